@@ -3,15 +3,16 @@ import tkinter as tk
 from tkinter import ttk
 
 from config import COLORS, FONTS
-from utils import validate_email, validate_password, show_message
+from utils import validate_email, validate_password, show_message, run_in_background
 from database import Database
 
 
 class AuthenticationUI:
-    def __init__(self, parent, on_login_success):
+    def __init__(self, parent, on_login_success, prefetcher=None):
         self.parent = parent
         self.on_login_success = on_login_success
-        self.db = Database()
+        self.prefetcher = prefetcher
+        self.db = prefetcher.db if prefetcher else Database()
 
         self.current_mode = "login"
         self._auth_compact = False
@@ -20,6 +21,9 @@ class AuthenticationUI:
         self.form_panel = None
         self.login_frame = None
         self.register_frame = None
+        self.login_button = None
+        self.register_button = None
+        self._auth_busy = False
 
         self.login_username = tk.StringVar()
         self.login_password = tk.StringVar()
@@ -149,6 +153,9 @@ class AuthenticationUI:
         self.login_password_entry.pack(fill=tk.X, pady=(0, 8), ipady=5)
         self.login_username_entry.bind("<Return>", self._submit_login)
         self.login_password_entry.bind("<Return>", self._submit_login)
+        # Start loading dashboard data while the password is being typed
+        self.login_password_entry.bind("<FocusIn>", self._prefetch_dashboard, add="+")
+        self.login_password_entry.bind("<KeyPress>", self._prefetch_dashboard, add="+")
 
         tk.Checkbutton(
             self.login_frame,
@@ -162,7 +169,7 @@ class AuthenticationUI:
             selectcolor=COLORS["surface"],
         ).pack(anchor=tk.W)
 
-        tk.Button(
+        self.login_button = tk.Button(
             self.login_frame,
             text="Sign In",
             command=lambda: self.handle_login(self.login_username.get(), self.login_password.get()),
@@ -173,7 +180,8 @@ class AuthenticationUI:
             cursor="hand2",
             padx=16,
             pady=10,
-        ).pack(fill=tk.X, pady=(16, 0))
+        )
+        self.login_button.pack(fill=tk.X, pady=(16, 0))
 
         helper = tk.Frame(self.login_frame, bg=COLORS["surface"])
         helper.pack(fill=tk.X, pady=(10, 0))
@@ -247,7 +255,7 @@ class AuthenticationUI:
 
         tk.Label(self.register_frame, textvariable=self.password_strength_var, font=FONTS["small"], fg=COLORS["primary"], bg=COLORS["surface"]).grid(row=7, column=0, columnspan=2, sticky="w", pady=(0, 8))
 
-        tk.Button(
+        self.register_button = tk.Button(
             self.register_frame,
             text="Create Account",
             command=lambda: self.handle_register(
@@ -264,7 +272,8 @@ class AuthenticationUI:
             cursor="hand2",
             padx=16,
             pady=10,
-        ).grid(row=8, column=0, columnspan=2, sticky="ew", pady=(4, 0))
+        )
+        self.register_button.grid(row=8, column=0, columnspan=2, sticky="ew", pady=(4, 0))
 
         tk.Label(
             self.register_frame,
@@ -327,6 +336,10 @@ class AuthenticationUI:
         self.login_username.set("admin")
         self.login_password.set("Admin@123")
 
+    def _prefetch_dashboard(self, event=None):
+        if self.prefetcher:
+            self.prefetcher.prefetch(self.login_username.get())
+
     def _submit_login(self, event=None):
         self.handle_login(self.login_username.get(), self.login_password.get())
 
@@ -364,15 +377,32 @@ class AuthenticationUI:
             show_message(self.parent, "Error", "Username and password are required", "error")
             return
 
-        try:
-            user_data = self.db.login_user(username, password)
+        if self._auth_busy:
+            return
+
+        def on_done(user_data):
+            self._set_busy(False, self.login_button, "Sign In")
             if not user_data:
                 show_message(self.parent, "Error", "Invalid username or password", "error")
                 return
             self.on_login_success(user_data)
-        except Exception as e:
+
+        def on_error(e):
+            self._set_busy(False, self.login_button, "Sign In")
             show_message(self.parent, "Error", f"Login failed: {str(e)}", "error")
 
+        # PBKDF2 verification is deliberately slow; keep the Tk loop responsive
+        self._set_busy(True, self.login_button, "Signing In...")
+        run_in_background(self.parent, lambda: self.db.login_user(username, password), on_done, on_error)
+
+    def _set_busy(self, busy, button=None, label=None):
+        self._auth_busy = busy
+        if button is not None:
+            try:
+                button.config(state=tk.DISABLED if busy else tk.NORMAL, text=label)
+            except tk.TclError:
+                pass
+
     def handle_register(self, full_name, username, email, password, confirm):
         full_name = (full_name or "").strip()
         username = (username or "").strip()
@@ -395,8 +425,11 @@ class AuthenticationUI:
             show_message(self.parent, "Error", message, "error")
             return
 
-        try:
-            user_id = self.db.register_user(username, email, password, full_name)
+        if self._auth_busy:
+            return
+
+        def on_done(user_id):
+            self._set_busy(False, self.register_button, "Create Account")
             if not user_id:
                 show_message(self.parent, "Error", "Username or email already exists", "error")
                 return
@@ -407,5 +440,15 @@ class AuthenticationUI:
             self.register_password.set("")
             self.register_confirm.set("")
             self._switch_mode("login")
-        except Exception as e:
+
+        def on_error(e):
+            self._set_busy(False, self.register_button, "Create Account")
             show_message(self.parent, "Error", f"Registration failed: {str(e)}", "error")
+
+        self._set_busy(True, self.register_button, "Creating Account...")
+        run_in_background(
+            self.parent,
+            lambda: self.db.register_user(username, email, password, full_name),
+            on_done,
+            on_error,
+        )
@@ -0,0 +1,375 @@
+"""Online SQLite backups: stepped snapshots, compression, verification and rotation.
+
+A backup of a database with archived years also has a ``<backup>.archive``
+folder beside it holding a copy of every archive file the snapshot uses.
+"""
+import gzip
+import os
+import re
+import shutil
+import sqlite3
+import tempfile
+import threading
+from datetime import datetime
+
+from config import (
+    ARCHIVE_DIR_NAME,
+    AUTO_BACKUP_INTERVAL,
+    BACKUP_COMPRESSION,
+    BACKUP_DIR,
+    BACKUP_KEEP,
+    BACKUP_PAGES_PER_STEP,
+    DB_PATH,
+)
+from migrations import migrate
+
+
+BACKUP_PREFIX = "OGCA_DB_Backup_"
+ARCHIVE_SUFFIX = ".archive"
+COMPRESSION_SUFFIXES = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _require_zstd():
+    try:
+        import zstandard
+    except Exception:
+        raise RuntimeError("zstandard is required for .zst backups. Install with: pip install zstandard")
+    return zstandard
+
+
+def compression_for_path(path):
+    """Infer compression from a backup file name (None for plain .db)."""
+    path = str(path)
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def _compress_file(src, dst, compression):
+    if compression == "gzip":
+        with open(src, "rb") as fin, gzip.open(dst, "wb", compresslevel=6) as fout:
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+    elif compression == "zstd":
+        zstandard = _require_zstd()
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            zstandard.ZstdCompressor(level=10).copy_stream(fin, fout)
+    else:
+        shutil.copyfile(src, dst)
+
+
+def _decompress_file(src, dst, compression):
+    if compression == "gzip":
+        with gzip.open(src, "rb") as fin, open(dst, "wb") as fout:
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+    elif compression == "zstd":
+        zstandard = _require_zstd()
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            zstandard.ZstdDecompressor().copy_stream(fin, fout)
+    else:
+        shutil.copyfile(src, dst)
+
+
+def _online_copy(src_path, dst_path, pages, progress):
+    """Copy src into dst page by page; readers/writers are only blocked per step."""
+    src = sqlite3.connect(str(src_path))
+    dst = sqlite3.connect(str(dst_path))
+    try:
+        def _step(status, remaining, total):
+            if progress:
+                progress(total - remaining, total)
+
+        src.backup(dst, pages=pages, progress=_step)
+    finally:
+        dst.close()
+        src.close()
+
+
+def integrity_check(db_file):
+    """Run PRAGMA integrity_check on an uncompressed database. Returns (ok, message)."""
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        rows = conn.execute("PRAGMA integrity_check").fetchall()
+    finally:
+        conn.close()
+    messages = [r[0] for r in rows]
+    return messages == ["ok"], "; ".join(messages[:5])
+
+
+def backup_archive_dir(path):
+    """Folder holding the archive-file copies that belong to the backup at path."""
+    return str(path) + ARCHIVE_SUFFIX
+
+
+def _archive_parts(db_file):
+    """{file_name: {table: row_count}} for the archive files a database uses."""
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'archive_partitions'").fetchone():
+            return {}
+        parts = {}
+        for file_name, table, row_count in conn.execute(
+            "SELECT file_name, table_name, row_count FROM archive_partitions"
+        ):
+            parts.setdefault(file_name, {})[table] = row_count
+        return parts
+    finally:
+        conn.close()
+
+
+def _table_counts(db_file, tables):
+    conn = sqlite3.connect(f"file:{db_file}?mode=ro", uri=True)
+    try:
+        have = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] if t in have else 0 for t in tables}
+    finally:
+        conn.close()
+
+
+def _snapshot_archive(db_path, snapshot, out_dir, compression, pages, verify):
+    """Copy the archive files snapshot refers to into out_dir. Returns how many were copied.
+
+    Archiving moves rows and updates archive_partitions in one transaction, so
+    each copy must hold exactly the row counts recorded in the snapshot;
+    anything else means an archive run overlapped the backup.
+    """
+    parts = _archive_parts(snapshot)
+    if not parts:
+        return 0
+    archive_dir = os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIR_NAME)
+    os.makedirs(out_dir, exist_ok=True)
+    for file_name, expected in sorted(parts.items()):
+        src = os.path.join(archive_dir, file_name)
+        if not os.path.exists(src):
+            raise FileNotFoundError(f"Archive file not found: {src}")
+        plain = os.path.join(out_dir, file_name + ".tmp")
+        try:
+            _online_copy(src, plain, pages, None)
+            if verify:
+                ok, message = integrity_check(plain)
+                if not ok:
+                    raise RuntimeError(f"Archive {file_name} failed integrity check: {message}")
+            if _table_counts(plain, expected) != expected:
+                raise RuntimeError(f"Archive {file_name} changed while the backup was running; try again")
+            _compress_file(plain, os.path.join(out_dir, file_name + COMPRESSION_SUFFIXES[compression]), compression)
+        finally:
+            if os.path.exists(plain):
+                os.remove(plain)
+    return len(parts)
+
+
+def _archive_files(directory):
+    """{archive file name: stored path} for a backup's archive folder."""
+    files = {}
+    for name in os.listdir(directory):
+        compression = compression_for_path(name)
+        files[name[:len(name) - len(COMPRESSION_SUFFIXES[compression])]] = os.path.join(directory, name)
+    return files
+
+
+def verify_backup(path):
+    """Verify a (possibly compressed) backup file and its archive folder. Returns (ok, message)."""
+    compression = compression_for_path(path)
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = str(path)
+        if compression is not None:
+            plain = os.path.join(tmp, "verify.db")
+            _decompress_file(path, plain, compression)
+        ok, message = integrity_check(plain)
+        if not ok:
+            return ok, message
+        parts = _archive_parts(plain)
+        if not parts:
+            return ok, message
+        archive = backup_archive_dir(path)
+        stored = _archive_files(archive) if os.path.isdir(archive) else {}
+        missing = sorted(set(parts) - set(stored))
+        if missing:
+            return False, f"archive files missing from {archive}: {', '.join(missing)}"
+        for file_name in sorted(parts):
+            part = os.path.join(tmp, file_name)
+            _decompress_file(stored[file_name], part, compression_for_path(stored[file_name]))
+            ok, message = integrity_check(part)
+            if not ok:
+                return False, f"{file_name}: {message}"
+        return True, f"ok ({len(parts)} archive files)"
+
+
+def default_backup_name(compression=None):
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"{BACKUP_PREFIX}{stamp}.db{COMPRESSION_SUFFIXES.get(compression, '')}"
+
+
+def create_backup(dest=None, db_path=None, compression=BACKUP_COMPRESSION, pages=BACKUP_PAGES_PER_STEP,
+                  progress=None, verify=True):
+    """Snapshot the live database with the SQLite online backup API.
+
+    dest may be a file or a directory (a timestamped name is generated).
+    The snapshot is written to a temporary file next to dest, checked with
+    PRAGMA integrity_check, optionally compressed and then moved into place,
+    so a failed run never leaves a partial backup behind. Archive files the
+    snapshot uses are copied into backup_archive_dir(dest). Returns the path.
+    """
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd":
+        _require_zstd()
+
+    db_path = db_path or DB_PATH
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database file not found: {db_path}")
+
+    dest = str(dest) if dest else str(BACKUP_DIR) + os.sep
+    if os.path.isdir(dest) or dest.endswith(os.sep):
+        os.makedirs(dest, exist_ok=True)
+        dest = os.path.join(dest, default_backup_name(compression))
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+
+    fd, tmp_db = tempfile.mkstemp(suffix=".db", prefix=".ogca_backup_", dir=os.path.dirname(os.path.abspath(dest)))
+    os.close(fd)
+    tmp_out = dest + ".part"
+    archive = backup_archive_dir(dest)
+    tmp_archive = archive + ".part"
+    try:
+        _online_copy(db_path, tmp_db, pages, progress)
+        if verify:
+            ok, message = integrity_check(tmp_db)
+            if not ok:
+                raise RuntimeError(f"Backup failed integrity check: {message}")
+        shutil.rmtree(tmp_archive, ignore_errors=True)
+        copied = _snapshot_archive(db_path, tmp_db, tmp_archive, compression, pages, verify)
+        shutil.rmtree(archive, ignore_errors=True)
+        if copied:
+            os.replace(tmp_archive, archive)
+        if compression:
+            _compress_file(tmp_db, tmp_out, compression)
+            os.replace(tmp_out, dest)
+        else:
+            os.replace(tmp_db, dest)
+    finally:
+        for leftover in (tmp_db, tmp_out):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        shutil.rmtree(tmp_archive, ignore_errors=True)
+    return dest
+
+
+def restore_backup(src, db_path=None, pages=BACKUP_PAGES_PER_STEP, progress=None):
+    """Verify a backup and copy it into the live database through the backup API.
+
+    Writing through SQLite (rather than replacing the file) keeps any open
+    connections valid and never exposes a half-written database file. The
+    archive files in the backup's archive folder replace the database's
+    own, and archive files the restored database no longer uses are removed.
+    Backups made without an archive folder leave the archive files alone.
+    """
+    db_path = db_path or DB_PATH
+    compression = compression_for_path(src)
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = str(src)
+        if compression:
+            plain = os.path.join(tmp, "restore.db")
+            _decompress_file(src, plain, compression)
+        ok, message = integrity_check(plain)
+        if not ok:
+            raise RuntimeError(f"Backup failed integrity check: {message}")
+        archive = backup_archive_dir(src)
+        parts = {}
+        if os.path.isdir(archive):
+            stored = _archive_files(archive)
+            for file_name in _archive_parts(plain):
+                if file_name not in stored:
+                    raise FileNotFoundError(f"Archive file {file_name} is missing from {archive}")
+                part = os.path.join(tmp, file_name)
+                _decompress_file(stored[file_name], part, compression_for_path(stored[file_name]))
+                ok, message = integrity_check(part)
+                if not ok:
+                    raise RuntimeError(f"Archive {file_name} failed integrity check: {message}")
+                parts[file_name] = part
+        _online_copy(plain, db_path, pages, progress)
+        if os.path.isdir(archive):
+            _restore_archive(db_path, parts)
+    # A backup from an older release carries its older user_version; upgrade it now
+    migrate(db_path)
+    return db_path
+
+
+def _restore_archive(db_path, parts):
+    """Put the backup's archive files in place and drop ones the restored database does not use."""
+    archive_dir = os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIR_NAME)
+    os.makedirs(archive_dir, exist_ok=True)
+    for file_name, part in parts.items():
+        target = os.path.join(archive_dir, file_name)
+        shutil.copyfile(part, target + ".part")
+        os.replace(target + ".part", target)
+    stem = re.escape(os.path.splitext(os.path.basename(str(db_path)))[0])
+    for name in os.listdir(archive_dir):
+        if re.fullmatch(stem + r"_\d{4}\.db", name) and name not in parts:
+            os.remove(os.path.join(archive_dir, name))
+
+
+def list_backups(directory=None):
+    """Backups in directory, newest first."""
+    directory = str(directory or BACKUP_DIR)
+    if not os.path.isdir(directory):
+        return []
+    names = [
+        n for n in os.listdir(directory)
+        if n.startswith(BACKUP_PREFIX) and not n.endswith((".part", ARCHIVE_SUFFIX))
+    ]
+    return sorted((os.path.join(directory, n) for n in names), key=os.path.getmtime, reverse=True)
+
+
+def rotate_backups(directory=None, keep=BACKUP_KEEP):
+    """Delete all but the newest `keep` backups. Returns removed paths."""
+    removed = []
+    for path in list_backups(directory)[max(keep, 0):]:
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            continue
+        shutil.rmtree(backup_archive_dir(path), ignore_errors=True)
+    return removed
+
+
+class BackupScheduler:
+    """Take a rotated backup every `interval` seconds on a daemon thread."""
+
+    def __init__(self, interval=AUTO_BACKUP_INTERVAL, directory=None, keep=BACKUP_KEEP,
+                 compression=BACKUP_COMPRESSION, db_path=None):
+        self.interval = max(int(interval), 60)
+        self.directory = str(directory or BACKUP_DIR)
+        self.keep = keep
+        self.compression = compression
+        self.db_path = db_path
+        self.last_backup = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.last_backup = create_backup(self.directory, db_path=self.db_path, compression=self.compression)
+            rotate_backups(self.directory, self.keep)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+        return self.last_backup
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ogca-backup", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
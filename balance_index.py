@@ -0,0 +1,159 @@
+"""Point-in-time balances from a Fenwick (binary indexed) tree per account.
+
+daily_net holds each (user, account, day)'s net flow and is kept current by
+triggers (migration 12); archiving keeps the days it moves out, so it covers
+archived years too. A user's trees are built from it on first use: one per
+account (0 = personal) plus one for all accounts. After that, the flow
+deltas Database publishes on every commit are added to the trees, so
+balance-as-of and net-between queries are O(log days) and never re-read the
+ledger. A write to monthly_rollups (archiving, restoring) drops the user's
+trees to be rebuilt on the next query.
+
+account is "ALL", None (personal rows, no managed account) or an account id.
+"""
+import threading
+from datetime import date, timedelta
+
+
+GROW_DAYS = 366  # extra days allocated past the last day when a tree is (re)built
+
+
+def _ordinal(day):
+    if isinstance(day, date):
+        return day.toordinal()
+    return date.fromisoformat(str(day)[:10]).toordinal()
+
+
+class Fenwick:
+    """Prefix sums over consecutive days; add and prefix are O(log n)."""
+
+    def __init__(self, daily=None):
+        self.daily = dict(daily or {})  # ordinal -> net, kept so the tree can be rebuilt over a wider range
+        self.first = self.size = 0
+        self.tree = [0.0]
+        if self.daily:
+            self._build()
+
+    def _build(self):
+        first, last = min(self.daily), max(self.daily)
+        self.first = first
+        self.size = last - first + 1 + GROW_DAYS
+        tree = [0.0] * (self.size + 1)
+        for ordinal, net in self.daily.items():
+            tree[ordinal - first + 1] += net
+        for index in range(1, self.size + 1):  # O(n) bottom-up build
+            parent = index + (index & -index)
+            if parent <= self.size:
+                tree[parent] += tree[index]
+        self.tree = tree
+
+    def add(self, ordinal, net):
+        self.daily[ordinal] = self.daily.get(ordinal, 0.0) + net
+        if not self.first <= ordinal < self.first + self.size:
+            self._build()
+            return
+        index = ordinal - self.first + 1
+        while index <= self.size:
+            self.tree[index] += net
+            index += index & -index
+
+    def prefix(self, ordinal):
+        """Sum of every day up to and including ordinal."""
+        index = min(ordinal - self.first + 1, self.size)
+        total = 0.0
+        while index > 0:
+            total += self.tree[index]
+            index -= index & -index
+        return total
+
+
+class BalanceIndex:
+    def __init__(self, db):
+        self.db = db
+        self._trees = {}  # user_id -> {account_id or "ALL": Fenwick}
+        self._generation = 0  # bumped by writes so a build racing one is not kept
+        self._lock = threading.Lock()
+        db.add_flow_listener(self._on_flows)
+        db.add_change_listener(self._on_change)
+
+    def balance_as_of(self, user_id, day=None, account="ALL"):
+        """Balance of every flow dated on or before day (default today)."""
+        tree = self._tree(user_id, account)
+        if tree is None:
+            return 0.0
+        with self._lock:
+            return tree.prefix(_ordinal(day or date.today()))
+
+    def net_between(self, user_id, start_date, end_date, account="ALL"):
+        """Net flow from start_date through end_date, both inclusive."""
+        tree = self._tree(user_id, account)
+        if tree is None:
+            return 0.0
+        with self._lock:
+            return tree.prefix(_ordinal(end_date)) - tree.prefix(_ordinal(start_date) - 1)
+
+    def opening_and_closing(self, user_id, start_date, end_date, account="ALL"):
+        """(balance before start_date, balance at the end of end_date)."""
+        opening = self.balance_as_of(user_id, date.fromordinal(_ordinal(start_date)) - timedelta(days=1), account)
+        return opening, self.balance_as_of(user_id, end_date, account)
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._trees.clear()
+            else:
+                self._trees.pop(user_id, None)
+
+    def close(self):
+        self.db.remove_flow_listener(self._on_flows)
+        self.db.remove_change_listener(self._on_change)
+
+    def _tree(self, user_id, account):
+        key = 0 if account in (None, "", 0) else account
+        with self._lock:
+            trees = self._trees.get(user_id)
+            generation = self._generation
+        if trees is None:
+            trees = self._build(user_id)
+            with self._lock:
+                if generation == self._generation:
+                    self._trees[user_id] = trees
+        return trees.get(key)
+
+    def _build(self, user_id):
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT account_id, day, net FROM daily_net WHERE user_id = ?", (user_id,))
+            rows = cursor.fetchall()
+        finally:
+            conn.close()
+        daily = {"ALL": {}}
+        for account_id, day, net in rows:
+            try:
+                ordinal = _ordinal(day)
+            except ValueError:
+                continue
+            for key in (account_id or 0, "ALL"):
+                days = daily.setdefault(key, {})
+                days[ordinal] = days.get(ordinal, 0.0) + net
+        return {key: Fenwick(days) for key, days in daily.items()}
+
+    def _on_flows(self, flows):
+        with self._lock:
+            self._generation += 1
+            for (user_id, account_id, day), net in flows.items():
+                trees = self._trees.get(user_id)
+                if trees is None:
+                    continue  # not built yet: the first query reads daily_net
+                try:
+                    ordinal = _ordinal(day)
+                except ValueError:
+                    continue
+                for key in (account_id or 0, "ALL"):
+                    trees.setdefault(key, Fenwick()).add(ordinal, net)
+
+    def _on_change(self, tables):
+        if "monthly_rollups" in tables:
+            self.invalidate()
@@ -0,0 +1,176 @@
+"""Month-end batch PDF statements for managed accounts (no tkinter dependency).
+
+Each account is rendered by a separate task in a process pool. Workers
+import pdf_generator once and reuse its cached palette and styles for every
+account they render. Results are written to an output directory together
+with a manifest.json describing every file (or failure).
+"""
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import calendar
+from datetime import date, datetime, timedelta
+
+from database import Database
+
+
+MANIFEST_NAME = "manifest.json"
+PERIOD_DAYS = {"Month": 30, "Quarter": 90, "Year": 365}
+
+
+def period_range(period, today=None):
+    """Return (start_date, end_date) strings for Month/Quarter/Year."""
+    end = (today or datetime.now()).date()
+    start = end - timedelta(days=PERIOD_DAYS.get(period, 30))
+    return str(start), str(end)
+
+
+def closed_period_range(period="Month", today=None):
+    """(start_date, end_date) of the last full calendar Month/Quarter/Year before today.
+
+    Statements cover closed periods: run on 5 March, "Month" is 1-28 February.
+    """
+    day = (today or datetime.now()).date()
+    months = {"Quarter": 3, "Year": 12}.get(period, 1)
+    current = day.year * 12 + (day.month - 1) // months * months  # first month of the running period
+    first = current - months
+    start = date(first // 12, first % 12 + 1, 1)
+    last = current - 1
+    end_year, end_month = last // 12, last % 12 + 1
+    end = date(end_year, end_month, calendar.monthrange(end_year, end_month)[1])
+    return str(start), str(end)
+
+
+def _slug(value):
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", str(value or "")).strip("_") or "account"
+
+
+def report_user_data(db, user_id):
+    """User data with the report-designer brand name applied."""
+    user = db.get_user(user_id) or {}
+    design = db.get_report_design(user_id) or {}
+    if design.get("brand_name"):
+        user["full_name"] = design["brand_name"]
+    return user
+
+
+def render_account_report(db_path, task, out_dir, start_date=None, end_date=None, skip_empty=True):
+    """Render one account statement. Returns a manifest entry (never raises)."""
+    entry = {
+        "user_id": task["user_id"],
+        "username": task.get("username", ""),
+        "account_id": task["account_id"],
+        "account_name": task["account_name"],
+        "file": None,
+        "status": "ok",
+    }
+    t0 = time.perf_counter()
+    try:
+        from pdf_generator import AccountingReportGenerator
+
+        db = Database(db_path)
+        expenses = db.get_account_expenses(task["user_id"], task["account_id"], start_date, end_date)
+        summary = db.get_account_summary(task["user_id"], task["account_id"], start_date, end_date)
+        entry["transactions"] = len(expenses)
+        entry["total_expenses"] = round(float(summary["total_expenses"] or 0), 2)
+        entry["total_income"] = round(float(summary["total_income"] or 0), 2)
+        if not expenses and skip_empty:
+            entry["status"] = "skipped"
+            return entry
+
+        filename = f"Account_Report_{_slug(task.get('username'))}_{_slug(task['account_name'])}_{task['account_id']}.pdf"
+        path = os.path.join(out_dir, filename)
+        AccountingReportGenerator(path).generate_expense_report(
+            report_user_data(db, task["user_id"]),
+            expenses,
+            summary,
+            start_date or (expenses[-1]["date"] if expenses else ""),
+            end_date or datetime.now().strftime("%Y-%m-%d"),
+            report_name=f"Account Statement - {task['account_name']}",
+        )
+        entry["file"] = filename
+    except Exception as e:
+        entry["status"] = "error"
+        entry["error"] = str(e)
+    finally:
+        entry["seconds"] = round(time.perf_counter() - t0, 3)
+    return entry
+
+
+def _warm_worker():
+    # Build the shared palette/styles once per worker process
+    try:
+        from pdf_generator import AccountingReportGenerator
+
+        AccountingReportGenerator(os.devnull)._expense_table_style()
+    except Exception:
+        pass
+
+
+def write_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def run_batch_reports(out_dir, db_path=None, user_ids=None, start_date=None, end_date=None,
+                      workers=None, skip_empty=True, progress=None):
+    """Render a statement for every managed account (optionally of user_ids).
+
+    progress(done, total) is called as accounts finish. Returns the manifest
+    dict, which is also written to out_dir/manifest.json.
+    """
+    db = Database(db_path)
+    db_path = db.db_path
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [
+        {
+            "user_id": a["user_id"],
+            "username": a["username"],
+            "account_id": a["id"],
+            "account_name": a["account_name"],
+        }
+        for a in db.get_all_managed_accounts(user_ids)
+    ]
+
+    started = datetime.now()
+    t0 = time.perf_counter()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    entries = []
+    if workers == 1:
+        _warm_worker()
+        for task in tasks:
+            entries.append(render_account_report(db_path, task, out_dir, start_date, end_date, skip_empty))
+            if progress:
+                progress(len(entries), len(tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+            futures = [
+                pool.submit(render_account_report, db_path, task, out_dir, start_date, end_date, skip_empty)
+                for task in tasks
+            ]
+            for future in as_completed(futures):
+                entries.append(future.result())
+                if progress:
+                    progress(len(entries), len(tasks))
+
+    entries.sort(key=lambda e: (e["user_id"], e["account_name"]))
+    manifest = {
+        "generated_at": started.isoformat(timespec="seconds"),
+        "start_date": start_date,
+        "end_date": end_date,
+        "workers": workers,
+        "seconds": round(time.perf_counter() - t0, 3),
+        "accounts": len(entries),
+        "written": sum(1 for e in entries if e["status"] == "ok"),
+        "skipped": sum(1 for e in entries if e["status"] == "skipped"),
+        "failed": sum(1 for e in entries if e["status"] == "error"),
+        "reports": entries,
+    }
+    write_manifest(out_dir, manifest)
+    return manifest
@@ -0,0 +1,165 @@
+"""Net flow and running balance time series (no tkinter dependency).
+
+Income (+) and expenses (-) are UNION ALLed as typed flows, grouped into
+day, week (Monday) or month buckets, and the running balance is a
+SUM() OVER (ORDER BY period) window, all in one query. Ranged series reach
+into archive years like other ranged reads and start from the balance
+carried in from before the range; all-time series add archived months from
+monthly_rollups as flows on the first of each month.
+
+account is "ALL", None (personal rows, no managed account) or an account id.
+"""
+import threading
+from collections import OrderedDict
+
+from config import CASH_FLOW_CACHE_SIZE
+
+
+BUCKETS = {
+    "day": "date(day)",
+    "week": "date(day, '-6 days', 'weekday 1')",
+    "month": "strftime('%Y-%m-01', day)",
+}
+FLOW_TABLES = (("income", "income"), ("expenses", "expense"))
+LEDGER_TABLES = frozenset({"expenses", "income", "monthly_rollups"})
+
+
+def _scope(account, column="account_id"):
+    """SQL condition and params for an account scope."""
+    if account == "ALL":
+        return "", []
+    if account in (None, "", 0):
+        return f" AND COALESCE({column}, 0) = 0", []
+    return f" AND {column} = ?", [account]
+
+
+def _opening_balance(db, conn, user_id, start_date, account):
+    """Balance of every flow dated before start_date, archived rows included."""
+    cursor = conn.cursor()
+    month_start = f"{start_date[:7]}-01"
+    scope_sql, scope_params = _scope(account)
+    balance = 0.0
+    for table, kind in FLOW_TABLES:
+        sign = 1 if kind == "income" else -1
+        cursor.execute(
+            f"SELECT COALESCE(SUM(amount), 0) FROM {table} WHERE user_id = ? AND date < ?{scope_sql}",
+            [user_id, month_start] + scope_params,
+        )
+        balance += sign * cursor.fetchone()[0]
+        if month_start < start_date:
+            # Part of the start month: live rows plus archived rows (their rollup month is not counted)
+            source = db._ledger_source(conn, table, month_start, start_date)
+            cursor.execute(
+                f"SELECT COALESCE(SUM(amount), 0) FROM {source} WHERE user_id = ? AND date >= ? AND date < ?{scope_sql}",
+                [user_id, month_start, start_date] + scope_params,
+            )
+            balance += sign * cursor.fetchone()[0]
+    cursor.execute(
+        f"""
+        SELECT COALESCE(SUM(CASE kind WHEN 'income' THEN total ELSE -total END), 0)
+        FROM monthly_rollups WHERE user_id = ? AND month < ?{scope_sql}
+        """,
+        [user_id, start_date[:7]] + scope_params,
+    )
+    return balance + cursor.fetchone()[0]
+
+
+def flow_series(db, user_id, granularity="day", start_date=None, end_date=None, account="ALL"):
+    """[{period, income, expenses, net, balance}] in period order (empty periods are skipped)."""
+    if granularity not in BUCKETS:
+        raise ValueError(f"granularity must be one of {', '.join(BUCKETS)}")
+    start_date = str(start_date) if start_date else None
+    end_date = str(end_date) if end_date else None
+    scope_sql, scope_params = _scope(account)
+
+    conn = db.get_connection()
+    try:
+        range_sql, range_params = "", []
+        if start_date:
+            range_sql += " AND date >= ?"
+            range_params.append(start_date)
+        if end_date:
+            range_sql += " AND date <= ?"
+            range_params.append(end_date)
+
+        selects, params = [], []
+        for table, kind in FLOW_TABLES:
+            source = db._ledger_source(conn, table, start_date, end_date) if start_date else table
+            selects.append(
+                f"SELECT date AS day, '{kind}' AS kind, amount FROM {source} WHERE user_id = ?{range_sql}{scope_sql}"
+            )
+            params += [user_id] + range_params + scope_params
+        opening = 0.0
+        if start_date:
+            opening = _opening_balance(db, conn, user_id, start_date, account)
+        else:
+            rollup_sql = " AND month || '-01' <= ?" if end_date else ""
+            selects.append(
+                f"SELECT month || '-01' AS day, kind, total AS amount FROM monthly_rollups WHERE user_id = ?{rollup_sql}{scope_sql}"
+            )
+            params += [user_id] + ([end_date] if end_date else []) + scope_params
+
+        flows = "\n UNION ALL \n".join(selects)
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            WITH flows AS ({flows}),
+            buckets AS (
+                SELECT {BUCKETS[granularity]} AS period,
+                       SUM(CASE kind WHEN 'income' THEN amount ELSE 0 END) AS income,
+                       SUM(CASE kind WHEN 'expense' THEN amount ELSE 0 END) AS expenses
+                FROM flows
+                GROUP BY period
+            )
+            SELECT period, income, expenses, income - expenses AS net,
+                   ? + SUM(income - expenses) OVER (ORDER BY period ROWS UNBOUNDED PRECEDING) AS balance
+            FROM buckets
+            WHERE period IS NOT NULL
+            ORDER BY period
+            """,
+            params + [opening],
+        )
+        return [dict(row) for row in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+class CashFlow:
+    """flow_series() with an LRU cache per (user, granularity, range, account).
+
+    The cache is dropped whenever the Database reports a write to the ledger
+    tables, so repeated chart and report reads of the same range are free.
+    """
+
+    def __init__(self, db, max_entries=CASH_FLOW_CACHE_SIZE):
+        self.db = db
+        self.max_entries = max(1, int(max_entries))
+        self._cache = OrderedDict()
+        self._generation = 0  # bumped by writes so a query racing one is not cached
+        self._lock = threading.Lock()
+        db.add_change_listener(self._on_change)
+
+    def series(self, user_id, granularity="day", start_date=None, end_date=None, account="ALL"):
+        key = (user_id, granularity, str(start_date or ""), str(end_date or ""), account)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return list(self._cache[key])
+            generation = self._generation
+        rows = flow_series(self.db, user_id, granularity, start_date, end_date, account)
+        with self._lock:
+            if generation != self._generation:
+                return list(rows)
+            self._cache[key] = rows
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return list(rows)
+
+    def close(self):
+        self.db.remove_change_listener(self._on_change)
+
+    def _on_change(self, tables):
+        if LEDGER_TABLES & set(tables):
+            with self._lock:
+                self._generation += 1
+                self._cache.clear()
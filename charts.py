@@ -0,0 +1,323 @@
+"""Lightweight tk.Canvas charts: line, band, bar and donut.
+
+Charts keep their canvas items between redraws: every draw takes items
+from per-kind pools (coords/itemconfigure) and hides whatever is left over,
+so redrawing on resize or on new data creates nothing after the first
+paint. Line series with more points than the plot is wide are downsampled
+with LTTB (largest-triangle-three-buckets), which keeps the peaks and
+troughs that plain striding would drop.
+"""
+import math
+import tkinter as tk
+
+from config import COLORS, FONTS, CHART_COLORS, CHART_BAND_COLORS
+
+
+def lttb(points, threshold):
+    """Downsample [(x, y), ...] sorted by x to `threshold` points (first and last kept)."""
+    n = len(points)
+    if threshold >= n or threshold < 3:
+        return list(points)
+    sampled = [points[0]]
+    every = (n - 2) / (threshold - 2)
+    anchor = 0
+    for bucket in range(threshold - 2):
+        lo = int(bucket * every) + 1
+        hi = int((bucket + 1) * every) + 1
+        nxt = points[hi:min(int((bucket + 2) * every) + 1, n)] or points[-1:]
+        avg_x = sum(p[0] for p in nxt) / len(nxt)
+        avg_y = sum(p[1] for p in nxt) / len(nxt)
+        ax, ay = points[anchor]
+        best, best_area = lo, -1.0
+        for index in range(lo, hi):
+            x, y = points[index]
+            area = abs((ax - avg_x) * (y - ay) - (ax - x) * (avg_y - ay))
+            if area > best_area:
+                best, best_area = index, area
+        sampled.append(points[best])
+        anchor = best
+    sampled.append(points[-1])
+    return sampled
+
+
+def nice_ticks(lo, hi, count=5):
+    """Round axis ticks covering [lo, hi]."""
+    if hi <= lo:
+        hi = lo + 1
+    raw = (hi - lo) / count
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    value = math.floor(lo / step) * step
+    ticks = []
+    while value <= hi + step * 1e-9:
+        ticks.append(value)
+        value += step
+    if ticks[-1] < hi:
+        ticks.append(ticks[-1] + step)
+    return ticks
+
+
+def short_amount(value):
+    """Compact axis label: 1500 -> 1.5k, 2500000 -> 2.5M."""
+    size = abs(value)
+    for limit, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if size >= limit:
+            return f"{value / limit:.1f}".rstrip("0").rstrip(".") + suffix
+    return f"{value:.0f}"
+
+
+# Stacking order of item layers (items created later are raised back into place)
+LAYERS = ("band", "grid", "mark", "label")
+
+
+class ChartCanvas(tk.Canvas):
+    """Base chart: pooled items and a coalesced redraw on resize or new data."""
+
+    margin = (56, 16, 16, 30)  # left, top, right, bottom
+
+    def __init__(self, parent, height=240, bg=None, title="", **kwargs):
+        bg = bg or COLORS["surface"]
+        super().__init__(parent, height=height, bg=bg, highlightthickness=0, **kwargs)
+        self.title = title
+        self._bg = bg
+        self._pools = {}
+        self._used = {}
+        self._pending = None
+        self.bind("<Configure>", lambda e: self.redraw_later())
+
+    def redraw_later(self):
+        if self._pending is None:
+            self._pending = self.after_idle(self.redraw)
+
+    def redraw(self):
+        """Draw now (reusing items); normally scheduled through redraw_later()."""
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+            self._pending = None
+        if not self.winfo_exists():
+            return
+        self._used = {}
+        width = max(self.winfo_width(), int(self.cget("width") or 0), 2)
+        height = max(self.winfo_height(), int(self.cget("height") or 0), 2)
+        if self.title:
+            self._item("text", (8, 4), layer="label", text=self.title, anchor=tk.NW, font=FONTS["label"],
+                       fill=COLORS["text_primary"])
+        self.draw(width, height)
+        for key, pool in self._pools.items():
+            for item in pool[self._used.get(key, 0):]:
+                self.itemconfigure(item, state="hidden")
+        for layer in LAYERS:
+            self.tag_raise(layer)
+
+    def draw(self, width, height):
+        raise NotImplementedError
+
+    def _item(self, kind, coords, layer="mark", **options):
+        """Next pooled item of kind ("line", "polygon", "rectangle", "text", "arc", "oval") in layer, created only once."""
+        key = (kind, layer)
+        pool = self._pools.setdefault(key, [])
+        index = self._used.get(key, 0)
+        self._used[key] = index + 1
+        if index < len(pool):
+            item = pool[index]
+            self.coords(item, *coords)
+            self.itemconfigure(item, state="normal", **options)
+        else:
+            item = getattr(self, f"create_{kind}")(*coords, tags=(layer,), **options)
+            pool.append(item)
+        return item
+
+    def _plot_box(self, width, height):
+        left, top, right, bottom = self.margin
+        top += 18 if self.title else 0
+        return left, top, max(left + 1, width - right), max(top + 1, height - bottom)
+
+    def _empty(self, width, height, text="No data yet"):
+        self._item("text", (width / 2, height / 2), layer="label", text=text, font=FONTS["body"],
+                   fill=COLORS["text_secondary"])
+
+    def _y_axis(self, box, lo, hi, y_format):
+        """Grid lines and labels; returns value -> canvas y."""
+        x0, y0, x1, y1 = box
+        ticks = nice_ticks(lo, hi)
+        lo, hi = ticks[0], ticks[-1]
+        scale = (y1 - y0) / (hi - lo)
+
+        def to_y(value):
+            return y1 - (value - lo) * scale
+
+        for tick in ticks:
+            y = to_y(tick)
+            self._item("line", (x0, y, x1, y), layer="grid", fill=COLORS["border"], width=1)
+            self._item("text", (x0 - 6, y), layer="label", text=y_format(tick), anchor=tk.E, font=FONTS["small"],
+                       fill=COLORS["text_secondary"])
+        if lo < 0 < hi:
+            self._item("line", (x0, to_y(0), x1, to_y(0)), layer="grid", fill=COLORS["border_dark"], width=1)
+        return to_y
+
+
+class LineChart(ChartCanvas):
+    """Single series line; long series are LTTB-downsampled to the plot width."""
+
+    def __init__(self, parent, color=None, x_format=str, y_format=short_amount, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.color = color or COLORS["secondary"]
+        self.x_format = x_format
+        self.y_format = y_format
+        self.points = []
+        self._sampled = (None, [])
+
+    def set_series(self, points):
+        """points: [(x, y), ...] with numeric x in ascending order (e.g. date ordinals)."""
+        self.points = [(float(x), float(y)) for x, y in points]
+        self._sampled = (None, [])
+        self.redraw_later()
+
+    def draw(self, width, height):
+        if len(self.points) < 2:
+            self._empty(width, height)
+            return
+        box = x0, y0, x1, y1 = self._plot_box(width, height)
+        target = max(3, int(x1 - x0))
+        if self._sampled[0] != target:
+            self._sampled = (target, lttb(self.points, target))
+        sampled = self._sampled[1]
+
+        ys = [p[1] for p in sampled]
+        to_y = self._y_axis(box, min(ys), max(ys), self.y_format)
+        first, last = self.points[0][0], self.points[-1][0]
+        x_scale = (x1 - x0) / ((last - first) or 1)
+        coords = []
+        for x, y in sampled:
+            coords.append(x0 + (x - first) * x_scale)
+            coords.append(to_y(y))
+        self._item("line", coords, fill=self.color, width=2)
+
+        for step in range(5):
+            x = first + (last - first) * step / 4
+            self._item("text", (x0 + (x - first) * x_scale, y1 + 4), layer="label", text=self.x_format(x),
+                       anchor=tk.N if 0 < step < 4 else (tk.NW if step == 0 else tk.NE),
+                       font=FONTS["small"], fill=COLORS["text_secondary"])
+
+
+class BandChart(ChartCanvas):
+    """Median line inside inner and outer shaded bands, e.g. 25-75% and 5-95% percentiles."""
+
+    def __init__(self, parent, color=None, band_colors=None, y_format=short_amount, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.color = color or COLORS["primary"]
+        self.band_colors = band_colors or CHART_BAND_COLORS
+        self.y_format = y_format
+        self.labels = []
+        self.median = []
+        self.bands = []
+
+    def set_bands(self, labels, median, bands):
+        """labels and median per step; bands: [(low, high), ...] outermost first, each a list per step."""
+        self.labels = [str(label) for label in labels]
+        self.median = [float(value) for value in median]
+        self.bands = [([float(v) for v in low], [float(v) for v in high]) for low, high in bands]
+        self.redraw_later()
+
+    def draw(self, width, height):
+        if len(self.median) < 2:
+            self._empty(width, height)
+            return
+        box = x0, y0, x1, y1 = self._plot_box(width, height)
+        values = self.median + [v for low, high in self.bands for v in low + high]
+        to_y = self._y_axis(box, min(values), max(values), self.y_format)
+        step = (x1 - x0) / (len(self.median) - 1)
+        xs = [x0 + index * step for index in range(len(self.median))]
+        for (low, high), color in zip(self.bands, self.band_colors):
+            coords = []
+            for x, value in zip(xs, high):
+                coords += (x, to_y(value))
+            for x, value in zip(reversed(xs), reversed(low)):
+                coords += (x, to_y(value))
+            self._item("polygon", coords, layer="band", fill=color, outline="")
+        line = []
+        for x, value in zip(xs, self.median):
+            line += (x, to_y(value))
+        self._item("line", line, fill=self.color, width=2)
+        label_every = max(1, math.ceil(len(self.labels) * 56 / max(1, x1 - x0)))
+        for index in range(0, len(self.labels), label_every):
+            self._item("text", (xs[index], y1 + 4), layer="label", text=self.labels[index][:10], anchor=tk.N,
+                       font=FONTS["small"], fill=COLORS["text_secondary"])
+
+
+class BarChart(ChartCanvas):
+    """Vertical bars for [(label, value), ...] (negative values hang below zero)."""
+
+    def __init__(self, parent, color=None, y_format=short_amount, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.color = color or COLORS["primary"]
+        self.y_format = y_format
+        self.data = []
+
+    def set_data(self, data):
+        self.data = [(str(label), float(value or 0)) for label, value in data]
+        self.redraw_later()
+
+    def draw(self, width, height):
+        if not self.data:
+            self._empty(width, height)
+            return
+        box = x0, y0, x1, y1 = self._plot_box(width, height)
+        values = [value for _, value in self.data]
+        to_y = self._y_axis(box, min(0.0, min(values)), max(0.0, max(values)), self.y_format)
+        slot = (x1 - x0) / len(self.data)
+        bar = max(1.0, slot * 0.7)
+        label_every = max(1, math.ceil(len(self.data) * 56 / max(1, x1 - x0)))
+        for index, (label, value) in enumerate(self.data):
+            left = x0 + index * slot + (slot - bar) / 2
+            top, bottom = sorted((to_y(value), to_y(0)))
+            fill = self.color if value >= 0 else COLORS["danger"]
+            self._item("rectangle", (left, top, left + bar, max(bottom, top + 1)), fill=fill, outline="")
+            if index % label_every == 0:
+                self._item("text", (left + bar / 2, y1 + 4), layer="label", text=label[:10], anchor=tk.N,
+                           font=FONTS["small"], fill=COLORS["text_secondary"])
+
+
+class DonutChart(ChartCanvas):
+    """Share of total for [(label, value), ...]; slices past max_slices are grouped as Other."""
+
+    def __init__(self, parent, max_slices=7, value_format=short_amount, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.max_slices = max_slices
+        self.value_format = value_format
+        self.data = []
+
+    def set_data(self, data):
+        rows = sorted(((str(label), float(value or 0)) for label, value in data if (value or 0) > 0),
+                      key=lambda row: row[1], reverse=True)
+        if len(rows) > self.max_slices:
+            rows = rows[:self.max_slices - 1] + [("Other", sum(value for _, value in rows[self.max_slices - 1:]))]
+        self.data = rows
+        self.redraw_later()
+
+    def draw(self, width, height):
+        total = sum(value for _, value in self.data)
+        if total <= 0:
+            self._empty(width, height)
+            return
+        top = 28 if self.title else 10
+        size = max(20, min(height - top - 10, width * 0.5))
+        x0, y0 = 14, top
+        start = 90.0
+        for index, (label, value) in enumerate(self.data):
+            extent = -min(359.999, 360.0 * value / total)
+            color = CHART_COLORS[index % len(CHART_COLORS)]
+            self._item("arc", (x0, y0, x0 + size, y0 + size), start=start, extent=extent,
+                       fill=color, outline=self._bg, style=tk.PIESLICE)
+            start += extent
+
+            ly = top + 4 + index * 20
+            lx = x0 + size + 18
+            self._item("rectangle", (lx, ly, lx + 10, ly + 10), layer="label", fill=color, outline="")
+            self._item("text", (lx + 16, ly + 5), layer="label", anchor=tk.W, font=FONTS["small"], fill=COLORS["text_primary"],
+                       text=f"{label[:18]}  {self.value_format(value)} ({value / total * 100:.0f}%)")
+        hole = size * 0.28
+        center = (x0 + size / 2, y0 + size / 2)
+        self._item("oval", (center[0] - hole, center[1] - hole, center[0] + hole, center[1] + hole),
+                   layer="label", fill=self._bg, outline=self._bg)
+        self._item("text", center, layer="label", text=self.value_format(total), font=FONTS["label"], fill=COLORS["text_primary"])
@@ -89,9 +89,11 @@ FONTS = {
     "label": ("Segoe UI", 10, "bold"),
 }
 
-# Password hashing
+# Password hashing (PBKDF2-HMAC). Cost is stored per user; changing these
+# values re-hashes each account transparently on its next successful login.
 SALT_LENGTH = 32
-HASH_ITERATIONS = 100000
+HASH_ALGORITHM = "sha256"
+HASH_ITERATIONS = 600000
 
 # PDF Configuration
 PDF_MARGIN = 50
@@ -257,6 +259,7 @@ CHART_COLORS = [
     "#f59e0b", "#06b6d4", "#8b5cf6", "#ec4899",
     "#14b8a6", "#f43f5e", "#eab308", "#06b6d4",
 ]
+CHART_BAND_COLORS = ["#dbeafe", "#93c5fd"]  # percentile bands, outermost first
 
 # Report Settings
 REPORT_DATE_RANGES = {
@@ -273,13 +276,49 @@ REPORT_DATE_RANGES = {
 
 # Notification Settings
 NOTIFICATIONS_ENABLED = True
+NOTIFICATION_RETENTION_DAYS = 90  # read notifications older than this leave the inbox
+NOTIFICATION_MAX_PER_USER = 500  # cap per user; oldest (read first) are pruned beyond it
+NOTIFICATION_ARCHIVE = True  # move pruned rows to notification_archive instead of deleting
+NOTIFICATION_PRUNE_BATCH = 500  # rows per short delete transaction
+TRASH_RETENTION_DAYS = 30  # trashed items older than this are purged in the background
+ARCHIVE_DIR_NAME = "archive"  # per-year cold-storage files live in <db folder>/archive
+ARCHIVE_AFTER_DAYS = 730  # default cutoff for archiving old transactions
 SHOW_BUDGET_ALERTS = True
 SHOW_MILESTONE_ALERTS = True
 SHOW_SPENDING_ALERTS = True
 
 # Performance Settings
 MAX_TRANSACTIONS_PER_PAGE = 50
+SEARCH_DEBOUNCE_MS = 120  # pause after the last keystroke before a table search runs
+PAGE_CACHE_SIZE = 6  # built pages kept alive between navigations (least recently shown are destroyed)
+ACCOUNT_CARD_BATCH = 24  # account cards built per batch as the Accounts page scrolls
+LEDGER_POLL_MS = 200  # how often open views pick up ledger changes committed on worker threads
+LEDGER_RELOAD_ROWS = 2000  # larger change batches reload the shared ledger instead of patching rows
+CASH_FLOW_CACHE_SIZE = 32  # cached net-flow/running-balance series (see cash_flow.py)
+FORECAST_HISTORY_MONTHS = 60  # closed months of history fitted per series (see forecast.py)
+FORECAST_HORIZON_MONTHS = 12  # months projected ahead, starting with the current month
+FORECAST_BAND_Z = 1.28  # half-width of forecast bands in standard deviations (~80%)
+SIMULATION_PATHS = 100000  # Monte Carlo balance paths per Scenario Lab run (see simulation.py)
+SIMULATION_BATCH = 10000  # paths per batch; the lab redraws after each one
+SIMULATION_HISTORY_MONTHS = 24  # closed months resampled per category
 CACHE_ENABLED = True
 AUTO_SAVE_INTERVAL = 60  # seconds
 AUTO_BACKUP_INTERVAL = 3600  # seconds
 
+# Database backups (online SQLite backup API, see backup_manager.py)
+AUTO_BACKUP_ENABLED = True
+BACKUP_DIR = BASE_DIR / "backups"
+BACKUP_KEEP = 10  # newest snapshots kept by rotation
+BACKUP_COMPRESSION = "gzip"  # None, "gzip" or "zstd" (needs: pip install zstandard)
+BACKUP_PAGES_PER_STEP = 256  # pages copied per step; lower = shorter lock hold
+
+# Outbound mail queue (see mail_queue.py)
+SMTP_TIMEOUT = 20  # seconds per SMTP operation
+SMTP_IDLE_SECONDS = 120  # reuse an authenticated connection while idle for less than this
+MAIL_BATCH_SIZE = 20  # messages claimed per drain cycle
+MAIL_POLL_SECONDS = 15  # how often the sender looks for due retries
+MAIL_MAX_ATTEMPTS = 6
+MAIL_RETRY_BASE_SECONDS = 30  # backoff: base * 2**attempt (capped at one hour)
+MAIL_CLAIM_LEASE_SECONDS = 900  # a claim older than this is assumed to belong to a crashed sender
+REPORT_SCHEDULE_INTERVAL = 900  # seconds between scheduled-report passes while the GUI is open
+
@@ -0,0 +1,218 @@
+"""Streaming CSV export engine shared by the GUI, FeatureManager and ogca.
+
+Rows are pulled from SQLite in fetchmany() chunks and written straight into
+csv.writer, so exports never hold a full result set in memory. Expenses and
+income are read through Database._ledger_source, so archived years are
+exported too. Paths ending in .gz are gzip-compressed.
+"""
+import csv
+import gzip
+from datetime import datetime
+
+
+CHUNK_SIZE = 500
+PROGRESS_EVERY = 1000
+
+# Exportable columns per table: key -> (header, SQL expression)
+EXPORT_COLUMNS = {
+    "expenses": {
+        "date": ("Date", "t.date"),
+        "category": ("Category", "t.category"),
+        "amount": ("Amount", "t.amount"),
+        "description": ("Description", "t.description"),
+        "payment_method": ("Payment Method", "t.payment_method"),
+        "notes": ("Notes", "t.notes"),
+        "account": ("Account", "a.account_name"),
+        "id": ("ID", "t.id"),
+    },
+    "income": {
+        "date": ("Date", "t.date"),
+        "source": ("Source", "t.source"),
+        "amount": ("Amount", "t.amount"),
+        "description": ("Description", "t.description"),
+        "notes": ("Notes", "t.notes"),
+        "account": ("Account", "a.account_name"),
+        "id": ("ID", "t.id"),
+    },
+}
+
+DEFAULT_COLUMNS = {
+    "expenses": ("date", "category", "amount", "description", "payment_method", "notes"),
+    "income": ("date", "source", "amount", "description", "notes"),
+}
+
+
+def open_csv(path):
+    """Open path for CSV writing (gzip when it ends in .gz)."""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "wt", newline="", encoding="utf-8")
+    return open(path, "w", newline="", encoding="utf-8")
+
+
+def _filters(user_id, start_date=None, end_date=None, account_id=None):
+    where = ["t.user_id = ?"]
+    params = [user_id]
+    if start_date:
+        where.append("t.date >= ?")
+        params.append(str(start_date))
+    if end_date:
+        where.append("t.date <= ?")
+        params.append(str(end_date))
+    if account_id is not None:
+        where.append("t.account_id = ?")
+        params.append(account_id)
+    return " AND ".join(where), params
+
+
+def _ledger_rows(db, table, start_date, end_date, build):
+    """Stream the rows of build(source) -> (sql, params), with source covering archived years."""
+    conn = db.get_connection()
+    try:
+        sql, params = build(db._ledger_source(conn, table, start_date, end_date, include_archived=True, alias="t"))
+        cursor = conn.cursor()
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(CHUNK_SIZE)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        conn.close()
+
+
+def transaction_query(table, user_id, columns=None, start_date=None, end_date=None, account_id=None, source=None):
+    """Build (sql, params, headers) for a filtered, column-selected export.
+
+    source is the FROM-clause source for table aliased as t (see
+    Database._ledger_source); it defaults to the live table.
+    """
+    if table not in EXPORT_COLUMNS:
+        raise ValueError(f"Unsupported table: {table}")
+    columns = list(columns or DEFAULT_COLUMNS[table])
+    unknown = [c for c in columns if c not in EXPORT_COLUMNS[table]]
+    if unknown:
+        raise ValueError(f"Unknown {table} column(s): {', '.join(unknown)}")
+
+    spec = EXPORT_COLUMNS[table]
+    select = ", ".join(f"{spec[c][1]} AS {c}" for c in columns)
+    join = " LEFT JOIN managed_accounts a ON a.id = t.account_id" if "account" in columns else ""
+    where, params = _filters(user_id, start_date, end_date, account_id)
+    source = source or f"{table} t"
+    sql = f"SELECT {select} FROM {source}{join} WHERE {where} ORDER BY t.date DESC, t.id DESC"
+    return sql, params, [spec[c][0] for c in columns]
+
+
+def _format_row(row, columns):
+    out = []
+    for key, value in zip(columns, row):
+        if key == "amount":
+            out.append(f"{float(value or 0):.2f}")
+        else:
+            out.append("" if value is None else value)
+    return out
+
+
+def write_transactions(writer, db, table, user_id, columns=None, start_date=None, end_date=None,
+                       account_id=None, progress=None, written=0):
+    """Stream one table's rows into writer. Returns (rows_written, amount_total)."""
+    columns = list(columns or DEFAULT_COLUMNS[table])
+    _, _, headers = transaction_query(table, user_id, columns, start_date, end_date, account_id)
+    writer.writerow(headers)
+    count = 0
+    total = 0.0
+    amount_idx = columns.index("amount") if "amount" in columns else None
+    rows = _ledger_rows(
+        db, table, start_date, end_date,
+        lambda source: transaction_query(table, user_id, columns, start_date, end_date, account_id, source)[:2],
+    )
+    for row in rows:
+        writer.writerow(_format_row(row, columns))
+        if amount_idx is not None:
+            total += float(row[amount_idx] or 0)
+        count += 1
+        if progress and (written + count) % PROGRESS_EVERY == 0:
+            progress(written + count)
+    return count, total
+
+
+def export_transactions_csv(db, user_id, path, table="expenses", columns=None, start_date=None,
+                            end_date=None, account_id=None, include_total=True, progress=None):
+    """Export expenses or income to a CSV file. Returns the number of rows."""
+    columns = list(columns or DEFAULT_COLUMNS[table])
+    with open_csv(path) as f:
+        writer = csv.writer(f)
+        count, total = write_transactions(
+            writer, db, table, user_id, columns, start_date, end_date, account_id, progress
+        )
+        if include_total and "amount" in columns:
+            writer.writerow([])
+            # Label in the first column, total under the Amount header
+            row = [""] * max(len(columns), 2)
+            row[0] = "TOTAL EXPENSES" if table == "expenses" else "TOTAL INCOME"
+            row[columns.index("amount") or 1] = f"{total:.2f}"
+            writer.writerow(row)
+    if progress:
+        progress(count)
+    return count
+
+
+def export_all_data_csv(db, user_id, path, start_date=None, end_date=None, account_id=None, progress=None):
+    """Export summary, expenses and income into one sectioned CSV. Returns row count."""
+    summary = db.get_summary(user_id, start_date, end_date)
+    with open_csv(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(["EXPENSE TRACKER DATA EXPORT"])
+        writer.writerow([f"Generated At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
+        writer.writerow([])
+
+        writer.writerow(["SUMMARY"])
+        writer.writerow(["Total Income", f"{summary['total_income']:.2f}"])
+        writer.writerow(["Total Expenses", f"{summary['total_expenses']:.2f}"])
+        writer.writerow(["Net Balance", f"{summary['balance']:.2f}"])
+        writer.writerow([])
+
+        writer.writerow(["EXPENSES"])
+        exp_count, _ = write_transactions(
+            writer, db, "expenses", user_id, None, start_date, end_date, account_id, progress
+        )
+        writer.writerow([])
+
+        writer.writerow(["INCOME"])
+        inc_count, _ = write_transactions(
+            writer, db, "income", user_id, None, start_date, end_date, account_id, progress, written=exp_count
+        )
+    if progress:
+        progress(exp_count + inc_count)
+    return exp_count + inc_count
+
+
+def export_category_csv(db, user_id, path, start_date=None, end_date=None, account_id=None):
+    """Export per-category expense totals with share of total. Returns row count."""
+    where, params = _filters(user_id, start_date, end_date, account_id)
+
+    def build(source):
+        return f"""
+            SELECT t.category, SUM(t.amount) AS total, COUNT(*) AS count,
+                   SUM(SUM(t.amount)) OVER () AS grand_total
+            FROM {source}
+            WHERE {where}
+            GROUP BY t.category
+            ORDER BY total DESC
+        """, params
+
+    count = 0
+    grand_total = 0.0
+    tx_count = 0
+    with open_csv(path) as f:
+        writer = csv.writer(f)
+        writer.writerow(["Category", "Amount", "Number of Transactions", "% of Total"])
+        for row in _ledger_rows(db, "expenses", start_date, end_date, build):
+            grand_total = float(row["grand_total"] or 0)
+            total = float(row["total"] or 0)
+            percentage = (total / grand_total * 100) if grand_total > 0 else 0
+            writer.writerow([row["category"], f"{total:.2f}", row["count"], f"{percentage:.1f}%"])
+            tx_count += row["count"]
+            count += 1
+        writer.writerow([])
+        writer.writerow(["TOTAL", f"{grand_total:.2f}", tx_count, "100%"])
+    return count
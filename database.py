@@ -1,339 +1,265 @@
 """Database module for Expense Tracker"""
 import sqlite3
 import hashlib
+import hmac
 import os
 import json
 from datetime import datetime
-from config import DB_PATH, SALT_LENGTH
+from config import DB_PATH, SALT_LENGTH, HASH_ALGORITHM, HASH_ITERATIONS
+from config import (
+    NOTIFICATION_RETENTION_DAYS, NOTIFICATION_MAX_PER_USER, NOTIFICATION_ARCHIVE, NOTIFICATION_PRUNE_BATCH,
+    TRASH_RETENTION_DAYS, ARCHIVE_DIR_NAME,
+)
+from migrations import LEGACY_HASH_ALGORITHM, LEGACY_HASH_ITERATIONS, migrate
+from cash_flow import flow_series
+
+
+_WRITE_ACTIONS = (sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE)
+_MAX_ATTACHED = 10  # SQLite's default limit on databases ATTACHed to one connection
+
+# Tables whose row-level changes (insert/update/delete with ids) are published
+ROW_EVENT_TABLES = frozenset({"expenses", "income"})
+
+
+def _log_flow(row, sign):
+    """Trigger statement logging the signed amount row (NEW/OLD) moved on its day."""
+    return (f"INSERT INTO flow_changes VALUES ({row}.user_id, COALESCE({row}.account_id, 0), "
+            f"COALESCE(date({row}.date), {row}.date), {sign}{row}.amount);")
+
+
+class _TrackedCursor(sqlite3.Cursor):
+    """Cursor that lets its connection install the row log before the first write."""
+
+    def execute(self, sql, parameters=()):
+        self.connection.before_write(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.connection.before_write(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        self.connection.before_write(None)
+        return super().executescript(sql_script)
+
+
+class _TrackedConnection(sqlite3.Connection):
+    """Connection that records the tables its statements write and reports them on commit.
+
+    With want_rows, temp triggers (private to this connection, created just
+    before its first INSERT/UPDATE/DELETE) also log the id of every
+    expenses/income row written and the signed amount it moved on its day;
+    the logs are read and cleared inside the committing transaction and
+    reported as {table: {op: [ids]}} and {(user_id, account_id, day): net}.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.written = set()
+        self.on_commit = None
+        self.want_rows = False
+        self.log_rows = False
+        self.set_authorizer(self._authorize)
+
+    def cursor(self, factory=_TrackedCursor):
+        return super().cursor(factory)
+
+    def _authorize(self, action, arg1, arg2, db_name, trigger):
+        if action in _WRITE_ACTIONS and db_name == "main":
+            self.written.add(arg1)
+        return sqlite3.SQLITE_OK
+
+    def before_write(self, sql):
+        if not self.want_rows or self.log_rows:
+            return
+        if sql is None or sql.lstrip()[:7].upper().startswith(("INSERT", "UPDATE", "DELETE", "REPLACE")):
+            written = set(self.written)
+            super().execute("CREATE TEMP TABLE IF NOT EXISTS row_changes (tbl TEXT, op TEXT, row_id INTEGER)")
+            super().execute("CREATE TEMP TABLE IF NOT EXISTS flow_changes (user_id INTEGER, account_id INTEGER, day TEXT, net REAL)")
+            for table in sorted(ROW_EVENT_TABLES):
+                sign = "" if table == "income" else "-"
+                negate = "-" if table == "income" else ""
+                flows = {
+                    "insert": _log_flow("NEW", sign),
+                    "update": _log_flow("OLD", negate) + _log_flow("NEW", sign),
+                    "delete": _log_flow("OLD", negate),
+                }
+                for op, ref in (("insert", "NEW"), ("update", "NEW"), ("delete", "OLD")):
+                    super().execute(
+                        f"CREATE TEMP TRIGGER IF NOT EXISTS log_{table}_{op} AFTER {op.upper()} ON main.{table} "
+                        f"BEGIN INSERT INTO row_changes VALUES ('{table}', '{op}', {ref}.id); {flows[op]} END"
+                    )
+            self.written = written
+            self.log_rows = True
+
+    def _take_row_changes(self):
+        """Coalesce the row log per id (insert+delete cancels, delete+insert is an update)."""
+        cursor = self.execute("SELECT tbl, op, row_id FROM temp.row_changes ORDER BY rowid")
+        per_row = {}
+        for table, op, row_id in cursor.fetchall():
+            first, _ = per_row.get((table, row_id), (op, op))
+            per_row[(table, row_id)] = (first, op)
+        self.execute("DELETE FROM temp.row_changes")
+        changes = {}
+        for (table, row_id), (first, last) in per_row.items():
+            if first == "insert":
+                op = None if last == "delete" else "insert"
+            else:
+                op = "delete" if last == "delete" else "update"
+            if op:
+                changes.setdefault(table, {}).setdefault(op, []).append(row_id)
+        return changes
+
+    def _take_flow_changes(self):
+        """Net amount moved per (user_id, account_id, day); days that net to zero are dropped."""
+        cursor = self.execute(
+            "SELECT user_id, account_id, day, SUM(net) FROM temp.flow_changes GROUP BY user_id, account_id, day"
+        )
+        flows = {(user_id, account_id, day): net for user_id, account_id, day, net in cursor.fetchall()
+                 if abs(net) > 1e-9}
+        self.execute("DELETE FROM temp.flow_changes")
+        return flows
+
+    def commit(self):
+        rows = flows = None
+        if self.log_rows:
+            rows = self._take_row_changes()
+            flows = self._take_flow_changes()
+        super().commit()
+        tables, self.written = self.written | set(rows or ()), set()
+        if tables and self.on_commit is not None:
+            self.on_commit(tables, rows, flows)
+
+    def rollback(self):
+        super().rollback()
+        self.written = set()
+        self.log_rows = False  # the temp log may have been created inside the rolled-back transaction
 
 
 class Database:
-    def __init__(self):
-        self.db_path = DB_PATH
+    def __init__(self, db_path=None):
+        self.db_path = db_path or DB_PATH
+        self._change_listeners = []
+        self._row_listeners = []
+        self._flow_listeners = []
         self.init_db()
 
     def get_connection(self):
         """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
+        if self._change_listeners or self._row_listeners or self._flow_listeners:
+            # No statement cache: the authorizer only sees a statement when it is
+            # prepared, so a cached re-run of the same write would go unreported
+            conn = sqlite3.connect(self.db_path, factory=_TrackedConnection, cached_statements=0)
+            conn.on_commit = self._emit_change
+            conn.want_rows = bool(self._row_listeners or self._flow_listeners)
+        else:
+            conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
-    def init_db(self):
-        """Initialize database with tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # Users table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                salt TEXT NOT NULL,
-                full_name TEXT,
-                phone TEXT,
-                address TEXT,
-                city TEXT,
-                state TEXT,
-                zip_code TEXT,
-                e_signature BLOB,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Expenses table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS expenses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                category TEXT NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT,
-                date DATE NOT NULL,
-                payment_method TEXT,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Income table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS income (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                source TEXT NOT NULL,
-                amount REAL NOT NULL,
-                description TEXT,
-                date DATE NOT NULL,
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Budget table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS budgets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                category TEXT NOT NULL,
-                limit_amount REAL NOT NULL,
-                month INTEGER NOT NULL,
-                year INTEGER NOT NULL,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Recurring bills table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS recurring_bills (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                category TEXT NOT NULL,
-                amount REAL NOT NULL,
-                frequency TEXT NOT NULL,
-                start_date DATE NOT NULL,
-                next_due_date DATE NOT NULL,
-                payment_method TEXT,
-                description TEXT,
-                is_active INTEGER DEFAULT 1,
-                last_run_at TIMESTAMP,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Categories table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                type TEXT NOT NULL,
-                color TEXT,
-                icon TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                UNIQUE(user_id, name)
-            )
-        ''')
-
-        # Managed Accounts (People Accounts)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS managed_accounts (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                account_name TEXT NOT NULL,
-                account_type TEXT,
-                email TEXT,
-                phone TEXT,
-                address TEXT,
-                city TEXT,
-                notes TEXT,
-                color TEXT,
-                icon TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
-                UNIQUE(user_id, account_name)
-            )
-        ''')
-
-        # Transaction archive
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS transaction_archive (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                transaction_type TEXT NOT NULL,
-                transaction_id INTEGER NOT NULL,
-                data TEXT NOT NULL,
-                archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Trash bin for recoverable deletes
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS trash_bin (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                item_type TEXT NOT NULL,
-                item_data TEXT NOT NULL,
-                deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Subscriptions center
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS subscriptions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                name TEXT NOT NULL,
-                amount REAL NOT NULL,
-                billing_cycle TEXT NOT NULL,
-                next_billing_date DATE NOT NULL,
-                category TEXT DEFAULT 'Utilities',
-                status TEXT DEFAULT 'active',
-                notes TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Report designer preferences
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS report_design_settings (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER UNIQUE NOT NULL,
-                brand_name TEXT,
-                primary_color TEXT,
-                footer_note TEXT,
-                layout_mode TEXT DEFAULT 'standard',
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Statement import rules (merchant keyword -> category/account mapping)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS import_rules (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                keyword TEXT NOT NULL,
-                category TEXT NOT NULL,
-                account_name TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Financial goals tracker
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS financial_goals (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                target_amount REAL NOT NULL,
-                current_amount REAL DEFAULT 0,
-                due_date DATE,
-                category TEXT DEFAULT 'General',
-                notes TEXT,
-                status TEXT DEFAULT 'active',
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # In-app notification center
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS notifications (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                message TEXT NOT NULL,
-                severity TEXT DEFAULT 'info',
-                is_read INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Quick notes workspace
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS quick_notes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                body TEXT DEFAULT '',
-                color_tag TEXT DEFAULT 'blue',
-                is_pinned INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Reminders planner
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS reminders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                title TEXT NOT NULL,
-                due_date DATE NOT NULL,
-                priority TEXT DEFAULT 'medium',
-                note TEXT DEFAULT '',
-                is_done INTEGER DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Add account_id column to expenses if not exists
-        try:
-            cursor.execute("PRAGMA table_info(expenses)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'account_id' not in columns:
-                cursor.execute('ALTER TABLE expenses ADD COLUMN account_id INTEGER DEFAULT NULL')
-        except Exception as e:
-            pass
-
-        # Add account_id column to income if not exists
-        try:
-            cursor.execute("PRAGMA table_info(income)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'account_id' not in columns:
-                cursor.execute('ALTER TABLE income ADD COLUMN account_id INTEGER DEFAULT NULL')
-        except Exception as e:
-            pass
+    def add_change_listener(self, callback):
+        """callback(tables) runs after each commit that wrote those tables.
+
+        It is called on the thread that committed, so GUI listeners must only
+        record the change and touch widgets later from the Tk thread.
+        """
+        self._change_listeners.append(callback)
+
+    def remove_change_listener(self, callback):
+        if callback in self._change_listeners:
+            self._change_listeners.remove(callback)
+
+    def add_row_listener(self, callback):
+        """callback(changes) runs after each commit that wrote expenses/income rows.
+
+        changes is {table: {"insert"|"update"|"delete": [ids]}}; same
+        threading rules as add_change_listener.
+        """
+        self._row_listeners.append(callback)
+
+    def remove_row_listener(self, callback):
+        if callback in self._row_listeners:
+            self._row_listeners.remove(callback)
+
+    def add_flow_listener(self, callback):
+        """callback(flows) runs after each commit that moved money on expenses/income.
+
+        flows is {(user_id, account_id, day): net change}, account_id 0 for
+        personal rows, income positive and expenses negative; same threading
+        rules as add_change_listener.
+        """
+        self._flow_listeners.append(callback)
+
+    def remove_flow_listener(self, callback):
+        if callback in self._flow_listeners:
+            self._flow_listeners.remove(callback)
+
+    def _emit_change(self, tables, rows=None, flows=None):
+        if rows:
+            for callback in list(self._row_listeners):
+                try:
+                    callback(rows)
+                except Exception:
+                    pass
+        if flows:
+            for callback in list(self._flow_listeners):
+                try:
+                    callback(flows)
+                except Exception:
+                    pass
+        for callback in list(self._change_listeners):
+            try:
+                callback(tables)
+            except Exception:
+                pass
 
-        # Add attachment_path column to expenses if not exists
+    def iter_rows(self, query, params=(), chunk_size=500):
+        """Yield rows for query in fetchmany() chunks instead of one big list."""
+        conn = self.get_connection()
         try:
-            cursor.execute("PRAGMA table_info(expenses)")
-            columns = [col[1] for col in cursor.fetchall()]
-            if 'attachment_path' not in columns:
-                cursor.execute('ALTER TABLE expenses ADD COLUMN attachment_path TEXT DEFAULT NULL')
-        except Exception:
-            pass
+            cursor = conn.cursor()
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
 
-        conn.commit()
-        conn.close()
+    def init_db(self):
+        """Bring the schema up to date (see migrations.py; free when current)."""
+        migrate(self.db_path)
 
     @staticmethod
-    def hash_password(password):
-        """Hash password with salt"""
-        salt = os.urandom(SALT_LENGTH).hex()
+    def hash_password(password, iterations=None, algorithm=None, salt=None):
+        """Hash password with salt. Returns (hash_hex, salt_hex)."""
+        salt = salt or os.urandom(SALT_LENGTH).hex()
         hashed = hashlib.pbkdf2_hmac(
-            'sha256',
+            algorithm or HASH_ALGORITHM,
             password.encode('utf-8'),
             salt.encode('utf-8'),
-            100000
+            int(iterations or HASH_ITERATIONS)
         ).hex()
         return hashed, salt
 
     @staticmethod
-    def verify_password(password, salt, hashed):
-        """Verify password"""
-        new_hash = hashlib.pbkdf2_hmac(
-            'sha256',
-            password.encode('utf-8'),
-            salt.encode('utf-8'),
-            100000
-        ).hex()
-        return new_hash == hashed
+    def verify_password(password, salt, hashed, iterations=None, algorithm=None):
+        """Verify password in constant time using the parameters it was hashed with."""
+        new_hash, _ = Database.hash_password(
+            password,
+            iterations=iterations or LEGACY_HASH_ITERATIONS,
+            algorithm=algorithm or LEGACY_HASH_ALGORITHM,
+            salt=salt,
+        )
+        return hmac.compare_digest(new_hash, hashed or "")
+
+    @staticmethod
+    def needs_rehash(user):
+        """True if the stored hash uses parameters other than the configured ones."""
+        algorithm = user.get("hash_algorithm") or LEGACY_HASH_ALGORITHM
+        iterations = int(user.get("hash_iterations") or LEGACY_HASH_ITERATIONS)
+        return algorithm != HASH_ALGORITHM or iterations != HASH_ITERATIONS
 
     # User operations
     def register_user(self, username, email, password, full_name=""):
@@ -343,9 +269,9 @@ class Database:
             conn = self.get_connection()
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO users (username, email, password_hash, salt, full_name)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (username, email, hashed, salt, full_name))
+                INSERT INTO users (username, email, password_hash, salt, full_name, hash_algorithm, hash_iterations)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (username, email, hashed, salt, full_name, HASH_ALGORITHM, HASH_ITERATIONS))
             conn.commit()
             user_id = cursor.lastrowid
             conn.close()
@@ -354,16 +280,36 @@ class Database:
             return None
 
     def login_user(self, username, password):
-        """Login user and return user data"""
+        """Login user and return user data.
+
+        Slow by design (PBKDF2); call it from a worker thread in the UI.
+        Hashes stored with outdated cost parameters are upgraded on success.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM users WHERE username = ?', (username,))
         user = cursor.fetchone()
         conn.close()
 
-        if user and self.verify_password(password, user['salt'], user['password_hash']):
-            return dict(user)
-        return None
+        if not user:
+            # Spend the same time as a real check so usernames cannot be probed by timing
+            self.hash_password(password or "")
+            return None
+
+        user = dict(user)
+        if not self.verify_password(
+            password,
+            user['salt'],
+            user['password_hash'],
+            iterations=user.get('hash_iterations'),
+            algorithm=user.get('hash_algorithm'),
+        ):
+            return None
+
+        if self.needs_rehash(user):
+            self.update_user_password(user['id'], password)
+            user.update(self.get_user(user['id']) or {})
+        return user
 
     def get_user(self, user_id):
         """Get user data"""
@@ -462,10 +408,11 @@ class Database:
         cursor.execute(
             '''
             UPDATE users
-            SET password_hash = ?, salt = ?, updated_at = CURRENT_TIMESTAMP
+            SET password_hash = ?, salt = ?, hash_algorithm = ?, hash_iterations = ?,
+                updated_at = CURRENT_TIMESTAMP
             WHERE id = ?
             ''',
-            (hashed, salt, user_id)
+            (hashed, salt, HASH_ALGORITHM, HASH_ITERATIONS, user_id)
         )
         conn.commit()
         changed = cursor.rowcount > 0
@@ -508,8 +455,9 @@ class Database:
         cursor = conn.cursor()
         
         if start_date and end_date:
-            cursor.execute('''
-                SELECT * FROM expenses 
+            source = self._ledger_source(conn, "expenses", start_date, end_date)
+            cursor.execute(f'''
+                SELECT * FROM {source}
                 WHERE user_id = ? AND date BETWEEN ? AND ?
                 ORDER BY date DESC
             ''', (user_id, start_date, end_date))
@@ -577,8 +525,9 @@ class Database:
         cursor = conn.cursor()
         
         if start_date and end_date:
-            cursor.execute('''
-                SELECT * FROM income 
+            source = self._ledger_source(conn, "income", start_date, end_date)
+            cursor.execute(f'''
+                SELECT * FROM {source}
                 WHERE user_id = ? AND date BETWEEN ? AND ?
                 ORDER BY date DESC
             ''', (user_id, start_date, end_date))
@@ -621,113 +570,193 @@ class Database:
         conn.close()
 
     # Trash bin
+    @staticmethod
+    def _trash_columns(item_type, data):
+        """(amount, date, category) list-view columns for a trash snapshot."""
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except Exception:
+                data = {}
+        label = data.get("source") if item_type == "income" else data.get("category")
+        try:
+            amount = float(data.get("amount") or 0)
+        except (TypeError, ValueError):
+            amount = 0.0
+        return amount, data.get("date") or "", label or ""
+
+    def trash_items(self, user_id, item_type, rows):
+        """Move many item snapshots into the trash bin in one transaction."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany(
+            '''
+            INSERT INTO trash_bin (user_id, item_type, item_data, amount, date, category)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ''',
+            [
+                (user_id, item_type, json.dumps(row)) + self._trash_columns(item_type, row)
+                for row in rows
+            ]
+        )
+        conn.commit()
+        count = cursor.rowcount
+        conn.close()
+        return count
+
     def trash_item(self, user_id, item_type, item_data):
         """Move item snapshot into trash bin."""
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute(
             '''
-            INSERT INTO trash_bin (user_id, item_type, item_data)
-            VALUES (?, ?, ?)
+            INSERT INTO trash_bin (user_id, item_type, item_data, amount, date, category)
+            VALUES (?, ?, ?, ?, ?, ?)
             ''',
-            (user_id, item_type, json.dumps(item_data))
+            (user_id, item_type, json.dumps(item_data)) + self._trash_columns(item_type, item_data)
         )
         conn.commit()
         trash_id = cursor.lastrowid
         conn.close()
         return trash_id
 
-    def get_trash_items(self, user_id):
-        """List trashed items for user."""
+    def get_trash_items(self, user_id, include_data=False):
+        """List trashed items for user (typed columns; item_data only if asked)."""
         conn = self.get_connection()
         cursor = conn.cursor()
+        data_col = ", item_data" if include_data else ""
         cursor.execute(
-            '''
-            SELECT * FROM trash_bin
+            f'''
+            SELECT id, user_id, item_type, amount, date, category, deleted_at{data_col}
+            FROM trash_bin
             WHERE user_id = ?
-            ORDER BY deleted_at DESC
+            ORDER BY deleted_at DESC, id DESC
             ''',
             (user_id,)
         )
-        rows = []
-        for row in cursor.fetchall():
-            d = dict(row)
-            try:
-                d["item_data"] = json.loads(d["item_data"])
-            except Exception:
-                d["item_data"] = {}
-            rows.append(d)
+        rows = [dict(row) for row in cursor.fetchall()]
         conn.close()
+        if include_data:
+            for d in rows:
+                try:
+                    d["item_data"] = json.loads(d["item_data"])
+                except Exception:
+                    d["item_data"] = {}
         return rows
 
-    def restore_trash_item(self, trash_id, user_id):
-        """Restore one trashed expense/income item."""
+    def restore_trash_items(self, trash_ids, user_id):
+        """Restore trashed expenses/income in one transaction. Returns (restored, message)."""
+        trash_ids = list(trash_ids)
+        if not trash_ids:
+            return 0, "Nothing selected"
+        today = datetime.now().strftime("%Y-%m-%d")
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM trash_bin WHERE id = ? AND user_id = ?', (trash_id, user_id))
-        row = cursor.fetchone()
-        if not row:
-            conn.close()
-            return False, "Trash item not found"
-
-        data = json.loads(row["item_data"])
-        item_type = row["item_type"]
         try:
-            if item_type == "expense":
-                cursor.execute(
-                    '''
-                    INSERT INTO expenses (user_id, account_id, category, amount, date, description, payment_method, notes, attachment_path)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''',
-                    (
+            marks = ", ".join("?" for _ in trash_ids)
+            cursor.execute(
+                f'SELECT id, item_type, item_data FROM trash_bin WHERE user_id = ? AND id IN ({marks})',
+                [user_id] + trash_ids
+            )
+            expenses, income, restored_ids = [], [], []
+            for row in cursor.fetchall():
+                data = json.loads(row["item_data"])
+                if row["item_type"] == "expense":
+                    expenses.append((
                         user_id,
                         data.get("account_id"),
                         data.get("category", "Other"),
                         data.get("amount", 0),
-                        data.get("date", datetime.now().strftime("%Y-%m-%d")),
+                        data.get("date", today),
                         data.get("description", ""),
                         data.get("payment_method", ""),
                         data.get("notes", ""),
                         data.get("attachment_path"),
-                    )
-                )
-            elif item_type == "income":
-                cursor.execute(
-                    '''
-                    INSERT INTO income (user_id, account_id, source, amount, date, description, notes)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''',
-                    (
+                    ))
+                elif row["item_type"] == "income":
+                    income.append((
                         user_id,
                         data.get("account_id"),
                         data.get("source", "Other"),
                         data.get("amount", 0),
-                        data.get("date", datetime.now().strftime("%Y-%m-%d")),
+                        data.get("date", today),
                         data.get("description", ""),
                         data.get("notes", ""),
-                    )
-                )
-            else:
+                    ))
+                else:
+                    continue
+                restored_ids.append(row["id"])
+            if not restored_ids:
                 conn.close()
-                return False, "Unsupported trash item type"
+                return 0, "Trash item not found or unsupported type"
 
-            cursor.execute('DELETE FROM trash_bin WHERE id = ? AND user_id = ?', (trash_id, user_id))
+            cursor.executemany(
+                '''
+                INSERT INTO expenses (user_id, account_id, category, amount, date, description, payment_method, notes, attachment_path)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''',
+                expenses
+            )
+            cursor.executemany(
+                '''
+                INSERT INTO income (user_id, account_id, source, amount, date, description, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''',
+                income
+            )
+            cursor.execute(
+                f'DELETE FROM trash_bin WHERE user_id = ? AND id IN ({", ".join("?" for _ in restored_ids)})',
+                [user_id] + restored_ids
+            )
             conn.commit()
             conn.close()
-            return True, "Restored"
+            return len(restored_ids), "Restored"
         except Exception as e:
+            conn.rollback()
             conn.close()
-            return False, str(e)
+            return 0, str(e)
+
+    def restore_trash_item(self, trash_id, user_id):
+        """Restore one trashed expense/income item."""
+        restored, message = self.restore_trash_items([trash_id], user_id)
+        return restored > 0, message
+
+    def delete_trash_items(self, trash_ids, user_id):
+        """Permanently delete trash items in one statement. Returns the count."""
+        trash_ids = list(trash_ids)
+        if not trash_ids:
+            return 0
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f'DELETE FROM trash_bin WHERE user_id = ? AND id IN ({", ".join("?" for _ in trash_ids)})',
+            [user_id] + trash_ids
+        )
+        conn.commit()
+        deleted = cursor.rowcount
+        conn.close()
+        return deleted
 
     def delete_trash_item(self, trash_id, user_id):
         """Permanently delete one trash item."""
+        return self.delete_trash_items([trash_id], user_id) > 0
+
+    def purge_trash(self, older_than_days=TRASH_RETENTION_DAYS, user_id=None):
+        """Permanently delete trash older than older_than_days (0 = everything)."""
+        # deleted_at is CURRENT_TIMESTAMP (UTC), so compare against SQLite's clock
+        cutoff = f"-{int(older_than_days)} days"
         conn = self.get_connection()
         cursor = conn.cursor()
-        cursor.execute('DELETE FROM trash_bin WHERE id = ? AND user_id = ?', (trash_id, user_id))
+        if user_id is None:
+            cursor.execute("DELETE FROM trash_bin WHERE deleted_at <= datetime('now', ?)", (cutoff,))
+        else:
+            cursor.execute(
+                "DELETE FROM trash_bin WHERE user_id = ? AND deleted_at <= datetime('now', ?)", (user_id, cutoff)
+            )
         conn.commit()
-        ok = cursor.rowcount > 0
+        deleted = cursor.rowcount
         conn.close()
-        return ok
+        return deleted
 
     # Subscriptions
     def add_subscription(self, user_id, name, amount, billing_cycle, next_billing_date, category="Utilities", notes=""):
@@ -1257,12 +1286,21 @@ class Database:
         if start_date and end_date:
             where_clause += " AND date BETWEEN ? AND ?"
             params.extend([start_date, end_date])
+            expenses_src = self._ledger_source(conn, "expenses", start_date, end_date)
+            income_src = self._ledger_source(conn, "income", start_date, end_date)
+        else:
+            expenses_src, income_src = "expenses", "income"
         
-        cursor.execute(f'SELECT COALESCE(SUM(amount), 0) as total FROM expenses {where_clause}', params)
+        cursor.execute(f'SELECT COALESCE(SUM(amount), 0) as total FROM {expenses_src} {where_clause}', params)
         total_expenses = cursor.fetchone()[0]
         
-        cursor.execute(f'SELECT COALESCE(SUM(amount), 0) as total FROM income {where_clause}', params)
+        cursor.execute(f'SELECT COALESCE(SUM(amount), 0) as total FROM {income_src} {where_clause}', params)
         total_income = cursor.fetchone()[0]
+
+        if not (start_date and end_date):
+            # All-time totals include archived months through their rollups
+            total_expenses += self._rollup_total(cursor, user_id, "expense")
+            total_income += self._rollup_total(cursor, user_id, "income")
         
         conn.close()
         
@@ -1283,13 +1321,24 @@ class Database:
         if start_date and end_date:
             where_clause += " AND date BETWEEN ? AND ?"
             params.extend([start_date, end_date])
-        
-        cursor.execute(f'''
-            SELECT category, SUM(amount) as total, COUNT(*) as count
-            FROM expenses {where_clause}
-            GROUP BY category
-            ORDER BY total DESC
-        ''', params)
+            source = self._ledger_source(conn, "expenses", start_date, end_date)
+            cursor.execute(f'''
+                SELECT category, SUM(amount) as total, COUNT(*) as count
+                FROM {source} {where_clause}
+                GROUP BY category
+                ORDER BY total DESC
+            ''', params)
+        else:
+            cursor.execute('''
+                SELECT category, SUM(total) as total, SUM(count) as count
+                FROM (
+                    SELECT category, amount AS total, 1 AS count FROM expenses WHERE user_id = ?
+                    UNION ALL
+                    SELECT category, total, tx_count FROM monthly_rollups WHERE user_id = ? AND kind = 'expense'
+                )
+                GROUP BY category
+                ORDER BY total DESC
+            ''', (user_id, user_id))
         
         results = [dict(row) for row in cursor.fetchall()]
         conn.close()
@@ -1304,16 +1353,20 @@ class Database:
         cursor = conn.cursor()
         cursor.execute(f'''
             SELECT 
-                strftime('%Y-%m', date) as month,
-                SUM(amount) as total,
-                COUNT(*) as count,
-                AVG(amount) as average
-            FROM expenses 
-            WHERE user_id = ?
-            GROUP BY strftime('%Y-%m', date)
+                month,
+                SUM(total) as total,
+                SUM(count) as count,
+                SUM(total) / NULLIF(SUM(count), 0) as average
+            FROM (
+                SELECT strftime('%Y-%m', date) as month, SUM(amount) as total, COUNT(*) as count
+                FROM expenses WHERE user_id = ? GROUP BY strftime('%Y-%m', date)
+                UNION ALL
+                SELECT month, total, tx_count FROM monthly_rollups WHERE user_id = ? AND kind = 'expense'
+            )
+            GROUP BY month
             ORDER BY month DESC
             LIMIT ?
-        ''', (user_id, months))
+        ''', (user_id, user_id, months))
         
         results = [dict(row) for row in cursor.fetchall()]
         conn.close()
@@ -1344,14 +1397,17 @@ class Database:
         cursor = conn.cursor()
         cursor.execute('''
             SELECT 
-                strftime('%Y', date) as year,
-                strftime('%m', date) as month,
-                SUM(amount) as total
-            FROM expenses 
-            WHERE user_id = ?
+                substr(month, 1, 4) as year,
+                substr(month, 6, 2) as month,
+                SUM(total) as total
+            FROM (
+                SELECT strftime('%Y-%m', date) as month, amount as total FROM expenses WHERE user_id = ?
+                UNION ALL
+                SELECT month, total FROM monthly_rollups WHERE user_id = ? AND kind = 'expense'
+            )
             GROUP BY year, month
             ORDER BY year DESC, month DESC
-        ''', (user_id,))
+        ''', (user_id, user_id))
         
         results = [dict(row) for row in cursor.fetchall()]
         conn.close()
@@ -1364,15 +1420,19 @@ class Database:
         cursor.execute('''
             SELECT 
                 category,
-                SUM(amount) as total,
-                COUNT(*) as count,
-                AVG(amount) as average
-            FROM expenses 
-            WHERE user_id = ?
+                SUM(total) as total,
+                SUM(count) as count,
+                SUM(total) / NULLIF(SUM(count), 0) as average
+            FROM (
+                SELECT category, SUM(amount) as total, COUNT(*) as count
+                FROM expenses WHERE user_id = ? GROUP BY category
+                UNION ALL
+                SELECT category, total, tx_count FROM monthly_rollups WHERE user_id = ? AND kind = 'expense'
+            )
             GROUP BY category
             ORDER BY total DESC
             LIMIT ?
-        ''', (user_id, limit))
+        ''', (user_id, user_id, limit))
         
         results = [dict(row) for row in cursor.fetchall()]
         conn.close()
@@ -1503,48 +1563,26 @@ class Database:
         return ratio
 
     # Cash Flow Analysis
-    def get_cash_flow_by_date(self, user_id, start_date, end_date):
-        """Get daily cash flow (income - expenses)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT date, SUM(CASE WHEN 'expenses' THEN -amount ELSE amount END) as net_flow
-            FROM (
-                SELECT date, amount FROM expenses WHERE user_id = ?
-                UNION ALL
-                SELECT date, amount FROM income WHERE user_id = ?
-            )
-            WHERE date BETWEEN ? AND ?
-            GROUP BY date
-            ORDER BY date
-        ''', (user_id, user_id, start_date, end_date))
-        
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return results
+    def get_cash_flow_by_date(self, user_id, start_date, end_date, account="ALL"):
+        """Get daily cash flow (income - expenses) with the running balance"""
+        return [
+            {"date": row["period"], "net_flow": row["net"], "balance": row["balance"]}
+            for row in flow_series(self, user_id, "day", start_date, end_date, account)
+        ]
 
-    def get_balance_history(self, user_id, months=12):
-        """Get running balance over time"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT 
-                strftime('%Y-%m', date) as month,
-                SUM(CASE WHEN user_id = ? THEN amount ELSE 0 END) as income_total,
-                SUM(CASE WHEN user_id = ? THEN -amount ELSE 0 END) as expense_total
-            FROM (
-                SELECT date, amount FROM income WHERE user_id = ?
-                UNION ALL
-                SELECT date, amount FROM expenses WHERE user_id = ?
-            )
-            GROUP BY month
-            ORDER BY month
-        ''', (user_id, user_id, user_id, user_id))
-        
-        results = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return results
+    def get_balance_history(self, user_id, months=12, account="ALL"):
+        """Get monthly income, expenses and running balance for the last `months` months"""
+        rows = flow_series(self, user_id, "month", account=account)[-int(months):] if months else []
+        return [
+            {
+                "month": row["period"][:7],
+                "income_total": row["income"],
+                "expense_total": row["expenses"],
+                "net_flow": row["net"],
+                "balance": row["balance"],
+            }
+            for row in rows
+        ]
 
     # Expense Forecast
     def get_expense_forecast(self, user_id, days_ahead=30):
@@ -1697,6 +1735,22 @@ class Database:
         conn.close()
         return dict(result) if result else None
 
+    def get_transactions_by_ids(self, table, user_id, ids, chunk_size=500):
+        """Live expenses/income rows of user_id with the given ids (for patching views)."""
+        if table not in ROW_EVENT_TABLES:
+            raise ValueError(f"not a ledger table: {table}")
+        ids = list(ids)
+        rows = []
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            marks = ", ".join("?" * len(chunk))
+            cursor.execute(f"SELECT * FROM {table} WHERE user_id = ? AND id IN ({marks})", [user_id] + chunk)
+            rows.extend(dict(row) for row in cursor.fetchall())
+        conn.close()
+        return rows
+
     def get_statistics_summary(self, user_id):
         """Get comprehensive statistics"""
         return {
@@ -1744,6 +1798,25 @@ class Database:
         conn.close()
         return accounts
 
+    def get_all_managed_accounts(self, user_ids=None):
+        """Managed accounts across all users (or the given user ids), with owner info."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        query = '''
+            SELECT a.*, u.username, u.full_name AS owner_name
+            FROM managed_accounts a
+            JOIN users u ON u.id = a.user_id
+        '''
+        params = []
+        if user_ids:
+            query += f" WHERE a.user_id IN ({', '.join('?' for _ in user_ids)})"
+            params = list(user_ids)
+        query += " ORDER BY a.user_id, a.account_name"
+        cursor.execute(query, params)
+        accounts = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return accounts
+
     def get_account(self, account_id, user_id):
         """Get specific account"""
         conn = self.get_connection()
@@ -1819,8 +1892,9 @@ class Database:
         conn = self.get_connection()
         cursor = conn.cursor()
         if start_date and end_date:
-            cursor.execute('''
-                SELECT * FROM expenses 
+            source = self._ledger_source(conn, "expenses", start_date, end_date)
+            cursor.execute(f'''
+                SELECT * FROM {source}
                 WHERE user_id = ? AND account_id = ? AND date BETWEEN ? AND ?
                 ORDER BY date DESC
             ''', (user_id, account_id, start_date, end_date))
@@ -1834,20 +1908,32 @@ class Database:
         conn.close()
         return expenses
 
-    def get_account_summary(self, user_id, account_id):
+    def get_account_summary(self, user_id, account_id, start_date=None, end_date=None):
         """Get financial summary for account"""
         conn = self.get_connection()
         cursor = conn.cursor()
+
+        where_clause = "WHERE user_id = ? AND account_id = ?"
+        params = [user_id, account_id]
+        if start_date and end_date:
+            where_clause += " AND date BETWEEN ? AND ?"
+            params.extend([start_date, end_date])
+            income_src = self._ledger_source(conn, "income", start_date, end_date)
+            expenses_src = self._ledger_source(conn, "expenses", start_date, end_date)
+        else:
+            income_src, expenses_src = "income", "expenses"
         
         # Total income
-        cursor.execute('SELECT COALESCE(SUM(amount), 0) as total FROM income WHERE user_id = ? AND account_id = ?', 
-                      (user_id, account_id))
+        cursor.execute(f'SELECT COALESCE(SUM(amount), 0) as total FROM {income_src} {where_clause}', params)
         income = cursor.fetchone()['total']
         
         # Total expenses
-        cursor.execute('SELECT COALESCE(SUM(amount), 0) as total FROM expenses WHERE user_id = ? AND account_id = ?',
-                      (user_id, account_id))
+        cursor.execute(f'SELECT COALESCE(SUM(amount), 0) as total FROM {expenses_src} {where_clause}', params)
         expenses = cursor.fetchone()['total']
+
+        if not (start_date and end_date):
+            income += self._rollup_total(cursor, user_id, "income", account_id)
+            expenses += self._rollup_total(cursor, user_id, "expense", account_id)
         
         conn.close()
         return {
@@ -1856,17 +1942,55 @@ class Database:
             'balance': income - expenses
         }
 
+    def get_all_account_summaries(self, user_id):
+        """Summaries for every managed account in one grouped query (all-time, incl. archived months).
+
+        Returns {account_id: {total_income, total_expenses, balance, tx_count, last_activity}}.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT account_id, SUM(income) AS total_income, SUM(expense) AS total_expenses,
+                   SUM(tx_count) AS tx_count, MAX(last_activity) AS last_activity
+            FROM (
+                SELECT account_id, SUM(amount) AS income, 0 AS expense, COUNT(*) AS tx_count, MAX(date) AS last_activity
+                FROM income WHERE user_id = ? AND account_id IS NOT NULL GROUP BY account_id
+                UNION ALL
+                SELECT account_id, 0, SUM(amount), COUNT(*), MAX(date)
+                FROM expenses WHERE user_id = ? AND account_id IS NOT NULL GROUP BY account_id
+                UNION ALL
+                SELECT account_id,
+                       SUM(CASE WHEN kind = 'income' THEN total ELSE 0 END),
+                       SUM(CASE WHEN kind = 'expense' THEN total ELSE 0 END),
+                       SUM(tx_count), MAX(month)
+                FROM monthly_rollups WHERE user_id = ? AND account_id != 0 GROUP BY account_id
+            )
+            GROUP BY account_id
+        ''', (user_id, user_id, user_id))
+        summaries = {}
+        for row in cursor.fetchall():
+            summary = dict(row)
+            summary['balance'] = summary['total_income'] - summary['total_expenses']
+            summaries[summary.pop('account_id')] = summary
+        conn.close()
+        return summaries
+
     def get_account_category_summary(self, user_id, account_id):
         """Get category breakdown for account"""
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute('''
-            SELECT category, COUNT(*) as count, SUM(amount) as total
-            FROM expenses 
-            WHERE user_id = ? AND account_id = ?
+            SELECT category, SUM(count) as count, SUM(total) as total
+            FROM (
+                SELECT category, COUNT(*) as count, SUM(amount) as total
+                FROM expenses WHERE user_id = ? AND account_id = ? GROUP BY category
+                UNION ALL
+                SELECT category, tx_count, total FROM monthly_rollups
+                WHERE user_id = ? AND kind = 'expense' AND account_id = ?
+            )
             GROUP BY category 
             ORDER BY total DESC
-        ''', (user_id, account_id))
+        ''', (user_id, account_id, user_id, account_id))
         categories = [dict(row) for row in cursor.fetchall()]
         conn.close()
         return categories
@@ -2025,62 +2149,211 @@ class Database:
         conn.close()
         return deleted
 
-    def generate_system_notifications(self, user_id):
-        """Generate key alerts from current budget/recurring states."""
-        created = 0
-        today = datetime.now().strftime("%Y-%m-%d")
-        now = datetime.now()
+    def add_notifications(self, user_id, alerts):
+        """Insert many notifications in one transaction.
+
+        Alerts with a fingerprint that already exists for the user are skipped.
+        Returns the number of rows inserted.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany(
+            '''
+            INSERT OR IGNORE INTO notifications (user_id, title, message, severity, is_read, fingerprint)
+            VALUES (?, ?, ?, ?, 0, ?)
+            ''',
+            [
+                (user_id, a["title"], a["message"], a.get("severity", "info"), a.get("fingerprint"))
+                for a in alerts
+            ]
+        )
+        created = max(cursor.rowcount, 0)  # changes() per statement, so counter trigger writes are not included
+        conn.commit()
+        conn.close()
+        return created
+
+    def get_unread_notification_count(self, user_id):
+        """Unread notifications for the nav badge (reads the maintained counter)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT unread FROM notification_counters WHERE user_id = ?', (user_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return int(row["unread"]) if row else 0
+
+    def rebuild_notification_counters(self):
+        """Recount notification_counters from the notifications table."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM notification_counters')
+        cursor.execute('''
+            INSERT INTO notification_counters (user_id, unread, total)
+            SELECT user_id, SUM(CASE WHEN is_read = 0 THEN 1 ELSE 0 END), COUNT(*)
+            FROM notifications GROUP BY user_id
+        ''')
+        conn.commit()
+        conn.close()
+
+    def _move_notifications(self, select_sql, params, archive, batch_size, limit=None):
+        """Archive/delete up to `limit` rows picked by select_sql in short transactions."""
+        moved = 0
+        conn = self.get_connection()
+        cursor = conn.cursor()
         try:
-            budget_rows = self.get_budget_vs_actual(user_id, now.month, now.year)
-        except Exception:
-            budget_rows = []
+            while limit is None or moved < limit:
+                take = batch_size if limit is None else min(batch_size, limit - moved)
+                cursor.execute(f"{select_sql} LIMIT ?", list(params) + [take])
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                marks = ", ".join("?" for _ in ids)
+                if archive:
+                    cursor.execute(f'''
+                        INSERT OR REPLACE INTO notification_archive
+                        (id, user_id, title, message, severity, is_read, fingerprint, created_at)
+                        SELECT id, user_id, title, message, severity, is_read, fingerprint, created_at
+                        FROM notifications WHERE id IN ({marks})
+                    ''', ids)
+                cursor.execute(f'DELETE FROM notifications WHERE id IN ({marks})', ids)
+                conn.commit()
+                moved += len(ids)
+                if len(ids) < take:
+                    break
+        finally:
+            conn.close()
+        return moved
+
+    def prune_notifications(self, user_id=None, retention_days=NOTIFICATION_RETENTION_DAYS,
+                            max_per_user=NOTIFICATION_MAX_PER_USER, archive=NOTIFICATION_ARCHIVE,
+                            batch_size=NOTIFICATION_PRUNE_BATCH):
+        """Apply the notification retention policy in small batches.
+
+        Read notifications older than retention_days are archived (or deleted),
+        then users above max_per_user lose their oldest rows, read ones first.
+        Returns {"expired": n, "capped": n}.
+        """
+        cutoff = f"-{int(retention_days)} days"  # created_at is UTC CURRENT_TIMESTAMP
+        user_clause = "" if user_id is None else " AND user_id = ?"
+        user_params = [] if user_id is None else [user_id]
+        expired = self._move_notifications(
+            "SELECT id FROM notifications WHERE is_read = 1 AND created_at < datetime('now', ?)"
+            f"{user_clause} ORDER BY created_at",
+            [cutoff] + user_params,
+            archive,
+            batch_size,
+        )
+
+        capped = 0
+        if max_per_user:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+            cursor.execute(
+                f'SELECT user_id, total FROM notification_counters WHERE total > ?{user_clause}',
+                [max_per_user] + user_params
+            )
+            over = [(row["user_id"], row["total"] - max_per_user) for row in cursor.fetchall()]
+            conn.close()
+            for uid, excess in over:
+                capped += self._move_notifications(
+                    'SELECT id FROM notifications WHERE user_id = ? ORDER BY is_read DESC, created_at, id',
+                    [uid],
+                    archive,
+                    batch_size,
+                    limit=excess,
+                )
+        return {"expired": expired, "capped": capped}
+
+    @staticmethod
+    def notification_fingerprint(kind, subject, period):
+        return f"{kind}:{subject}:{period}"
+
+    def compute_system_alerts(self, user_id, now=None):
+        """Compute budget, recurring-bill and balance alerts in one pass."""
+        now = now or datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        month_key = now.strftime("%Y-%m")
+        month_start = f"{month_key}-01"
+        next_month = f"{now.year + now.month // 12}-{now.month % 12 + 1:02d}-01"
+        fp = self.notification_fingerprint
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            '''
+            SELECT b.category, b.limit_amount, COALESCE(SUM(e.amount), 0) AS spent
+            FROM budgets b
+            LEFT JOIN expenses e
+              ON e.user_id = b.user_id AND e.category = b.category AND e.date >= ? AND e.date < ?
+            WHERE b.user_id = ? AND b.month = ? AND b.year = ? AND b.limit_amount > 0
+            GROUP BY b.id
+            ORDER BY b.category
+            ''',
+            (month_start, next_month, user_id, now.month, now.year)
+        )
+        budget_rows = [dict(r) for r in cursor.fetchall()]
+        cursor.execute(
+            '''
+            SELECT COUNT(*) AS due FROM recurring_bills
+            WHERE user_id = ? AND is_active = 1 AND next_due_date != '' AND next_due_date <= ?
+            ''',
+            (user_id, today)
+        )
+        due_bills = int(cursor.fetchone()["due"])
+        cursor.execute(
+            '''
+            SELECT (SELECT COALESCE(SUM(amount), 0) FROM income WHERE user_id = ?)
+                 - (SELECT COALESCE(SUM(amount), 0) FROM expenses WHERE user_id = ?) AS balance
+            ''',
+            (user_id, user_id)
+        )
+        balance = float(cursor.fetchone()["balance"] or 0)
+        balance += self._rollup_total(cursor, user_id, "income") - self._rollup_total(cursor, user_id, "expense")
+        conn.close()
+
+        alerts = []
         for row in budget_rows:
-            limit_amt = float(row.get("limit_amount", 0) or 0)
-            spent = float(row.get("actual_spent", 0) or 0)
-            if limit_amt <= 0:
-                continue
-            ratio = spent / limit_amt
+            category = row["category"] or "Category"
+            ratio = float(row["spent"] or 0) / float(row["limit_amount"])
             if ratio >= 1:
-                self.add_notification(
-                    user_id,
-                    "Budget Exceeded",
-                    f"{row.get('category', 'Category')} exceeded budget by {(ratio - 1) * 100:.1f}%.",
-                    "danger"
-                )
-                created += 1
+                alerts.append({
+                    "fingerprint": fp("budget_exceeded", category, month_key),
+                    "title": "Budget Exceeded",
+                    "message": f"{category} exceeded budget by {(ratio - 1) * 100:.1f}%.",
+                    "severity": "danger",
+                })
             elif ratio >= 0.8:
-                self.add_notification(
-                    user_id,
-                    "Budget Warning",
-                    f"{row.get('category', 'Category')} has reached {ratio * 100:.1f}% of budget.",
-                    "warning"
-                )
-                created += 1
-
-        due_bills = [
-            b for b in self.get_recurring_bills(user_id, active_only=True)
-            if b.get("next_due_date", "") and b.get("next_due_date", "") <= today
-        ]
+                alerts.append({
+                    "fingerprint": fp("budget_warning", category, month_key),
+                    "title": "Budget Warning",
+                    "message": f"{category} has reached {ratio * 100:.1f}% of budget.",
+                    "severity": "warning",
+                })
         if due_bills:
-            self.add_notification(
-                user_id,
-                "Recurring Bills Due",
-                f"{len(due_bills)} recurring bill(s) are due or overdue.",
-                "danger"
-            )
-            created += 1
-
-        summary = self.get_summary(user_id)
-        balance = float(summary.get("balance", 0) or 0)
+            alerts.append({
+                "fingerprint": fp("bills_due", "", today),
+                "title": "Recurring Bills Due",
+                "message": f"{due_bills} recurring bill(s) are due or overdue.",
+                "severity": "danger",
+            })
         if balance < 0:
-            self.add_notification(
-                user_id,
-                "Negative Balance Warning",
-                "Your current balance is negative. Review spending and planned bills.",
-                "danger"
-            )
-            created += 1
-        return created
+            alerts.append({
+                "fingerprint": fp("negative_balance", "", month_key),
+                "title": "Negative Balance Warning",
+                "message": "Your current balance is negative. Review spending and planned bills.",
+                "severity": "danger",
+            })
+        return alerts
+
+    def generate_system_notifications(self, user_id, now=None):
+        """Generate key alerts from current budget/recurring states.
+
+        Each alert fires at most once per period (budget/balance: month,
+        due bills: day). Returns the number of new notifications.
+        """
+        alerts = self.compute_system_alerts(user_id, now)
+        if not alerts:
+            return 0
+        return self.add_notifications(user_id, alerts)
 
     # ========== NOTES METHODS ==========
     def add_quick_note(self, user_id, title, body="", color_tag="blue", is_pinned=0):
@@ -2249,3 +2522,346 @@ class Database:
             "possible_duplicates": len(duplicates),
         }
 
+    # ========== MAIL OUTBOX ==========
+    def enqueue_mail(self, message_bytes, recipients, sender="", subject="", user_id=None):
+        """Queue a serialized email message. Returns the outbox id."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO mail_outbox (user_id, sender, recipients, subject, message)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (user_id, sender, ", ".join(recipients), subject, sqlite3.Binary(message_bytes)))
+        conn.commit()
+        mail_id = cursor.lastrowid
+        conn.close()
+        return mail_id
+
+    def claim_due_mail(self, now, limit=20, user_id=None):
+        """Mark up to `limit` due messages as sending and return them (oldest first)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        user_clause = "" if user_id is None else "AND user_id = ?"
+        cursor.execute(f'''
+            SELECT * FROM mail_outbox
+            WHERE status = 'queued' AND next_attempt_at <= ? {user_clause}
+            ORDER BY next_attempt_at, id
+            LIMIT ?
+        ''', [now] + ([] if user_id is None else [user_id]) + [limit])
+        rows = [dict(row) for row in cursor.fetchall()]
+        if rows:
+            cursor.execute(
+                f"UPDATE mail_outbox SET status = 'sending', claimed_at = ? WHERE id IN ({', '.join('?' for _ in rows)})",
+                [now] + [r["id"] for r in rows],
+            )
+        conn.commit()
+        conn.close()
+        return rows
+
+    def mark_mail_sent(self, mail_id):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE mail_outbox
+            SET status = 'sent', attempts = attempts + 1, last_error = NULL, sent_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (mail_id,))
+        conn.commit()
+        conn.close()
+
+    def mark_mail_attempt_failed(self, mail_id, error, next_attempt_at=None):
+        """Record a failed attempt; reschedule it, or fail it permanently if next_attempt_at is None."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            UPDATE mail_outbox
+            SET status = ?, attempts = attempts + 1, last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at)
+            WHERE id = ?
+        ''', ("queued" if next_attempt_at is not None else "failed", str(error)[:500], next_attempt_at, mail_id))
+        conn.commit()
+        conn.close()
+
+    def release_mail(self, mail_ids):
+        """Put claimed messages back in the queue without counting an attempt."""
+        if not mail_ids:
+            return
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"UPDATE mail_outbox SET status = 'queued' WHERE status = 'sending' AND id IN ({', '.join('?' for _ in mail_ids)})",
+            list(mail_ids),
+        )
+        conn.commit()
+        conn.close()
+
+    def get_mail(self, mail_id):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            'SELECT id, user_id, recipients, subject, status, attempts, last_error, next_attempt_at, created_at, sent_at '
+            'FROM mail_outbox WHERE id = ?',
+            (mail_id,),
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def get_outbox_counts(self, user_id=None):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if user_id is None:
+            cursor.execute('SELECT status, COUNT(*) AS c FROM mail_outbox GROUP BY status')
+        else:
+            cursor.execute('SELECT status, COUNT(*) AS c FROM mail_outbox WHERE user_id = ? GROUP BY status', (user_id,))
+        counts = {row["status"]: row["c"] for row in cursor.fetchall()}
+        conn.close()
+        return counts
+
+    def requeue_stuck_mail(self, user_id=None, claimed_before=None):
+        """Return messages left in 'sending' by a crashed sender to the queue.
+
+        Only claims made before claimed_before (epoch seconds) are requeued, so
+        messages another sender is still working on are left alone; user_id
+        limits it to one user's mail. Returns the number requeued.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        query = "UPDATE mail_outbox SET status = 'queued', claimed_at = NULL WHERE status = 'sending'"
+        params = []
+        if claimed_before is not None:
+            query += " AND (claimed_at IS NULL OR claimed_at < ?)"
+            params.append(claimed_before)
+        if user_id is not None:
+            query += " AND user_id = ?"
+            params.append(user_id)
+        cursor.execute(query, params)
+        conn.commit()
+        changed = cursor.rowcount
+        conn.close()
+        return changed
+
+    # ========== REPORT SCHEDULES ==========
+    def add_report_schedule(self, user_id, recipients, next_run_date, frequency="monthly", report_kind="expense",
+                            period="Month", account_id=None, sender="", is_active=1):
+        """Add a recurring report delivery. recipients is a list or comma-separated string."""
+        if not isinstance(recipients, str):
+            recipients = ", ".join(recipients)
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('''
+            INSERT INTO report_schedules
+            (user_id, account_id, report_kind, period, frequency, recipients, sender, next_run_date, is_active,
+             anchor_day)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CAST(strftime('%d', ?) AS INTEGER))
+        ''', (user_id, account_id, report_kind, period, frequency, recipients, sender, next_run_date, int(is_active),
+              next_run_date))
+        conn.commit()
+        schedule_id = cursor.lastrowid
+        conn.close()
+        return schedule_id
+
+    def get_report_schedules(self, user_id=None):
+        """Get report schedules (with account names), optionally for one user."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        query = '''
+            SELECT s.*, a.account_name FROM report_schedules s
+            LEFT JOIN managed_accounts a ON a.id = s.account_id
+        '''
+        if user_id is None:
+            cursor.execute(query + ' ORDER BY s.next_run_date, s.id')
+        else:
+            cursor.execute(query + ' WHERE s.user_id = ? ORDER BY s.next_run_date, s.id', (user_id,))
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def get_due_report_schedules(self, run_date, user_ids=None):
+        """Active schedules with next_run_date on/before run_date, in one query."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        query = '''
+            SELECT s.*, a.account_name FROM report_schedules s
+            LEFT JOIN managed_accounts a ON a.id = s.account_id
+            WHERE s.is_active = 1 AND s.next_run_date <= ?
+        '''
+        params = [run_date]
+        if user_ids:
+            query += f" AND s.user_id IN ({', '.join('?' for _ in user_ids)})"
+            params.extend(user_ids)
+        cursor.execute(query + ' ORDER BY s.user_id, s.id', params)
+        rows = [dict(row) for row in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def update_report_schedule(self, schedule_id, user_id, **kwargs):
+        """Update report schedule fields."""
+        allowed = {
+            "account_id", "report_kind", "period", "frequency", "recipients",
+            "sender", "next_run_date", "is_active",
+        }
+        fields = {k: v for k, v in kwargs.items() if k in allowed}
+        if not fields:
+            return False
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        set_clause = ", ".join([f"{k} = ?" for k in fields.keys()])
+        values = list(fields.values())
+        if "next_run_date" in fields:
+            # A new start date also sets the day of month later runs return to
+            set_clause += ", anchor_day = CAST(strftime('%d', ?) AS INTEGER)"
+            values.append(fields["next_run_date"])
+        cursor.execute(
+            f'UPDATE report_schedules SET {set_clause} WHERE id = ? AND user_id = ?',
+            values + [schedule_id, user_id]
+        )
+        conn.commit()
+        ok = cursor.rowcount > 0
+        conn.close()
+        return ok
+
+    def delete_report_schedule(self, schedule_id, user_id):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM report_schedules WHERE id = ? AND user_id = ?', (schedule_id, user_id))
+        conn.commit()
+        ok = cursor.rowcount > 0
+        conn.close()
+        return ok
+
+    def claim_report_schedules(self, claims):
+        """Advance due schedules before their reports are sent.
+
+        claims is an iterable of (schedule_id, due next_run_date, new
+        next_run_date). A schedule is claimed only if its next_run_date is
+        still the due one, so two scheduler processes never both send the
+        same run. Returns the claimed ids.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        claimed = []
+        for schedule_id, due, next_run in claims:
+            cursor.execute(
+                'UPDATE report_schedules SET next_run_date = ? WHERE id = ? AND next_run_date = ? AND is_active = 1',
+                (next_run, schedule_id, due)
+            )
+            if cursor.rowcount == 1:
+                claimed.append(schedule_id)
+        conn.commit()
+        conn.close()
+        return claimed
+
+    def record_report_schedule_runs(self, runs):
+        """Store results of a scheduler pass: iterable of (schedule_id, next_run_date, status)."""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.executemany('''
+            UPDATE report_schedules
+            SET next_run_date = ?, last_status = ?, last_run_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', [(next_run, status, schedule_id) for schedule_id, next_run, status in runs])
+        conn.commit()
+        conn.close()
+
+    # ========== LEDGER ARCHIVE (cold storage, see ledger_archive.py) ==========
+    def archive_dir(self):
+        """Directory holding the per-year archive files of this database."""
+        return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), ARCHIVE_DIR_NAME)
+
+    def get_archive_partitions(self, table=None):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        if table:
+            cursor.execute('SELECT * FROM archive_partitions WHERE table_name = ? ORDER BY year', (table,))
+        else:
+            cursor.execute('SELECT * FROM archive_partitions ORDER BY table_name, year')
+        rows = [dict(r) for r in cursor.fetchall()]
+        conn.close()
+        return rows
+
+    def _rollup_total(self, cursor, user_id, kind, account_id=None):
+        if account_id is None:
+            cursor.execute(
+                'SELECT COALESCE(SUM(total), 0) FROM monthly_rollups WHERE user_id = ? AND kind = ?',
+                (user_id, kind)
+            )
+        else:
+            cursor.execute(
+                'SELECT COALESCE(SUM(total), 0) FROM monthly_rollups WHERE user_id = ? AND kind = ? AND account_id = ?',
+                (user_id, kind, account_id)
+            )
+        return cursor.fetchone()[0]
+
+    @staticmethod
+    def _spill_archive_year(cursor, path, table, columns, spill):
+        """Copy table from the archive file at path into temp.spill. False if it has no such table."""
+        cursor.execute("ATTACH DATABASE ? AS archive_spill", (path,))
+        try:
+            have = {col[1] for col in cursor.execute(f"PRAGMA archive_spill.table_info({table})").fetchall()}
+            if not have:
+                return False
+            cols = ", ".join(c if c in have else f"NULL AS {c}" for c in columns)
+            cursor.execute(f"CREATE TEMP TABLE {spill} AS SELECT {cols} FROM archive_spill.{table}")
+            return True
+        finally:
+            cursor.execute("DETACH DATABASE archive_spill")
+
+    def _ledger_source(self, conn, table, start_date=None, end_date=None, include_archived=False, alias=None):
+        """FROM-clause source for table, UNION ALL-ing archive years the date range reaches.
+
+        Needed archive files are ATTACHed to conn; years beyond SQLite's
+        attach limit are copied into temp tables on conn instead. Without a
+        start_date only the live table is used unless include_archived is set.
+        The source is named alias (default: table).
+        """
+        name = alias or table
+        live = table if name == table else f"{table} {name}"
+        if not (start_date or include_archived):
+            return live
+        cursor = conn.cursor()
+        params = [table]
+        query = 'SELECT year, file_name FROM archive_partitions WHERE table_name = ?'
+        if start_date:
+            query += ' AND year >= ?'
+            params.append(int(str(start_date)[:4]))
+        if end_date:
+            query += ' AND year <= ?'
+            params.append(int(str(end_date)[:4]))
+        cursor.execute(query + ' ORDER BY year', params)
+        parts = cursor.fetchall()
+        if not parts:
+            return live
+
+        columns = [col[1] for col in cursor.execute(f"PRAGMA main.table_info({table})").fetchall()]
+        attached = {row[1] for row in cursor.execute("PRAGMA database_list").fetchall()}
+        spilled = {row[0] for row in cursor.execute("SELECT name FROM temp.sqlite_master WHERE type = 'table'")}
+        # main and temp take no slot; one is kept free for copying years that do not fit
+        slots = _MAX_ATTACHED - 1 - len(attached - {"main", "temp"})
+        selects = [f"SELECT {', '.join(columns)} FROM main.{table}"]
+        for part in parts:
+            alias = f"archive_{part['year']}"
+            path = os.path.join(self.archive_dir(), part["file_name"])
+            spill = f"{alias}_{table}"
+            if spill in spilled:
+                selects.append(f"SELECT {', '.join(columns)} FROM temp.{spill}")
+                continue
+            if alias not in attached:
+                if not os.path.exists(path):
+                    continue
+                if slots <= 0:
+                    # Out of ATTACH slots: copy the year into a temp table on this connection
+                    if self._spill_archive_year(cursor, path, table, columns, spill):
+                        spilled.add(spill)
+                        selects.append(f"SELECT {', '.join(columns)} FROM temp.{spill}")
+                    continue
+                cursor.execute("ATTACH DATABASE ? AS " + alias, (path,))
+                attached.add(alias)
+                slots -= 1
+            have = {col[1] for col in cursor.execute(f"PRAGMA {alias}.table_info({table})").fetchall()}
+            if not have:
+                continue
+            cols = ", ".join(c if c in have else f"NULL AS {c}" for c in columns)
+            selects.append(f"SELECT {cols} FROM {alias}.{table}")
+        if len(selects) == 1:
+            return live
+        return "(" + " UNION ALL ".join(selects) + f") AS {name}"
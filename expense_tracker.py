@@ -1,38 +1,57 @@
 ﻿"""Main Expense Tracker UI"""
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
-from config import COLORS, FONTS, WINDOW_WIDTH, WINDOW_HEIGHT, FEATURES
+from config import (
+    COLORS, FONTS, WINDOW_WIDTH, WINDOW_HEIGHT, FEATURES, TRASH_RETENTION_DAYS, ARCHIVE_AFTER_DAYS, ACCOUNT_CARD_BATCH,
+)
 from utils import (
     CustomEntry, create_header, create_stat_card, format_currency,
     format_date, get_date_range, show_message, PremiumButton, Sidebar,
-    validate_email
+    validate_email, validate_date, run_in_background, TableSearch, sort_key
 )
 from database import Database
-from pdf_generator import AccountingReportGenerator
 from feature_manager import FeatureManager
-from datetime import datetime, timedelta
-import json
-import shutil
+from page_manager import PageManager, retained_page
+from ledger_store import LedgerStore
+from charts import LineChart, BandChart, BarChart, DonutChart
+from cash_flow import CashFlow
+from balance_index import BalanceIndex
+from forecast import Forecaster, month_index
+from simulation import load_history, simulate
+import statement_parser
+from datetime import datetime, timedelta, date
 import calendar
-import smtplib, os, tempfile
+import os
 import subprocess
 import sys
 import re
-import logging
-import io
-import contextlib
-from email.message import EmailMessage
-from reportlab.pdfgen import canvas as pdf_canvas
+import threading
+
+# Tables behind every page that shows ledger figures (see page_manager.py)
+LEDGER_TABLES = frozenset({"expenses", "income", "managed_accounts", "monthly_rollups"})
+
+# Heavy modules (ReportLab via pdf_generator, smtplib/email, pdfplumber, PIL)
+# are imported inside the methods that need them so the app starts fast.
 
 
 class ExpenseTrackerUI:
-    def __init__(self, parent, user_data):
+    def __init__(self, parent, user_data, prefetched=None):
         self.parent = parent
         self.user_data = user_data
         self.db = Database()
+        # Dashboard data loaded in the background during login (see startup.py)
+        self._prefetched = dict(prefetched or {})
         self.user_id = user_data['id']
+        # One shared copy of the ledger; open tables patch themselves from its row events
+        self.ledger = LedgerStore(self.db, self.user_id)
+        self.cash_flow = CashFlow(self.db)  # cached net flow / running balance series for charts and reports
+        self.balance_index = BalanceIndex(self.db)  # O(log n) balance-as-of-date lookups
+        self.forecaster = Forecaster(self.db)  # seasonal per-category fits, refit when a month closes
+        for table in ("expenses", "income"):
+            if table in self._prefetched:
+                self.ledger.seed(table, self._prefetched.pop(table))
         self.current_page = "dashboard"
-        self.feature_manager = FeatureManager(self.db, self.user_id)
+        self.feature_manager = FeatureManager(self.db, self.user_id, forecaster=self.forecaster)
         self.dashboard_account_scope = None
         self.insights_account_scope = "ALL"
         self.smtp_settings = {
@@ -42,8 +61,14 @@ class ExpenseTrackerUI:
             "password": "",
             "use_tls": True,
         }
+        self.mail_sender = None
+        self.alerts_btn = None
         self._tree_sort_orders = {}
+        self._tree_searches = {}
+        self._page_views = {}
+        self.pages = None
         self._status_clear_job = None
+        self._dashboard_job = None
         self.main_container = None
         self.right_section = None
         self.sidebar = None
@@ -101,6 +126,9 @@ class ExpenseTrackerUI:
             COLORS[key] = value
         
         self.setup_ui()
+        self.ledger.attach(self.parent)
+        for table in ("expenses", "income"):
+            self.ledger.subscribe(table, self._on_ledger_change)
         self.load_data()
 
     def setup_ui(self):
@@ -128,9 +156,12 @@ class ExpenseTrackerUI:
         # Top navigation
         self.create_top_nav(right_section)
         
-        # Main content area
-        self.content_frame = tk.Frame(right_section, bg=COLORS["background"])
-        self.content_frame.pack(fill=tk.BOTH, expand=True)
+        # Main content area: every page is a retained frame inside it (see page_manager.py)
+        self.page_host = tk.Frame(right_section, bg=COLORS["background"])
+        self.page_host.pack(fill=tk.BOTH, expand=True)
+        self.content_frame = self.page_host
+        self.pages = PageManager(self.page_host)
+        self.db.add_change_listener(self.pages.mark_dirty)
 
         # Status bar for quick feedback
         status_bar = tk.Frame(right_section, bg=COLORS["surface"], height=28)
@@ -328,6 +359,16 @@ class ExpenseTrackerUI:
         self.theme_combo.pack(side=tk.LEFT, padx=(0, 10))
         self.theme_combo.bind("<<ComboboxSelected>>", self._on_theme_change)
 
+        self.alerts_btn = tk.Button(
+            right, text="Alerts", command=self.show_notification_center,
+            font=FONTS["small"], bg=COLORS["surface_alt"], fg=COLORS["text_primary"],
+            relief=tk.FLAT, padx=10, pady=5, cursor="hand2"
+        )
+        self.alerts_btn.pack(side=tk.LEFT, padx=(0, 10))
+        self._refresh_alert_badge(schedule=True)
+        # Housekeeping: notification retention and trash purge off the Tk thread
+        run_in_background(self.parent, self._run_housekeeping)
+
         tk.Button(
             right, text="Command", command=self.open_command_palette,
             font=FONTS["small"], bg=COLORS["surface_alt"], fg=COLORS["text_primary"],
@@ -350,6 +391,27 @@ class ExpenseTrackerUI:
         self.clock_label.pack(side=tk.LEFT, padx=(10, 0))
         self._start_clock()
 
+    def _run_housekeeping(self):
+        """Apply notification and trash retention for this user (worker thread)."""
+        self.db.prune_notifications(self.user_id)
+        self.db.purge_trash(user_id=self.user_id)
+
+    def _refresh_alert_badge(self, schedule=False):
+        """Show the unread count on the nav Alerts button (O(1) counter read)."""
+        if not self.parent.winfo_exists() or self.alerts_btn is None:
+            return
+        try:
+            unread = self.db.get_unread_notification_count(self.user_id)
+        except Exception:
+            unread = 0
+        self.alerts_btn.config(
+            text=f"Alerts ({unread})" if unread else "Alerts",
+            bg=COLORS["danger"] if unread else COLORS["surface_alt"],
+            fg="white" if unread else COLORS["text_primary"],
+        )
+        if schedule:
+            self.parent.after(30000, lambda: self._refresh_alert_badge(schedule=True))
+
     def _start_clock(self):
         """Live clock in top navigation."""
         if not self.parent.winfo_exists():
@@ -360,11 +422,17 @@ class ExpenseTrackerUI:
     def _set_view_state(self, page_key, title, subtitle, status_message):
         """Centralized state updates for consistent UX."""
         self.current_page = page_key
+        self._page_views[page_key] = (title, subtitle, status_message)
         self.page_title.config(text=title)
         self.page_subtitle_var.set(subtitle)
         self._set_active_nav(page_key)
         self.set_status(status_message, auto_clear=True)
 
+    def _restore_view_state(self, page_key):
+        """Re-apply the title/nav state of a retained page shown again without a rebuild."""
+        title, subtitle, status_message = self._page_views[page_key]
+        self._set_view_state(page_key, title, subtitle, status_message)
+
     def toggle_sidebar(self):
         """Manually toggle sidebar visibility."""
         if self._compact_mode:
@@ -505,6 +573,7 @@ class ExpenseTrackerUI:
             if self.right_section:
                 self.right_section.configure(bg=COLORS["background"])
             self._configure_ttk_theme()
+            self.pages.clear()
             self.refresh_current_page()
             self.set_status(f"Theme changed: {preset_name}", auto_clear=True)
         except Exception:
@@ -637,10 +706,7 @@ class ExpenseTrackerUI:
             return
 
         self.db.add_expense(self.user_id, category.strip() or "Other", amount, str(datetime.now().date()), "Quick add", "Other")
-        self.load_data()
         self.set_status(f"Expense added: {category} ({format_currency(amount)})", auto_clear=True)
-        if self.current_page in ("dashboard", "transactions"):
-            self.refresh_current_page()
 
     def quick_add_income(self):
         """Fast add flow for income from any page."""
@@ -657,16 +723,59 @@ class ExpenseTrackerUI:
             return
 
         self.db.add_income(self.user_id, source.strip() or "Other", amount, str(datetime.now().date()), "Quick add")
-        self.load_data()
         self.set_status(f"Income added: {source} ({format_currency(amount)})", auto_clear=True)
-        if self.current_page in ("dashboard", "transactions"):
-            self.refresh_current_page()
 
     @staticmethod
-    def _row_matches_search(row_values, query):
-        """Case-insensitive row matching for table filters."""
-        joined = " ".join(str(value or "") for value in row_values).lower()
-        return query in joined
+    def _search_text(row_values):
+        """Lowercase haystack for a table row (built once per load by TableSearch)."""
+        return " ".join(str(value or "") for value in row_values).lower()
+
+    def _table_search(self, tree, entry, values, **kwargs):
+        """TableSearch bound to tree; column sorting then re-orders all of its rows."""
+        search = TableSearch(tree, entry, values, **kwargs)
+        key = str(tree)
+        self._tree_searches[key] = search
+        tree.bind("<Destroy>", lambda e: self._tree_searches.pop(key, None) if e.widget is tree else None, add="+")
+        return search
+
+    def _on_ledger_change(self, upserted, deleted):
+        """Rebuild the dashboard once per batch of ledger changes while it is on screen.
+
+        Hidden pages are only marked dirty (see page_manager.py).
+        """
+        if self.current_page == "dashboard" and self._dashboard_job is None:
+            self._dashboard_job = self.parent.after_idle(self._refresh_dashboard)
+
+    def _refresh_dashboard(self):
+        self._dashboard_job = None
+        if self.current_page == "dashboard":
+            self.show_dashboard()
+
+    def _follow_ledger(self, search, table, reload, convert=None, key=None):
+        """Patch search from self.ledger row changes to table until its tree is destroyed.
+
+        convert(row) maps a ledger row to the search's row (None = not shown
+        here) and key(row_id) maps a ledger id to the search's row key.
+        reload() runs when the store re-read the whole table.
+        """
+        convert = convert or (lambda row: row)
+        key = key or (lambda row_id: row_id)
+
+        def on_change(upserted, deleted):
+            if deleted is None:
+                reload()
+                return
+            shown, removed = [], [key(row_id) for row_id in deleted]
+            for row in upserted:
+                converted = convert(row)
+                if converted is None:
+                    removed.append(key(row["id"]))
+                else:
+                    shown.append(converted)
+            search.patch(shown, removed)
+
+        unsubscribe = self.ledger.subscribe(table, on_change)
+        search.tree.bind("<Destroy>", lambda e: unsubscribe() if e.widget is search.tree else None, add="+")
 
     def _attach_tree_sorting(self, tree, columns):
         """Enable click-to-sort for table columns."""
@@ -677,18 +786,14 @@ class ExpenseTrackerUI:
         """Sort tree rows by selected column."""
         order_key = (id(tree), column)
         descending = self._tree_sort_orders.get(order_key, False)
-        rows = [(tree.set(item, column), item) for item in tree.get_children("")]
-
-        def normalize(value):
-            text = str(value).replace(",", "").strip()
-            try:
-                return float(text)
-            except ValueError:
-                return text.lower()
-
-        rows.sort(key=lambda x: normalize(x[0]), reverse=descending)
-        for index, (_, item) in enumerate(rows):
-            tree.move(item, "", index)
+        search = self._tree_searches.get(str(tree))
+        if search is not None:
+            # Sort the row model (every loaded row, including ones hidden by the search)
+            search.sort_column(list(tree["columns"]).index(column), descending)
+        else:
+            rows = [(sort_key(tree.set(item, column)), item) for item in tree.get_children("")]
+            rows.sort(key=lambda x: x[0], reverse=descending)
+            tree.set_children("", *(item for _, item in rows))
 
         self._tree_sort_orders[order_key] = not descending
         direction = "descending" if descending else "ascending"
@@ -696,23 +801,7 @@ class ExpenseTrackerUI:
 
     def _smart_suggest_category(self, description):
         """Suggest category using keyword rules + history."""
-        text = (description or "").strip().lower()
-        if not text:
-            return None
-
-        keyword_map = {
-            "Food": ["food", "restaurant", "cafe", "zomato", "swiggy", "dinner", "lunch"],
-            "Transport": ["uber", "ola", "taxi", "metro", "bus", "fuel", "petrol", "diesel"],
-            "Utilities": ["electricity", "water", "internet", "wifi", "gas", "bill", "recharge"],
-            "Entertainment": ["movie", "netflix", "spotify", "game", "concert"],
-            "Healthcare": ["doctor", "medicine", "pharmacy", "hospital", "clinic"],
-            "Education": ["course", "tuition", "book", "exam", "school", "college"],
-        }
-        for category, words in keyword_map.items():
-            if any(word in text for word in words):
-                return category
-
-        return self.db.suggest_category(self.user_id, text)
+        return statement_parser.suggest_category(self.db, self.user_id, description)
 
     def _open_date_picker(self, target_entry, initial_date=None):
         """Open a lightweight calendar picker and write selected date to target CustomEntry."""
@@ -826,215 +915,31 @@ class ExpenseTrackerUI:
     @staticmethod
     def _normalize_statement_date(raw_date):
         """Convert statement date formats into YYYY-MM-DD."""
-        raw = (raw_date or "").strip()
-        formats = ["%b %d, %Y", "%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y"]
-        for fmt in formats:
-            try:
-                return datetime.strptime(raw, fmt).strftime("%Y-%m-%d")
-            except ValueError:
-                continue
-        return raw
+        return statement_parser.normalize_statement_date(raw_date)
 
     @staticmethod
     def _phonepe_transaction_regex():
-        return re.compile(
-            r'^(?P<date>[A-Za-z]{3}\s+\d{1,2},\s+\d{4})\s+'
-            r'(?P<details>.+?)\s+'
-            r'(?P<type>DEBIT|CREDIT)\s+'
-            r'(?P<amount>[^\s]+)$'
-        )
+        return statement_parser.phonepe_transaction_regex()
 
     def _parse_phonepe_statement_pdf(self, pdf_path):
         """Parse multi-page PhonePe-style statement and return transactions list."""
-        try:
-            import pdfplumber
-        except Exception:
-            raise RuntimeError("pdfplumber is required for PDF import. Install with: pip install pdfplumber")
-        logging.getLogger("pdfminer").setLevel(logging.ERROR)
-        logging.getLogger("pdfplumber").setLevel(logging.ERROR)
-
-        pattern = self._phonepe_transaction_regex()
-        transactions = []
-        with contextlib.redirect_stderr(io.StringIO()):
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_no, page in enumerate(pdf.pages, start=1):
-                    text = page.extract_text() or ""
-                    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-                    current = None
-
-                    for line in lines:
-                        if line.startswith("Page ") or "system generated statement" in line.lower():
-                            continue
-                        if line.startswith("Date Transaction Details") or line.startswith("Transaction Statement for"):
-                            continue
-                        if re.match(r'^\d{2}\D\d{2}\s*(am|pm)$', line.lower()):
-                            # orphan time line in odd extraction, ignore
-                            continue
-
-                        m = pattern.match(line)
-                        if m:
-                            if current:
-                                transactions.append(current)
-                            raw_date = m.group("date")
-                            details = m.group("details").strip()
-                            txn_type = m.group("type").upper()
-                            raw_amount = m.group("amount")
-                            cleaned_amount = re.sub(r'[^0-9.,]', '', raw_amount).replace(",", "")
-                            amount = float(cleaned_amount) if cleaned_amount else 0.0
-                            current = {
-                                "date": self._normalize_statement_date(raw_date),
-                                "raw_date": raw_date,
-                                "details": details,
-                                "type": txn_type,
-                                "amount": amount,
-                                "txn_id": "",
-                                "utr_no": "",
-                                "page": page_no,
-                            }
-                            continue
-
-                        if current:
-                            txn_id_match = re.search(r'Transaction ID\s+([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
-                            if txn_id_match:
-                                current["txn_id"] = txn_id_match.group(1)
-                            utr_match = re.search(r'UTR No\.\s*([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
-                            if utr_match:
-                                current["utr_no"] = utr_match.group(1)
-
-                    if current:
-                        transactions.append(current)
-
-        # de-duplicate by txn_id (or fallback tuple)
-        seen = set()
-        deduped = []
-        for t in transactions:
-            key = t["txn_id"] or f"{t['date']}|{t['type']}|{t['amount']}|{t['details']}"
-            if key in seen:
-                continue
-            seen.add(key)
-            deduped.append(t)
-        return deduped
+        return statement_parser.parse_phonepe_statement_pdf(pdf_path)
 
     def _smart_enhance_statement_description(self, details, txn_type, txn_id, provider="Statement"):
         """Create cleaner description from raw statement details."""
-        d = (details or "").strip()
-        if d.lower().startswith("paid to "):
-            base = d[8:].strip()
-            desc = f"{provider} payment to {base}"
-        elif d.lower().startswith("received from "):
-            base = d[14:].strip()
-            desc = f"{provider} receipt from {base}"
-        else:
-            desc = f"{provider} {txn_type.lower()} - {d}"
-        if txn_id:
-            desc = f"{desc} ({txn_id})"
-        return desc[:160]
+        return statement_parser.enhance_statement_description(details, txn_type, txn_id, provider=provider)
 
     def _detect_statement_provider(self, sample_text):
         """Best-effort provider detection from PDF text."""
-        s = (sample_text or "").lower()
-        if "phonepe" in s:
-            return "PhonePe"
-        if "paytm" in s:
-            return "Paytm"
-        if "google pay" in s or "gpay" in s:
-            return "GPay"
-        return "Generic"
+        return statement_parser.detect_statement_provider(sample_text)
 
     def _parse_generic_upi_statement_pdf(self, pdf_path):
         """Generic parser for UPI/payment statement formats."""
-        try:
-            import pdfplumber
-        except Exception:
-            raise RuntimeError("pdfplumber is required for PDF import. Install with: pip install pdfplumber")
-        logging.getLogger("pdfminer").setLevel(logging.ERROR)
-        logging.getLogger("pdfplumber").setLevel(logging.ERROR)
-
-        pattern = re.compile(
-            r'^(?P<date>[A-Za-z]{3}\s+\d{1,2},\s+\d{4}|\d{2}[/-]\d{2}[/-]\d{4}|\d{4}-\d{2}-\d{2})\s+'
-            r'(?P<details>.+?)\s+'
-            r'(?:(?P<type>DEBIT|CREDIT)\s+)?'
-            r'(?P<amount>[^\s]+)$',
-            flags=re.IGNORECASE
-        )
-
-        txns = []
-        with contextlib.redirect_stderr(io.StringIO()):
-            with pdfplumber.open(pdf_path) as pdf:
-                for page_no, page in enumerate(pdf.pages, start=1):
-                    lines = [ln.strip() for ln in (page.extract_text() or "").splitlines() if ln.strip()]
-                    current = None
-                    for line in lines:
-                        low = line.lower()
-                        if line.startswith("Page ") or "system generated statement" in low or line.startswith("Date Transaction"):
-                            continue
-                        m = pattern.match(line)
-                        if m:
-                            if current:
-                                txns.append(current)
-                            raw_date = m.group("date")
-                            details = m.group("details").strip()
-                            raw_amount = m.group("amount")
-                            cleaned_amount = re.sub(r'[^0-9.,]', '', raw_amount).replace(",", "")
-                            amount = float(cleaned_amount) if cleaned_amount else 0.0
-                            txn_type = (m.group("type") or "").upper()
-                            if not txn_type:
-                                dl = details.lower()
-                                if "paid to" in dl or "sent to" in dl or "debit" in dl:
-                                    txn_type = "DEBIT"
-                                elif "received" in dl or "credit" in dl:
-                                    txn_type = "CREDIT"
-                                else:
-                                    txn_type = "DEBIT"
-                            current = {
-                                "date": self._normalize_statement_date(raw_date),
-                                "raw_date": raw_date,
-                                "details": details,
-                                "type": txn_type,
-                                "amount": amount,
-                                "txn_id": "",
-                                "utr_no": "",
-                                "page": page_no,
-                            }
-                            continue
-                        if current:
-                            txn_id_match = re.search(r'(?:Transaction ID|Txn ID)\s*[:.]?\s*([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
-                            if txn_id_match:
-                                current["txn_id"] = txn_id_match.group(1)
-                            utr_match = re.search(r'UTR(?: No\.)?\s*[:.]?\s*([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
-                            if utr_match:
-                                current["utr_no"] = utr_match.group(1)
-                    if current:
-                        txns.append(current)
-
-        seen = set()
-        out = []
-        for t in txns:
-            key = t["txn_id"] or f"{t['date']}|{t['type']}|{t['amount']}|{t['details']}"
-            if key in seen:
-                continue
-            seen.add(key)
-            out.append(t)
-        return out
+        return statement_parser.parse_generic_upi_statement_pdf(pdf_path)
 
     def _parse_statement_pdf(self, pdf_path, preset="Auto"):
         """Parse PDF statement using selected preset."""
-        try:
-            import pdfplumber
-            with contextlib.redirect_stderr(io.StringIO()):
-                with pdfplumber.open(pdf_path) as pdf:
-                    first_text = (pdf.pages[0].extract_text() or "") if pdf.pages else ""
-        except Exception:
-            first_text = ""
-
-        provider = self._detect_statement_provider(first_text) if preset == "Auto" else preset
-        provider = provider or "Generic"
-
-        if provider == "PhonePe":
-            txns = self._parse_phonepe_statement_pdf(pdf_path)
-        else:
-            txns = self._parse_generic_upi_statement_pdf(pdf_path)
-        return provider, txns
+        return statement_parser.parse_statement_pdf(pdf_path, preset=preset)
 
     def manage_import_rules(self, on_change=None):
         """Manage merchant keyword import rules."""
@@ -1189,14 +1094,9 @@ class ExpenseTrackerUI:
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scroll.pack(side=tk.RIGHT, fill=tk.Y)
 
-        preview_rows = []
-        for idx, txn in enumerate(parsed):
-            rule = self.db.find_import_rule(self.user_id, txn["details"])
-            category = (rule["category"] if rule else None) or self._smart_suggest_category(txn["details"]) or ("Income" if txn["type"] == "CREDIT" else "Other")
-            desc = self._smart_enhance_statement_description(txn["details"], txn["type"], txn["txn_id"], provider=provider)
-            row = {**txn, "category": category, "description": desc, "rule_account_name": (rule.get("account_name") if rule else "")}
-            preview_rows.append(row)
-            tree.insert("", "end", iid=str(idx), values=(txn["date"], txn["type"], f"{txn['amount']:.2f}", category, desc, txn["txn_id"]))
+        preview_rows = statement_parser.build_import_rows(self.db, self.user_id, parsed, provider)
+        for idx, row in enumerate(preview_rows):
+            tree.insert("", "end", iid=str(idx), values=(row["date"], row["type"], f"{row['amount']:.2f}", row["category"], row["description"], row["txn_id"]))
 
         def refresh_preview():
             tree.delete(*tree.get_children())
@@ -1259,43 +1159,14 @@ class ExpenseTrackerUI:
 
         def do_import():
             account_id = account_map.get(account_var.get())
-            imported = 0
-            skipped = 0
-            for row in preview_rows:
-                txn_id = row.get("txn_id", "")
-                if txn_id and self.db.statement_txn_exists(self.user_id, txn_id):
-                    skipped += 1
-                    continue
-
-                mapped_account = row.get("rule_account_name", "")
-                row_account_id = account_map.get(mapped_account, account_id) if mapped_account else account_id
-
-                notes = f"[STATEMENT:{txn_id}] [UTR:{row.get('utr_no','')}] [SOURCE:{provider} PDF]".strip()
-                if row["type"] == "DEBIT":
-                    self.db.add_expense(
-                        self.user_id,
-                        row["category"],
-                        float(row["amount"]),
-                        row["date"],
-                        row["description"],
-                        "UPI",
-                        notes=notes,
-                        account_id=row_account_id,
-                    )
-                    imported += 1
-                elif row["type"] == "CREDIT":
-                    self.db.add_income(
-                        self.user_id,
-                        row["description"],
-                        float(row["amount"]),
-                        row["date"],
-                        f"Imported from statement {txn_id}",
-                        notes=notes,
-                        account_id=row_account_id,
-                    )
-                    imported += 1
-                else:
-                    skipped += 1
+            imported, skipped = statement_parser.save_import_rows(
+                self.db,
+                self.user_id,
+                preview_rows,
+                provider,
+                account_id=account_id,
+                account_map=account_map,
+            )
 
             self.load_data()
             self.set_status(f"Statement import done. Imported={imported}, skipped={skipped}", auto_clear=True)
@@ -1349,52 +1220,100 @@ class ExpenseTrackerUI:
         frame = tk.Frame(dlg, bg=COLORS["background"])
         frame.pack(fill=tk.BOTH, expand=True, padx=12, pady=12)
 
-        cols = ("Trash ID", "Type", "Deleted At", "Summary")
-        tree = ttk.Treeview(frame, columns=cols, show="headings", height=14)
+        cols = ("Trash ID", "Type", "Deleted At", "Category / Source", "Amount", "Date")
+        tree = ttk.Treeview(frame, columns=cols, show="headings", height=14, selectmode="extended")
         for col in cols:
             tree.heading(col, text=col)
-            tree.column(col, width=140 if col != "Summary" else 430)
+            tree.column(col, width=200 if col == "Category / Source" else 130)
         self._attach_tree_sorting(tree, cols)
         tree.pack(fill=tk.BOTH, expand=True)
 
         def refresh():
             tree.delete(*tree.get_children())
             for item in self.db.get_trash_items(self.user_id):
-                data = item.get("item_data", {})
-                if item["item_type"] == "expense":
-                    summary = f"{data.get('category','')} | {data.get('amount','')} | {data.get('date','')}"
-                else:
-                    summary = f"{data.get('source','')} | {data.get('amount','')} | {data.get('date','')}"
-                tree.insert("", "end", values=(item["id"], item["item_type"], item["deleted_at"], summary))
+                tree.insert("", "end", values=(
+                    item["id"], item["item_type"], item["deleted_at"], item["category"] or "",
+                    f"{float(item['amount'] or 0):.2f}", item["date"] or "",
+                ))
 
         btns = tk.Frame(dlg, bg=COLORS["background"])
         btns.pack(fill=tk.X, padx=12, pady=(0, 12))
 
+        def selected_ids():
+            return [int(tree.item(item, "values")[0]) for item in tree.selection()]
+
         def restore_selected():
-            selected = tree.selection()
-            if not selected:
+            ids = selected_ids()
+            if not ids:
                 return
-            trash_id = int(tree.item(selected[0], "values")[0])
-            ok, msg = self.db.restore_trash_item(trash_id, self.user_id)
-            if ok:
-                self.set_status("Item restored from trash", auto_clear=True)
+            restored, msg = self.db.restore_trash_items(ids, self.user_id)
+            if restored:
+                self.set_status(f"{restored} item(s) restored from trash", auto_clear=True)
                 refresh()
             else:
                 show_message(self.parent, "Error", f"Restore failed: {msg}", "error")
 
         def delete_selected():
-            selected = tree.selection()
-            if not selected:
-                return
-            trash_id = int(tree.item(selected[0], "values")[0])
-            if self.db.delete_trash_item(trash_id, self.user_id):
+            ids = selected_ids()
+            if ids and self.db.delete_trash_items(ids, self.user_id):
                 refresh()
 
+        def purge_old():
+            days = simpledialog.askinteger(
+                "Purge Trash", "Permanently delete items trashed more than N days ago (0 = all):",
+                initialvalue=TRASH_RETENTION_DAYS, minvalue=0, parent=dlg,
+            )
+            if days is None:
+                return
+            deleted = self.db.purge_trash(days, user_id=self.user_id)
+            self.set_status(f"{deleted} trash item(s) purged", auto_clear=True)
+            refresh()
+
         tk.Button(btns, text="Restore Selected", bg=COLORS["accent"], fg="white", relief=tk.FLAT, padx=12, pady=6, command=restore_selected).pack(side=tk.LEFT, padx=4)
         tk.Button(btns, text="Delete Permanently", bg=COLORS["danger"], fg="white", relief=tk.FLAT, padx=12, pady=6, command=delete_selected).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Purge Older...", bg=COLORS["secondary"], fg="white", relief=tk.FLAT, padx=12, pady=6, command=purge_old).pack(side=tk.LEFT, padx=4)
         tk.Button(btns, text="Refresh", bg=COLORS["primary"], fg="white", relief=tk.FLAT, padx=12, pady=6, command=refresh).pack(side=tk.LEFT, padx=4)
         refresh()
 
+    def archive_old_transactions(self):
+        """Move old expenses/income into per-year archive files (totals are kept)."""
+        import ledger_archive
+
+        days = simpledialog.askinteger(
+            "Archive Old Data",
+            "Archive whole years of transactions older than N days.\n"
+            "Summaries keep their totals; date-ranged reports still read archived years.",
+            initialvalue=ARCHIVE_AFTER_DAYS, minvalue=0, parent=self.parent,
+        )
+        if days is None:
+            return
+        before = ledger_archive.default_cutoff(days)
+        if not messagebox.askyesno(
+            "Archive Old Data",
+            f"Move transactions dated before {before} into {self.db.archive_dir()}?\n"
+            "Back up the archive folder together with the database.",
+        ):
+            return
+
+        def on_done(result):
+            self.set_status(
+                f"Archived {result['expenses']} expense(s) and {result['income']} income row(s)", auto_clear=True
+            )
+            self.refresh_current_page()
+
+        def on_error(e):
+            self.set_status("Archiving failed", auto_clear=True)
+            show_message(self.parent, "Error", f"Archiving failed: {e}", "error")
+
+        self.set_status("Archiving old transactions...")
+        run_in_background(
+            self.parent,
+            lambda progress: ledger_archive.archive_transactions(self.db, before, self.user_id, progress=progress),
+            on_done,
+            on_error,
+            on_progress=lambda table, year, rows: self.set_status(f"Archiving... {table} {year}: {rows} row(s)"),
+        )
+
     def configure_report_designer(self):
         """Customize report branding/layout settings."""
         current = self.db.get_report_design(self.user_id) or {}
@@ -1559,6 +1478,8 @@ class ExpenseTrackerUI:
             color = design.get("primary_color") or "#1e3a8a"
 
             try:
+                from reportlab.pdfgen import canvas as pdf_canvas
+
                 c = pdf_canvas.Canvas(file_path, pagesize=(595, 842))
                 c.setFillColor(color)
                 c.rect(0, 800, 595, 42, fill=1)
@@ -1625,10 +1546,16 @@ class ExpenseTrackerUI:
         for widget in self.content_frame.winfo_children():
             widget.destroy()
 
+    def _prefetched_or(self, key, loader):
+        """Use data prefetched during login once, then fall back to the database."""
+        if key in self._prefetched:
+            return self._prefetched.pop(key)
+        return loader()
+
     def load_data(self):
         """Load data from database"""
-        self.summary = self.db.get_summary(self.user_id)
-        self.category_summary = self.db.get_category_summary(self.user_id)
+        self.summary = self._prefetched_or("summary", lambda: self.db.get_summary(self.user_id))
+        self.category_summary = self._prefetched_or("category_summary", lambda: self.db.get_category_summary(self.user_id))
 
     def _filter_rows_by_account_scope(self, rows, scope):
         """Filter expense/income rows by dashboard account scope."""
@@ -1638,6 +1565,7 @@ class ExpenseTrackerUI:
             return [r for r in rows if r.get("account_id") in (None, "", 0)]
         return [r for r in rows if r.get("account_id") == scope]
 
+    @retained_page("dashboard", depends=LEDGER_TABLES | {"budgets", "recurring_bills", "financial_goals", "subscriptions"})
     def show_dashboard(self):
         """Show enhanced dashboard"""
         self._set_view_state("dashboard", "Dashboard", "Financial pulse and quick actions", "Dashboard loaded")
@@ -1645,7 +1573,7 @@ class ExpenseTrackerUI:
         self.load_data()
 
         # Scope selector: show calculations for selected account only
-        accounts = self.db.get_managed_accounts(self.user_id)
+        accounts = self._prefetched_or("managed_accounts", lambda: self.db.get_managed_accounts(self.user_id))
         scope_map = {"All Accounts": "ALL", "Personal (Main)": None}
         for acc in accounts:
             scope_map[acc["account_name"]] = acc["id"]
@@ -1677,8 +1605,8 @@ class ExpenseTrackerUI:
 
         scope_combo.bind("<<ComboboxSelected>>", apply_scope_change)
 
-        all_expenses_full = self.db.get_expenses(self.user_id)
-        all_income_full = self.db.get_income(self.user_id)
+        all_expenses_full = self.ledger.rows("expenses")
+        all_income_full = self.ledger.rows("income")
         all_expenses = self._filter_rows_by_account_scope(all_expenses_full, self.dashboard_account_scope)
         all_income = self._filter_rows_by_account_scope(all_income_full, self.dashboard_account_scope)
 
@@ -1687,6 +1615,8 @@ class ExpenseTrackerUI:
             "total_expenses": sum(float(e.get("amount", 0)) for e in all_expenses),
         }
         local_summary["balance"] = local_summary["total_income"] - local_summary["total_expenses"]
+        # Balance through today (future-dated rows excluded, archived months included)
+        current_balance = self.balance_index.balance_as_of(self.user_id, account=self.dashboard_account_scope)
 
         cat_totals = {}
         for exp in all_expenses:
@@ -1716,7 +1646,7 @@ class ExpenseTrackerUI:
         days_passed = max(1, datetime.now().day)
         daily_average = this_month_expenses / days_passed if this_month_expenses > 0 else 0
         
-        create_stat_card(stats_frame, "Total Balance", format_currency(local_summary['balance']), COLORS["primary"])
+        create_stat_card(stats_frame, "Total Balance", format_currency(current_balance), COLORS["primary"])
         create_stat_card(stats_frame, "Total Income", format_currency(local_summary['total_income']), COLORS["accent"])
         create_stat_card(stats_frame, "Total Expenses", format_currency(local_summary['total_expenses']), COLORS["danger"])
         create_stat_card(stats_frame, "Daily Average", format_currency(daily_average), COLORS["warning"])
@@ -1997,6 +1927,8 @@ class ExpenseTrackerUI:
                         font=FONTS["small"], fg=COLORS["warning"], bg=COLORS["surface"]).pack(anchor=tk.W, pady=2)
 
 
+    # The expense/income tables patch themselves from self.ledger row events
+    @retained_page("transactions", depends={"managed_accounts"})
     def show_transactions(self):
         """Show transactions management"""
         self._set_view_state("transactions", "Transactions", "Manage expense and income records", "Transactions loaded")
@@ -2111,99 +2043,89 @@ class ExpenseTrackerUI:
 
         rows_cache = []
 
-        def load_rows():
-            rows_cache.clear()
+        def expense_row(e):
             selected_account = account_map.get(account_var.get(), "ALL")
+            if selected_account != "ALL" and e.get("account_id") != selected_account:
+                return None
+            return {
+                "type": "Expense",
+                "id": e["id"],
+                "date": e.get("date", ""),
+                "account": get_account_name(e.get("account_id")),
+                "category_source": e.get("category", ""),
+                "amount": float(e.get("amount", 0)),
+                "description": e.get("description", "") or "-",
+                "method": e.get("payment_method", "") or "-",
+            }
 
-            exp_rows = self.db.get_expenses(self.user_id)
-            inc_rows = self.db.get_income(self.user_id)
-
-            for e in exp_rows:
-                if selected_account != "ALL" and e.get("account_id") != selected_account:
-                    continue
-                rows_cache.append({
-                    "type": "Expense",
-                    "id": e["id"],
-                    "date": e.get("date", ""),
-                    "account": get_account_name(e.get("account_id")),
-                    "category_source": e.get("category", ""),
-                    "amount": float(e.get("amount", 0)),
-                    "description": e.get("description", "") or "-",
-                    "method": e.get("payment_method", "") or "-",
-                })
-
-            for i in inc_rows:
-                if selected_account != "ALL" and i.get("account_id") != selected_account:
-                    continue
-                rows_cache.append({
-                    "type": "Income",
-                    "id": i["id"],
-                    "date": i.get("date", ""),
-                    "account": get_account_name(i.get("account_id")),
-                    "category_source": i.get("source", ""),
-                    "amount": float(i.get("amount", 0)),
-                    "description": i.get("description", "") or "-",
-                    "method": "-",
-                })
+        def income_row(i):
+            selected_account = account_map.get(account_var.get(), "ALL")
+            if selected_account != "ALL" and i.get("account_id") != selected_account:
+                return None
+            return {
+                "type": "Income",
+                "id": i["id"],
+                "date": i.get("date", ""),
+                "account": get_account_name(i.get("account_id")),
+                "category_source": i.get("source", ""),
+                "amount": float(i.get("amount", 0)),
+                "description": i.get("description", "") or "-",
+                "method": "-",
+            }
 
+        def load_rows():
+            rows_cache.clear()
+            for table, convert in (("expenses", expense_row), ("income", income_row)):
+                rows_cache.extend(row for row in map(convert, self.ledger.rows(table)) if row is not None)
             rows_cache.sort(key=lambda r: r["date"], reverse=True)
 
-        def render():
-            tree.delete(*tree.get_children())
-            selected_type = type_var.get().strip().lower()
-            query = search_entry.get().strip().lower()
-            shown = []
-            for row in rows_cache:
-                if selected_type != "all" and row["type"].lower() != selected_type:
-                    continue
-                if query:
-                    hay = " ".join([
-                        row["type"], str(row["id"]), row["date"], row["account"],
-                        row["category_source"], row["description"], row["method"]
-                    ]).lower()
-                    if query not in hay:
-                        continue
-                shown.append(row)
-
-            for idx, row in enumerate(shown):
-                tree.insert("", "end", iid=str(idx), values=(
-                    row["type"],
-                    row["id"],
-                    row["date"],
-                    row["account"],
-                    row["category_source"],
-                    f"{row['amount']:.2f}",
-                    row["description"][:90],
-                    row["method"],
-                ))
-            summary_var.set(f"Showing {len(shown)} transaction(s). Double-click a row to edit.")
-            return shown
+        search = self._table_search(
+            tree, search_entry,
+            lambda row: (
+                row["type"],
+                row["id"],
+                row["date"],
+                row["account"],
+                row["category_source"],
+                f"{row['amount']:.2f}",
+                row["description"][:90],
+                row["method"],
+            ),
+            haystack=lambda row: " ".join([
+                row["type"], str(row["id"]), row["date"], row["account"],
+                row["category_source"], row["description"], row["method"]
+            ]),
+            on_change=lambda shown: summary_var.set(
+                f"Showing {len(shown)} transaction(s). Double-click a row to edit."
+            ),
+            sort_keys={1: lambda row: row["id"], 2: lambda row: str(row["date"]), 5: lambda row: row["amount"]},
+            key=lambda row: (row["type"], row["id"]),
+        )
 
-        current_shown = []
+        def apply_type_filter():
+            selected_type = type_var.get().strip().lower()
+            search.set_filter(None if selected_type == "all" else lambda row: row["type"].lower() == selected_type)
 
         def refresh():
-            nonlocal current_shown
             load_rows()
-            current_shown = render()
+            search.load(rows_cache)
+
+        self._follow_ledger(search, "expenses", refresh, expense_row, lambda row_id: ("Expense", row_id))
+        self._follow_ledger(search, "income", refresh, income_row, lambda row_id: ("Income", row_id))
 
         def on_double_click(event=None):
             sel = tree.selection()
             if not sel:
                 return
-            idx = int(sel[0])
-            if idx < 0 or idx >= len(current_shown):
-                return
-            row = current_shown[idx]
+            row = search.row(sel[0])
             if row["type"] == "Expense":
                 self.show_edit_expense_dialog(int(row["id"]))
             else:
                 self.show_edit_income_dialog(int(row["id"]))
 
         tree.bind("<Double-1>", on_double_click)
-        search_entry.entry.bind("<KeyRelease>", lambda e: render())
-        search_entry.entry.bind("<Return>", lambda e: render())
         account_var.trace_add("write", lambda *_: refresh())
-        type_var.trace_add("write", lambda *_: render())
+        type_var.trace_add("write", lambda *_: apply_type_filter())
 
         btns = tk.Frame(outer, bg=COLORS["background"])
         btns.pack(fill=tk.X, pady=(8, 0))
@@ -2215,8 +2137,7 @@ class ExpenseTrackerUI:
     def show_edit_expense_dialog(self, expense_id):
         """Show edit expense dialog"""
         # Get expense data
-        expenses = self.db.get_expenses(self.user_id)
-        expense = next((e for e in expenses if e['id'] == expense_id), None)
+        expense = next(iter(self.db.get_transactions_by_ids("expenses", self.user_id, [expense_id])), None)
         
         if not expense:
             show_message(self.parent, "Error", "Expense not found", "error")
@@ -2313,7 +2234,6 @@ class ExpenseTrackerUI:
             )
             show_message(dialog, "Success", "Expense updated successfully", "info")
             dialog.destroy()
-            self.show_transactions()
         
         update_btn = tk.Button(btn_frame, text="Update", command=update_expense,
                               font=FONTS["body"], bg=COLORS["primary"], fg="white",
@@ -2339,13 +2259,11 @@ class ExpenseTrackerUI:
             self.db.delete_expense(expense_id)
             show_message(dialog, "Success", "Expense deleted successfully", "info")
             dialog.destroy()
-            self.show_transactions()
 
     def show_edit_income_dialog(self, income_id):
         """Show edit income dialog"""
         # Get income data
-        income_list = self.db.get_income(self.user_id)
-        income = next((i for i in income_list if i['id'] == income_id), None)
+        income = next(iter(self.db.get_transactions_by_ids("income", self.user_id, [income_id])), None)
         
         if not income:
             show_message(self.parent, "Error", "Income record not found", "error")
@@ -2431,7 +2349,6 @@ class ExpenseTrackerUI:
             )
             show_message(dialog, "Success", "Income updated successfully", "info")
             dialog.destroy()
-            self.show_transactions()
         
         update_btn = tk.Button(btn_frame, text="Update", command=update_income,
                               font=FONTS["body"], bg=COLORS["primary"], fg="white",
@@ -2457,7 +2374,6 @@ class ExpenseTrackerUI:
             self.db.delete_income(income_id)
             show_message(dialog, "Success", "Income deleted successfully", "info")
             dialog.destroy()
-            self.show_transactions()
 
 
     def create_expense_manager(self, parent):
@@ -2665,9 +2581,6 @@ class ExpenseTrackerUI:
             account_var.set("Personal (Main)")
             attachment_var.set("")
             attachment_label_var.set("No receipt attached")
-            
-            # Refresh data
-            self.show_transactions()
         
         add_btn = tk.Button(
             form_frame,
@@ -2727,47 +2640,34 @@ class ExpenseTrackerUI:
             tree.column(col, width=col_widths.get(col, 100))
         self._attach_tree_sorting(tree, columns)
         
-        # Get expenses
-        expenses = self.db.get_expenses(self.user_id)
-
-        def render_expenses(data):
-            tree.delete(*tree.get_children())
-            for exp in data:
-                tree.insert("", "end", values=(
-                    exp['id'],
-                    exp['date'],
-                    exp['category'],
-                    f"{exp['amount']:.2f}",
-                    exp['description'][:30] if exp['description'] else "-",
-                    exp['payment_method'] or "-",
-                    "Double-click to edit"
-                ), tags=(f"expense_{exp['id']}",))
+        def update_summary(data):
             total = sum(float(exp.get('amount', 0)) for exp in data)
             summary_var.set(f"{len(data)} expenses shown | Total: {format_currency(total)}")
 
-        render_expenses(expenses)
-
-        def filter_expenses(event=None):
-            query = search_entry.get().strip().lower()
-            if not query:
-                render_expenses(expenses)
-                return
-            filtered = []
-            for exp in expenses:
-                values = (
-                    exp.get('id'),
-                    exp.get('date'),
-                    exp.get('category'),
-                    exp.get('amount'),
-                    exp.get('description'),
-                    exp.get('payment_method')
-                )
-                if self._row_matches_search(values, query):
-                    filtered.append(exp)
-            render_expenses(filtered)
-
-        search_entry.entry.bind("<KeyRelease>", filter_expenses)
-        search_entry.entry.bind("<Return>", filter_expenses)
+        search = self._table_search(
+            tree, search_entry,
+            lambda exp: (
+                exp['id'],
+                exp['date'],
+                exp['category'],
+                f"{exp['amount']:.2f}",
+                exp['description'][:30] if exp['description'] else "-",
+                exp['payment_method'] or "-",
+                "Double-click to edit"
+            ),
+            haystack=lambda exp: self._search_text((
+                exp.get('id'), exp.get('date'), exp.get('category'),
+                exp.get('amount'), exp.get('description'), exp.get('payment_method')
+            )),
+            on_change=update_summary,
+            sort_keys={
+                0: lambda exp: exp['id'], 1: lambda exp: str(exp['date']),
+                2: lambda exp: str(exp['category']).lower(), 3: lambda exp: float(exp['amount'] or 0),
+            },
+            key=lambda exp: exp['id'],
+        )
+        search.load(self.ledger.rows("expenses"))
+        self._follow_ledger(search, "expenses", lambda: search.load(self.ledger.rows("expenses")))
         
         # Bind double-click for editing
         def on_tree_double_click(event):
@@ -2883,9 +2783,6 @@ class ExpenseTrackerUI:
             date_entry.set(str(datetime.now().date()))
             description_entry.clear()
             account_var.set("Personal (Main)")
-            
-            # Refresh
-            self.show_transactions()
         
         add_btn = tk.Button(
             form_frame,
@@ -2941,45 +2838,32 @@ class ExpenseTrackerUI:
             tree.column(col, width=col_widths.get(col, 100))
         self._attach_tree_sorting(tree, columns)
         
-        # Get income
-        income = self.db.get_income(self.user_id)
-
-        def render_income(data):
-            tree.delete(*tree.get_children())
-            for inc in data:
-                tree.insert("", "end", values=(
-                    inc['id'],
-                    inc['date'],
-                    inc['source'],
-                    f"{inc['amount']:.2f}",
-                    inc['description'][:30] if inc.get('description') else "-",
-                    "Double-click to edit"
-                ), tags=(f"income_{inc['id']}",))
+        def update_summary(data):
             total = sum(float(inc.get('amount', 0)) for inc in data)
             summary_var.set(f"{len(data)} income records shown | Total: {format_currency(total)}")
 
-        render_income(income)
-
-        def filter_income(event=None):
-            query = search_entry.get().strip().lower()
-            if not query:
-                render_income(income)
-                return
-            filtered = []
-            for inc in income:
-                values = (
-                    inc.get('id'),
-                    inc.get('date'),
-                    inc.get('source'),
-                    inc.get('amount'),
-                    inc.get('description')
-                )
-                if self._row_matches_search(values, query):
-                    filtered.append(inc)
-            render_income(filtered)
-
-        search_entry.entry.bind("<KeyRelease>", filter_income)
-        search_entry.entry.bind("<Return>", filter_income)
+        search = self._table_search(
+            tree, search_entry,
+            lambda inc: (
+                inc['id'],
+                inc['date'],
+                inc['source'],
+                f"{inc['amount']:.2f}",
+                inc['description'][:30] if inc.get('description') else "-",
+                "Double-click to edit"
+            ),
+            haystack=lambda inc: self._search_text((
+                inc.get('id'), inc.get('date'), inc.get('source'), inc.get('amount'), inc.get('description')
+            )),
+            on_change=update_summary,
+            sort_keys={
+                0: lambda inc: inc['id'], 1: lambda inc: str(inc['date']),
+                2: lambda inc: str(inc['source']).lower(), 3: lambda inc: float(inc['amount'] or 0),
+            },
+            key=lambda inc: inc['id'],
+        )
+        search.load(self.ledger.rows("income"))
+        self._follow_ledger(search, "income", lambda: search.load(self.ledger.rows("income")))
         
         # Bind double-click for editing
         def on_tree_double_click(event):
@@ -2998,6 +2882,7 @@ class ExpenseTrackerUI:
         tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+    @retained_page("accounts", depends=LEDGER_TABLES)
     def show_accounts(self):
         """Show account management section"""
         self._set_view_state("accounts", "Manage Accounts", "Account entities and account-level analytics", "Accounts loaded")
@@ -3016,6 +2901,10 @@ class ExpenseTrackerUI:
                            font=FONTS["body"], relief=tk.FLAT, cursor="hand2",
                            command=self.add_new_account)
         add_btn.pack(side=tk.LEFT, padx=5)
+
+        tk.Button(btn_frame, text="Month-end Statements", bg=COLORS["primary"], fg="white",
+                  font=FONTS["body"], relief=tk.FLAT, cursor="hand2",
+                  command=self.generate_all_account_reports).pack(side=tk.LEFT, padx=5)
         
         # Accounts container
         canvas = tk.Canvas(self.content_frame, bg=COLORS["background"], highlightthickness=0)
@@ -3026,21 +2915,38 @@ class ExpenseTrackerUI:
             lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
         
         canvas.create_window((0, 0), window=scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
         
         if not accounts:
+            canvas.configure(yscrollcommand=scrollbar.set)
             tk.Label(scrollable_frame, text="No accounts yet. Create one to get started!",
                     font=FONTS["body"], fg=COLORS["text_secondary"],
                     bg=COLORS["background"]).pack(pady=50)
         else:
-            for account in accounts:
-                self.create_account_card(scrollable_frame, account)
+            # One grouped query for every card, then build cards a batch at a
+            # time as the list scrolls towards its end
+            summaries = self.db.get_all_account_summaries(self.user_id)
+            pending = list(accounts)
+
+            def render_more():
+                if not scrollable_frame.winfo_exists():
+                    return
+                batch, pending[:] = pending[:ACCOUNT_CARD_BATCH], pending[ACCOUNT_CARD_BATCH:]
+                for account in batch:
+                    self.create_account_card(scrollable_frame, account, summaries.get(account['id'], {}))
+
+            def on_scroll(first, last):
+                scrollbar.set(first, last)
+                if pending and float(last) > 0.9:
+                    canvas.after_idle(render_more)
+
+            canvas.configure(yscrollcommand=on_scroll)
+            render_more()
         
         canvas.pack(side="left", fill="both", expand=True, padx=20, pady=20)
         scrollbar.pack(side="right", fill="y")
 
-    def create_account_card(self, parent, account):
-        """Create account management card"""
+    def create_account_card(self, parent, account, summary=None):
+        """Create account management card (summary from get_all_account_summaries)"""
         card = tk.Frame(parent, bg=COLORS["surface"], relief=tk.RIDGE, bd=2)
         card.pack(fill=tk.X, pady=12)
         
@@ -3066,18 +2972,24 @@ class ExpenseTrackerUI:
                     fg=COLORS["text_secondary"], bg=COLORS["surface"]).pack(anchor=tk.W, pady=(3, 0))
         
         # Summary
-        summary = self.db.get_account_summary(self.user_id, account['id'])
+        if summary is None:
+            summary = self.db.get_account_summary(self.user_id, account['id'])
         
         summary_frame = tk.Frame(content, bg=COLORS["background"])
         summary_frame.pack(fill=tk.X, pady=(15, 10))
         
-        tk.Label(summary_frame, text=f"Balance: Rs. {summary['balance']:,.2f}", 
+        tk.Label(summary_frame, text=f"Balance: Rs. {summary.get('balance', 0):,.2f}", 
                 font=FONTS["body"], fg=COLORS["accent"],
                 bg=COLORS["background"]).pack(anchor=tk.W, pady=3)
         
-        tk.Label(summary_frame, text=f"Expenses: Rs. {summary['total_expenses']:,.2f}", 
+        tk.Label(summary_frame, text=f"Expenses: Rs. {summary.get('total_expenses', 0):,.2f}", 
                 font=FONTS["small"], fg=COLORS["danger"],
                 bg=COLORS["background"]).pack(anchor=tk.W, pady=1)
+
+        if summary.get('tx_count'):
+            tk.Label(summary_frame, text=f"{summary['tx_count']} transactions | Last activity: {summary['last_activity']}",
+                    font=FONTS["small"], fg=COLORS["text_secondary"],
+                    bg=COLORS["background"]).pack(anchor=tk.W, pady=1)
         
         # Action buttons
         btn_frame = tk.Frame(content, bg=COLORS["surface"])
@@ -3226,48 +3138,120 @@ class ExpenseTrackerUI:
                 font=FONTS["body"], fg=COLORS["primary"],
                 bg=COLORS["background"]).pack(anchor=tk.E)
 
+        self._build_reconcile_strip(trans_window, account_id)
+
+    def _build_reconcile_strip(self, parent, account_id):
+        """Compare a bank statement's closing balance with the ledger balance on that date."""
+        strip = tk.Frame(parent, bg=COLORS["surface"], relief=tk.FLAT, bd=1)
+        strip.pack(fill=tk.X, padx=20, pady=(0, 15))
+
+        tk.Label(strip, text="Reconcile - statement date:", font=FONTS["small"],
+                fg=COLORS["text_secondary"], bg=COLORS["surface"]).pack(side=tk.LEFT, padx=(10, 4), pady=8)
+        date_var = tk.StringVar(value=date.today().isoformat())
+        ttk.Entry(strip, textvariable=date_var, width=12).pack(side=tk.LEFT)
+        tk.Label(strip, text="Statement balance:", font=FONTS["small"],
+                fg=COLORS["text_secondary"], bg=COLORS["surface"]).pack(side=tk.LEFT, padx=(10, 4))
+        balance_var = tk.StringVar()
+        ttk.Entry(strip, textvariable=balance_var, width=14).pack(side=tk.LEFT)
+        result = tk.Label(strip, text="", font=FONTS["small"], fg=COLORS["text_primary"], bg=COLORS["surface"])
+
+        def reconcile():
+            ok, message = validate_date(date_var.get().strip())
+            if not ok:
+                result.config(text=message, fg=COLORS["danger"])
+                return
+            ledger = self.balance_index.balance_as_of(self.user_id, date_var.get().strip(), account_id)
+            text = f"Ledger balance: Rs. {ledger:,.2f}"
+            color = COLORS["text_primary"]
+            if balance_var.get().strip():
+                try:
+                    statement = float(balance_var.get().replace(",", ""))
+                except ValueError:
+                    result.config(text="Invalid statement balance", fg=COLORS["danger"])
+                    return
+                difference = statement - ledger
+                text += f" | Difference: Rs. {difference:,.2f}"
+                color = COLORS["success"] if abs(difference) < 0.005 else COLORS["danger"]
+            result.config(text=text, fg=color)
+
+        tk.Button(strip, text="Reconcile", bg=COLORS["secondary"], fg="white", font=FONTS["small"],
+                 relief=tk.FLAT, padx=10, pady=3, command=reconcile).pack(side=tk.LEFT, padx=8)
+        result.pack(side=tk.LEFT, padx=4)
+        reconcile()
+
     def generate_account_report(self, account_id, account_name):
         """Generate report for specific account"""
-        try:
-            # Get account data
-            account = self.db.get_account(account_id, self.user_id)
-            if not account:
-                show_message(self.parent, "Error", "Account not found", "error")
-                return
-            
-            # Get account expenses
-            expenses = self.db.get_account_expenses(self.user_id, account_id)
-            if not expenses:
+        from batch_reports import render_account_report
+
+        account = self.db.get_account(account_id, self.user_id)
+        if not account:
+            show_message(self.parent, "Error", "Account not found", "error")
+            return
+
+        task = {
+            "user_id": self.user_id,
+            "username": self.user_data.get("username", ""),
+            "account_id": account_id,
+            "account_name": account_name,
+        }
+        out_dir = os.getcwd()
+
+        def on_done(entry):
+            if entry["status"] == "skipped":
                 show_message(self.parent, "Info", "No transactions found for this account", "info")
-                return
-            
-            # Calculate summary
-            summary = {
-                'total_expense': sum(e.get('amount', 0) for e in expenses),
-                'transaction_count': len(expenses),
-                'date': datetime.now().strftime("%B %d, %Y")
-            }
-            
-            # Get user data for report header
-            user_data = self.db.get_user(self.user_id)
-            
-            # Generate PDF
-            from pdf_generator import AccountingReportGenerator
-            filename = f"Account_Report_{account_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-            pdf_gen = AccountingReportGenerator(filename)
-            
-            # Create report content
-            pdf_gen.generate_expense_report(
-                user_data=user_data,
-                expenses=expenses,
-                summary=summary,
-                start_date=expenses[-1]['date'] if expenses else datetime.now().strftime("%Y-%m-%d"),
-                end_date=datetime.now().strftime("%Y-%m-%d")
+            elif entry["status"] == "error":
+                show_message(self.parent, "Error", f"Failed to generate report: {entry['error']}", "error")
+            else:
+                self.set_status("Account report generated", auto_clear=True)
+                show_message(self.parent, "Success", f"Report saved as {entry['file']}", "info")
+
+        self.set_status(f"Generating report for {account_name}...")
+        run_in_background(
+            self.parent,
+            lambda: render_account_report(self.db.db_path, task, out_dir),
+            on_done,
+            lambda e: show_message(self.parent, "Error", f"Failed to generate report: {str(e)}", "error"),
+        )
+
+    def generate_all_account_reports(self):
+        """Render last month's statement for every account in a process pool."""
+        from batch_reports import closed_period_range, run_batch_reports
+
+        out_dir = filedialog.askdirectory(title="Select folder for account statements")
+        if not out_dir:
+            return
+
+        start_date, end_date = closed_period_range("Month")
+
+        def on_done(manifest):
+            self.set_status(f"{manifest['written']} statements generated", auto_clear=True)
+            show_message(
+                self.parent,
+                "Statements Ready",
+                f"Written: {manifest['written']}\nSkipped (no activity): {manifest['skipped']}\n"
+                f"Failed: {manifest['failed']}\n\nSaved to {out_dir}",
+                "info" if not manifest["failed"] else "warning",
             )
-            
-            show_message(self.parent, "Success", f"Report saved as {filename}", "info")
-        except Exception as e:
-            show_message(self.parent, "Error", f"Failed to generate report: {str(e)}", "error")
+
+        def on_error(e):
+            self.set_status("Statement generation failed", auto_clear=True)
+            show_message(self.parent, "Error", f"Failed to generate statements: {e}", "error")
+
+        self.set_status("Generating account statements...")
+        run_in_background(
+            self.parent,
+            lambda progress: run_batch_reports(
+                out_dir,
+                db_path=self.db.db_path,
+                user_ids=[self.user_id],
+                start_date=start_date,
+                end_date=end_date,
+                progress=progress,
+            ),
+            on_done,
+            on_error,
+            on_progress=lambda done, total: self.set_status(f"Generating account statements... {done}/{total}"),
+        )
 
     def edit_account(self, account_id):
         """Edit account details"""
@@ -3331,6 +3315,7 @@ class ExpenseTrackerUI:
         # This can be extended for additional caching/sync operations
         pass
 
+    @retained_page("reports", depends=())
     def show_reports(self):
         """Show reports section"""
         self._set_view_state("reports", "Reports & Analytics", "Export, summarize, and present financial data", "Reports loaded")
@@ -3399,15 +3384,17 @@ class ExpenseTrackerUI:
                 "buttons": [("Email Setup Help", self.show_email_setup_help),
                            ("Configure SMTP", self.configure_smtp_settings),
                            ("Send Test Email", self.send_test_email),
+                           ("Scheduled Reports", self.open_report_schedules),
                            ("Export All Data", self.export_all_data_csv),
-                           ("Export JSON", self.export_json_backup),
-                           ("Import JSON", self.import_json_backup),
+                           ("Export Backup", self.export_json_backup),
+                           ("Import Backup", self.import_json_backup),
                            ("Backup DB", self.backup_database_copy),
                            ("Restore DB", self.restore_database_copy),
                            ("Subscriptions", self.open_subscription_center),
                            ("Invoice Generator", self.generate_invoice_pdf),
                            ("Report Designer", self.configure_report_designer),
                            ("Trash Bin", self.open_trash_bin),
+                           ("Archive Old Data", self.archive_old_transactions),
                            ("Command Center", self.open_command_center),
                            ("Quick Calculator", self.show_quick_calculator),
                            ("Monthly Snapshot", self.generate_monthly_snapshot_txt),
@@ -3516,6 +3503,8 @@ class ExpenseTrackerUI:
         
         # Generate PDF
         try:
+            from pdf_generator import AccountingReportGenerator
+
             report = AccountingReportGenerator(file_path)
             report.generate_expense_report(
                 report_user_data,
@@ -3550,6 +3539,8 @@ class ExpenseTrackerUI:
         
         # Generate PDF
         try:
+            from pdf_generator import AccountingReportGenerator
+
             report = AccountingReportGenerator(file_path)
             report.generate_balance_sheet(
                 report_user_data,
@@ -3627,43 +3618,196 @@ class ExpenseTrackerUI:
             "password": password,
             "use_tls": bool(use_tls),
         }
+        if self.mail_sender is not None:
+            # Queued mail may have been waiting for working settings
+            self.mail_sender.wake()
         self.set_status("SMTP settings saved for this session", auto_clear=True)
         show_message(self.parent, "Success", "SMTP settings saved", "info")
         return True
 
-    def _send_email_message(self, msg):
-        """Send an EmailMessage using configured SMTP settings."""
+    def _get_mail_sender(self):
+        """Lazily start the background outbox sender for this session."""
+        if self.mail_sender is None:
+            from mail_queue import MailSender
+
+            self.mail_sender = MailSender(self.db, lambda: self.smtp_settings, user_id=self.user_id)
+            self.mail_sender.start()
+        return self.mail_sender
+
+    def _smtp_ready(self):
         s = self.smtp_settings
         if not all([s.get("server"), s.get("port"), s.get("username"), s.get("password")]):
-            if not self.configure_smtp_settings():
-                return False
-            s = self.smtp_settings
-        if not msg.get("From"):
-            msg["From"] = s["username"]
+            return self.configure_smtp_settings()
+        return True
 
-        try:
-            if s.get("use_tls", True):
-                server = smtplib.SMTP(s["server"], int(s["port"]), timeout=20)
-                server.ehlo()
-                server.starttls()
-                server.ehlo()
+    def _queue_email(self, build_message, success_text, busy_text="Sending email..."):
+        """Queue the message returned by build_message() and report the first attempt.
+
+        build_message runs off the Tk thread, so it may render attachments.
+        """
+        if not self._smtp_ready():
+            return
+        sender = self._get_mail_sender()
+
+        def work():
+            msg = build_message()
+            if not msg.get("From"):
+                msg["From"] = self.smtp_settings["username"]
+            mail_id = sender.submit(msg, self.user_id)
+            return sender.wait_for(mail_id)
+
+        def on_done(row):
+            status = row["status"] if row else "queued"
+            error = (row or {}).get("last_error") or ""
+            if status == "sent":
+                self.set_status(success_text, auto_clear=True)
+                show_message(self.parent, "Success", success_text, "info")
+            elif status == "failed":
+                show_message(self.parent, "Email Error", f"Failed to send email: {error}", "error")
+            elif "auth" in error.lower() or "535" in error:
+                show_message(
+                    self.parent,
+                    "Email Error",
+                    "SMTP login failed. Check username/password.\nIf using Gmail/Outlook with 2FA, use an App Password.\n\n"
+                    "The message stays in the outbox and will be retried.",
+                    "error",
+                )
             else:
-                server = smtplib.SMTP_SSL(s["server"], int(s["port"]), timeout=20)
+                detail = f"\n\nLast error: {error}" if error else ""
+                self.set_status("Email queued; it will be sent in the background", auto_clear=True)
+                show_message(self.parent, "Email Queued", f"The email is queued and will be retried automatically.{detail}", "info")
 
-            server.login(s["username"], s["password"])
-            server.send_message(msg)
-            server.quit()
-            return True
-        except smtplib.SMTPAuthenticationError:
-            show_message(
-                self.parent,
-                "Email Error",
-                "SMTP login failed. Check username/password.\nIf using Gmail/Outlook with 2FA, use an App Password.",
-                "error",
+        def on_error(e):
+            show_message(self.parent, "Email Error", f"Failed to prepare email: {e}", "error")
+
+        self.set_status(busy_text)
+        run_in_background(self.parent, work, on_done=on_done, on_error=on_error)
+
+    def on_scheduled_reports(self, result):
+        """Called from the report scheduler thread after it queued mail."""
+        if self.mail_sender is not None:
+            self.mail_sender.wake()
+
+    def open_report_schedules(self):
+        """Manage recurring report deliveries (sent through the mail outbox)."""
+        from report_scheduler import FREQUENCIES, run_due_schedules
+
+        dlg = tk.Toplevel(self.parent)
+        dlg.title("Scheduled Reports")
+        dlg.geometry("1040x500")
+        dlg.config(bg=COLORS["background"])
+        dlg.transient(self.parent)
+
+        top = tk.Frame(dlg, bg=COLORS["surface"], relief=tk.FLAT, bd=1)
+        top.pack(fill=tk.X, padx=12, pady=12)
+
+        accounts = {a["account_name"]: a["id"] for a in self.db.get_managed_accounts(self.user_id)}
+        report_var = tk.StringVar(value="Month Expense Report")
+        account_var = tk.StringVar(value="All Accounts")
+        frequency_var = tk.StringVar(value="Monthly")
+        recipients_entry = CustomEntry(top, placeholder="Recipients (comma-separated)")
+        recipients_entry.set(self.user_data.get("email", ""))
+        first = (datetime.now().date().replace(day=1) + timedelta(days=32)).replace(day=1)
+        date_entry = CustomEntry(top, placeholder="YYYY-MM-DD")
+        date_entry.set(str(first))
+        reports = {
+            "Month Expense Report": ("expense", "Month"),
+            "Quarter Expense Report": ("expense", "Quarter"),
+            "Year Expense Report": ("expense", "Year"),
+            "Balance Sheet": ("balance", "Month"),
+        }
+
+        tk.Label(top, text="Report", bg=COLORS["surface"], font=FONTS["body"]).grid(row=0, column=0, padx=6, pady=8, sticky=tk.W)
+        ttk.Combobox(top, textvariable=report_var, values=list(reports), width=22, state="readonly").grid(row=0, column=1, padx=6, pady=8, sticky=tk.W)
+        tk.Label(top, text="Account", bg=COLORS["surface"], font=FONTS["body"]).grid(row=0, column=2, padx=6, pady=8, sticky=tk.W)
+        ttk.Combobox(top, textvariable=account_var, values=["All Accounts"] + list(accounts), width=18, state="readonly").grid(row=0, column=3, padx=6, pady=8, sticky=tk.W)
+        tk.Label(top, text="Every", bg=COLORS["surface"], font=FONTS["body"]).grid(row=0, column=4, padx=6, pady=8, sticky=tk.W)
+        ttk.Combobox(top, textvariable=frequency_var, values=[f.title() for f in FREQUENCIES], width=12, state="readonly").grid(row=0, column=5, padx=6, pady=8, sticky=tk.W)
+        tk.Label(top, text="Send To", bg=COLORS["surface"], font=FONTS["body"]).grid(row=1, column=0, padx=6, pady=8, sticky=tk.W)
+        recipients_entry.grid(row=1, column=1, columnspan=3, padx=6, pady=8, sticky=tk.EW)
+        tk.Label(top, text="First Run", bg=COLORS["surface"], font=FONTS["body"]).grid(row=1, column=4, padx=6, pady=8, sticky=tk.W)
+        date_entry.grid(row=1, column=5, padx=6, pady=8, sticky=tk.W)
+
+        table_frame = tk.Frame(dlg, bg=COLORS["background"])
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=12, pady=(0, 12))
+        cols = ("ID", "Report", "Account", "Every", "Next Run", "Recipients", "Active", "Last Status")
+        tree = ttk.Treeview(table_frame, columns=cols, show="headings", height=10)
+        for col in cols:
+            tree.heading(col, text=col)
+            tree.column(col, width=60 if col in ("ID", "Active") else (200 if col in ("Recipients", "Last Status") else 120))
+        self._attach_tree_sorting(tree, cols)
+        scroll = ttk.Scrollbar(table_frame, orient="vertical", command=tree.yview)
+        tree.configure(yscroll=scroll.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scroll.pack(side=tk.RIGHT, fill=tk.Y)
+
+        def refresh_schedules():
+            tree.delete(*tree.get_children())
+            for sch in self.db.get_report_schedules(self.user_id):
+                label = "Balance Sheet" if sch["report_kind"] == "balance" else f"{sch['period']} Expense Report"
+                tree.insert("", "end", values=(
+                    sch["id"], label, sch.get("account_name") or "All Accounts", (sch["frequency"] or "").title(),
+                    sch["next_run_date"], sch["recipients"], "Yes" if sch["is_active"] else "No", sch.get("last_status") or "",
+                ))
+
+        def add_schedule():
+            recipients = [r.strip() for r in recipients_entry.get().split(",") if r.strip()]
+            if not recipients or not all(validate_email(r) for r in recipients):
+                show_message(self.parent, "Error", "Enter valid recipient emails", "error")
+                return
+            try:
+                datetime.strptime(date_entry.get().strip(), "%Y-%m-%d")
+            except ValueError:
+                show_message(self.parent, "Error", "Date must be YYYY-MM-DD", "error")
+                return
+            kind, period = reports[report_var.get()]
+            self.db.add_report_schedule(
+                self.user_id,
+                recipients,
+                date_entry.get().strip(),
+                frequency=frequency_var.get().lower(),
+                report_kind=kind,
+                period=period,
+                account_id=accounts.get(account_var.get()),
+                sender=self.smtp_settings.get("username", ""),
             )
-        except Exception as e:
-            show_message(self.parent, "Email Error", f"Failed to send email: {e}", "error")
-        return False
+            refresh_schedules()
+
+        def selected_id():
+            sel = tree.selection()
+            return int(tree.item(sel[0], "values")[0]) if sel else None
+
+        def toggle_schedule():
+            schedule_id = selected_id()
+            if schedule_id is None:
+                return
+            active = tree.item(tree.selection()[0], "values")[6] == "Yes"
+            self.db.update_report_schedule(schedule_id, self.user_id, is_active=0 if active else 1)
+            refresh_schedules()
+
+        def delete_schedule():
+            schedule_id = selected_id()
+            if schedule_id is not None:
+                self.db.delete_report_schedule(schedule_id, self.user_id)
+                refresh_schedules()
+
+        def run_now():
+            def on_done(result):
+                refresh_schedules()
+                if result["queued"]:
+                    self.on_scheduled_reports(result)
+                self.set_status(f"Scheduled reports: {result['queued']} queued, {result['errors']} errors", auto_clear=True)
+
+            run_in_background(dlg, lambda: run_due_schedules(self.db, user_ids=[self.user_id]), on_done=on_done,
+                              on_error=lambda e: show_message(self.parent, "Error", f"Scheduler failed: {e}", "error"))
+
+        btns = tk.Frame(dlg, bg=COLORS["background"])
+        btns.pack(fill=tk.X, padx=12, pady=(0, 12))
+        tk.Button(btns, text="Add Schedule", command=add_schedule, bg=COLORS["primary"], fg="white", relief=tk.FLAT, padx=12, pady=6).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Pause/Resume", command=toggle_schedule, bg=COLORS["secondary"], fg="white", relief=tk.FLAT, padx=12, pady=6).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Delete", command=delete_schedule, bg=COLORS["danger"], fg="white", relief=tk.FLAT, padx=12, pady=6).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Run Due Now", command=run_now, bg=COLORS["accent"], fg="white", relief=tk.FLAT, padx=12, pady=6).pack(side=tk.LEFT, padx=4)
+        refresh_schedules()
 
     def send_test_email(self):
         """Send a test message to validate SMTP settings."""
@@ -3676,94 +3820,78 @@ class ExpenseTrackerUI:
             show_message(self.parent, "Error", "Invalid recipient email", "error")
             return
 
-        msg = EmailMessage()
-        msg["Subject"] = "OG CA - SMTP Test"
-        msg["From"] = self.smtp_settings.get("username", self.user_data.get("email", ""))
-        msg["To"] = recipient.strip()
-        msg.set_content(
-            "This is a test email from OG CA.\n"
-            "If you received this, your SMTP setup is working."
-        )
+        def build_message():
+            from email.message import EmailMessage
+
+            msg = EmailMessage()
+            msg["Subject"] = "OG CA - SMTP Test"
+            msg["From"] = self.smtp_settings.get("username", self.user_data.get("email", ""))
+            msg["To"] = recipient.strip()
+            msg.set_content(
+                "This is a test email from OG CA.\n"
+                "If you received this, your SMTP setup is working."
+            )
+            return msg
 
-        if self._send_email_message(msg):
-            self.set_status("Test email sent", auto_clear=True)
-            show_message(self.parent, "Success", "Test email sent successfully", "info")
+        self._queue_email(build_message, "Test email sent successfully")
 
     def email_report(self, period):
-        """Generate a PDF report and email it as attachment."""
-        file_path = None
-        try:
-            tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
-            file_path = tmp.name
-            tmp.close()
-            design = self.db.get_report_design(self.user_id) or {}
-            report_user_data = dict(self.user_data)
-            if design.get("brand_name"):
-                report_user_data["full_name"] = design["brand_name"]
-
-            if period in ("Month", "Quarter", "Year"):
-                if period == "Month":
-                    start_date = (datetime.now() - timedelta(days=30)).date()
-                elif period == "Quarter":
-                    start_date = (datetime.now() - timedelta(days=90)).date()
-                else:
-                    start_date = (datetime.now() - timedelta(days=365)).date()
-
-                end_date = datetime.now().date()
-                expenses = self.db.get_expenses(self.user_id, str(start_date), str(end_date))
-                summary = self.db.get_summary(self.user_id, str(start_date), str(end_date))
-                report = AccountingReportGenerator(file_path)
-                report.generate_expense_report(
-                    report_user_data, expenses, summary, str(start_date), str(end_date)
-                )
-                subject = f"{period} Expense Report"
-            elif period == "Balance":
-                income = self.db.get_income(self.user_id)
-                expenses = self.db.get_expenses(self.user_id)
-                summary = self.db.get_summary(self.user_id)
-                report = AccountingReportGenerator(file_path)
-                report.generate_balance_sheet(report_user_data, income, expenses, summary)
-                subject = "Balance Sheet"
-            else:
-                raise ValueError("Unsupported report type")
+        """Render a PDF report in memory and queue it as an email attachment."""
+        if period not in ("Month", "Quarter", "Year", "Balance"):
+            show_message(self.parent, "Error", "Failed to prepare email report: Unsupported report type", "error")
+            return
+        recipient = simpledialog.askstring(
+            "Email Report",
+            "Recipient Email:",
+            initialvalue=self.user_data.get("email", ""),
+        )
+        if not recipient or not validate_email(recipient):
+            show_message(self.parent, "Error", "Invalid recipient email", "error")
+            return
 
-            recipient = simpledialog.askstring(
-                "Email Report",
-                "Recipient Email:",
-                initialvalue=self.user_data.get("email", ""),
-            )
-            if not recipient or not validate_email(recipient):
-                show_message(self.parent, "Error", "Invalid recipient email", "error")
-                return
+        def build_message():
+            from email.message import EmailMessage
+
+            from report_scheduler import render_report
 
+            kind = "balance" if period == "Balance" else "expense"
+            subject, attach_name, data = render_report(self.db, self.user_id, kind, period)
             msg = EmailMessage()
             msg["Subject"] = subject
             msg["From"] = self.smtp_settings.get("username", self.user_data.get("email", ""))
             msg["To"] = recipient.strip()
             msg.set_content("Please find attached your requested report.")
+            msg.add_attachment(data, maintype="application", subtype="pdf", filename=attach_name)
+            return msg
 
-            with open(file_path, "rb") as f:
-                data = f.read()
-                attach_name = f"{subject.replace(' ', '_')}_{datetime.now().strftime('%Y%m%d')}.pdf"
-                msg.add_attachment(data, maintype="application", subtype="pdf", filename=attach_name)
+        self._queue_email(build_message, "Report emailed successfully", "Preparing report email...")
 
-            if self._send_email_message(msg):
-                self.set_status("Report emailed successfully", auto_clear=True)
-                show_message(self.parent, "Success", "Report emailed successfully", "info")
-        except Exception as e:
-            show_message(self.parent, "Error", f"Failed to prepare email report: {e}", "error")
-        finally:
-            if file_path and os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except Exception:
-                    pass
+    def _run_csv_export(self, label, func, file_path):
+        """Run a csv_export job off the Tk thread with row-count progress."""
+        def on_done(rows):
+            self.set_status(f"{label} exported ({rows} rows)", auto_clear=True)
+            show_message(self.parent, "Success", f"{label} exported to {file_path}", "info")
+
+        def on_error(e):
+            self.set_status(f"{label} export failed", auto_clear=True)
+            show_message(self.parent, "Error", f"Failed to export CSV: {str(e)}", "error")
+
+        self.set_status(f"Exporting {label.lower()}...")
+        run_in_background(
+            self.parent,
+            func,
+            on_done,
+            on_error,
+            on_progress=lambda rows: self.set_status(f"Exporting {label.lower()}... {rows} rows"),
+        )
 
     def export_expense_csv(self, period):
         """Export expenses to CSV"""
+        import csv_export
+
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
+            filetypes=[("CSV files", "*.csv"), ("Compressed CSV", "*.csv.gz")],
             initialfile=f"Expenses_{period}_{datetime.now().strftime('%Y%m%d')}.csv"
         )
         
@@ -3780,224 +3908,187 @@ class ExpenseTrackerUI:
         
         end_date = datetime.now().date()
         
-        # Get expenses
-        expenses = self.db.get_expenses(self.user_id, str(start_date), str(end_date))
-        
-        try:
-            import csv
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Date', 'Category', 'Amount', 'Description', 'Payment Method', 'Notes'])
-                
-                for exp in expenses:
-                    writer.writerow([
-                        exp['date'],
-                        exp['category'],
-                        f"{exp['amount']:.2f}",
-                        exp['description'] or '',
-                        exp['payment_method'] or '',
-                        exp['notes'] or ''
-                    ])
-                
-                # Add summary
-                writer.writerow([])
-                total = sum(e['amount'] for e in expenses)
-                writer.writerow(['TOTAL EXPENSES', '', f"{total:.2f}"])
-            
-            show_message(self.parent, "Success", f"Expenses exported to {file_path}", "info")
-        except Exception as e:
-            show_message(self.parent, "Error", f"Failed to export CSV: {str(e)}", "error")
+        self._run_csv_export(
+            "Expenses",
+            lambda progress: csv_export.export_transactions_csv(
+                self.db, self.user_id, file_path, "expenses",
+                start_date=start_date, end_date=end_date, progress=progress,
+            ),
+            file_path,
+        )
 
     def export_all_data_csv(self):
         """Export complete expense and income data into one CSV file."""
+        import csv_export
+
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv")],
+            filetypes=[("CSV files", "*.csv"), ("Compressed CSV", "*.csv.gz")],
             initialfile=f"All_Data_Backup_{datetime.now().strftime('%Y%m%d')}.csv",
         )
         if not file_path:
             return
 
-        expenses = self.db.get_expenses(self.user_id)
-        income = self.db.get_income(self.user_id)
-        summary = self.db.get_summary(self.user_id)
-
-        try:
-            import csv
-
-            with open(file_path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["EXPENSE TRACKER DATA EXPORT"])
-                writer.writerow([f"Generated At: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
-                writer.writerow([])
-
-                writer.writerow(["SUMMARY"])
-                writer.writerow(["Total Income", f"{summary['total_income']:.2f}"])
-                writer.writerow(["Total Expenses", f"{summary['total_expenses']:.2f}"])
-                writer.writerow(["Net Balance", f"{summary['balance']:.2f}"])
-                writer.writerow([])
-
-                writer.writerow(["EXPENSES"])
-                writer.writerow(["Date", "Category", "Amount", "Description", "Payment Method", "Notes"])
-                for exp in expenses:
-                    writer.writerow([
-                        exp.get("date", ""),
-                        exp.get("category", ""),
-                        f"{float(exp.get('amount', 0)):.2f}",
-                        exp.get("description", "") or "",
-                        exp.get("payment_method", "") or "",
-                        exp.get("notes", "") or "",
-                    ])
-                writer.writerow([])
-
-                writer.writerow(["INCOME"])
-                writer.writerow(["Date", "Source", "Amount", "Description", "Notes"])
-                for inc in income:
-                    writer.writerow([
-                        inc.get("date", ""),
-                        inc.get("source", ""),
-                        f"{float(inc.get('amount', 0)):.2f}",
-                        inc.get("description", "") or "",
-                        inc.get("notes", "") or "",
-                    ])
-
-            self.set_status("Full data backup exported", auto_clear=True)
-            show_message(self.parent, "Success", f"All data exported to {file_path}", "info")
-        except Exception as e:
-            show_message(self.parent, "Error", f"Failed to export all data: {str(e)}", "error")
+        self._run_csv_export(
+            "All data",
+            lambda progress: csv_export.export_all_data_csv(self.db, self.user_id, file_path, progress=progress),
+            file_path,
+        )
 
     def export_json_backup(self):
-        """Export all core data to a JSON backup file."""
+        """Stream all of the user's data to an NDJSON backup file."""
+        import ndjson_backup
+
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".json",
-            filetypes=[("JSON files", "*.json")],
-            initialfile=f"OGCA_Backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            defaultextension=".ndjson",
+            filetypes=[("NDJSON backup", "*.ndjson"), ("Compressed NDJSON", "*.ndjson.gz")],
+            initialfile=f"OGCA_Backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson",
         )
         if not file_path:
             return
 
-        payload = {
-            "app": "OG CA",
-            "version": "major-update",
-            "generated_at": datetime.now().isoformat(),
-            "user_id": self.user_id,
-            "user": self.db.get_user(self.user_id),
-            "expenses": self.db.get_expenses(self.user_id),
-            "income": self.db.get_income(self.user_id),
-            "summary": self.db.get_summary(self.user_id),
-            "categories": self.db.get_category_summary(self.user_id),
-        }
-
-        try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(payload, f, ensure_ascii=False, indent=2)
-            self.set_status("JSON backup exported", auto_clear=True)
-            show_message(self.parent, "Success", f"JSON backup saved:\n{file_path}", "info")
-        except Exception as e:
-            show_message(self.parent, "Error", f"Failed to export JSON: {e}", "error")
+        def on_done(counts):
+            self.set_status(f"Backup exported ({sum(counts.values())} rows)", auto_clear=True)
+            show_message(self.parent, "Success", f"Backup saved:\n{file_path}", "info")
+
+        def on_error(e):
+            self.set_status("Backup export failed", auto_clear=True)
+            show_message(self.parent, "Error", f"Failed to export backup: {e}", "error")
+
+        self.set_status("Exporting backup...")
+        run_in_background(
+            self.parent,
+            lambda progress: ndjson_backup.export_backup(self.db, self.user_id, file_path, progress=progress),
+            on_done,
+            on_error,
+            on_progress=lambda rows: self.set_status(f"Exporting backup... {rows} rows"),
+        )
 
     def import_json_backup(self):
-        """Import data from JSON backup (adds transactions to current account)."""
+        """Import an NDJSON (or legacy .json) backup into the current account."""
+        import ndjson_backup
+
         file_path = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json")],
-            title="Select JSON Backup",
+            filetypes=[("OG CA backups", "*.ndjson *.ndjson.gz *.json"), ("All Files", "*.*")],
+            title="Select Backup",
         )
         if not file_path:
             return
 
         if not messagebox.askyesno(
             "Confirm Import",
-            "This will add transactions from the backup into your current account.\nContinue?",
+            "This will add the data from the backup into your current account.\nContinue?",
         ):
             return
 
-        try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            imported_expenses = 0
-            for exp in data.get("expenses", []):
-                self.db.add_expense(
-                    self.user_id,
-                    exp.get("category", "Other"),
-                    float(exp.get("amount", 0)),
-                    exp.get("date", str(datetime.now().date())),
-                    exp.get("description", ""),
-                    exp.get("payment_method", ""),
-                    exp.get("notes", ""),
-                    account_id=exp.get("account_id"),
-                )
-                imported_expenses += 1
-
-            imported_income = 0
-            for inc in data.get("income", []):
-                self.db.add_income(
-                    self.user_id,
-                    inc.get("source", "Other"),
-                    float(inc.get("amount", 0)),
-                    inc.get("date", str(datetime.now().date())),
-                    inc.get("description", ""),
-                    inc.get("notes", ""),
-                    account_id=inc.get("account_id"),
-                )
-                imported_income += 1
+        def do_import(progress):
+            if file_path.lower().endswith(".json"):
+                return ndjson_backup.import_legacy_json(self.db, self.user_id, file_path)
+            return ndjson_backup.import_backup(self.db, self.user_id, file_path, progress=progress)
 
+        def on_done(counts):
             self.load_data()
             self.refresh_current_page()
-            self.set_status("JSON backup imported", auto_clear=True)
-            show_message(
-                self.parent,
-                "Success",
-                f"Import completed.\nExpenses: {imported_expenses}\nIncome: {imported_income}",
-                "info",
-            )
-        except Exception as e:
-            show_message(self.parent, "Error", f"Failed to import JSON backup: {e}", "error")
+            self.set_status("Backup imported", auto_clear=True)
+            lines = "\n".join(f"{table.replace('_', ' ').title()}: {n}" for table, n in counts.items() if n)
+            show_message(self.parent, "Success", f"Import completed.\n{lines or 'No new rows'}", "info")
+
+        def on_error(e):
+            self.set_status("Backup import failed", auto_clear=True)
+            show_message(self.parent, "Error", f"Failed to import backup: {e}", "error")
+
+        self.set_status("Importing backup...")
+        run_in_background(
+            self.parent,
+            do_import,
+            on_done,
+            on_error,
+            on_progress=lambda rows: self.set_status(f"Importing backup... {rows} rows"),
+        )
+
+    def _backup_progress(self, label):
+        def report(done, total):
+            pct = int(done * 100 / total) if total else 100
+            self.set_status(f"{label}... {pct}%")
+        return report
 
     def backup_database_copy(self):
-        """Create a direct copy of the SQLite database file."""
-        src = os.path.join(os.path.dirname(__file__), "expense_tracker.db")
+        """Snapshot the live database with the SQLite online backup API."""
+        import backup_manager
+
+        src = self.db.db_path
         if not os.path.exists(src):
             show_message(self.parent, "Error", "Database file not found", "error")
             return
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".db",
-            filetypes=[("SQLite DB", "*.db")],
-            initialfile=f"OGCA_DB_Backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db",
+            filetypes=[("SQLite DB", "*.db"), ("Compressed DB", "*.db.gz *.db.zst")],
+            initialfile=backup_manager.default_backup_name(),
         )
         if not file_path:
             return
 
-        try:
-            shutil.copy2(src, file_path)
-            self.set_status("Database backup created", auto_clear=True)
-            show_message(self.parent, "Success", f"Database backup saved:\n{file_path}", "info")
-        except Exception as e:
+        def on_done(path):
+            self.set_status("Database backup created and verified", auto_clear=True)
+            show_message(self.parent, "Success", f"Database backup saved:\n{path}", "info")
+
+        def on_error(e):
+            self.set_status("Database backup failed", auto_clear=True)
             show_message(self.parent, "Error", f"Failed to backup database: {e}", "error")
 
+        self.set_status("Backing up database...")
+        run_in_background(
+            self.parent,
+            lambda progress: backup_manager.create_backup(
+                file_path,
+                db_path=src,
+                compression=backup_manager.compression_for_path(file_path),
+                progress=progress,
+            ),
+            on_done,
+            on_error,
+            on_progress=self._backup_progress("Backing up database"),
+        )
+
     def restore_database_copy(self):
-        """Restore DB from backup .db file."""
-        src = filedialog.askopenfilename(filetypes=[("SQLite DB", "*.db")], title="Select DB Backup")
+        """Restore DB from a verified backup file."""
+        import backup_manager
+
+        src = filedialog.askopenfilename(
+            filetypes=[("SQLite DB", "*.db *.db.gz *.db.zst"), ("All Files", "*.*")],
+            title="Select DB Backup",
+        )
         if not src:
             return
 
-        dst = os.path.join(os.path.dirname(__file__), "expense_tracker.db")
         if not messagebox.askyesno(
             "Confirm Restore",
             "This will replace current database and restart the app data view.\nContinue?",
         ):
             return
 
-        try:
-            shutil.copy2(src, dst)
+        def on_done(_):
+            self.ledger.reload()
+            self.balance_index.invalidate()
             self.load_data()
             self.refresh_current_page()
             self.set_status("Database restored", auto_clear=True)
             show_message(self.parent, "Success", "Database restored successfully", "info")
-        except Exception as e:
+
+        def on_error(e):
+            self.set_status("Database restore failed", auto_clear=True)
             show_message(self.parent, "Error", f"Failed to restore database: {e}", "error")
 
+        self.set_status("Restoring database...")
+        run_in_background(
+            self.parent,
+            lambda progress: backup_manager.restore_backup(src, db_path=self.db.db_path, progress=progress),
+            on_done,
+            on_error,
+            on_progress=self._backup_progress("Restoring database"),
+        )
+
     def show_quick_calculator(self):
         """Simple built-in calculator utility."""
         dlg = tk.Toplevel(self.parent)
@@ -4034,6 +4125,8 @@ class ExpenseTrackerUI:
         expenses = self.db.get_expenses(self.user_id, str(start), str(end))
         income = self.db.get_income(self.user_id, str(start), str(end))
         summary = self.db.get_summary(self.user_id, str(start), str(end))
+        weeks = self.cash_flow.series(self.user_id, "week", start, end)
+        opening, closing = self.balance_index.opening_and_closing(self.user_id, start, end)
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=".txt",
@@ -4050,6 +4143,13 @@ class ExpenseTrackerUI:
                 f.write(f"Total Income: {summary['total_income']:.2f}\n")
                 f.write(f"Total Expenses: {summary['total_expenses']:.2f}\n")
                 f.write(f"Net Balance: {summary['balance']:.2f}\n\n")
+                f.write(f"Opening Balance: {opening:.2f}\n")
+                f.write(f"Closing Balance: {closing:.2f}\n\n")
+                if weeks:
+                    f.write("Weekly Net Flow (week of):\n")
+                    for week in weeks:
+                        f.write(f"  {week['period']}  {week['net']:>12.2f}  balance {week['balance']:>12.2f}\n")
+                    f.write("\n")
                 f.write(f"Transactions: expenses={len(expenses)}, income={len(income)}\n")
             self.set_status("Monthly snapshot generated", auto_clear=True)
             show_message(self.parent, "Success", f"Snapshot saved:\n{file_path}", "info")
@@ -4087,7 +4187,7 @@ class ExpenseTrackerUI:
             ("Go Reports", self.show_reports),
             ("Quick Add Expense", self.quick_add_expense),
             ("Quick Add Income", self.quick_add_income),
-            ("Export JSON Backup", self.export_json_backup),
+            ("Export Data Backup", self.export_json_backup),
             ("Backup Database", self.backup_database_copy),
             ("Send Test Email", self.send_test_email),
             ("Open Calculator", self.show_quick_calculator),
@@ -4108,6 +4208,8 @@ class ExpenseTrackerUI:
 
     def export_category_data(self):
         """Export category breakdown to CSV"""
+        import csv_export
+
         file_path = filedialog.asksaveasfilename(
             defaultextension=".csv",
             filetypes=[("CSV files", "*.csv")],
@@ -4117,36 +4219,30 @@ class ExpenseTrackerUI:
         if not file_path:
             return
         
-        # Get category summary
-        category_summary = self.db.get_category_summary(self.user_id)
-        
         try:
-            import csv
-            with open(file_path, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(['Category', 'Amount', 'Number of Transactions', '% of Total'])
-                
-                total = sum(c['total'] for c in category_summary)
-                
-                for cat in category_summary:
-                    percentage = (cat['total'] / total * 100) if total > 0 else 0
-                    writer.writerow([
-                        cat['category'],
-                        f"{cat['total']:.2f}",
-                        cat['count'],
-                        f"{percentage:.1f}%"
-                    ])
-                
-                writer.writerow([])
-                writer.writerow(['TOTAL', f"{total:.2f}", sum(c['count'] for c in category_summary), '100%'])
-            
+            csv_export.export_category_csv(self.db, self.user_id, file_path)
             show_message(self.parent, "Success", f"Category data exported to {file_path}", "info")
         except Exception as e:
             show_message(self.parent, "Error", f"Failed to export CSV: {str(e)}", "error")
 
     def show_category_chart(self):
-        """Show category chart"""
-        show_message(self.parent, "Feature", "Category chart will be displayed here. Coming in next update!", "info")
+        """Spending charts: category share and the last 12 months."""
+        dlg = tk.Toplevel(self.parent)
+        dlg.title("Spending Charts")
+        dlg.geometry("860x620")
+        dlg.config(bg=COLORS["background"])
+        dlg.transient(self.parent)
+
+        categories = self.db.get_category_summary(self.user_id)
+        months = list(reversed(self.db.get_monthly_spending_trend(self.user_id, 12)))
+
+        donut = DonutChart(dlg, title="Expenses by Category", height=280)
+        donut.pack(fill=tk.X, padx=12, pady=(12, 6))
+        donut.set_data([(row["category"] or "Other", row["total"]) for row in categories])
+
+        bars = BarChart(dlg, title="Monthly Spending (Last 12 Months)", height=260)
+        bars.pack(fill=tk.BOTH, expand=True, padx=12, pady=(6, 12))
+        bars.set_data([(row["month"], row["total"]) for row in months])
 
     def show_balance_summary(self):
         """Show balance summary dialog"""
@@ -4187,6 +4283,14 @@ class ExpenseTrackerUI:
                              relief=tk.FLAT, padx=20, pady=8)
         close_btn.pack(pady=20)
 
+    def _budget_status(self, month, year):
+        """Budget vs actual with month-end projections and breach dates (plain actuals without numpy)."""
+        try:
+            return self.forecaster.budget_status(self.user_id, int(month), int(year))
+        except RuntimeError:
+            return self.db.get_budget_vs_actual(self.user_id, month, year)
+
+    @retained_page("budget", depends=LEDGER_TABLES | {"budgets", "recurring_bills"})
     def show_budget(self):
         """Show budget and recurring bills management."""
         self._set_view_state("budget", "Budget", "Budget planner and recurring bill control center", "Budget loaded")
@@ -4226,7 +4330,7 @@ class ExpenseTrackerUI:
 
         budget_table_frame = tk.Frame(budget_tab, bg=COLORS["background"])
         budget_table_frame.pack(fill=tk.BOTH, expand=True)
-        budget_columns = ("ID", "Category", "Limit", "Spent", "Remaining", "Usage %", "Status")
+        budget_columns = ("ID", "Category", "Limit", "Spent", "Remaining", "Usage %", "Projected", "Breach Date", "Status")
         budget_tree = ttk.Treeview(budget_table_frame, columns=budget_columns, show="headings", height=14)
         for col in budget_columns:
             budget_tree.heading(col, text=col)
@@ -4239,15 +4343,18 @@ class ExpenseTrackerUI:
 
         def refresh_budget_table():
             budget_tree.delete(*budget_tree.get_children())
-            rows = self.db.get_budget_vs_actual(self.user_id, month_var.get(), year_var.get())
+            rows = self._budget_status(month_var.get(), year_var.get())
             for r in rows:
                 usage = float(r["usage_percent"])
                 if usage >= 100:
                     status = "Exceeded"
+                elif r.get("breach_date"):
+                    status = "At Risk"
                 elif usage >= 80:
                     status = "Warning"
                 else:
                     status = "Healthy"
+                projected = f"{r['projected']:.2f}" if "projected" in r else "-"
                 budget_tree.insert(
                     "",
                     "end",
@@ -4258,6 +4365,8 @@ class ExpenseTrackerUI:
                         f"{r['spent']:.2f}",
                         f"{r['remaining']:.2f}",
                         f"{usage:.1f}",
+                        projected,
+                        r.get("breach_date") or "-",
                         status,
                     ),
                 )
@@ -4468,6 +4577,7 @@ class ExpenseTrackerUI:
             tk.Label(tile, text=subtitle, font=FONTS["small"], fg=COLORS["text_secondary"], bg=tile["bg"]).pack(anchor=tk.W, padx=12, pady=(0, 10))
         return tile
 
+    @retained_page("goals", depends=LEDGER_TABLES | {"financial_goals"})
     def show_goals_center(self):
         """Major update: Financial goals planner and progress center."""
         self._set_view_state("goals", "Goals Planner", "Target planning, progress tracking, and milestones", "Goals planner loaded")
@@ -4687,6 +4797,7 @@ class ExpenseTrackerUI:
 
         refresh_table()
 
+    @retained_page("insights", depends=LEDGER_TABLES | {"budgets"})
     def show_insights_center(self):
         """Major update: dedicated insights center with account scope."""
         self._set_view_state("insights", "Insights Center", "Actionable account-wise intelligence and trends", "Insights center loaded")
@@ -4714,8 +4825,8 @@ class ExpenseTrackerUI:
 
         scope_combo.bind("<<ComboboxSelected>>", apply_scope)
 
-        all_expenses = self.db.get_expenses(self.user_id)
-        all_income = self.db.get_income(self.user_id)
+        all_expenses = self.ledger.rows("expenses")
+        all_income = self.ledger.rows("income")
         expenses = self._filter_rows_by_account_scope(all_expenses, self.insights_account_scope)
         income = self._filter_rows_by_account_scope(all_income, self.insights_account_scope)
 
@@ -4773,6 +4884,19 @@ class ExpenseTrackerUI:
         if top_cats:
             names = ", ".join(c[0] for c in top_cats)
             recommendations.append(f"Top spend categories: {names}. Review these for optimization.")
+        try:
+            forecast = self.forecaster.forecast(self.user_id, "expense", self.insights_account_scope, months=3)
+            breaches = [] if self.insights_account_scope != "ALL" else [
+                b for b in self.forecaster.budget_status(self.user_id, date.today().month, date.today().year)
+                if b["breach_date"] and b["spent"] < b["limit_amount"]
+            ]
+        except RuntimeError:
+            forecast, breaches = None, []
+        for b in breaches:
+            recommendations.append(
+                f"{b['category']} budget is projected to run out on {b['breach_date']} "
+                f"({format_currency(b['projected'])} vs {format_currency(b['limit_amount'])} limit)."
+            )
         if not recommendations:
             recommendations.append("Performance is stable. Keep current budgeting pattern and goal contributions.")
 
@@ -4794,28 +4918,55 @@ class ExpenseTrackerUI:
                 ).pack(anchor=tk.W, padx=14, pady=2)
 
         trend_card = tk.Frame(body, bg=COLORS["surface"])
-        trend_card.grid(row=1, column=0, columnspan=2, sticky="nsew")
-        tk.Label(trend_card, text="Monthly Spending Trend (Last 12 Months)", font=FONTS["subheading"], bg=COLORS["surface"], fg=COLORS["primary"]).pack(anchor=tk.W, padx=12, pady=(12, 8))
-
-        trend_cols = ("month", "total")
-        trend_tree = ttk.Treeview(trend_card, columns=trend_cols, show="headings", height=12)
-        trend_tree.heading("month", text="Month")
-        trend_tree.heading("total", text="Total Spent")
-        trend_tree.column("month", width=180, anchor=tk.W)
-        trend_tree.column("total", width=180, anchor=tk.W)
-        trend_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=(12, 0), pady=(0, 12))
-        trend_scroll = ttk.Scrollbar(trend_card, orient="vertical", command=trend_tree.yview)
-        trend_tree.configure(yscrollcommand=trend_scroll.set)
-        trend_scroll.pack(side=tk.RIGHT, fill=tk.Y, padx=(0, 12), pady=(0, 12))
+        trend_card.grid(row=1, column=0, sticky="nsew", padx=(0, 8))
+        trend_chart = BarChart(trend_card, title="Monthly Spending Trend (Last 12 Months)", height=280)
+        trend_chart.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
 
         trend_map = {}
         for row in expenses:
             date_value = str(row.get("date", "") or "")
             month_key = date_value[:7] if len(date_value) >= 7 else "Unknown"
             trend_map[month_key] = trend_map.get(month_key, 0) + float(row.get("amount", 0) or 0)
-        for month in sorted(trend_map.keys(), reverse=True)[:12]:
-            trend_tree.insert("", tk.END, values=(month, format_currency(trend_map[month])))
+        trend_chart.set_data([(month, trend_map[month]) for month in sorted(trend_map)[-12:]])
 
+        flow_card = tk.Frame(body, bg=COLORS["surface"])
+        flow_card.grid(row=1, column=1, sticky="nsew", padx=(8, 0))
+        flow_chart = LineChart(
+            flow_card, title="Running Balance, Daily (Last 10 Years)", height=280,
+            x_format=lambda x: date.fromordinal(int(x)).strftime("%b %Y"),
+        )
+        flow_chart.pack(fill=tk.BOTH, expand=True, padx=8, pady=8)
+        end = date.today()
+        start = end - timedelta(days=3652)
+        points = []
+        for row in self.cash_flow.series(self.user_id, "day", start, end, account=self.insights_account_scope):
+            try:
+                points.append((date.fromisoformat(row["period"]).toordinal(), row["balance"]))
+            except ValueError:
+                continue
+        flow_chart.set_series(points)
+
+        forecast_card = tk.Frame(body, bg=COLORS["surface"])
+        forecast_card.grid(row=2, column=0, columnspan=2, sticky="nsew", pady=(8, 0))
+        tk.Label(forecast_card, text="Spending Forecast (80% range)", font=FONTS["subheading"], bg=COLORS["surface"], fg=COLORS["primary"]).pack(anchor=tk.W, padx=12, pady=(12, 6))
+        if forecast is None:
+            lines = ["- Forecasts need numpy (pip install numpy)"]
+        elif not forecast["total"]:
+            lines = ["- Not enough closed months to forecast yet"]
+        else:
+            lines = [
+                f"- {datetime.strptime(row['month'], '%Y-%m').strftime('%b %Y')}: {format_currency(row['expected'])}"
+                f"  ({format_currency(row['low'])} - {format_currency(row['high'])})"
+                for row in forecast["total"]
+            ]
+            this_month = sorted(forecast["categories"].items(), key=lambda kv: kv[1][0]["expected"], reverse=True)[:4]
+            lines.append("- Largest this month: " + ", ".join(
+                f"{category} {format_currency(rows[0]['expected'])}" for category, rows in this_month
+            ))
+        for line in lines:
+            tk.Label(forecast_card, text=line, font=FONTS["body"], bg=COLORS["surface"], fg=COLORS["text_primary"]).pack(anchor=tk.W, padx=14, pady=2)
+
+    @retained_page("notifications", depends={"notifications"})
     def show_notification_center(self):
         """Major update: notification center for alerts and reminders."""
         self._set_view_state("notifications", "Notification Center", "Smart alerts, reminders, and risk signals", "Notification center loaded")
@@ -4864,6 +5015,7 @@ class ExpenseTrackerUI:
 
         def refresh_notifications():
             tree.delete(*tree.get_children())
+            self._refresh_alert_badge()
             rows = self.db.get_notifications(self.user_id, unread_only=unread_only_var.get())
             for n in rows:
                 tree.insert(
@@ -4906,8 +5058,10 @@ class ExpenseTrackerUI:
         tk.Button(controls, text="Delete Selected", bg=COLORS["danger"], fg="white", relief=tk.FLAT, padx=12, pady=6, command=delete_selected).pack(side=tk.LEFT, padx=4)
         tk.Button(controls, text="Refresh", bg=COLORS["primary"], fg="white", relief=tk.FLAT, padx=12, pady=6, command=refresh_notifications).pack(side=tk.LEFT, padx=4)
 
+        self.pages.set_refresher(refresh_notifications)
         refresh_notifications()
 
+    @retained_page("notes", depends={"quick_notes"})
     def show_notes_hub(self):
         """Insane update: full notes workspace."""
         self._set_view_state("notes", "Notes Hub", "Capture and organize accounting notes quickly", "Notes hub loaded")
@@ -5017,8 +5171,10 @@ class ExpenseTrackerUI:
         tk.Button(actions, text="New", command=clear_form, bg=COLORS["surface_alt"], fg=COLORS["text_primary"], relief=tk.FLAT, padx=10, pady=6).pack(side=tk.LEFT, padx=4)
         listbox.bind("<<ListboxSelect>>", load_selected)
 
+        self.pages.set_refresher(refresh_notes)
         refresh_notes()
 
+    @retained_page("reminders", depends={"reminders"})
     def show_reminders_hub(self):
         """Insane update: reminders planner with due tracking."""
         self._set_view_state("reminders", "Reminders", "Due-date planner for operational and financial tasks", "Reminders loaded")
@@ -5099,8 +5255,10 @@ class ExpenseTrackerUI:
         tk.Button(btns, text="Delete", command=delete, bg=COLORS["danger"], fg="white", relief=tk.FLAT, padx=12, pady=6).pack(side=tk.LEFT, padx=4)
         tk.Button(btns, text="Refresh", command=refresh, bg=COLORS["secondary"], fg="white", relief=tk.FLAT, padx=12, pady=6).pack(side=tk.LEFT, padx=4)
         pending_only_var.trace_add("write", lambda *args: refresh())
+        self.pages.set_refresher(refresh)
         refresh()
 
+    @retained_page("data_quality", depends=LEDGER_TABLES)
     def show_data_quality_center(self):
         """Insane update: data quality diagnostics and cleanup shortcuts."""
         self._set_view_state("data_quality", "Data Quality", "Data diagnostics, cleanup insights, and duplicate checks", "Data quality center loaded")
@@ -5123,6 +5281,29 @@ class ExpenseTrackerUI:
         tk.Label(panel, text="- Use Scenario Lab to test budget adjustments before applying real changes.", bg=COLORS["surface"], fg=COLORS["text_primary"], font=FONTS["body"]).pack(anchor=tk.W, padx=14, pady=3)
         tk.Button(panel, text="Open Transactions", command=self.show_transactions, bg=COLORS["primary"], fg="white", relief=tk.FLAT, padx=12, pady=7).pack(anchor=tk.W, padx=14, pady=(12, 0))
 
+    def _scenario_projection(self, month):
+        """(income row, expense row, balance carried in) from the forecast for 'YYYY-MM', or None.
+
+        The balance carried in is the balance at the end of last month plus the
+        forecast net of every month before the scenario month.
+        """
+        try:
+            income = self.forecaster.forecast(self.user_id, "income")["total"]
+            expenses = self.forecaster.forecast(self.user_id, "expense")["total"]
+        except RuntimeError:
+            return None
+        months = [row["month"] for row in expenses or income]
+        if month not in months:
+            return None
+        zero = {"expected": 0.0, "low": 0.0, "high": 0.0}
+        income = dict(zip(months, income)) if income else {}
+        expenses = dict(zip(months, expenses)) if expenses else {}
+        carried = self.balance_index.balance_as_of(self.user_id, date.today().replace(day=1) - timedelta(days=1))
+        for earlier in months[:months.index(month)]:
+            carried += income.get(earlier, zero)["expected"] - expenses.get(earlier, zero)["expected"]
+        return income.get(month, zero), expenses.get(month, zero), carried
+
+    @retained_page("scenario", depends=LEDGER_TABLES)
     def show_scenario_lab(self):
         """Insane update: what-if simulation for monthly finance planning."""
         self._set_view_state("scenario", "Scenario Lab", "What-if simulations before financial decisions", "Scenario lab loaded")
@@ -5159,9 +5340,16 @@ class ExpenseTrackerUI:
         ttk.Entry(form, textvariable=one_time_expense_var).grid(row=2, column=1, sticky=tk.EW, pady=4)
         tk.Label(form, text="Scenario Month", bg=COLORS["surface"], fg=COLORS["text_secondary"], font=FONTS["small"]).grid(row=3, column=0, sticky=tk.W, pady=4)
         ttk.Entry(form, textvariable=month_var).grid(row=3, column=1, sticky=tk.EW, pady=4)
+        horizon_var = tk.StringVar(value="24")
+        tk.Label(form, text="Monte Carlo Horizon (months)", bg=COLORS["surface"], fg=COLORS["text_secondary"], font=FONTS["small"]).grid(row=4, column=0, sticky=tk.W, pady=4)
+        ttk.Combobox(form, textvariable=horizon_var, values=["12", "18", "24", "30", "36"], state="readonly", width=8).grid(row=4, column=1, sticky=tk.W, pady=4)
+
+        band_chart = BandChart(card, title="Simulated Balance (median, 25-75% and 5-95% of paths)", height=240)
+        band_chart.pack(fill=tk.X, padx=14, pady=(0, 8))
 
-        result_box = tk.Text(card, height=12, font=FONTS["body"], bg=COLORS["surface_alt"], fg=COLORS["text_primary"], relief=tk.FLAT)
+        result_box = tk.Text(card, height=9, font=FONTS["body"], bg=COLORS["surface_alt"], fg=COLORS["text_primary"], relief=tk.FLAT)
         result_box.pack(fill=tk.BOTH, expand=True, padx=14, pady=(0, 12))
+        monte_carlo = {"stop": threading.Event()}
 
         def run_simulation():
             try:
@@ -5171,14 +5359,34 @@ class ExpenseTrackerUI:
             except ValueError:
                 show_message(self.parent, "Error", "Scenario values must be numeric", "error")
                 return
-            sim_income = base_income * (1 + income_pct / 100.0)
-            sim_expense = base_expense * (1 + expense_pct / 100.0) + one_time
-            sim_balance = sim_income - sim_expense
+            month = month_var.get().strip()
+            projection = self._scenario_projection(month)
+            if projection:
+                # Baseline: that month's forecast, on top of the balance carried into it
+                income_row, expense_row, carried = projection
+                sim_income = income_row["expected"] * (1 + income_pct / 100.0)
+                sim_expense = expense_row["expected"] * (1 + expense_pct / 100.0) + one_time
+                sim_balance = carried + sim_income - sim_expense
+                baseline = carried + income_row["expected"] - expense_row["expected"]
+                basis = (
+                    f"Forecast Income: {format_currency(income_row['expected'])} "
+                    f"({format_currency(income_row['low'])} - {format_currency(income_row['high'])})\n"
+                    f"Forecast Expense: {format_currency(expense_row['expected'])} "
+                    f"({format_currency(expense_row['low'])} - {format_currency(expense_row['high'])})\n"
+                    f"Balance Carried In: {format_currency(carried)}\n\n"
+                )
+            else:
+                sim_income = base_income * (1 + income_pct / 100.0)
+                sim_expense = base_expense * (1 + expense_pct / 100.0) + one_time
+                sim_balance = sim_income - sim_expense
+                baseline = base_balance
+                basis = "Baseline: all-time totals (no forecast for this month)\n\n"
             runway = (sim_income / sim_expense) if sim_expense > 0 else 0
             result_box.delete("1.0", tk.END)
             result_box.insert(
                 tk.END,
-                f"Scenario Month: {month_var.get().strip()}\n\n"
+                f"Scenario Month: {month}\n\n"
+                f"{basis}"
                 f"Simulated Income: {format_currency(sim_income)}\n"
                 f"Simulated Expense: {format_currency(sim_expense)}\n"
                 f"Projected Balance: {format_currency(sim_balance)}\n"
@@ -5186,18 +5394,101 @@ class ExpenseTrackerUI:
             )
             if sim_balance < 0:
                 result_box.insert(tk.END, "Risk: Balance turns negative. Consider reducing expense growth or increasing income.\n")
-            elif sim_balance < base_balance:
+            elif sim_balance < baseline:
                 result_box.insert(tk.END, "Warning: Balance is lower than baseline.\n")
             else:
                 result_box.insert(tk.END, "Good: Scenario improves or maintains baseline balance.\n")
             self.set_status("Scenario simulation completed", auto_clear=True)
 
+        def show_monte_carlo(summary, final):
+            bands = summary["bands"]
+            months = summary["months"]
+            band_chart.set_bands(
+                [datetime.strptime(m, "%Y-%m").strftime("%b %y") for m in months],
+                bands[50], [(bands[5], bands[95]), (bands[25], bands[75])],
+            )
+            lines = [
+                f"Monte Carlo: {summary['paths']:,} paths{'' if final else ' so far'} over {len(months)} months, "
+                f"starting from {format_currency(summary['start_balance'])} at the end of last month",
+                f"Chance the balance goes negative: {summary['prob_negative'] * 100:.1f}%",
+                f"Balance at the end of {months[-1]}: median {format_currency(bands[50][-1])} "
+                f"(5-95%: {format_currency(bands[5][-1])} to {format_currency(bands[95][-1])})",
+            ]
+            scenario = month_var.get().strip()
+            if scenario in months:
+                index = months.index(scenario)
+                lines.append(f"Scenario month {scenario}: median {format_currency(bands[50][index])}, "
+                             f"{summary['prob_negative_by_month'][index] * 100:.1f}% chance of a negative balance")
+            for goal in summary["goals"]:
+                when = f"median {goal['median_months']} months" if goal["median_months"] else f"not within {len(months)} months for most paths"
+                due = f", {goal['prob_by_due'] * 100:.0f}% by its due date" if goal["prob_by_due"] is not None else ""
+                lines.append(f"Goal '{goal['title']}' ({format_currency(goal['remaining'])} to go): "
+                             f"{goal['prob_reached'] * 100:.0f}% reached, {when}{due}")
+            result_box.delete("1.0", tk.END)
+            result_box.insert(tk.END, "\n".join(lines) + "\n")
+
+        def run_monte_carlo():
+            try:
+                income_pct = float(income_change_var.get())
+                expense_pct = float(expense_change_var.get())
+                one_time = float(one_time_expense_var.get())
+                horizon = int(horizon_var.get())
+            except ValueError:
+                show_message(self.parent, "Error", "Scenario values must be numeric", "error")
+                return
+            first = date.today().replace(day=1)
+            try:
+                one_time_month = month_index(month_var.get().strip()) - month_index(first.strftime("%Y-%m"))
+            except ValueError:
+                one_time_month = 0
+            goals = []
+            for goal in self.db.get_financial_goals(self.user_id, active_only=True):
+                remaining = float(goal["target_amount"] or 0) - float(goal["current_amount"] or 0)
+                if remaining > 0:
+                    due = str(goal.get("due_date") or "")
+                    goals.append({
+                        "title": goal["title"],
+                        "remaining": remaining,
+                        "due_index": month_index(due) - month_index(first.strftime("%Y-%m")) if len(due) >= 7 else None,
+                    })
+            start_balance = self.balance_index.balance_as_of(self.user_id, first - timedelta(days=1))
+
+            # A new run stops the previous one between batches
+            monte_carlo["stop"].set()
+            stop = monte_carlo["stop"] = threading.Event()
+
+            def work(progress):
+                history = load_history(self.db, self.user_id)
+                return simulate(
+                    history, start_balance, months=horizon, income_change=income_pct, expense_change=expense_pct,
+                    one_time=one_time, one_time_month=one_time_month, goals=goals[:5],
+                    progress=progress, should_stop=stop.is_set,
+                )
+
+            def on_progress(summary):
+                if not stop.is_set():
+                    show_monte_carlo(summary, final=False)
+
+            def on_done(summary):
+                if summary and not stop.is_set():
+                    show_monte_carlo(summary, final=True)
+                    self.set_status("Monte Carlo simulation completed", auto_clear=True)
+
+            self.set_status("Running Monte Carlo simulation...")
+            run_in_background(
+                result_box, work, on_done,
+                lambda e: show_message(self.parent, "Error", f"Simulation failed: {e}", "error"),
+                on_progress=on_progress,
+            )
+
         btns = tk.Frame(card, bg=COLORS["surface"])
         btns.pack(fill=tk.X, padx=14, pady=(0, 12))
         tk.Button(btns, text="Run Simulation", command=run_simulation, bg=COLORS["primary"], fg="white", relief=tk.FLAT, padx=12, pady=7).pack(side=tk.LEFT, padx=4)
+        tk.Button(btns, text="Run Monte Carlo", command=run_monte_carlo, bg=COLORS["info"], fg="white", relief=tk.FLAT, padx=12, pady=7).pack(side=tk.LEFT, padx=4)
         tk.Button(btns, text="Open Budget", command=self.show_budget, bg=COLORS["secondary"], fg="white", relief=tk.FLAT, padx=12, pady=7).pack(side=tk.LEFT, padx=4)
         tk.Button(btns, text="Open Goals", command=self.show_goals_center, bg=COLORS["accent"], fg="white", relief=tk.FLAT, padx=12, pady=7).pack(side=tk.LEFT, padx=4)
 
+    @retained_page("profile", depends={"users"})
     def show_profile(self):
         """Show user profile"""
         self._set_view_state("profile", "Profile", "Account owner details and preferences", "Profile loaded")
@@ -5271,6 +5562,7 @@ class ExpenseTrackerUI:
         if messagebox.askyesno("Logout", "Are you sure you want to logout?"):
             self.parent.destroy()
 
+    @retained_page("features")
     def show_features(self):
         """Show all available features"""
         self._set_view_state("features", "Features & Capabilities", "Complete feature inventory and release highlights", "Features loaded")
@@ -5336,8 +5628,8 @@ class ExpenseTrackerUI:
                 "Automatic temp file cleanup for email reports",
                 "Data & Email tools panel in Reports",
                 "Export all data (CSV)",
-                "JSON full backup export",
-                "JSON backup import",
+                "NDJSON streaming backup export",
+                "NDJSON backup import (legacy JSON supported)",
                 "SQLite DB direct backup",
                 "SQLite DB restore",
                 "Command Center launcher",
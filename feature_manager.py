@@ -2,15 +2,15 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
 from config import COLORS, FONTS, FEATURES
-from datetime import datetime, timedelta
 
 
 class FeatureManager:
     """Manages and implements all available features"""
     
-    def __init__(self, db, user_id):
+    def __init__(self, db, user_id, forecaster=None):
         self.db = db
         self.user_id = user_id
+        self.forecaster = forecaster
         self.active_features = {k: v for k, v in FEATURES.items() if v}
     
     # ============ TRANSACTION FEATURES ============
@@ -97,17 +97,12 @@ class FeatureManager:
         return sorted(months.items())
     
     def get_forecast(self, months_ahead=3):
-        """Forecast future spending"""
-        trends = self.get_spending_trends()
-        if not trends:
-            return []
-        
-        last_amount = trends[-1][1]
-        forecasts = []
-        for i in range(1, months_ahead + 1):
-            future_date = datetime.now() + timedelta(days=30*i)
-            forecasts.append((future_date.strftime('%Y-%m'), last_amount * 0.95))  # 5% reduction
-        return forecasts
+        """Forecast spending for the next months_ahead months: [(YYYY-MM, expected)]"""
+        if self.forecaster is None:
+            from forecast import Forecaster
+            self.forecaster = Forecaster(self.db)
+        total = self.forecaster.forecast(self.user_id, months=months_ahead + 1)["total"]
+        return [(row["month"], row["expected"]) for row in total[1:]]  # first row is the current month
     
     def calculate_financial_health(self):
         """Calculate financial health score (0-100)"""
@@ -200,13 +195,13 @@ class FeatureManager:
     
     def export_to_csv(self, filename):
         """Export transactions to CSV"""
-        import csv
+        import csv_export
         try:
-            expenses = self.db.get_expenses(self.user_id)
-            with open(filename, 'w', newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=['date', 'category', 'amount', 'description'])
-                writer.writeheader()
-                writer.writerows(expenses)
+            csv_export.export_transactions_csv(
+                self.db, self.user_id, filename, "expenses",
+                columns=['date', 'category', 'amount', 'description'],
+                include_total=False,
+            )
             return True, f"Exported to {filename}"
         except Exception as e:
             return False, str(e)
@@ -0,0 +1,293 @@
+"""Seasonal spend and income forecasts per category and account (no tkinter dependency).
+
+Each (kind, account, category) month series - live months grouped from
+expenses/income plus archived months from monthly_rollups - gets an additive
+Holt-Winters model with a damped trend, and a 12-month seasonal component once
+it has two years of history. All series are fitted together: a small grid of
+smoothing parameters is run as NumPy arrays of shape (grid, series) and each
+series keeps the combination with the lowest one-step-ahead error.
+
+Only closed months are fitted, so the fit is cached per user and redone when
+a month closes or a write lands in an already closed month. Projections,
+80% bands and budget breach dates are then read from the cached arrays.
+
+account is "ALL", None (personal rows, no managed account) or an account id.
+"""
+import calendar
+import threading
+from datetime import date, timedelta
+
+from config import FORECAST_HISTORY_MONTHS, FORECAST_HORIZON_MONTHS, FORECAST_BAND_Z
+
+
+ALPHAS = (0.1, 0.3, 0.5, 0.7, 0.9)
+BETAS = (0.0, 0.05, 0.15)
+GAMMAS = (0.05, 0.2, 0.4)
+DAMPING = 0.9  # trend damping; keeps long horizons from running away
+SEASON = 12
+SEASONAL_MIN_MONTHS = 2 * SEASON
+LABEL_COLUMNS = {"expense": ("expenses", "category"), "income": ("income", "source")}
+
+
+def _require_numpy():
+    try:
+        import numpy
+    except Exception:
+        raise RuntimeError("numpy is required for forecasts. Install with: pip install numpy")
+    return numpy
+
+
+def month_index(month):
+    """'YYYY-MM' -> months since year 0."""
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+def month_label(index):
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def _account_key(account):
+    return 0 if account in (None, "", 0) else account
+
+
+def monthly_history(db, user_id, first_month, last_month):
+    """{(kind, account_id, category): {'YYYY-MM': total}} for first_month..last_month."""
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        end = month_label(month_index(last_month) + 1)
+        selects, params = [], []
+        for kind, (table, label) in LABEL_COLUMNS.items():
+            selects.append(
+                f"""SELECT '{kind}', COALESCE(account_id, 0), COALESCE({label}, ''), substr(date, 1, 7), SUM(amount)
+                FROM {table} WHERE user_id = ? AND date >= ? AND date < ?
+                GROUP BY COALESCE(account_id, 0), COALESCE({label}, ''), substr(date, 1, 7)"""
+            )
+            params += [user_id, f"{first_month}-01", f"{end}-01"]
+        selects.append(
+            "SELECT kind, account_id, category, month, total FROM monthly_rollups "
+            "WHERE user_id = ? AND month >= ? AND month <= ?"
+        )
+        params += [user_id, first_month, last_month]
+        cursor.execute(" UNION ALL ".join(selects), params)
+        history = {}
+        for kind, account_id, category, month, total in cursor.fetchall():
+            months = history.setdefault((kind, account_id, category), {})
+            months[month] = months.get(month, 0.0) + (total or 0.0)
+        return history
+    finally:
+        conn.close()
+
+
+def fit(history, first_month, last_month, horizon=FORECAST_HORIZON_MONTHS):
+    """Fit every series in history; returns a ForecastModel (or None without data)."""
+    np = _require_numpy()
+    keys = sorted(history, key=lambda key: (key[0], str(key[1]), key[2]))
+    if not keys:
+        return None
+    first = month_index(first_month)
+    steps = month_index(last_month) - first + 1
+    y = np.zeros((len(keys), steps))
+    for row, key in enumerate(keys):
+        for month, total in history[key].items():
+            y[row, month_index(month) - first] = total
+    n = len(keys)
+    start = np.argmax(y != 0, axis=1)  # first active month; zeros after it are real zero-spend months
+    observed = steps - start
+    seasonal = observed >= SEASONAL_MIN_MONTHS
+    rows = np.arange(n)
+
+    # Initial state: first year's mean and shape for seasonal series, first value otherwise
+    window = y[rows[:, None], np.minimum(start[:, None] + np.arange(2 * SEASON), steps - 1)]
+    first_year = window[:, :SEASON].mean(axis=1)
+    level0 = np.where(seasonal, first_year, y[rows, start])
+    trend0 = np.where(seasonal, (window[:, SEASON:].mean(axis=1) - first_year) / SEASON, 0.0)
+    season0 = np.zeros((n, SEASON))
+    positions = (first + start[:, None] + np.arange(SEASON)) % SEASON
+    season0[rows[:, None], positions] = np.where(seasonal[:, None], window[:, :SEASON] - first_year[:, None], 0.0)
+
+    grid = np.array([(a, b, g) for a in ALPHAS for b in BETAS for g in GAMMAS])
+    alpha, beta = grid[:, 0:1], grid[:, 1:2]
+    gamma = grid[:, 2:3] * seasonal[None, :]  # non-seasonal series keep a zero season
+    level = np.repeat(level0[None, :], len(grid), axis=0)
+    trend = np.repeat(trend0[None, :], len(grid), axis=0)
+    season = np.repeat(season0[None, :, :], len(grid), axis=0)
+    sse = np.zeros_like(level)
+    for t in range(steps):
+        active = t >= start
+        if not active.any():
+            continue
+        p = (first + t) % SEASON
+        value = y[:, t]
+        damped = level + DAMPING * trend
+        error = value - damped - season[:, :, p]
+        sse += np.where(t > start, error * error, 0.0)
+        new_level = alpha * (value - season[:, :, p]) + (1 - alpha) * damped
+        new_trend = beta * (new_level - level) + (1 - beta) * DAMPING * trend
+        new_season = gamma * (value - new_level) + (1 - gamma) * season[:, :, p]
+        level = np.where(active, new_level, level)
+        trend = np.where(active, new_trend, trend)
+        season[:, :, p] = np.where(active, new_season, season[:, :, p])
+
+    best = np.argmin(sse, axis=0)
+    level, trend = level[best, rows], trend[best, rows]
+    season = season[best, rows]
+    best_alpha = grid[best, 0]
+    sigma = np.sqrt(sse[best, rows] / np.maximum(observed - 1, 1))
+    sigma = np.where(observed > 1, sigma, np.abs(level) * 0.5)  # one month of data: wide band
+
+    h = np.arange(1, horizon + 1)
+    damped_steps = np.cumsum(DAMPING ** h)
+    expected = level[:, None] + trend[:, None] * damped_steps[None, :] + season[:, (first + steps - 1 + h) % SEASON]
+    spread = sigma[:, None] * np.sqrt(1 + (h[None, :] - 1) * best_alpha[:, None] ** 2)
+    months = [month_label(first + steps - 1 + step) for step in h]
+    return ForecastModel(keys, months, np.maximum(expected, 0.0), spread)
+
+
+class ForecastModel:
+    """Fitted projections: expected (series x months) and its standard deviation."""
+
+    def __init__(self, keys, months, expected, spread):
+        self.keys = keys
+        self.months = months
+        self.expected = expected
+        self.spread = spread
+
+    def select(self, kind="expense", account="ALL"):
+        """{category: (expected, low, high)} arrays over self.months for one kind and scope."""
+        np = _require_numpy()
+        account = account if account == "ALL" else _account_key(account)
+        grouped = {}
+        for row, (row_kind, account_id, category) in enumerate(self.keys):
+            if row_kind == kind and (account == "ALL" or account_id == account):
+                grouped.setdefault(category, []).append(row)
+        result = {}
+        for category, rows in grouped.items():
+            expected = self.expected[rows].sum(axis=0)
+            spread = np.sqrt((self.spread[rows] ** 2).sum(axis=0))  # series treated as independent
+            result[category] = (expected, np.maximum(expected - FORECAST_BAND_Z * spread, 0.0),
+                                expected + FORECAST_BAND_Z * spread)
+        return result
+
+
+class Forecaster:
+    """fit() per user, cached until a month closes or a closed month is edited.
+
+    Writes in the current month do not refit: they only change month-to-date
+    spend, which budget_status() reads fresh. Edits that move no money (e.g.
+    a category change) are picked up when the next month closes.
+    """
+
+    def __init__(self, db, horizon=FORECAST_HORIZON_MONTHS):
+        self.db = db
+        self.horizon = horizon
+        self._models = {}  # user_id -> (last closed month, ForecastModel or None)
+        self._generation = 0
+        self._lock = threading.Lock()
+        db.add_flow_listener(self._on_flows)
+
+    def model(self, user_id, today=None):
+        today = today or date.today()
+        last_closed = month_label(today.year * 12 + today.month - 2)
+        with self._lock:
+            cached = self._models.get(user_id)
+            generation = self._generation
+        if cached and cached[0] == last_closed:
+            return cached[1]
+        first_month = month_label(month_index(last_closed) - FORECAST_HISTORY_MONTHS + 1)
+        history = monthly_history(self.db, user_id, first_month, last_closed)
+        model = fit(history, first_month, last_closed, self.horizon)
+        with self._lock:
+            if generation == self._generation:
+                self._models[user_id] = (last_closed, model)
+        return model
+
+    def forecast(self, user_id, kind="expense", account="ALL", months=None):
+        """{"months": [...], "categories": {category: [{month, expected, low, high}]}, "total": [...]}"""
+        model = self.model(user_id)
+        if model is None:
+            return {"months": [], "categories": {}, "total": []}
+        months = min(months or self.horizon, len(model.months))
+        selected = model.select(kind, account)
+        np = _require_numpy()
+
+        def rows(expected, low, high):
+            return [{"month": model.months[i], "expected": float(expected[i]), "low": float(low[i]),
+                     "high": float(high[i])} for i in range(months)]
+
+        categories = {category: rows(*arrays) for category, arrays in selected.items()}
+        if selected:
+            total_expected = sum(arrays[0] for arrays in selected.values())
+            half_width = np.sqrt(sum(((arrays[2] - arrays[0]) ** 2) for arrays in selected.values()))
+            total = rows(total_expected, np.maximum(total_expected - half_width, 0.0), total_expected + half_width)
+        else:
+            total = []
+        return {"months": model.months[:months], "categories": categories, "total": total}
+
+    def month_projection(self, user_id, month, kind="expense", account="ALL"):
+        """{category: (expected, low, high)} for 'YYYY-MM' within the horizon, else {}."""
+        model = self.model(user_id)
+        if model is None or month not in model.months:
+            return {}
+        index = model.months.index(month)
+        return {category: (float(expected[index]), float(low[index]), float(high[index]))
+                for category, (expected, low, high) in model.select(kind, account).items()}
+
+    def budget_status(self, user_id, month, year, today=None):
+        """Budgets for month/year with month-end projections and projected breach dates.
+
+        [{category, limit_amount, spent, projected, low, high, breach_date}], where
+        breach_date is the day spending is expected to pass the limit (the
+        current month assumes the forecast's remaining spend is spread evenly
+        over the days left), or None when it is not expected to.
+        """
+        today = today or date.today()
+        label = f"{int(year):04d}-{int(month):02d}"
+        days = calendar.monthrange(int(year), int(month))[1]
+        first_day = date(int(year), int(month), 1)
+        projection = self.month_projection(user_id, label)
+        results = []
+        for row in self.db.get_budget_vs_actual(user_id, month, year):
+            limit_amount, spent = float(row["limit_amount"]), float(row["spent"])
+            expected, low, high = projection.get(row["category"], (0.0, 0.0, 0.0))
+            breach = None
+            if first_day > today:
+                projected = expected
+                if expected > limit_amount > 0:
+                    breach = first_day + timedelta(days=int(limit_amount / (expected / days)))
+            elif label == today.strftime("%Y-%m"):
+                remaining_days = days - today.day
+                daily = expected / days
+                projected = spent + daily * remaining_days
+                low = spent + low / days * remaining_days
+                high = spent + high / days * remaining_days
+                if limit_amount <= 0:
+                    pass  # category has spending but no budget
+                elif spent >= limit_amount:
+                    breach = today
+                elif projected > limit_amount:
+                    breach = today + timedelta(days=int((limit_amount - spent) / daily) + 1)
+            else:
+                projected = low = high = spent  # closed month: the actuals are final
+            results.append(dict(row, projected=projected, low=low, high=high,
+                                breach_date=breach.isoformat() if breach else None))
+        return results
+
+    def invalidate(self, user_id=None):
+        with self._lock:
+            self._generation += 1
+            if user_id is None:
+                self._models.clear()
+            else:
+                self._models.pop(user_id, None)
+
+    def close(self):
+        self.db.remove_flow_listener(self._on_flows)
+
+    def _on_flows(self, flows):
+        current = date.today().strftime("%Y-%m")
+        stale = {user_id for (user_id, _, day) in flows if str(day)[:7] < current}
+        with self._lock:
+            self._generation += 1
+            for user_id in stale:
+                self._models.pop(user_id, None)
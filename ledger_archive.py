@@ -0,0 +1,196 @@
+"""Cold storage for old expenses and income (no tkinter dependency).
+
+Rows dated before a cutoff move from the live tables into one SQLite file
+per year (``<db folder>/archive/<db name>_<year>.db``). Their per-month,
+per-category totals are added to ``monthly_rollups`` in the main database, so
+all-time summaries stay correct while the hot tables stay small; their
+per-day nets stay in ``daily_net``, so point-in-time balances do too. Date-ranged
+reads in Database ATTACH the archive years they reach and UNION ALL them with
+the live table; years past SQLite's limit of 10 attached files per connection
+are copied into temp tables instead.
+
+backup_manager copies the archive files into each database backup and puts
+them back on restore.
+"""
+import os
+from datetime import datetime, timedelta
+
+from config import ARCHIVE_AFTER_DAYS
+
+
+ARCHIVE_TABLES = {"expenses": ("expense", "category"), "income": ("income", "source")}
+ARCHIVE_ALIAS = "cold"
+
+
+def default_cutoff(days=ARCHIVE_AFTER_DAYS, today=None):
+    """First day of the year `days` ago: archive whole years only by default."""
+    day = (today or datetime.now()).date() - timedelta(days=int(days))
+    return f"{day.year}-01-01"
+
+
+def archive_file_name(db, year):
+    stem = os.path.splitext(os.path.basename(str(db.db_path)))[0]
+    return f"{stem}_{year}.db"
+
+
+def _ensure_archive_table(cursor, table):
+    """Create/extend ARCHIVE_ALIAS.table to carry every live column."""
+    live = cursor.execute(f"PRAGMA main.table_info({table})").fetchall()
+    have = {col[1] for col in cursor.execute(f"PRAGMA {ARCHIVE_ALIAS}.table_info({table})").fetchall()}
+    if not have:
+        cols = ", ".join(
+            f"{col[1]} {col[2] or ''}{' PRIMARY KEY' if col[5] else ''}".strip() for col in live
+        )
+        cursor.execute(f"CREATE TABLE {ARCHIVE_ALIAS}.{table} ({cols})")
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {ARCHIVE_ALIAS}.idx_{table}_user_date ON {table}(user_id, date)"
+        )
+    else:
+        for col in live:
+            if col[1] not in have:
+                cursor.execute(f"ALTER TABLE {ARCHIVE_ALIAS}.{table} ADD COLUMN {col[1]} {col[2] or ''}")
+    return [col[1] for col in live]
+
+
+def _archive_years(cursor, table, before, user_id):
+    query = f"SELECT DISTINCT substr(date, 1, 4) AS y FROM {table} WHERE date < ?"
+    params = [before]
+    if user_id is not None:
+        query += " AND user_id = ?"
+        params.append(user_id)
+    years = [row[0] for row in cursor.execute(query, params).fetchall()]
+    return sorted(int(y) for y in years if y and y.isdigit() and len(y) == 4)
+
+
+def _move_year(conn, db, table, year, before, user_id, direction):
+    """Move one year of rows between main and the archive file in one transaction."""
+    kind, label = ARCHIVE_TABLES[table]
+    file_name = archive_file_name(db, year)
+    path = os.path.join(db.archive_dir(), file_name)
+    cursor = conn.cursor()
+    cursor.execute(f"ATTACH DATABASE ? AS {ARCHIVE_ALIAS}", (path,))
+    try:
+        columns = ", ".join(_ensure_archive_table(cursor, table))
+        lo, hi = f"{year}-01-01", min(f"{year + 1}-01-01", before)
+        where = "date >= ? AND date < ?"
+        params = [lo, hi]
+        if user_id is not None:
+            where += " AND user_id = ?"
+            params.append(user_id)
+
+        source, target = ("main", ARCHIVE_ALIAS) if direction == "archive" else (ARCHIVE_ALIAS, "main")
+        sign = "+" if direction == "archive" else "-"
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute(
+            f"""
+            INSERT INTO main.monthly_rollups (user_id, kind, month, category, account_id, total, tx_count)
+            SELECT user_id, ?, substr(date, 1, 7), COALESCE({label}, ''), COALESCE(account_id, 0),
+                   SUM(amount), COUNT(*)
+            FROM {source}.{table} WHERE {where}
+            GROUP BY user_id, substr(date, 1, 7), COALESCE({label}, ''), COALESCE(account_id, 0)
+            ON CONFLICT (user_id, kind, month, category, account_id) DO UPDATE SET
+                total = total {sign} excluded.total,
+                tx_count = tx_count {sign} excluded.tx_count
+            """,
+            [kind] + params,
+        )
+        if direction == "restore":
+            cursor.execute("DELETE FROM main.monthly_rollups WHERE tx_count <= 0")
+        cursor.execute(
+            f"INSERT OR REPLACE INTO {target}.{table} ({columns}) SELECT {columns} FROM {source}.{table} WHERE {where}",
+            params,
+        )
+        moved = cursor.rowcount
+        # The daily_net triggers on main.{table} take the moved rows out on archive
+        # (and add them back on restore); cancel that so daily_net keeps every day
+        flow = "" if table == "income" else "-"
+        cursor.execute(
+            f"""
+            INSERT INTO main.daily_net (user_id, account_id, day, net)
+            SELECT user_id, COALESCE(account_id, 0), COALESCE(date(date), date), {sign}SUM({flow}amount)
+            FROM {source}.{table} WHERE {where}
+            GROUP BY user_id, COALESCE(account_id, 0), COALESCE(date(date), date)
+            ON CONFLICT (user_id, account_id, day) DO UPDATE SET net = net + excluded.net
+            """,
+            params,
+        )
+        cursor.execute(f"DELETE FROM {source}.{table} WHERE {where}", params)
+        if cursor.rowcount != moved:
+            raise RuntimeError(f"{table} {year}: copied {moved} rows but removed {cursor.rowcount}")
+
+        remaining = cursor.execute(f"SELECT COUNT(*) FROM {ARCHIVE_ALIAS}.{table}").fetchone()[0]
+        if remaining:
+            cursor.execute(
+                """
+                INSERT INTO main.archive_partitions (table_name, year, file_name, row_count, archived_through)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (table_name, year) DO UPDATE SET
+                    row_count = excluded.row_count,
+                    archived_through = MAX(COALESCE(archived_through, ''), excluded.archived_through),
+                    updated_at = CURRENT_TIMESTAMP
+                """,
+                (table, year, file_name, remaining, hi if direction == "archive" else lo),
+            )
+        else:
+            cursor.execute("DELETE FROM main.archive_partitions WHERE table_name = ? AND year = ?", (table, year))
+        conn.commit()
+        return moved
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute(f"DETACH DATABASE {ARCHIVE_ALIAS}")
+
+
+def archive_transactions(db, before=None, user_id=None, progress=None):
+    """Move expenses/income dated before `before` (YYYY-MM-DD) into per-year files.
+
+    Returns {"expenses": n, "income": n, "years": [...]}. Each (table, year)
+    is moved in its own transaction; progress(table, year, rows) is called
+    after each.
+    """
+    before = str(before or default_cutoff())
+    os.makedirs(db.archive_dir(), exist_ok=True)
+    result = {"expenses": 0, "income": 0, "years": []}
+    conn = db.get_connection()
+    try:
+        for table in ARCHIVE_TABLES:
+            for year in _archive_years(conn.cursor(), table, before, user_id):
+                moved = _move_year(conn, db, table, year, before, user_id, "archive")
+                result[table] += moved
+                if year not in result["years"]:
+                    result["years"].append(year)
+                if progress:
+                    progress(table, year, moved)
+    finally:
+        conn.close()
+    result["years"].sort()
+    return result
+
+
+def restore_year(db, year, user_id=None):
+    """Move one archived year back into the live tables. Returns rows restored per table."""
+    restored = {}
+    conn = db.get_connection()
+    try:
+        for table in ARCHIVE_TABLES:
+            path = os.path.join(db.archive_dir(), archive_file_name(db, year))
+            if not os.path.exists(path):
+                restored[table] = 0
+                continue
+            restored[table] = _move_year(conn, db, table, int(year), f"{int(year) + 1}-01-01", user_id, "restore")
+    finally:
+        conn.close()
+    return restored
+
+
+def archive_status(db):
+    """Partition rows plus live/rollup counts, for the CLI and the GUI."""
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        live = {t: cursor.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ARCHIVE_TABLES}
+        rollups = cursor.execute("SELECT COUNT(*) FROM monthly_rollups").fetchone()[0]
+    finally:
+        conn.close()
+    return {"live": live, "rollups": rollups, "partitions": db.get_archive_partitions()}
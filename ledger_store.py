@@ -0,0 +1,134 @@
+"""Shared in-process copy of one user's expenses and income.
+
+Database publishes row-level changes ({table: {op: [ids]}}) after every
+commit that writes expenses/income. The store re-reads only those ids and
+hands subscribers (upserted rows, deleted ids), so an open table patches a
+few rows instead of reloading the ledger. Batches larger than
+LEDGER_RELOAD_ROWS (archiving, imports) reload the table instead and are
+delivered as (all rows, None).
+
+Changes committed on the Tk thread are applied immediately; ones committed
+on worker threads are queued and applied by the poll started with attach().
+"""
+import threading
+from collections import deque
+
+from config import LEDGER_POLL_MS, LEDGER_RELOAD_ROWS
+
+
+LEDGER_LOADERS = {"expenses": "get_expenses", "income": "get_income"}
+
+
+class LedgerStore:
+    def __init__(self, db, user_id):
+        self.db = db
+        self.user_id = user_id
+        self._rows = {}  # table -> {id: row}, loaded on first use
+        self._unordered = set()  # tables with inserts since the last (date desc) ordering
+        self._subscribers = {table: [] for table in LEDGER_LOADERS}
+        self._pending = deque()
+        self._widget = None
+        self._poll_id = None
+        db.add_row_listener(self._on_rows)
+
+    def seed(self, table, rows):
+        """Use rows already fetched (e.g. prefetched at login) as the table's contents."""
+        if table not in self._rows:
+            self._rows[table] = {row["id"]: row for row in rows}
+
+    def rows(self, table):
+        """Every row of table for this user, newest date first."""
+        cache = self._rows.get(table)
+        if cache is None:
+            loader = getattr(self.db, LEDGER_LOADERS[table])
+            cache = self._rows[table] = {row["id"]: row for row in loader(self.user_id)}
+        elif table in self._unordered:
+            ordered = sorted(cache.values(), key=lambda row: (str(row.get("date") or ""), row["id"]), reverse=True)
+            cache = self._rows[table] = {row["id"]: row for row in ordered}
+        self._unordered.discard(table)
+        return list(cache.values())
+
+    def subscribe(self, table, callback):
+        """callback(upserted_rows, deleted_ids) after each change; returns an unsubscribe function."""
+        self._subscribers[table].append(callback)
+
+        def unsubscribe():
+            if callback in self._subscribers[table]:
+                self._subscribers[table].remove(callback)
+        return unsubscribe
+
+    def attach(self, widget):
+        """Poll from widget's event loop for changes committed on other threads."""
+        self._widget = widget
+        self._schedule()
+
+    def close(self):
+        self.db.remove_row_listener(self._on_rows)
+        if self._poll_id is not None and self._widget is not None:
+            try:
+                self._widget.after_cancel(self._poll_id)
+            except Exception:
+                pass
+        self._poll_id = None
+
+    def reload(self, tables=None):
+        """Re-read loaded tables and hand subscribers (all rows, None), e.g. after a restore."""
+        for table in list(tables or self._rows):
+            if self._rows.pop(table, None) is not None:
+                self._notify(table, self.rows(table), None)
+
+    def _schedule(self):
+        try:
+            self._poll_id = self._widget.after(LEDGER_POLL_MS, self._poll)
+        except Exception:
+            self._poll_id = None
+
+    def _poll(self):
+        self.flush()
+        self._schedule()
+
+    def _on_rows(self, changes):
+        self._pending.append(changes)
+        if threading.current_thread() is threading.main_thread():
+            self.flush()
+
+    def flush(self):
+        """Apply queued row changes and notify subscribers (Tk thread only)."""
+        merged = {}
+        while self._pending:
+            for table, ops in self._pending.popleft().items():
+                if table not in LEDGER_LOADERS:
+                    continue
+                pending = merged.setdefault(table, {})
+                for op, ids in ops.items():
+                    for row_id in ids:
+                        pending[row_id] = "delete" if op == "delete" else "upsert"
+        for table, pending in merged.items():
+            self._apply(table, pending)
+
+    def _apply(self, table, pending):
+        cache = self._rows.get(table)
+        if cache is None:
+            return  # not loaded yet: the first rows() call reads current data
+        if len(pending) > LEDGER_RELOAD_ROWS:
+            self.reload([table])
+            return
+
+        deleted = [row_id for row_id, op in pending.items() if op == "delete" and row_id in cache]
+        for row_id in deleted:
+            del cache[row_id]
+        wanted = [row_id for row_id, op in pending.items() if op == "upsert"]
+        upserted = self.db.get_transactions_by_ids(table, self.user_id, wanted) if wanted else []
+        for row in upserted:
+            if row["id"] not in cache:
+                self._unordered.add(table)
+            cache[row["id"]] = row
+        if upserted or deleted:
+            self._notify(table, upserted, deleted)
+
+    def _notify(self, table, upserted, deleted):
+        for callback in list(self._subscribers[table]):
+            try:
+                callback(upserted, deleted)
+            except Exception:
+                pass
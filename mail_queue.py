@@ -0,0 +1,261 @@
+"""Persistent outbound mail queue with a pooled, retrying SMTP sender.
+
+Messages are serialized once into the mail_outbox table. A MailSender thread
+claims due messages in batches, sends them over a reused authenticated
+connection and reschedules failures with exponential backoff. Any SMTP
+server works for local testing, e.g. ``python -m aiosmtpd -n -l localhost:1025``
+with settings {"server": "localhost", "port": 1025, "security": "none"}.
+"""
+import random
+import smtplib
+import threading
+import time
+from email.utils import getaddresses
+
+from config import (
+    MAIL_BATCH_SIZE,
+    MAIL_CLAIM_LEASE_SECONDS,
+    MAIL_MAX_ATTEMPTS,
+    MAIL_POLL_SECONDS,
+    MAIL_RETRY_BASE_SECONDS,
+    SMTP_IDLE_SECONDS,
+    SMTP_TIMEOUT,
+)
+
+
+MAX_RETRY_DELAY = 3600
+
+
+def smtp_security(settings):
+    """'starttls', 'ssl' or 'none' (falls back to the legacy use_tls flag)."""
+    security = str(settings.get("security") or "").lower()
+    if security in ("starttls", "ssl", "none"):
+        return security
+    return "starttls" if settings.get("use_tls", True) else "ssl"
+
+
+def settings_ready(settings):
+    return bool(settings and settings.get("server") and settings.get("port"))
+
+
+def enqueue_message(db, msg, user_id=None):
+    """Serialize an EmailMessage into the outbox. Returns the outbox id."""
+    recipients = [
+        addr for _, addr in getaddresses(msg.get_all("To", []) + msg.get_all("Cc", []) + msg.get_all("Bcc", []))
+        if addr
+    ]
+    if not recipients:
+        raise ValueError("Message has no recipients")
+    del msg["Bcc"]
+    sender = getaddresses([msg.get("From", "")])[0][1]
+    return db.enqueue_mail(msg.as_bytes(), recipients, sender, msg.get("Subject", ""), user_id)
+
+
+class SMTPConnectionPool:
+    """Keep one authenticated SMTP connection and reuse it between batches."""
+
+    def __init__(self, timeout=SMTP_TIMEOUT, idle_seconds=SMTP_IDLE_SECONDS):
+        self.timeout = timeout
+        self.idle_seconds = idle_seconds
+        self._conn = None
+        self._key = None
+        self._last_used = 0.0
+
+    @staticmethod
+    def _settings_key(settings):
+        return (
+            settings.get("server"),
+            int(settings.get("port") or 0),
+            settings.get("username"),
+            settings.get("password"),
+            smtp_security(settings),
+        )
+
+    def _open(self, settings):
+        host, port = settings["server"], int(settings["port"])
+        if smtp_security(settings) == "ssl":
+            conn = smtplib.SMTP_SSL(host, port, timeout=self.timeout)
+        else:
+            conn = smtplib.SMTP(host, port, timeout=self.timeout)
+            conn.ehlo()
+            if smtp_security(settings) == "starttls":
+                conn.starttls()
+                conn.ehlo()
+        if settings.get("username") and settings.get("password"):
+            conn.login(settings["username"], settings["password"])
+        return conn
+
+    def get(self, settings):
+        key = self._settings_key(settings)
+        if self._conn is not None and key == self._key:
+            if time.monotonic() - self._last_used < self.idle_seconds:
+                try:
+                    if self._conn.noop()[0] == 250:
+                        return self._conn
+                except (smtplib.SMTPException, OSError):
+                    pass
+        self.close()
+        self._conn = self._open(settings)
+        self._key = key
+        self.touch()
+        return self._conn
+
+    def touch(self):
+        self._last_used = time.monotonic()
+
+    def close(self):
+        if self._conn is not None:
+            try:
+                self._conn.quit()
+            except Exception:
+                pass
+        self._conn = None
+        self._key = None
+
+
+def _is_permanent(error):
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return True
+    code = getattr(error, "smtp_code", None)
+    return isinstance(error, smtplib.SMTPResponseException) and code is not None and 500 <= code < 600 \
+        and not isinstance(error, smtplib.SMTPAuthenticationError)
+
+
+class MailSender:
+    """Background thread that drains the mail_outbox table."""
+
+    def __init__(self, db, settings_provider, batch_size=MAIL_BATCH_SIZE, poll_seconds=MAIL_POLL_SECONDS,
+                 max_attempts=MAIL_MAX_ATTEMPTS, retry_base=MAIL_RETRY_BASE_SECONDS, pool=None, user_id=None):
+        self.db = db
+        self.user_id = user_id  # only send this user's mail (None = everyone's)
+        self.settings_provider = settings_provider
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.pool = pool or SMTPConnectionPool()
+        self.last_error = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._progress = threading.Condition()
+        self._thread = None
+
+    # ---- queue API ----
+    def submit(self, msg, user_id=None):
+        """Queue a message and wake the sender. Returns the outbox id."""
+        mail_id = enqueue_message(self.db, msg, user_id)
+        self.wake()
+        return mail_id
+
+    def wake(self):
+        self._wake.set()
+
+    def wait_for(self, mail_id, timeout=SMTP_TIMEOUT * 2):
+        """Block until mail_id was sent, failed or attempted once. Returns its outbox row."""
+        deadline = time.monotonic() + timeout
+        with self._progress:
+            while True:
+                row = self.db.get_mail(mail_id)
+                if row is None or row["status"] in ("sent", "failed") or row["attempts"] > 0:
+                    return row
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return row
+                self._progress.wait(min(remaining, 1.0))
+
+    # ---- sending ----
+    def retry_delay(self, attempts):
+        delay = min(MAX_RETRY_DELAY, self.retry_base * (2 ** max(attempts - 1, 0)))
+        return delay * random.uniform(0.8, 1.2)
+
+    def _record_failure(self, row, error):
+        attempts = row["attempts"] + 1
+        if _is_permanent(error) or attempts >= self.max_attempts:
+            self.db.mark_mail_attempt_failed(row["id"], error)
+            return "failed"
+        self.db.mark_mail_attempt_failed(row["id"], error, time.time() + self.retry_delay(attempts))
+        return "retry"
+
+    def _send(self, settings, row):
+        recipients = [r.strip() for r in (row["recipients"] or "").split(",") if r.strip()]
+        payload = bytes(row["message"])
+        try:
+            conn = self.pool.get(settings)
+            conn.sendmail(row["sender"], recipients, payload)
+        except smtplib.SMTPServerDisconnected:
+            # Pooled connection went stale between noop and send; reconnect once
+            self.pool.close()
+            conn = self.pool.get(settings)
+            conn.sendmail(row["sender"], recipients, payload)
+        self.pool.touch()
+
+    def _notify(self):
+        with self._progress:
+            self._progress.notify_all()
+
+    def drain_once(self):
+        """Send one batch of due messages. Returns counts of sent/retry/failed."""
+        counts = {"sent": 0, "retry": 0, "failed": 0}
+        settings = self.settings_provider() or {}
+        if not settings_ready(settings):
+            return counts
+
+        rows = self.db.claim_due_mail(time.time(), self.batch_size, self.user_id)
+        for index, row in enumerate(rows):
+            if self._stop.is_set():
+                self.db.release_mail([r["id"] for r in rows[index:]])
+                break
+            try:
+                self._send(settings, row)
+                self.db.mark_mail_sent(row["id"])
+                counts["sent"] += 1
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                counts[self._record_failure(row, e)] += 1
+                if isinstance(e, (smtplib.SMTPAuthenticationError, smtplib.SMTPConnectError, OSError)):
+                    # The server is unusable right now; leave the rest for the next cycle
+                    self.pool.close()
+                    self.db.release_mail([r["id"] for r in rows[index + 1:]])
+                    self._notify()
+                    break
+            self._notify()
+        return counts
+
+    def drain(self):
+        """Send until nothing is due (for headless runs). Returns total counts."""
+        totals = {"sent": 0, "retry": 0, "failed": 0}
+        while True:
+            counts = self.drain_once()
+            for key, value in counts.items():
+                totals[key] += value
+            if counts["sent"] == 0:
+                break
+        self.pool.close()
+        return totals
+
+    # ---- thread ----
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                counts = self.drain_once()
+            except Exception as e:
+                self.last_error = str(e)
+                counts = {}
+            if sum(counts.values()) >= self.batch_size:
+                continue
+            self._wake.wait(self.poll_seconds)
+            self._wake.clear()
+        self.pool.close()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self.db.requeue_stuck_mail(self.user_id, time.time() - MAIL_CLAIM_LEASE_SECONDS)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ogca-mail-sender", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
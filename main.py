@@ -1,8 +1,9 @@
 """Main Application Entry Point"""
+import multiprocessing
 import tkinter as tk
-from config import WINDOW_WIDTH, WINDOW_HEIGHT, COLORS
+from config import WINDOW_WIDTH, WINDOW_HEIGHT, COLORS, AUTO_BACKUP_ENABLED
 from auth_ui import AuthenticationUI
-from expense_tracker import ExpenseTrackerUI
+from startup import DashboardPrefetcher
 
 
 class ExpenseTrackerApp:
@@ -12,6 +13,9 @@ class ExpenseTrackerApp:
         self.root.geometry(f"{WINDOW_WIDTH}x{WINDOW_HEIGHT}")
         self.root.minsize(1000, 600)
         self.root.config(bg=COLORS["background"])
+        self.prefetcher = DashboardPrefetcher()
+        self.backup_scheduler = None
+        self.report_scheduler = None
         
         # Center window on screen
         self.center_window()
@@ -38,10 +42,14 @@ class ExpenseTrackerApp:
         auth_frame = tk.Frame(self.root, bg=COLORS["background"])
         auth_frame.pack(fill=tk.BOTH, expand=True)
         
-        auth_ui = AuthenticationUI(auth_frame, self.on_login_success)
+        auth_ui = AuthenticationUI(auth_frame, self.on_login_success, prefetcher=self.prefetcher)
+        # Load the main UI module in the background once the login screen is up
+        self.root.after(200, self.prefetcher.warm_imports)
 
     def on_login_success(self, user_data):
         """Handle successful login"""
+        from expense_tracker import ExpenseTrackerUI
+
         # Clear root
         for widget in self.root.winfo_children():
             widget.destroy()
@@ -50,8 +58,36 @@ class ExpenseTrackerApp:
         tracker_frame = tk.Frame(self.root, bg=COLORS["background"])
         tracker_frame.pack(fill=tk.BOTH, expand=True)
         
-        expense_tracker = ExpenseTrackerUI(tracker_frame, user_data)
+        expense_tracker = ExpenseTrackerUI(
+            tracker_frame,
+            user_data,
+            prefetched=self.prefetcher.take(user_data.get("id")),
+        )
         self.show_welcome_popup(user_data)
+        self.start_backup_scheduler()
+        self.start_report_scheduler(user_data.get("id"), expense_tracker)
+
+    def start_backup_scheduler(self):
+        """Start periodic online backups (once per app session)."""
+        if not AUTO_BACKUP_ENABLED or self.backup_scheduler is not None:
+            return
+        from backup_manager import BackupScheduler
+
+        self.backup_scheduler = BackupScheduler(db_path=self.prefetcher.db.db_path)
+        self.backup_scheduler.start()
+
+    def start_report_scheduler(self, user_id, expense_tracker):
+        """Queue the logged-in user's due scheduled reports periodically."""
+        from report_scheduler import ReportScheduler
+
+        if self.report_scheduler is not None:
+            self.report_scheduler.stop()
+        self.report_scheduler = ReportScheduler(
+            db_path=self.prefetcher.db.db_path,
+            user_ids=[user_id],
+            on_run=expense_tracker.on_scheduled_reports,
+        )
+        self.report_scheduler.start()
 
     def show_welcome_popup(self, user_data):
         """Display a polished welcome popup after login."""
@@ -94,5 +130,7 @@ class ExpenseTrackerApp:
 
 
 if __name__ == "__main__":
+    # Batch statements use a process pool; required for frozen Windows builds
+    multiprocessing.freeze_support()
     app = ExpenseTrackerApp()
     app.run()
@@ -0,0 +1,671 @@
+"""Versioned schema migrations driven by ``PRAGMA user_version``.
+
+Database() calls migrate(), which reads the version once and returns when it
+is current, so constructing a Database costs one PRAGMA read. Pending steps
+run in order, each in its own BEGIN IMMEDIATE transaction that also bumps
+user_version, so a crash leaves the schema at the last completed step.
+Backfill steps commit in batches and select only rows that still need work,
+so an interrupted backfill resumes where it stopped on the next start.
+
+Databases created before versioning report user_version 0; every step is
+idempotent (IF NOT EXISTS, column checks), so they upgrade the same way.
+To change the schema, append a step to MIGRATIONS - never edit a shipped one.
+"""
+import os
+import sqlite3
+
+# Cost used by every hash written before per-user parameters were stored
+LEGACY_HASH_ALGORITHM = "sha256"
+LEGACY_HASH_ITERATIONS = 100000
+BACKFILL_BATCH = 500
+
+
+def _columns(cursor, table):
+    return {col[1] for col in cursor.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _add_columns(cursor, table, columns):
+    """ALTER TABLE ... ADD COLUMN for each (name, declaration) not there yet."""
+    have = _columns(cursor, table)
+    for name, declaration in columns:
+        if name not in have:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+
+
+def _create_base_tables(cursor):
+    # Users table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            salt TEXT NOT NULL,
+            full_name TEXT,
+            phone TEXT,
+            address TEXT,
+            city TEXT,
+            state TEXT,
+            zip_code TEXT,
+            e_signature BLOB,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Expenses table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            date DATE NOT NULL,
+            payment_method TEXT,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Income table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS income (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            source TEXT NOT NULL,
+            amount REAL NOT NULL,
+            description TEXT,
+            date DATE NOT NULL,
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Budget table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS budgets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            category TEXT NOT NULL,
+            limit_amount REAL NOT NULL,
+            month INTEGER NOT NULL,
+            year INTEGER NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Recurring bills table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS recurring_bills (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            category TEXT NOT NULL,
+            amount REAL NOT NULL,
+            frequency TEXT NOT NULL,
+            start_date DATE NOT NULL,
+            next_due_date DATE NOT NULL,
+            payment_method TEXT,
+            description TEXT,
+            is_active INTEGER DEFAULT 1,
+            last_run_at TIMESTAMP,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Categories table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            type TEXT NOT NULL,
+            color TEXT,
+            icon TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            UNIQUE(user_id, name)
+        )
+    ''')
+
+    # Managed Accounts (People Accounts)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS managed_accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            account_name TEXT NOT NULL,
+            account_type TEXT,
+            email TEXT,
+            phone TEXT,
+            address TEXT,
+            city TEXT,
+            notes TEXT,
+            color TEXT,
+            icon TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            UNIQUE(user_id, account_name)
+        )
+    ''')
+
+    # Transaction archive
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS transaction_archive (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            transaction_type TEXT NOT NULL,
+            transaction_id INTEGER NOT NULL,
+            data TEXT NOT NULL,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Trash bin for recoverable deletes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS trash_bin (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            item_type TEXT NOT NULL,
+            item_data TEXT NOT NULL,
+            deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Subscriptions center
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS subscriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            amount REAL NOT NULL,
+            billing_cycle TEXT NOT NULL,
+            next_billing_date DATE NOT NULL,
+            category TEXT DEFAULT 'Utilities',
+            status TEXT DEFAULT 'active',
+            notes TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Report designer preferences
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_design_settings (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER UNIQUE NOT NULL,
+            brand_name TEXT,
+            primary_color TEXT,
+            footer_note TEXT,
+            layout_mode TEXT DEFAULT 'standard',
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Statement import rules (merchant keyword -> category/account mapping)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS import_rules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            keyword TEXT NOT NULL,
+            category TEXT NOT NULL,
+            account_name TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Financial goals tracker
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS financial_goals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            target_amount REAL NOT NULL,
+            current_amount REAL DEFAULT 0,
+            due_date DATE,
+            category TEXT DEFAULT 'General',
+            notes TEXT,
+            status TEXT DEFAULT 'active',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # In-app notification center
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notifications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            message TEXT NOT NULL,
+            severity TEXT DEFAULT 'info',
+            is_read INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Quick notes workspace
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quick_notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            body TEXT DEFAULT '',
+            color_tag TEXT DEFAULT 'blue',
+            is_pinned INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Reminders planner
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS reminders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            due_date DATE NOT NULL,
+            priority TEXT DEFAULT 'medium',
+            note TEXT DEFAULT '',
+            is_done INTEGER DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+
+
+def _add_account_and_hash_columns(cursor):
+    _add_columns(cursor, "expenses", [
+        ("account_id", "INTEGER DEFAULT NULL"),
+        ("attachment_path", "TEXT DEFAULT NULL"),
+    ])
+    _add_columns(cursor, "income", [("account_id", "INTEGER DEFAULT NULL")])
+    # Store password hashing cost with each user (legacy rows keep the old defaults)
+    _add_columns(cursor, "users", [
+        ("hash_algorithm", f"TEXT DEFAULT '{LEGACY_HASH_ALGORITHM}'"),
+        ("hash_iterations", f"INTEGER DEFAULT {LEGACY_HASH_ITERATIONS}"),
+    ])
+
+
+def _create_mail_outbox(cursor):
+    # Outbound mail queue (drained by mail_queue.MailSender)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mail_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            sender TEXT,
+            recipients TEXT NOT NULL,
+            subject TEXT,
+            message BLOB NOT NULL,
+            status TEXT DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            last_error TEXT,
+            next_attempt_at REAL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_at TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_mail_outbox_due ON mail_outbox(status, next_attempt_at)'
+    )
+
+
+def _create_report_schedules(cursor):
+    # Recurring report deliveries (see report_scheduler.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS report_schedules (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            account_id INTEGER,
+            report_kind TEXT DEFAULT 'expense',
+            period TEXT DEFAULT 'Month',
+            frequency TEXT DEFAULT 'monthly',
+            recipients TEXT NOT NULL,
+            sender TEXT,
+            next_run_date DATE NOT NULL,
+            last_run_at TIMESTAMP,
+            last_status TEXT,
+            is_active INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
+            FOREIGN KEY (account_id) REFERENCES managed_accounts(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_report_schedules_due ON report_schedules(is_active, next_run_date)'
+    )
+
+
+def _add_notification_fingerprint(cursor):
+    # Generated alerts carry a fingerprint (kind:subject:period) so each fires once
+    _add_columns(cursor, "notifications", [("fingerprint", "TEXT DEFAULT NULL")])
+    cursor.execute(
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_notifications_fingerprint ON notifications(user_id, fingerprint)'
+    )
+
+
+NOTIFICATION_COUNTER_TRIGGERS = (
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_notifications_count_insert
+    AFTER INSERT ON notifications
+    BEGIN
+        INSERT OR IGNORE INTO notification_counters (user_id) VALUES (NEW.user_id);
+        UPDATE notification_counters
+        SET total = total + 1, unread = unread + (NEW.is_read = 0)
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_notifications_count_delete
+    AFTER DELETE ON notifications
+    BEGIN
+        UPDATE notification_counters
+        SET total = total - 1, unread = unread - (OLD.is_read = 0)
+        WHERE user_id = OLD.user_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_notifications_count_read
+    AFTER UPDATE OF is_read ON notifications
+    WHEN (OLD.is_read = 0) != (NEW.is_read = 0)
+    BEGIN
+        UPDATE notification_counters
+        SET unread = unread + (NEW.is_read = 0) - (OLD.is_read = 0)
+        WHERE user_id = NEW.user_id;
+    END
+    ''',
+)
+
+
+def _notification_retention(cursor):
+    # Archive table, list/retention indexes and per-user counters kept
+    # current by triggers (O(1) unread badge)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_archive (
+            id INTEGER PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            message TEXT NOT NULL,
+            severity TEXT,
+            is_read INTEGER,
+            fingerprint TEXT,
+            created_at TIMESTAMP,
+            archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_notifications_user_created ON notifications(user_id, created_at)'
+    )
+    cursor.execute(
+        'CREATE INDEX IF NOT EXISTS idx_notifications_read_created ON notifications(is_read, created_at)'
+    )
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_counters (
+            user_id INTEGER PRIMARY KEY,
+            unread INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    # Seed users that have no counter row yet (existing rows are kept by the triggers)
+    cursor.execute('''
+        INSERT OR IGNORE INTO notification_counters (user_id, unread, total)
+        SELECT user_id, SUM(CASE WHEN is_read = 0 THEN 1 ELSE 0 END), COUNT(*)
+        FROM notifications GROUP BY user_id
+    ''')
+    for trigger in NOTIFICATION_COUNTER_TRIGGERS:
+        cursor.execute(trigger)
+
+
+def _add_trash_columns(cursor):
+    # Typed trash_bin columns so the list view does not parse item_data
+    _add_columns(cursor, "trash_bin", [
+        ("amount", "REAL DEFAULT NULL"),
+        ("date", "TEXT DEFAULT NULL"),
+        ("category", "TEXT DEFAULT NULL"),  # expense category, or income source
+    ])
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_trash_bin_user_deleted ON trash_bin(user_id, deleted_at)')
+
+
+def _backfill_trash_columns(conn, batch_size=BACKFILL_BATCH):
+    """Fill the typed trash_bin columns from item_data, one batch per transaction."""
+    from database import Database
+
+    last_id = 0
+    while True:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                'SELECT id, item_type, item_data FROM trash_bin WHERE category IS NULL AND id > ? ORDER BY id LIMIT ?',
+                (last_id, batch_size),
+            ).fetchall()
+            conn.executemany(
+                'UPDATE trash_bin SET amount = ?, date = ?, category = ? WHERE id = ?',
+                [Database._trash_columns(item_type, data) + (trash_id,) for trash_id, item_type, data in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1][0]
+
+
+def _create_ledger_archive_tables(cursor):
+    # Cold storage: old expenses/income live in per-year archive files
+    # (see ledger_archive.py); their monthly totals stay here
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_rollups (
+            user_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            month TEXT NOT NULL,
+            category TEXT NOT NULL DEFAULT '',
+            account_id INTEGER NOT NULL DEFAULT 0,
+            total REAL NOT NULL DEFAULT 0,
+            tx_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, kind, month, category, account_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS archive_partitions (
+            table_name TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            file_name TEXT NOT NULL,
+            row_count INTEGER DEFAULT 0,
+            archived_through DATE,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (table_name, year)
+        )
+    ''')
+
+
+def _add_account_indexes(cursor):
+    # Per-account summaries and statements filter and group by account
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_account ON expenses(user_id, account_id, date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_income_user_account ON income(user_id, account_id, date)')
+
+
+def _add_date_indexes(cursor):
+    # Transaction lists load newest-first; let ORDER BY date walk an index
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_expenses_user_date ON expenses(user_id, date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_income_user_date ON income(user_id, date)')
+
+
+def _create_daily_net(cursor):
+    # Net flow per (user, account, day), kept current by triggers so balance
+    # indexes read one row per active day instead of every transaction.
+    # Archiving keeps the days it moves out (see ledger_archive._move_year).
+    # account_id 0 is personal (no managed account), as in monthly_rollups.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_net (
+            user_id INTEGER NOT NULL,
+            account_id INTEGER NOT NULL DEFAULT 0,
+            day TEXT NOT NULL,
+            net REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, account_id, day)
+        ) WITHOUT ROWID
+    ''')
+
+    def upsert(row, sign):
+        return (
+            f"INSERT INTO daily_net (user_id, account_id, day, net) "
+            f"VALUES ({row}.user_id, COALESCE({row}.account_id, 0), COALESCE(date({row}.date), {row}.date), {sign}{row}.amount) "
+            f"ON CONFLICT (user_id, account_id, day) DO UPDATE SET net = net + excluded.net;"
+        )
+
+    for table, sign, negate in (("income", "", "-"), ("expenses", "-", "")):
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS daily_net_{table}_insert AFTER INSERT ON {table} "
+                       f"BEGIN {upsert('NEW', sign)} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS daily_net_{table}_delete AFTER DELETE ON {table} "
+                       f"BEGIN {upsert('OLD', negate)} END")
+        cursor.execute(f"CREATE TRIGGER IF NOT EXISTS daily_net_{table}_update "
+                       f"AFTER UPDATE OF user_id, account_id, date, amount ON {table} "
+                       f"BEGIN {upsert('OLD', negate)} {upsert('NEW', sign)} END")
+    cursor.execute('''
+        INSERT OR REPLACE INTO daily_net (user_id, account_id, day, net)
+        SELECT user_id, account_id, day, SUM(net) FROM (
+            SELECT user_id, COALESCE(account_id, 0) AS account_id, COALESCE(date(date), date) AS day, amount AS net FROM income
+            UNION ALL
+            SELECT user_id, COALESCE(account_id, 0), COALESCE(date(date), date), -amount FROM expenses
+        )
+        GROUP BY user_id, account_id, day
+    ''')
+
+
+def _backfill_archived_daily_net(conn):
+    """Add rows already moved to archive files (ledger_archive.py) to daily_net.
+
+    Each archive year is recounted from its live and archived rows in its own
+    transaction, so re-running after an interruption gives the same totals.
+    """
+    from config import ARCHIVE_DIR_NAME
+
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    archive_dir = os.path.join(os.path.dirname(os.path.abspath(db_path)), ARCHIVE_DIR_NAME)
+    partitions = conn.execute("SELECT DISTINCT year, file_name FROM archive_partitions ORDER BY year").fetchall()
+    for year, file_name in partitions:
+        path = os.path.join(archive_dir, file_name)
+        if not os.path.exists(path):
+            continue
+        conn.execute("ATTACH DATABASE ? AS cold", (path,))
+        try:
+            cold = {row[0] for row in conn.execute("SELECT name FROM cold.sqlite_master WHERE type = 'table'")}
+            lo, hi = f"{int(year)}-01-01", f"{int(year) + 1}-01-01"
+            flows = []
+            for table, sign in (("income", ""), ("expenses", "-")):
+                for schema in ("main", "cold") if table in cold else ("main",):
+                    flows.append(
+                        f"SELECT user_id, COALESCE(account_id, 0) AS account_id, COALESCE(date(date), date) AS day, "
+                        f"{sign}amount AS net FROM {schema}.{table} WHERE date >= '{lo}' AND date < '{hi}'"
+                    )
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM main.daily_net WHERE day >= ? AND day < ?", (lo, hi))
+                conn.execute(
+                    f"INSERT INTO main.daily_net (user_id, account_id, day, net) "
+                    f"SELECT user_id, account_id, day, SUM(net) FROM ({' UNION ALL '.join(flows)}) "
+                    f"GROUP BY user_id, account_id, day"
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.execute("DETACH DATABASE cold")
+
+
+def _add_schedule_anchor_day(cursor):
+    # Day of month monthly/quarterly/yearly schedules run on, so a run clamped
+    # to a short month (31st -> 28 Feb) returns to the 31st afterwards
+    _add_columns(cursor, "report_schedules", [("anchor_day", "INTEGER")])
+    cursor.execute(
+        "UPDATE report_schedules SET anchor_day = CAST(strftime('%d', next_run_date) AS INTEGER) "
+        "WHERE anchor_day IS NULL"
+    )
+
+
+def _add_mail_claimed_at(cursor):
+    # When a sender claimed a message, so only stale claims are requeued
+    _add_columns(cursor, "mail_outbox", [("claimed_at", "REAL")])
+
+
+# (version, description, step, batched). Plain steps get a cursor inside the
+# migration transaction; batched steps get the connection and commit themselves.
+MIGRATIONS = [
+    (1, "base tables", _create_base_tables, False),
+    (2, "account, attachment and password-cost columns", _add_account_and_hash_columns, False),
+    (3, "mail outbox", _create_mail_outbox, False),
+    (4, "report schedules", _create_report_schedules, False),
+    (5, "notification fingerprints", _add_notification_fingerprint, False),
+    (6, "notification archive and counters", _notification_retention, False),
+    (7, "typed trash_bin columns", _add_trash_columns, False),
+    (8, "backfill typed trash_bin columns", _backfill_trash_columns, True),
+    (9, "ledger archive rollups", _create_ledger_archive_tables, False),
+    (10, "expense/income account indexes", _add_account_indexes, False),
+    (11, "expense/income date indexes", _add_date_indexes, False),
+    (12, "daily net flow table", _create_daily_net, False),
+    (13, "archived days in daily_net", _backfill_archived_daily_net, True),
+    (14, "report schedule anchor day", _add_schedule_anchor_day, False),
+    (15, "mail claim timestamps", _add_mail_claimed_at, False),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(db_path, target=SCHEMA_VERSION, progress=None):
+    """Apply pending migrations up to target. Returns the versions applied."""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        if schema_version(conn) >= target:
+            return []
+        applied = []
+        for version, description, step, batched in MIGRATIONS:
+            if version > target:
+                break
+            if batched:
+                if schema_version(conn) >= version:
+                    continue
+                step(conn)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Re-check under the write lock: another process may have migrated
+                if schema_version(conn) >= version:
+                    conn.execute("ROLLBACK")
+                    continue
+                if not batched:
+                    step(conn.cursor())
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(version)
+            if progress:
+                progress(version, description)
+        return applied
+    finally:
+        conn.close()
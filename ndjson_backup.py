@@ -0,0 +1,305 @@
+"""Streaming line-delimited JSON (NDJSON) backups of one user's data.
+
+File layout, one JSON object per line:
+
+    {"type": "header", "format": "ogca-ndjson", "version": 1, ...}
+    {"type": "row", "table": "managed_accounts", "row": {...}}
+    ...
+    {"type": "footer", "counts": {"expenses": 1200, ...}}
+
+Rows are read with fetchmany() and written one line at a time, and imports
+insert in executemany() batches, so memory use does not grow with file
+size. Paths ending in .gz are transparently compressed. Archived expenses and
+income are exported with the live rows and come back as live rows on import.
+"""
+import base64
+import gzip
+import json
+from datetime import datetime
+
+from ledger_archive import ARCHIVE_TABLES
+
+
+BACKUP_FORMAT = "ogca-ndjson"
+BACKUP_VERSION = 1
+FETCH_SIZE = 500
+BATCH_SIZE = 1000
+
+# Export/import order matters: accounts come first so account_id references
+# in later tables can be remapped to the ids they receive on import.
+BACKUP_TABLES = (
+    "managed_accounts",
+    "categories",
+    "expenses",
+    "income",
+    "budgets",
+    "recurring_bills",
+    "subscriptions",
+    "financial_goals",
+    "import_rules",
+    "report_design_settings",
+    "quick_notes",
+    "reminders",
+    "notifications",
+    "report_schedules",
+    "trash_bin",
+    "transaction_archive",
+)
+
+ACCOUNT_REF_TABLES = ("expenses", "income", "report_schedules")
+# Tables with a per-user unique key: existing rows win on import
+IGNORE_DUPLICATE_TABLES = ("managed_accounts", "categories", "report_design_settings", "notifications")
+PROFILE_EXCLUDE = ("password_hash", "salt", "hash_algorithm", "hash_iterations")
+
+
+def _open(path, mode):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8", newline="\n")
+
+
+def _encode_value(value):
+    if isinstance(value, (bytes, memoryview)):
+        return {"$b64": base64.b64encode(bytes(value)).decode("ascii")}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "$b64" in value:
+        return base64.b64decode(value["$b64"])
+    return value
+
+
+def _table_columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [col[1] for col in cursor.fetchall()]
+
+
+def iter_backup_records(db, user_id, tables=BACKUP_TABLES):
+    """Yield header, row and footer records for user_id, streaming from SQLite."""
+    user = db.get_user(user_id) or {}
+    yield {
+        "type": "header",
+        "format": BACKUP_FORMAT,
+        "version": BACKUP_VERSION,
+        "app": "OG CA",
+        "generated_at": datetime.now().isoformat(),
+        "user_id": user_id,
+        "user": {k: _encode_value(v) for k, v in user.items() if k not in PROFILE_EXCLUDE},
+        "tables": list(tables),
+    }
+
+    counts = {}
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        existing = {r[0] for r in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in tables:
+            if table not in existing:
+                continue
+            counts[table] = 0
+            source = db._ledger_source(conn, table, include_archived=True) if table in ARCHIVE_TABLES else table
+            cursor.execute(f"SELECT * FROM {source} WHERE user_id = ? ORDER BY id", (user_id,))
+            names = [d[0] for d in cursor.description]
+            while True:
+                batch = cursor.fetchmany(FETCH_SIZE)
+                if not batch:
+                    break
+                for row in batch:
+                    counts[table] += 1
+                    yield {
+                        "type": "row",
+                        "table": table,
+                        "row": {k: _encode_value(v) for k, v in zip(names, row) if k != "user_id"},
+                    }
+    finally:
+        conn.close()
+
+    yield {"type": "footer", "counts": counts}
+
+
+def export_backup(db, user_id, path, progress=None):
+    """Write an NDJSON backup to path. Returns per-table row counts."""
+    counts = {}
+    written = 0
+    with _open(path, "w") as f:
+        for record in iter_backup_records(db, user_id):
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str))
+            f.write("\n")
+            if record["type"] == "row":
+                written += 1
+                if progress and written % BATCH_SIZE == 0:
+                    progress(written)
+            elif record["type"] == "footer":
+                counts = record["counts"]
+    if progress:
+        progress(written)
+    return counts
+
+
+def iter_records(path):
+    """Yield decoded records from an NDJSON backup, validating the header."""
+    with _open(path, "r") as f:
+        first = True
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if first:
+                if record.get("type") != "header" or record.get("format") != BACKUP_FORMAT:
+                    raise ValueError("Not an OG CA NDJSON backup (missing header)")
+                if int(record.get("version", 0)) > BACKUP_VERSION:
+                    raise ValueError(f"Backup version {record.get('version')} is newer than supported")
+                first = False
+            yield record
+        if first:
+            raise ValueError("Backup file is empty")
+
+
+class _BatchWriter:
+    """Buffer rows per table and flush them with executemany()."""
+
+    def __init__(self, cursor, user_id, batch_size):
+        self.cursor = cursor
+        self.user_id = user_id
+        self.batch_size = batch_size
+        self.columns = {}
+        self.account_map = {}
+        self.table = None
+        self.pending = []
+        self.counts = {}
+
+    def _insert_sql(self, table, cols):
+        verb = "INSERT OR IGNORE" if table in IGNORE_DUPLICATE_TABLES else "INSERT"
+        placeholders = ", ".join("?" for _ in cols)
+        return f"{verb} INTO {table} (user_id, {', '.join(cols)}) VALUES (?, {placeholders})"
+
+    def _target_columns(self, table):
+        if table not in self.columns:
+            self.columns[table] = [c for c in _table_columns(self.cursor, table) if c not in ("id", "user_id")]
+        return self.columns[table]
+
+    def add(self, table, row):
+        if table not in BACKUP_TABLES:
+            return
+        if table != self.table:
+            self.flush()
+            self.table = table
+        if table == "managed_accounts":
+            self._add_account(row)
+            return
+        if table in ACCOUNT_REF_TABLES and row.get("account_id") is not None:
+            row["account_id"] = self.account_map.get(row["account_id"])
+        self.pending.append(row)
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def _add_account(self, row):
+        # Accounts are few; insert one by one to learn their new ids
+        cols = [c for c in self._target_columns("managed_accounts") if c in row]
+        self.cursor.execute(
+            self._insert_sql("managed_accounts", cols),
+            [self.user_id] + [_decode_value(row[c]) for c in cols],
+        )
+        if self.cursor.rowcount:
+            new_id = self.cursor.lastrowid
+            self.counts["managed_accounts"] = self.counts.get("managed_accounts", 0) + 1
+        else:
+            self.cursor.execute(
+                "SELECT id FROM managed_accounts WHERE user_id = ? AND account_name = ?",
+                (self.user_id, row.get("account_name")),
+            )
+            found = self.cursor.fetchone()
+            new_id = found[0] if found else None
+        if row.get("id") is not None:
+            self.account_map[row["id"]] = new_id
+
+    def flush(self):
+        if not self.pending:
+            return
+        table = self.table
+        cols = [c for c in self._target_columns(table) if c in self.pending[0]]
+        self.cursor.executemany(
+            self._insert_sql(table, cols),
+            ([self.user_id] + [_decode_value(r.get(c)) for c in cols] for r in self.pending),
+        )
+        self.counts[table] = self.counts.get(table, 0) + max(self.cursor.rowcount, 0)
+        self.pending = []
+
+
+def import_backup(db, user_id, path, batch_size=BATCH_SIZE, progress=None):
+    """Stream an NDJSON backup into user_id's data in one transaction.
+
+    Returns per-table counts of inserted rows. Nothing is written if the
+    file is malformed or truncated (no footer).
+    """
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        writer = _BatchWriter(cursor, user_id, batch_size)
+        seen = 0
+        complete = False
+        for record in iter_records(path):
+            kind = record.get("type")
+            if kind == "row":
+                writer.add(record.get("table"), dict(record.get("row") or {}))
+                seen += 1
+                if progress and seen % batch_size == 0:
+                    progress(seen)
+            elif kind == "footer":
+                complete = True
+        if not complete:
+            raise ValueError("Backup file is truncated (missing footer)")
+        writer.flush()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    if progress:
+        progress(seen)
+    return writer.counts
+
+
+def import_legacy_json(db, user_id, path, batch_size=BATCH_SIZE):
+    """Import an old whole-document .json backup (expenses and income only)."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    today = str(datetime.now().date())
+    conn = db.get_connection()
+    try:
+        cursor = conn.cursor()
+        writer = _BatchWriter(cursor, user_id, batch_size)
+        # Old files carry raw account ids; keep only those owned by this user
+        cursor.execute("SELECT id FROM managed_accounts WHERE user_id = ?", (user_id,))
+        writer.account_map = {r[0]: r[0] for r in cursor.fetchall()}
+        for exp in data.get("expenses", []):
+            writer.add("expenses", {
+                "category": exp.get("category", "Other"),
+                "amount": float(exp.get("amount", 0)),
+                "date": exp.get("date", today),
+                "description": exp.get("description", ""),
+                "payment_method": exp.get("payment_method", ""),
+                "notes": exp.get("notes", ""),
+                "account_id": exp.get("account_id"),
+            })
+        for inc in data.get("income", []):
+            writer.add("income", {
+                "source": inc.get("source", "Other"),
+                "amount": float(inc.get("amount", 0)),
+                "date": inc.get("date", today),
+                "description": inc.get("description", ""),
+                "notes": inc.get("notes", ""),
+                "account_id": inc.get("account_id"),
+            })
+        writer.flush()
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+    return writer.counts
@@ -0,0 +1,3 @@
+@echo off
+REM OG CA headless batch jobs (recurring bills, reports, exports, backups)
+python "%~dp0ogca.py" %*
@@ -0,0 +1,810 @@
+"""Headless command-line entry point for OG CA batch jobs.
+
+Runs server-side work (statement import, exports, PDF reports, recurring
+bill posting, backups and benchmarks) without importing tkinter.
+
+Examples:
+    python ogca.py recurring --all-users --workers 4
+    python ogca.py report --user admin --kind expense --period Month --out reports
+    python ogca.py statements --all-users --period Month --workers 4 --out statements
+    python ogca.py schedules add --user admin --to boss@example.com --account "Client A" --start 2025-02-01
+    python ogca.py schedules run --send --smtp-server localhost --smtp-port 1025 --security none
+    python ogca.py import statement.pdf --user admin --account "Client A"
+    python ogca.py backup --out backups --compress gzip --keep 10
+    python ogca.py cashflow --user admin --by month --start 2024-01-01 --account "Client A"
+    python ogca.py balance --user admin --as-of 2025-03-31 --account "Client A" --statement 15230.50
+    python ogca.py simulate --user admin --months 36 --expense-change 10
+    python ogca.py benchmark --pdf-rows 1000,10000,50000
+    OGCA_SMTP_PASSWORD=... python ogca.py mail --smtp-server smtp.gmail.com --smtp-user me@example.com
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from batch_reports import PERIOD_DAYS, closed_period_range, period_range
+from config import DB_PATH, MAIL_CLAIM_LEASE_SECONDS, SIMULATION_PATHS
+from database import Database
+
+
+def _user_slug(user):
+    return "".join(ch if ch.isalnum() else "_" for ch in str(user.get("username") or user["id"]))
+
+
+# ========== PER-USER JOBS (module level so they pickle for worker processes) ==========
+
+def job_recurring(db_path, user, opts):
+    db = Database(db_path)
+    posted = db.run_due_recurring_bills(user["id"], run_date=opts.get("date"))
+    notified = 0
+    if opts.get("notifications", True):
+        notified = db.generate_system_notifications(user["id"])
+    return {"user": user["username"], "posted": posted, "notifications": notified}
+
+
+def job_export(db_path, user, opts):
+    db = Database(db_path)
+    out_dir = opts["out"]
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    start_date, end_date = period_range(opts["period"]) if opts.get("period") else (None, None)
+    written = []
+    if opts["format"] == "ndjson":
+        import ndjson_backup
+
+        path = os.path.join(out_dir, f"OGCA_Backup_{_user_slug(user)}_{stamp}.ndjson.gz")
+        counts = ndjson_backup.export_backup(db, user["id"], path)
+        written.append(path)
+        return {"user": user["username"], "files": written, "rows": sum(counts.values())}
+    if opts["format"] == "json":
+        payload = {
+            "app": "OG CA",
+            "version": "major-update",
+            "generated_at": datetime.now().isoformat(),
+            "user_id": user["id"],
+            "user": db.get_user(user["id"]),
+            "expenses": db.get_expenses(user["id"], start_date, end_date),
+            "income": db.get_income(user["id"], start_date, end_date),
+            "summary": db.get_summary(user["id"], start_date, end_date),
+            "categories": db.get_category_summary(user["id"], start_date, end_date),
+        }
+        path = os.path.join(out_dir, f"OGCA_Backup_{_user_slug(user)}_{stamp}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2, default=str)
+        written.append(path)
+    else:
+        import csv_export
+
+        ext = ".csv.gz" if opts.get("gzip") else ".csv"
+        account_id = None
+        if opts.get("account"):
+            accounts = {a["account_name"]: a["id"] for a in db.get_managed_accounts(user["id"])}
+            if opts["account"] not in accounts:
+                raise ValueError(f"unknown account '{opts['account']}'")
+            account_id = accounts[opts["account"]]
+        for table, prefix in (("expenses", "Expenses"), ("income", "Income")):
+            path = os.path.join(out_dir, f"{prefix}_{_user_slug(user)}_{stamp}{ext}")
+            csv_export.export_transactions_csv(
+                db, user["id"], path, table,
+                columns=opts.get("columns", {}).get(table),
+                start_date=start_date,
+                end_date=end_date,
+                account_id=account_id,
+                include_total=False,
+            )
+            written.append(path)
+    return {"user": user["username"], "files": written}
+
+
+def job_report(db_path, user, opts):
+    from batch_reports import report_user_data as load_report_user_data
+    from pdf_generator import AccountingReportGenerator
+
+    db = Database(db_path)
+    report_user_data = load_report_user_data(db, user["id"])
+    stamp = datetime.now().strftime("%Y%m%d")
+    if opts["kind"] == "balance":
+        path = os.path.join(opts["out"], f"Balance_Sheet_{_user_slug(user)}_{stamp}.pdf")
+        AccountingReportGenerator(path).generate_balance_sheet(
+            report_user_data,
+            db.get_income(user["id"]),
+            db.get_expenses(user["id"]),
+            db.get_summary(user["id"]),
+        )
+    else:
+        start_date, end_date = period_range(opts["period"])
+        path = os.path.join(opts["out"], f"Expense_Report_{opts['period']}_{_user_slug(user)}_{stamp}.pdf")
+        AccountingReportGenerator(path).generate_expense_report(
+            report_user_data,
+            db.get_expenses(user["id"], start_date, end_date),
+            db.get_summary(user["id"], start_date, end_date),
+            start_date,
+            end_date,
+        )
+    return {"user": user["username"], "files": [path]}
+
+
+def job_benchmark(db_path, user, opts):
+    db = Database(db_path)
+    uid = user["id"]
+    queries = {
+        "get_summary": lambda: db.get_summary(uid),
+        "get_category_summary": lambda: db.get_category_summary(uid),
+        "get_expenses": lambda: db.get_expenses(uid),
+        "get_income": lambda: db.get_income(uid),
+        "get_monthly_spending_trend": lambda: db.get_monthly_spending_trend(uid, 12),
+        "get_managed_accounts": lambda: db.get_managed_accounts(uid),
+    }
+    repeat = max(1, int(opts.get("repeat", 5)))
+    timings = {}
+    for name, fn in queries.items():
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - t0) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        timings[name] = round(best, 3)
+    return {"user": user["username"], "best_ms": timings}
+
+
+# ========== DRIVER ==========
+
+def resolve_users(db, selectors, all_users=False):
+    """Resolve --user values (username or id) into user rows."""
+    if all_users:
+        return db.get_all_users()
+    users = []
+    for sel in selectors or []:
+        row = None
+        if str(sel).isdigit():
+            row = db.get_user(int(sel))
+        if row is None:
+            matches = [u for u in db.get_all_users(sel) if u["username"] == sel]
+            row = matches[0] if matches else None
+        if row is None:
+            raise SystemExit(f"ogca: unknown user '{sel}'")
+        if all(u["id"] != row["id"] for u in users):
+            users.append({"id": row["id"], "username": row["username"]})
+    return users
+
+
+def run_for_users(job, db_path, users, opts, workers=1):
+    """Run a per-user job serially or across a process pool."""
+    users = [{"id": u["id"], "username": u["username"]} for u in users]
+    if workers > 1 and len(users) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(job, db_path, u, opts) for u in users]
+            results = []
+            for user, fut in zip(users, futures):
+                try:
+                    results.append(fut.result())
+                except Exception as e:
+                    results.append({"user": user["username"], "error": str(e)})
+            return results
+    results = []
+    for user in users:
+        try:
+            results.append(job(db_path, user, opts))
+        except Exception as e:
+            results.append({"user": user["username"], "error": str(e)})
+    return results
+
+
+def cmd_backup(args):
+    import backup_manager
+
+    if args.verify:
+        ok, message = backup_manager.verify_backup(args.verify)
+        print(f"{args.verify}: {message}")
+        return 0 if ok else 1
+
+    if args.compress:
+        compression = None if args.compress == "none" else args.compress
+    elif args.out and not os.path.isdir(args.out):
+        compression = backup_manager.compression_for_path(args.out)
+    else:
+        compression = backup_manager.BACKUP_COMPRESSION
+
+    def progress(done, total):
+        if not args.json:
+            print(f"\r  copied {done}/{total} pages", end="", file=sys.stderr, flush=True)
+
+    try:
+        path = backup_manager.create_backup(
+            args.out,
+            db_path=args.db,
+            compression=compression,
+            progress=progress,
+            verify=not args.no_verify,
+        )
+    except Exception as e:
+        print(f"\nogca: backup failed: {e}", file=sys.stderr)
+        return 1
+    if not args.json:
+        print(file=sys.stderr)
+
+    removed = []
+    if args.keep is not None:
+        removed = backup_manager.rotate_backups(os.path.dirname(os.path.abspath(path)), args.keep)
+    if args.json:
+        print(json.dumps({"backup": path, "rotated": removed}, indent=2))
+    else:
+        print(f"Database backup saved: {path}")
+        for old in removed:
+            print(f"  rotated out {old}")
+    return 0
+
+
+def _smtp_settings(args):
+    settings = {
+        "server": args.smtp_server or os.environ.get("OGCA_SMTP_SERVER", ""),
+        "port": args.smtp_port or int(os.environ.get("OGCA_SMTP_PORT") or 587),
+        "username": args.smtp_user or os.environ.get("OGCA_SMTP_USER", ""),
+        "password": os.environ.get("OGCA_SMTP_PASSWORD", ""),
+        "security": args.security or os.environ.get("OGCA_SMTP_SECURITY", "starttls"),
+    }
+    if not settings["server"]:
+        raise SystemExit(f"ogca: {args.command} needs --smtp-server or OGCA_SMTP_SERVER to send mail")
+    return settings
+
+
+def _drain_outbox(args, db):
+    from mail_queue import MailSender
+
+    settings = _smtp_settings(args)
+    sender = MailSender(db, lambda: settings)
+    totals = sender.drain()
+    if sender.last_error and not args.json:
+        print(f"last error: {sender.last_error}", file=sys.stderr)
+    return totals
+
+
+def cmd_mail(args, db):
+    if args.requeue_stuck:
+        db.requeue_stuck_mail(claimed_before=time.time() - MAIL_CLAIM_LEASE_SECONDS)
+    totals = None
+    if not args.status:
+        totals = _drain_outbox(args, db)
+
+    counts = db.get_outbox_counts()
+    if args.json:
+        print(json.dumps({"drained": totals, "outbox": counts}))
+    else:
+        if totals is not None:
+            print(f"sent {totals['sent']}, retrying {totals['retry']}, failed {totals['failed']}")
+        print("outbox: " + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())) if counts else "outbox: empty")
+    return 0 if not totals or not totals["failed"] else 1
+
+
+def cmd_schedules(args, db):
+    import report_scheduler
+
+    if args.action == "add":
+        users = resolve_users(db, args.user)
+        if len(users) != 1 or not args.to:
+            raise SystemExit("ogca: schedules add needs exactly one --user and --to")
+        account_id = None
+        if args.account:
+            account_id = next(
+                (a["id"] for a in db.get_managed_accounts(users[0]["id"]) if a["account_name"] == args.account), None
+            )
+            if account_id is None:
+                raise SystemExit(f"ogca: unknown account {args.account!r}")
+        schedule_id = db.add_report_schedule(
+            users[0]["id"],
+            args.to,
+            args.start or str(datetime.now().date()),
+            frequency=args.frequency,
+            report_kind=args.kind,
+            period=args.period,
+            account_id=account_id,
+            sender=args.sender,
+        )
+        print(json.dumps({"schedule": schedule_id}) if args.json else f"Added schedule #{schedule_id}")
+        return 0
+
+    user_ids = [u["id"] for u in resolve_users(db, args.user)] if args.user else None
+    if args.action == "list":
+        rows = [r for r in db.get_report_schedules() if user_ids is None or r["user_id"] in user_ids]
+        for r in rows:
+            if args.json:
+                print(json.dumps(r, default=str))
+            else:
+                report = "balance" if r["report_kind"] == "balance" else f"{r['period']} expense"
+                state = "" if r["is_active"] else " (paused)"
+                print(f"#{r['id']} user {r['user_id']} {report} [{r.get('account_name') or 'all accounts'}] "
+                      f"{r['frequency']} next {r['next_run_date']} -> {r['recipients']}{state}  {r.get('last_status') or ''}")
+        return 0
+
+    result = report_scheduler.run_due_schedules(db, run_date=args.date, user_ids=user_ids, default_sender=args.sender)
+    if args.send and result["queued"]:
+        result["mail"] = _drain_outbox(args, db)
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{result['due']} due, {result['rendered']} reports rendered, {result['queued']} emails queued, "
+              f"{result['errors']} errors")
+        if "mail" in result:
+            print(f"sent {result['mail']['sent']}, retrying {result['mail']['retry']}, failed {result['mail']['failed']}")
+    return 0 if not result["errors"] else 1
+
+
+def cmd_notifications(args, db):
+    from config import NOTIFICATION_MAX_PER_USER, NOTIFICATION_RETENTION_DAYS
+
+    if args.rebuild_counters:
+        db.rebuild_notification_counters()
+    result = db.prune_notifications(
+        retention_days=args.days if args.days is not None else NOTIFICATION_RETENTION_DAYS,
+        max_per_user=args.cap if args.cap is not None else NOTIFICATION_MAX_PER_USER,
+        archive=not args.delete,
+        batch_size=args.batch,
+    )
+    if args.json:
+        print(json.dumps(result))
+    else:
+        verb = "deleted" if args.delete else "archived"
+        print(f"{result['expired']} expired and {result['capped']} over-cap notifications {verb}")
+    return 0
+
+
+def cmd_trash(args, db):
+    from config import TRASH_RETENTION_DAYS
+
+    days = args.days if args.days is not None else TRASH_RETENTION_DAYS
+    deleted = db.purge_trash(days)
+    print(json.dumps({"purged": deleted}) if args.json else f"Purged {deleted} trash item(s) older than {days} days")
+    return 0
+
+
+def cmd_archive(args, db):
+    import ledger_archive
+
+    if args.restore:
+        result = {"restored": ledger_archive.restore_year(db, args.restore)}
+    elif not args.list:
+        user_ids = [u["id"] for u in resolve_users(db, args.user)] if args.user else [None]
+        if args.before:
+            before = args.before
+        elif args.days is not None:
+            before = ledger_archive.default_cutoff(args.days)
+        else:
+            before = ledger_archive.default_cutoff()
+
+        def progress(table, year, rows):
+            if not args.json:
+                print(f"  {table} {year}: {rows} row(s) archived", file=sys.stderr)
+
+        result = {"before": before, "expenses": 0, "income": 0}
+        for user_id in user_ids:
+            moved = ledger_archive.archive_transactions(db, before, user_id, progress=progress)
+            result["expenses"] += moved["expenses"]
+            result["income"] += moved["income"]
+    else:
+        result = {}
+    status = ledger_archive.archive_status(db)
+    if args.json:
+        print(json.dumps({**result, **status}, default=str))
+        return 0
+    if "restored" in result:
+        print(f"Restored {result['restored']['expenses']} expense(s) and {result['restored']['income']} income row(s)")
+    elif result:
+        print(f"Archived {result['expenses']} expense(s) and {result['income']} income row(s) dated before {result['before']}")
+    for part in status["partitions"]:
+        print(f"  {part['table_name']:<9} {part['year']}  {part['row_count']:>8} rows  {part['file_name']}")
+    print(f"Live rows: {status['live']['expenses']} expenses, {status['live']['income']} income; "
+          f"{status['rollups']} monthly rollup row(s)")
+    return 0
+
+
+def resolve_account_scope(db, user_id, name):
+    """--account value -> "ALL" (empty), None (Personal) or a managed account id."""
+    if not name:
+        return "ALL"
+    if name == "Personal":
+        return None
+    account_map = {a["account_name"]: a["id"] for a in db.get_managed_accounts(user_id)}
+    if name not in account_map:
+        raise SystemExit(f"ogca: unknown account '{name}'")
+    return account_map[name]
+
+
+def cmd_cashflow(args, db):
+    from cash_flow import flow_series
+
+    user_id = resolve_users(db, [args.user])[0]["id"]
+    account = resolve_account_scope(db, user_id, args.account)
+    if args.period:
+        start_date, end_date = period_range(args.period)
+    else:
+        start_date, end_date = args.start, args.end
+    rows = flow_series(db, user_id, args.by, start_date, end_date, account)
+    if args.json:
+        print(json.dumps(rows))
+        return 0
+    print(f"{'Period':<12}{'Income':>14}{'Expenses':>14}{'Net':>14}{'Balance':>16}")
+    for row in rows:
+        print(f"{row['period']:<12}{row['income']:>14.2f}{row['expenses']:>14.2f}{row['net']:>14.2f}{row['balance']:>16.2f}")
+    return 0
+
+
+def cmd_balance(args, db):
+    from balance_index import BalanceIndex
+
+    user_id = resolve_users(db, [args.user])[0]["id"]
+    account = resolve_account_scope(db, user_id, args.account)
+    as_of = args.as_of or datetime.now().strftime("%Y-%m-%d")
+    index = BalanceIndex(db)
+    result = {"as_of": as_of, "balance": index.balance_as_of(user_id, as_of, account)}
+    if args.start:
+        result["start"] = args.start
+        result["net"] = index.net_between(user_id, args.start, as_of, account)
+    if args.statement is not None:
+        result["statement"] = args.statement
+        result["difference"] = args.statement - result["balance"]
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"Balance as of {as_of}: {result['balance']:.2f}")
+        if args.start:
+            print(f"Net {args.start} .. {as_of}: {result['net']:.2f}")
+        if args.statement is not None:
+            status = "reconciled" if abs(result["difference"]) < 0.005 else "NOT reconciled"
+            print(f"Statement: {args.statement:.2f}  difference: {result['difference']:.2f}  ({status})")
+    if args.statement is not None and abs(result["difference"]) >= 0.005:
+        return 1
+    return 0
+
+
+def cmd_simulate(args, db):
+    from datetime import date, timedelta
+    from balance_index import BalanceIndex
+    from simulation import load_history, simulate
+
+    user_id = resolve_users(db, [args.user])[0]["id"]
+    account = resolve_account_scope(db, user_id, args.account)
+    start_balance = BalanceIndex(db).balance_as_of(user_id, date.today().replace(day=1) - timedelta(days=1), account)
+    history = load_history(db, user_id, account)
+    summary = simulate(history, start_balance, months=args.months, paths=args.paths,
+                       income_change=args.income_change, expense_change=args.expense_change, seed=args.seed)
+    if args.json:
+        print(json.dumps(summary))
+        return 0
+    bands = summary["bands"]
+    print(f"{summary['paths']:,} paths from {start_balance:.2f}; "
+          f"chance of a negative balance: {summary['prob_negative'] * 100:.1f}%")
+    print(f"{'Month':<10}" + "".join(f"{'P' + str(p):>14}" for p in bands) + f"{'P(neg)':>9}")
+    for index, month in enumerate(summary["months"]):
+        row = "".join(f"{bands[p][index]:>14.2f}" for p in bands)
+        print(f"{month:<10}{row}{summary['prob_negative_by_month'][index] * 100:>8.1f}%")
+    return 0
+
+
+def cmd_statements(args, db):
+    from batch_reports import run_batch_reports
+
+    user_ids = None if args.all_users else [u["id"] for u in resolve_users(db, args.user)]
+    start_date, end_date = closed_period_range(args.period) if args.period != "All" else (None, None)
+
+    def progress(done, total):
+        if not args.json:
+            print(f"\r  rendered {done}/{total} accounts", end="", file=sys.stderr, flush=True)
+
+    manifest = run_batch_reports(
+        args.out,
+        db_path=args.db,
+        user_ids=user_ids,
+        start_date=start_date,
+        end_date=end_date,
+        workers=args.workers,
+        skip_empty=not args.include_empty,
+        progress=progress,
+    )
+    if args.json:
+        print(json.dumps(manifest, default=str))
+    else:
+        print(file=sys.stderr)
+        for entry in manifest["reports"]:
+            if entry["status"] == "error":
+                print(f"[{entry['username']}/{entry['account_name']}] ERROR: {entry['error']}")
+        print(
+            f"{manifest['written']} statements written, {manifest['skipped']} empty skipped, "
+            f"{manifest['failed']} failed in {manifest['seconds']:.1f}s "
+            f"({manifest['workers']} workers) -> {os.path.join(args.out, 'manifest.json')}"
+        )
+    return 1 if manifest["failed"] else 0
+
+
+def cmd_import(args, db):
+    import statement_parser
+
+    users = resolve_users(db, [args.user])
+    user_id = users[0]["id"]
+    account_map = {a["account_name"]: a["id"] for a in db.get_managed_accounts(user_id)}
+    account_id = None
+    if args.account:
+        if args.account not in account_map:
+            raise SystemExit(f"ogca: unknown account '{args.account}'")
+        account_id = account_map[args.account]
+
+    try:
+        provider, parsed = statement_parser.parse_statement_pdf(args.pdf, preset=args.preset)
+    except Exception as e:
+        print(f"ogca: failed to parse PDF: {e}", file=sys.stderr)
+        return 1
+    rows = statement_parser.build_import_rows(db, user_id, parsed, provider)
+    if args.dry_run:
+        for row in rows:
+            print(f"{row['date']}\t{row['type']}\t{row['amount']:.2f}\t{row['category']}\t{row['description']}")
+        print(f"Provider: {provider} | Parsed: {len(rows)} (dry run, nothing saved)")
+        return 0
+    imported, skipped = statement_parser.save_import_rows(
+        db, user_id, rows, provider, account_id=account_id, account_map=account_map
+    )
+    print(f"Provider: {provider} | Imported: {imported} | Skipped: {skipped}")
+    return 0
+
+
+def cmd_startup_benchmark(args):
+    from startup import measure_startup
+
+    results = measure_startup(repeat=max(1, args.repeat))
+    for label, median_ms, error in results:
+        if args.json:
+            print(json.dumps({"case": label, "median_ms": median_ms, "error": error}))
+        elif error:
+            print(f"{label:<46} unavailable ({error})")
+        else:
+            print(f"{label:<46} {median_ms:8.1f} ms (median of {args.repeat})")
+    return 0
+
+
+def cmd_pdf_benchmark(args):
+    try:
+        from pdf_generator import benchmark_expense_report
+    except Exception as e:
+        print(f"ogca: PDF benchmark unavailable: {e}", file=sys.stderr)
+        return 1
+
+    counts = [int(c) for c in args.pdf_rows.split(",") if c.strip()]
+    results = benchmark_expense_report(counts, compare_single=args.pdf_compare, measure_memory=not args.no_memory)
+    for res in results:
+        if args.json:
+            print(json.dumps(res))
+        else:
+            peak = f"{res['peak_mb']:7.1f} MB peak" if res["peak_mb"] is not None else ""
+            print(f"{res['rows']:>7} rows  {res['mode']:<13} {res['seconds']:8.2f} s  {res['pages']:>5} pages  {peak}")
+    return 0
+
+
+def _print_results(results, as_json=False):
+    failed = 0
+    for res in results:
+        if "error" in res:
+            failed += 1
+        if as_json:
+            print(json.dumps(res, default=str))
+        elif "error" in res:
+            print(f"[{res['user']}] ERROR: {res['error']}")
+        else:
+            details = ", ".join(f"{k}={v}" for k, v in res.items() if k != "user")
+            print(f"[{res['user']}] {details}")
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="ogca", description="OG CA headless batch jobs")
+    parser.add_argument("--db", default=str(DB_PATH), help="SQLite database path (default: config.DB_PATH)")
+    # Options accepted after the subcommand too, e.g. `ogca recurring --all-users --workers 4`.
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=argparse.SUPPRESS, help="SQLite database path")
+    common.add_argument("--workers", type=int, default=1, help="Process multiple users in parallel")
+    common.add_argument("--json", action="store_true", help="Print one JSON result per line")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_user_args(p, required=True):
+        group = p.add_mutually_exclusive_group(required=required)
+        group.add_argument("--user", action="append", help="Username or id (repeatable)")
+        group.add_argument("--all-users", action="store_true", help="Run for every user")
+
+    p = sub.add_parser("import", parents=[common], help="Import a bank/UPI statement PDF")
+    p.add_argument("pdf")
+    p.add_argument("--user", required=True)
+    p.add_argument("--preset", default="Auto", choices=["Auto", "PhonePe", "Paytm", "GPay", "Generic"])
+    p.add_argument("--account", default="", help="Managed account name (default: Personal)")
+    p.add_argument("--dry-run", action="store_true")
+
+    p = sub.add_parser("export", parents=[common], help="Export user data to CSV or JSON")
+    add_user_args(p)
+    p.add_argument("--format", choices=["csv", "json", "ndjson"], default="csv",
+                   help="ndjson = full streaming backup of every table (gzip)")
+    p.add_argument("--period", choices=list(PERIOD_DAYS), default=None)
+    p.add_argument("--out", default=".")
+    p.add_argument("--account", default="", help="CSV: only rows for this managed account")
+    p.add_argument("--columns", default="",
+                   help="CSV: comma-separated expense columns, e.g. date,category,amount,account")
+    p.add_argument("--income-columns", default="", help="CSV: comma-separated income columns")
+    p.add_argument("--gzip", action="store_true", help="CSV: write .csv.gz files")
+
+    p = sub.add_parser("report", parents=[common], help="Generate PDF reports")
+    add_user_args(p)
+    p.add_argument("--kind", choices=["expense", "balance"], default="expense")
+    p.add_argument("--period", choices=list(PERIOD_DAYS), default="Month")
+    p.add_argument("--out", default=".")
+
+    p = sub.add_parser("statements", parents=[common],
+                       help="Month-end PDF statement for every managed account (process pool + manifest)")
+    add_user_args(p)
+    p.add_argument("--period", choices=list(PERIOD_DAYS) + ["All"], default="Month",
+                   help="Last full calendar month/quarter/year (default: Month)")
+    p.add_argument("--out", default="statements")
+    p.add_argument("--include-empty", action="store_true", help="Also render accounts with no expenses")
+
+    p = sub.add_parser("recurring", parents=[common], help="Post due recurring bills and refresh notifications")
+    add_user_args(p)
+    p.add_argument("--date", default=None, help="Run date YYYY-MM-DD (default: today)")
+    p.add_argument("--no-notifications", action="store_true")
+
+    p = sub.add_parser("backup", parents=[common], help="Snapshot the database")
+    p.add_argument("--out", default=None, help="Output file or directory (default: config.BACKUP_DIR)")
+    p.add_argument("--compress", choices=["none", "gzip", "zstd"], default=None,
+                   help="Compression (default: config.BACKUP_COMPRESSION, or inferred from --out)")
+    p.add_argument("--keep", type=int, default=None, help="Rotate: keep only the newest N backups in the directory")
+    p.add_argument("--no-verify", action="store_true", help="Skip PRAGMA integrity_check on the snapshot")
+    p.add_argument("--verify", metavar="FILE", default=None, help="Only verify an existing backup file")
+
+    smtp = argparse.ArgumentParser(add_help=False)
+    smtp.add_argument("--smtp-server", default="", help="SMTP host (or OGCA_SMTP_SERVER)")
+    smtp.add_argument("--smtp-port", type=int, default=0, help="SMTP port (or OGCA_SMTP_PORT, default 587)")
+    smtp.add_argument("--smtp-user", default="", help="SMTP username (or OGCA_SMTP_USER); password from OGCA_SMTP_PASSWORD")
+    smtp.add_argument("--security", choices=["starttls", "ssl", "none"], default=None,
+                      help="Connection security (or OGCA_SMTP_SECURITY, default starttls)")
+
+    p = sub.add_parser("mail", parents=[common, smtp], help="Send queued outbox mail and show queue status")
+    p.add_argument("--status", action="store_true", help="Only print outbox counts")
+    p.add_argument("--requeue-stuck", action="store_true", help="Requeue messages a crashed sender left 'sending' (claims older than MAIL_CLAIM_LEASE_SECONDS)")
+
+    p = sub.add_parser("schedules", parents=[common, smtp], help="List, add or run scheduled report deliveries")
+    p.add_argument("action", choices=["run", "list", "add"], nargs="?", default="run")
+    p.add_argument("--user", action="append", help="Username or id (repeatable; default: all users)")
+    p.add_argument("--date", default=None, help="run: treat this YYYY-MM-DD as today")
+    p.add_argument("--send", action="store_true", help="run: also send the queued mail now")
+    p.add_argument("--sender", default="", help="From address (default: the user's email)")
+    p.add_argument("--to", action="append", help="add: recipient email (repeatable)")
+    p.add_argument("--kind", choices=["expense", "balance"], default="expense")
+    p.add_argument("--period", choices=list(PERIOD_DAYS), default="Month")
+    p.add_argument("--frequency", choices=["weekly", "monthly", "quarterly", "yearly"], default="monthly")
+    p.add_argument("--account", default="", help="add: managed account name (default: all accounts)")
+    p.add_argument("--start", default=None, help="add: first run date YYYY-MM-DD (default: today)")
+
+    p = sub.add_parser("notifications", parents=[common], help="Apply notification retention (batched)")
+    p.add_argument("--days", type=int, default=None, help="Retention for read notifications (default: config)")
+    p.add_argument("--cap", type=int, default=None, help="Max notifications kept per user (0 = no cap)")
+    p.add_argument("--delete", action="store_true", help="Delete instead of moving to notification_archive")
+    p.add_argument("--batch", type=int, default=500, help="Rows per delete transaction")
+    p.add_argument("--rebuild-counters", action="store_true", help="Recount the per-user unread counters first")
+
+    p = sub.add_parser("trash", parents=[common], help="Purge old trash bin items")
+    p.add_argument("--days", type=int, default=None, help="Keep items newer than N days (default: config; 0 = purge all)")
+
+    p = sub.add_parser("archive", parents=[common], help="Move old expenses/income into per-year archive files")
+    p.add_argument("--before", default=None, help="Archive rows dated before YYYY-MM-DD")
+    p.add_argument("--days", type=int, default=None,
+                   help="Archive whole years older than N days (default: config.ARCHIVE_AFTER_DAYS)")
+    p.add_argument("--user", action="append", help="Username or id (repeatable; default: all users)")
+    p.add_argument("--list", action="store_true", help="Only list archive partitions")
+    p.add_argument("--restore", type=int, metavar="YEAR", default=None, help="Move an archived year back")
+
+    p = sub.add_parser("cashflow", parents=[common], help="Net flow and running balance per day, week or month")
+    p.add_argument("--user", required=True)
+    p.add_argument("--by", default="month", choices=["day", "week", "month"])
+    p.add_argument("--period", choices=sorted(PERIOD_DAYS), default=None, help="Instead of --start/--end")
+    p.add_argument("--start", default=None, help="YYYY-MM-DD (balance carries in from before it)")
+    p.add_argument("--end", default=None, help="YYYY-MM-DD")
+    p.add_argument("--account", default="", help="Managed account name, or Personal (default: all accounts)")
+
+    p = sub.add_parser("balance", parents=[common], help="Balance as of a date; reconcile against a statement")
+    p.add_argument("--user", required=True)
+    p.add_argument("--as-of", default=None, help="YYYY-MM-DD (default: today)")
+    p.add_argument("--start", default=None, help="Also print the net flow from YYYY-MM-DD through --as-of")
+    p.add_argument("--statement", type=float, default=None,
+                   help="Statement closing balance to reconcile against (exit status 1 if it differs)")
+    p.add_argument("--account", default="", help="Managed account name, or Personal (default: all accounts)")
+
+    p = sub.add_parser("simulate", parents=[common], help="Monte Carlo balance bands from resampled monthly history")
+    p.add_argument("--user", required=True)
+    p.add_argument("--months", type=int, default=24, help="Horizon in months, starting with the current one")
+    p.add_argument("--paths", type=int, default=SIMULATION_PATHS, help="Number of paths (default: %(default)s)")
+    p.add_argument("--income-change", type=float, default=0.0, help="Percent applied to every income draw")
+    p.add_argument("--expense-change", type=float, default=0.0, help="Percent applied to every expense draw")
+    p.add_argument("--seed", type=int, default=None)
+    p.add_argument("--account", default="", help="Managed account name, or Personal (default: all accounts)")
+
+    p = sub.add_parser("benchmark", parents=[common], help="Time core queries per user, or cold startup")
+    add_user_args(p, required=False)
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--startup", action="store_true", help="Measure cold-start import time of the GUI")
+    p.add_argument("--pdf-rows", default="", metavar="N[,N...]",
+                   help="Time the PDF expense report on synthetic data, e.g. 1000,10000,50000")
+    p.add_argument("--pdf-compare", action="store_true", help="Also time the old single-table layout (<=10k rows)")
+    p.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory pass")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    db = Database(args.db)
+
+    if args.command == "import":
+        return cmd_import(args, db)
+
+    if args.command == "backup":
+        return cmd_backup(args)
+
+    if args.command == "statements":
+        return cmd_statements(args, db)
+
+    if args.command == "mail":
+        return cmd_mail(args, db)
+
+    if args.command == "schedules":
+        return cmd_schedules(args, db)
+
+    if args.command == "notifications":
+        return cmd_notifications(args, db)
+
+    if args.command == "trash":
+        return cmd_trash(args, db)
+
+    if args.command == "archive":
+        return cmd_archive(args, db)
+
+    if args.command == "cashflow":
+        return cmd_cashflow(args, db)
+
+    if args.command == "balance":
+        return cmd_balance(args, db)
+
+    if args.command == "simulate":
+        return cmd_simulate(args, db)
+
+    if args.command == "benchmark" and args.startup:
+        return cmd_startup_benchmark(args)
+    if args.command == "benchmark" and args.pdf_rows:
+        return cmd_pdf_benchmark(args)
+    if args.command == "benchmark" and not (args.user or args.all_users):
+        raise SystemExit("ogca: benchmark needs --user/--all-users, --startup or --pdf-rows")
+
+    users = resolve_users(db, args.user, all_users=args.all_users)
+    if args.command == "export":
+        os.makedirs(args.out, exist_ok=True)
+        columns = {}
+        if args.columns:
+            columns["expenses"] = [c.strip() for c in args.columns.split(",") if c.strip()]
+        if args.income_columns:
+            columns["income"] = [c.strip() for c in args.income_columns.split(",") if c.strip()]
+        job, opts = job_export, {
+            "out": args.out,
+            "format": args.format,
+            "period": args.period,
+            "account": args.account,
+            "columns": columns,
+            "gzip": args.gzip,
+        }
+    elif args.command == "report":
+        os.makedirs(args.out, exist_ok=True)
+        job, opts = job_report, {"out": args.out, "kind": args.kind, "period": args.period}
+    elif args.command == "recurring":
+        job, opts = job_recurring, {"date": args.date, "notifications": not args.no_notifications}
+    else:
+        job, opts = job_benchmark, {"repeat": args.repeat}
+
+    results = run_for_users(job, args.db, users, opts, workers=args.workers)
+    return _print_results(results, as_json=args.json)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
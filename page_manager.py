@@ -0,0 +1,126 @@
+"""Retained page frames for the main window.
+
+Pages are built once into their own frame and hidden with pack_forget when
+another page is shown. Database change events (table names) mark the pages
+that depend on those tables dirty; a dirty page runs its registered refresher
+(data-bound widgets only) or is rebuilt the next time it is shown. The least
+recently shown pages beyond `max_pages` are destroyed.
+"""
+import functools
+import tkinter as tk
+from collections import OrderedDict
+
+from config import COLORS, PAGE_CACHE_SIZE
+
+
+class _Page:
+    __slots__ = ("frame", "depends", "dirty", "refresher")
+
+    def __init__(self, frame, depends):
+        self.frame = frame
+        self.depends = frozenset(depends) if depends is not None else None
+        self.dirty = False
+        self.refresher = None
+
+
+class PageManager:
+    def __init__(self, host, max_pages=PAGE_CACHE_SIZE):
+        self.host = host
+        self.max_pages = max(1, int(max_pages))
+        self.current = None
+        self._pages = OrderedDict()
+        self._building = None
+
+    def show(self, key, build, depends=None, force=False):
+        """Display page `key`, building it with build(frame) when needed.
+
+        depends is the set of tables the page reads (None = any change makes
+        it dirty). Returns True when the page was (re)built.
+        """
+        page = self._pages.get(key)
+        if page is not None and not page.frame.winfo_exists():
+            del self._pages[key]
+            page = None
+        if page is None:
+            page = _Page(tk.Frame(self.host, bg=COLORS["background"]), depends)
+            self._pages[key] = page
+            force = True
+        self._pages.move_to_end(key)
+
+        if self.current != key:
+            previous = self._pages.get(self.current)
+            if previous is not None and previous.frame.winfo_exists():
+                previous.frame.pack_forget()
+            self.current = key
+        page.frame.pack(fill=tk.BOTH, expand=True)
+
+        rebuilt = force or (page.dirty and page.refresher is None)
+        if rebuilt:
+            for child in page.frame.winfo_children():
+                child.destroy()
+            page.refresher = None
+            page.dirty = False
+            self._building = page
+            try:
+                build(page.frame)
+            finally:
+                self._building = None
+        elif page.dirty:
+            page.dirty = False
+            page.refresher()
+        self._evict()
+        return rebuilt
+
+    def frame(self, key):
+        page = self._pages.get(key)
+        return page.frame if page is not None else None
+
+    def set_refresher(self, refresher):
+        """Called while building: refresh only the page's data-bound widgets when it is dirty."""
+        if self._building is not None:
+            self._building.refresher = refresher
+
+    def mark_dirty(self, tables=None):
+        """Flag pages that read any of `tables` (None = every page). Safe from worker threads."""
+        tables = set(tables) if tables is not None else None
+        for page in list(self._pages.values()):
+            if tables is None or page.depends is None or page.depends & tables:
+                page.dirty = True
+
+    def clear(self):
+        """Destroy every retained page (e.g. after a theme change)."""
+        for page in self._pages.values():
+            if page.frame.winfo_exists():
+                page.frame.destroy()
+        self._pages.clear()
+        self.current = None
+
+    def _evict(self):
+        while len(self._pages) > self.max_pages:
+            key, page = next(iter(self._pages.items()))
+            if key == self.current:
+                break
+            del self._pages[key]
+            if page.frame.winfo_exists():
+                page.frame.destroy()
+
+
+def retained_page(key, depends=None):
+    """Decorator for ExpenseTrackerUI.show_* methods: build into a retained page frame.
+
+    Calling show_* for the page that is already visible rebuilds it (an
+    explicit refresh); navigating to a retained, clean page just re-shows it.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            def build(frame):
+                self.content_frame = frame
+                method(self, *args, **kwargs)
+
+            rebuilt = self.pages.show(key, build, depends, force=self.pages.current == key)
+            self.content_frame = self.pages.frame(key)
+            if not rebuilt:
+                self._restore_view_state(key)
+        return wrapper
+    return decorator
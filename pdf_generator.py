@@ -1,4 +1,6 @@
 """Premium PDF report generator for OG CA."""
+import itertools
+import time
 from datetime import datetime
 
 from reportlab.lib import colors
@@ -23,11 +25,86 @@ class ColorBand(Flowable):
         self.canv.rect(0, 0, self.width, self.height, fill=1, stroke=0)
 
 
+EXPENSE_ROWS_PER_TABLE = 36  # roughly one A4 page of 8pt rows; keep even for row banding
+
+
+class ChunkedTable(Flowable):
+    """Lay out a long table as a stream of page-sized Table chunks.
+
+    Rows are pulled from an iterator only when the previous chunk has been
+    placed, so at most one chunk is materialized at a time, and page splits
+    work on a small table instead of re-splitting the whole remainder.
+    """
+
+    def __init__(self, header, rows, col_widths, table_style, rows_per_table=EXPENSE_ROWS_PER_TABLE, _state=None):
+        super().__init__()
+        self.header = header
+        self.col_widths = col_widths
+        self.table_style = table_style
+        self.rows_per_table = rows_per_table
+        self._state = _state or {"rows": iter(rows), "pending": None, "done": False}
+
+    def _next_table(self):
+        state = self._state
+        if state["pending"] is None and not state["done"]:
+            chunk = list(itertools.islice(state["rows"], self.rows_per_table))
+            if chunk:
+                state["pending"] = Table(
+                    [self.header] + chunk,
+                    colWidths=self.col_widths,
+                    repeatRows=1,
+                    style=self.table_style,
+                )
+            else:
+                state["done"] = True
+        return state["pending"]
+
+    def wrap(self, availWidth, availHeight):
+        if self._next_table() is None:
+            return 0, 0
+        # Never fit as a whole: the frame then asks split() for the next chunk
+        return availWidth, availHeight + 1
+
+    def split(self, availWidth, availHeight):
+        table = self._next_table()
+        if table is None:
+            return []
+        parts = table.split(availWidth, availHeight)
+        if not parts:
+            # Not even the header and one row fit; retried on the next frame
+            return []
+        self._state["pending"] = None
+        rest = ChunkedTable(self.header, None, self.col_widths, self.table_style, self.rows_per_table, _state=self._state)
+        return parts + [rest]
+
+    def draw(self):
+        pass
+
+
 class AccountingReportGenerator:
     """Generate premium accounting reports."""
 
     DEFAULT_SIGNATURE = "SAKSHAM SINGH"
 
+    PALETTE = {
+        "primary": "#0f172a",
+        "secondary": "#1d4ed8",
+        "accent": "#0f766e",
+        "success": "#15803d",
+        "warning": "#b45309",
+        "danger": "#b91c1c",
+        "surface": "#ffffff",
+        "surface_alt": "#f8fafc",
+        "border": "#cbd5e1",
+        "text": "#111827",
+        "muted": "#64748b",
+    }
+
+    # Palette, stylesheet and table styles are the same for every report, so
+    # they are built once per process and shared by all instances (batch jobs
+    # create one generator per account).
+    _shared = {}
+
     def __init__(self, filename="report.pdf"):
         self.filename = filename
         self.page_width, self.page_height = A4
@@ -35,21 +112,20 @@ class AccountingReportGenerator:
         self._setup_styles()
 
     def _setup_palette(self):
-        self.primary = colors.HexColor("#0f172a")
-        self.secondary = colors.HexColor("#1d4ed8")
-        self.accent = colors.HexColor("#0f766e")
-        self.success = colors.HexColor("#15803d")
-        self.warning = colors.HexColor("#b45309")
-        self.danger = colors.HexColor("#b91c1c")
-        self.surface = colors.HexColor("#ffffff")
-        self.surface_alt = colors.HexColor("#f8fafc")
-        self.border = colors.HexColor("#cbd5e1")
-        self.text = colors.HexColor("#111827")
-        self.muted = colors.HexColor("#64748b")
+        cache = AccountingReportGenerator._shared
+        if "palette" not in cache:
+            cache["palette"] = {name: colors.HexColor(value) for name, value in self.PALETTE.items()}
+        for name, color in cache["palette"].items():
+            setattr(self, name, color)
 
     def _setup_styles(self):
+        cache = AccountingReportGenerator._shared
+        if "styles" not in cache:
+            cache["styles"] = self._build_styles()
+        self.styles = cache["styles"]
+
+    def _build_styles(self):
         styles = getSampleStyleSheet()
-        self.styles = styles
 
         styles.add(
             ParagraphStyle(
@@ -118,6 +194,7 @@ class AccountingReportGenerator:
                 alignment=TA_LEFT,
             )
         )
+        return styles
 
     @staticmethod
     def _fmt_currency(value):
@@ -229,24 +306,11 @@ class AccountingReportGenerator:
         t.setStyle(TableStyle(style))
         return [t]
 
-    def _expense_table(self, expenses):
-        if not expenses:
-            return [Paragraph("No expenses in the selected period.", self.styles["Body"])]
-
-        data = [["Date", "Category", "Description", "Method", "Amount", "Notes"]]
-        for row in expenses[:120]:
-            data.append([
-                str(row.get("date", "")),
-                str(row.get("category", ""))[:22],
-                str(row.get("description", ""))[:30],
-                str(row.get("payment_method", ""))[:15],
-                self._fmt_currency(row.get("amount", 0)),
-                str(row.get("notes", ""))[:24],
-            ])
-
-        t = Table(data, colWidths=[0.8 * inch, 1.2 * inch, 1.65 * inch, 0.9 * inch, 1.0 * inch, 1.45 * inch], repeatRows=1)
-        t.setStyle(
-            TableStyle(
+    def _expense_table_style(self):
+        """TableStyle shared by every expense chunk and report in this process."""
+        cache = AccountingReportGenerator._shared
+        if "expense_table" not in cache:
+            cache["expense_table"] = TableStyle(
                 [
                     ("BACKGROUND", (0, 0), (-1, 0), self.primary),
                     ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
@@ -263,8 +327,31 @@ class AccountingReportGenerator:
                     ("BOTTOMPADDING", (0, 0), (-1, -1), 5),
                 ]
             )
-        )
-        return [t]
+        return cache["expense_table"]
+
+    def _expense_rows(self, expenses):
+        for row in expenses:
+            yield [
+                str(row.get("date") or ""),
+                str(row.get("category") or "")[:22],
+                str(row.get("description") or "")[:30],
+                str(row.get("payment_method") or "")[:15],
+                self._fmt_currency(row.get("amount", 0)),
+                str(row.get("notes") or "")[:24],
+            ]
+
+    def _expense_table(self, expenses):
+        if not expenses:
+            return [Paragraph("No expenses in the selected period.", self.styles["Body"])]
+
+        return [
+            ChunkedTable(
+                ["Date", "Category", "Description", "Method", "Amount", "Notes"],
+                self._expense_rows(expenses),
+                [0.8 * inch, 1.2 * inch, 1.65 * inch, 0.9 * inch, 1.0 * inch, 1.45 * inch],
+                self._expense_table_style(),
+            )
+        ]
 
     def _category_table(self, category_rows):
         if not category_rows:
@@ -336,14 +423,14 @@ class AccountingReportGenerator:
             Paragraph("Signature: SAKSHAM SINGH", self.styles["Signature"]),
         ]
 
-    def generate_expense_report(self, user_data, expenses, summary, start_date, end_date):
-        doc = self._doc("Expense Report")
+    def generate_expense_report(self, user_data, expenses, summary, start_date, end_date, report_name=None):
+        doc = self._doc(report_name or "Expense Report")
         elements = []
 
         elements.extend(
             self._header(
                 user_data,
-                "Extreme Premium Expense Intelligence Report",
+                report_name or "Extreme Premium Expense Intelligence Report",
                 f"Reporting Window: {start_date} to {end_date}",
             )
         )
@@ -464,3 +551,78 @@ class AccountingReportGenerator:
         elements.append(Paragraph("Footer Signature: SAKSHAM SINGH", self.styles["Muted"]))
 
         doc.build(elements, onFirstPage=self._page_decor, onLaterPages=self._page_decor)
+
+
+def _synthetic_expenses(count):
+    categories = ("Food", "Transport", "Utilities", "Healthcare", "Entertainment", "Other")
+    for i in range(count):
+        yield {
+            "date": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "category": categories[i % len(categories)],
+            "description": f"Benchmark expense {i}",
+            "payment_method": "UPI",
+            "amount": 10 + (i * 37) % 5000,
+            "notes": "",
+        }
+
+
+def benchmark_expense_report(row_counts=(1000, 10000, 50000), compare_single=False, measure_memory=True):
+    """Time generate_expense_report on synthetic data.
+
+    Returns a list of dicts (rows, mode, seconds, pages, peak_mb). Peak
+    memory comes from a second, tracemalloc-instrumented run so it does not
+    skew the timing. With compare_single, the old single-Table layout is
+    timed too for inputs up to 10k rows (it grows quadratically beyond).
+    """
+    import os
+    import re
+    import tempfile
+    import tracemalloc
+
+    class _SingleTableGenerator(AccountingReportGenerator):
+        def _expense_table(self, expenses):
+            data = [["Date", "Category", "Description", "Method", "Amount", "Notes"]]
+            data.extend(self._expense_rows(expenses))
+            return [Table(data, repeatRows=1, style=self._expense_table_style())]
+
+    modes = [("chunked", AccountingReportGenerator)]
+    if compare_single:
+        modes.append(("single-table", _SingleTableGenerator))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in row_counts:
+            expenses = list(_synthetic_expenses(count))
+            summary = {"total_expenses": sum(e["amount"] for e in expenses), "total_income": 0, "balance": 0}
+            for mode, cls in modes:
+                if mode == "single-table" and count > 10000:
+                    continue
+                path = os.path.join(tmp, f"bench_{mode}_{count}.pdf")
+
+                def run():
+                    cls(path).generate_expense_report(
+                        {"username": "benchmark"}, expenses, summary, "2025-01-01", "2025-12-31"
+                    )
+
+                t0 = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - t0
+                with open(path, "rb") as f:
+                    pages = len(re.findall(rb"/Type /Page\b", f.read()))
+
+                peak_mb = None
+                if measure_memory:
+                    tracemalloc.start()
+                    run()
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    peak_mb = round(peak / (1024 * 1024), 1)
+
+                results.append({
+                    "rows": count,
+                    "mode": mode,
+                    "seconds": round(elapsed, 3),
+                    "pages": pages,
+                    "peak_mb": peak_mb,
+                })
+    return results
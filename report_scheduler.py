@@ -0,0 +1,206 @@
+"""Scheduled report delivery (no tkinter dependency).
+
+A scheduler pass loads every due row of report_schedules in one query,
+groups them by (user, report kind, period, account) and renders each group's
+PDF once in memory, however many schedules or recipients share it. The report
+design is per user, so it is part of that key. Due schedules are claimed
+first by advancing their next_run_date only if it is still the due one, so a
+GUI scheduler and ``python ogca.py schedules run`` never both send a run; each
+claimed schedule then gets its own message in the mail outbox (see
+mail_queue.py). A schedule whose report fails is put back to retry.
+"""
+import calendar
+import io
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+from batch_reports import period_range, report_user_data
+from config import REPORT_SCHEDULE_INTERVAL
+from database import Database
+from mail_queue import enqueue_message
+
+
+REPORT_KINDS = ("expense", "balance")
+FREQUENCIES = ("weekly", "monthly", "quarterly", "yearly")
+MONTH_STEPS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+
+def _add_months(day, months, anchor_day=None):
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(anchor_day or day.day, calendar.monthrange(year, month)[1]))
+
+
+def advance_run_date(run_date, frequency, today=None, anchor_day=None):
+    """Next run date after run_date, skipping any runs missed before today.
+
+    Month-based frequencies land on anchor_day (the schedule's original day of
+    month) where the month has it, so the 31st runs on 28 Feb and then 31 Mar.
+    """
+    current = datetime.strptime(str(run_date), "%Y-%m-%d").date()
+    today = today or datetime.now().date()
+    freq = (frequency or "monthly").lower()
+    step = 0
+    while True:
+        step += 1
+        if freq == "weekly":
+            nxt = current + timedelta(days=7 * step)
+        else:
+            nxt = _add_months(current, MONTH_STEPS.get(freq, 1) * step, anchor_day)
+        if nxt > today:
+            return str(nxt)
+
+
+def render_report(db, user_id, kind="expense", period="Month", account_id=None, today=None):
+    """Render a report PDF into memory. Returns (subject, filename, pdf_bytes)."""
+    from pdf_generator import AccountingReportGenerator
+
+    if kind not in REPORT_KINDS:
+        raise ValueError(f"Unsupported report type: {kind}")
+    user = report_user_data(db, user_id)
+    account_name = None
+    if account_id is not None:
+        account = next((a for a in db.get_managed_accounts(user_id) if a["id"] == account_id), None)
+        if not account:
+            raise ValueError(f"Account {account_id} not found")
+        account_name = account["account_name"]
+
+    buf = io.BytesIO()
+    report = AccountingReportGenerator(buf)
+    if kind == "balance":
+        income = db.get_income(user_id)
+        if account_id is None:
+            expenses = db.get_expenses(user_id)
+            summary = db.get_summary(user_id)
+        else:
+            income = [row for row in income if row.get("account_id") == account_id]
+            expenses = db.get_account_expenses(user_id, account_id)
+            summary = db.get_account_summary(user_id, account_id)
+        report.generate_balance_sheet(user, income, expenses, summary)
+        subject = "Balance Sheet"
+    else:
+        start_date, end_date = period_range(period, today)
+        if account_id is None:
+            expenses = db.get_expenses(user_id, start_date, end_date)
+            summary = db.get_summary(user_id, start_date, end_date)
+        else:
+            expenses = db.get_account_expenses(user_id, account_id, start_date, end_date)
+            summary = db.get_account_summary(user_id, account_id, start_date, end_date)
+        report.generate_expense_report(
+            user, expenses, summary, start_date, end_date,
+            report_name=f"Account Statement - {account_name}" if account_name else None,
+        )
+        subject = f"{period} Expense Report"
+
+    if account_name:
+        subject = f"{subject} - {account_name}"
+    stamp = (today or datetime.now()).strftime("%Y%m%d")
+    filename = f"{subject.replace(' - ', '_').replace(' ', '_')}_{stamp}.pdf"
+    return subject, filename, buf.getvalue()
+
+
+def build_report_message(subject, filename, data, recipients, sender):
+    msg = EmailMessage()
+    msg["Subject"] = subject
+    msg["From"] = sender
+    msg["To"] = recipients
+    msg.set_content("Please find attached your scheduled report.")
+    msg.add_attachment(data, maintype="application", subtype="pdf", filename=filename)
+    return msg
+
+
+def run_due_schedules(db, run_date=None, user_ids=None, default_sender=""):
+    """Queue every due scheduled report. Returns counts for the pass."""
+    now = datetime.now()
+    run_date = str(run_date or now.date())
+    today = datetime.strptime(run_date, "%Y-%m-%d").date()
+    due = db.get_due_report_schedules(run_date, user_ids)
+    for schedule in due:
+        schedule["claimed_run_date"] = advance_run_date(
+            schedule["next_run_date"], schedule["frequency"], today, schedule.get("anchor_day")
+        )
+    claimed = set(db.claim_report_schedules(
+        (s["id"], s["next_run_date"], s["claimed_run_date"]) for s in due
+    ))
+    schedules = [s for s in due if s["id"] in claimed]
+
+    groups = {}
+    for schedule in schedules:
+        key = (schedule["user_id"], schedule["report_kind"], schedule["period"], schedule["account_id"])
+        groups.setdefault(key, []).append(schedule)
+
+    result = {"due": len(schedules), "rendered": 0, "queued": 0, "errors": 0, "mail_ids": []}
+    runs = []
+    senders = {}
+    for (user_id, kind, period, account_id), group in groups.items():
+        try:
+            subject, filename, data = render_report(
+                db, user_id, kind, period, account_id,
+                today=datetime.combine(today, now.time()),
+            )
+            result["rendered"] += 1
+        except Exception as e:
+            # Put these back to due so the next pass retries them
+            result["errors"] += len(group)
+            runs.extend((s["id"], s["next_run_date"], f"error: {e}") for s in group)
+            continue
+
+        for schedule in group:
+            if user_id not in senders:
+                senders[user_id] = default_sender or (db.get_user(user_id) or {}).get("email", "")
+            try:
+                msg = build_report_message(
+                    subject, filename, data, schedule["recipients"], schedule.get("sender") or senders[user_id]
+                )
+                mail_id = enqueue_message(db, msg, user_id)
+            except Exception as e:
+                result["errors"] += 1
+                runs.append((schedule["id"], schedule["next_run_date"], f"error: {e}"))
+                continue
+            result["queued"] += 1
+            result["mail_ids"].append(mail_id)
+            runs.append((schedule["id"], schedule["claimed_run_date"], f"queued mail #{mail_id}"))
+
+    if runs:
+        db.record_report_schedule_runs(runs)
+    return result
+
+
+class ReportScheduler:
+    """Run due report schedules every `interval` seconds on a daemon thread."""
+
+    def __init__(self, interval=REPORT_SCHEDULE_INTERVAL, db_path=None, user_ids=None, on_run=None):
+        self.interval = max(int(interval), 60)
+        self.db_path = db_path
+        self.user_ids = user_ids
+        self.on_run = on_run
+        self.last_result = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        try:
+            self.last_result = run_due_schedules(Database(self.db_path), user_ids=self.user_ids)
+            self.last_error = None
+            if self.on_run and self.last_result["queued"]:
+                self.on_run(self.last_result)
+        except Exception as e:
+            self.last_error = str(e)
+        return self.last_result
+
+    def _loop(self):
+        self.run_once()
+        while not self._stop.wait(self.interval):
+            self.run_once()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="ogca-report-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,119 @@
+"""Monte Carlo balance paths from resampled monthly history (no tkinter dependency).
+
+Every income source and expense category keeps its own distribution: the
+monthly totals of the last SIMULATION_HISTORY_MONTHS closed months, from the
+month it first appeared (zero months included). Each simulated month draws
+one historical month per category independently, with NumPy, for a batch of
+paths at a time; after each batch the percentile bands, the chance of the
+balance going negative and the odds of reaching each goal are reported over
+every path so far, so callers can render while the rest runs.
+"""
+from datetime import date
+
+from config import SIMULATION_BATCH, SIMULATION_HISTORY_MONTHS, SIMULATION_PATHS
+from forecast import month_index, month_label, _require_numpy, monthly_history
+
+
+PERCENTILES = (5, 25, 50, 75, 95)
+PREVIEW_PATHS = 20000  # bands reported between batches use an even sample of at most this many paths
+
+
+def load_history(db, user_id, account="ALL", months=SIMULATION_HISTORY_MONTHS, today=None):
+    """{"income"|"expense": {category: [monthly totals]}} over the last closed months."""
+    today = today or date.today()
+    last = today.year * 12 + today.month - 2
+    first = last - months + 1
+    account = account if account == "ALL" else (account or 0)
+    totals = {}
+    for (kind, account_id, category), by_month in monthly_history(db, user_id, month_label(first), month_label(last)).items():
+        if account != "ALL" and account_id != account:
+            continue
+        series = totals.setdefault(kind, {}).setdefault(category, [0.0] * months)
+        for month, total in by_month.items():
+            series[month_index(month) - first] += total
+    history = {"income": {}, "expense": {}}
+    for kind, categories in totals.items():
+        for category, series in categories.items():
+            active = next((i for i, value in enumerate(series) if value), None)
+            if active is not None:
+                history[kind][category] = series[active:]
+    return history
+
+
+def _summary(np, balances, done, negative_any, negative_by_month, goal_counts, goals, months, start_balance, final):
+    step = 1 if final else max(1, done // PREVIEW_PATHS)
+    bands = np.percentile(balances[:, :done:step], PERCENTILES, axis=1)
+    goal_rows = []
+    for goal, counts in zip(goals, goal_counts):
+        reached = np.cumsum(counts) / done  # P(reached within k + 1 months)
+        median = int(np.argmax(reached >= 0.5)) + 1 if reached[-1] >= 0.5 else None
+        due_index = goal.get("due_index")
+        goal_rows.append(dict(
+            goal,
+            prob_reached=float(reached[-1]),
+            median_months=median,
+            prob_by_due=float(reached[due_index]) if due_index is not None and 0 <= due_index < len(reached) else None,
+        ))
+    return {
+        "months": months,
+        "paths": done,
+        "start_balance": start_balance,
+        "bands": {p: bands[i].tolist() for i, p in enumerate(PERCENTILES)},
+        "prob_negative": negative_any / done,
+        "prob_negative_by_month": (negative_by_month / done).tolist(),
+        "goals": goal_rows,
+    }
+
+
+def simulate(history, start_balance, months=12, paths=SIMULATION_PATHS, income_change=0.0, expense_change=0.0,
+             one_time=0.0, one_time_month=0, goals=(), first_month=None, batch_size=SIMULATION_BATCH,
+             seed=None, progress=None, should_stop=None):
+    """Run paths balance paths over months; returns the final summary.
+
+    goals: [{"title", "remaining", "due_index"}] where remaining is the amount
+    still to save and due_index the 0-based month it is due in (or None).
+    progress(summary) is called after every batch with the paths so far;
+    should_stop() is polled between batches.
+    """
+    np = _require_numpy()
+    if not history["income"] and not history["expense"]:
+        raise ValueError("No closed months of history to simulate from")
+    rng = np.random.default_rng(seed)
+    first_month = first_month or date.today().strftime("%Y-%m")
+    labels = [month_label(month_index(first_month) + i) for i in range(months)]
+    samples = [(np.asarray(values, dtype=np.float32) * (1 + income_change / 100.0)) for values in history["income"].values()]
+    samples += [(np.asarray(values, dtype=np.float32) * -(1 + expense_change / 100.0)) for values in history["expense"].values()]
+    goals = [dict(goal) for goal in goals]
+
+    # Month-major (months x paths) so per-month percentiles read contiguous rows
+    balances = np.empty((months, paths), dtype=np.float32)
+    negative_any = 0
+    negative_by_month = np.zeros(months)
+    goal_counts = [np.zeros(months) for _ in goals]
+    done = 0
+    summary = None
+    while done < paths:
+        if should_stop and should_stop():
+            break
+        size = min(batch_size, paths - done)
+        net = np.zeros((months, size), dtype=np.float32)
+        for values in samples:
+            net += np.take(values, rng.integers(0, len(values), size=(months, size), dtype=np.int16))
+        if one_time and 0 <= one_time_month < months:
+            net[one_time_month] -= one_time
+        saved = np.cumsum(net, axis=0)
+        balance = start_balance + saved
+        balances[:, done:done + size] = balance
+        negative = balance < 0
+        negative_any += int(negative.any(axis=0).sum())
+        negative_by_month += negative.sum(axis=1)
+        for goal, counts in zip(goals, goal_counts):
+            reached = saved >= goal["remaining"]
+            hit = reached.any(axis=0)
+            counts += np.bincount(np.argmax(reached[:, hit], axis=0), minlength=months)
+        done += size
+        summary = _summary(np, balances, done, negative_any, negative_by_month, goal_counts, goals, labels,
+                           start_balance, final=done >= paths)
+        if progress:
+            progress(summary)
+    return summary
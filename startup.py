@@ -0,0 +1,150 @@
+"""Startup helpers: background warm-up/prefetch and a cold-start benchmark."""
+import importlib
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from database import Database
+
+
+class DashboardPrefetcher:
+    """Warm heavy imports and dashboard data while the login screen is open.
+
+    Data is kept in memory keyed by user id and is only handed out through
+    take() after the login succeeded for that same user.
+    """
+
+    def __init__(self, db=None):
+        self.db = db or Database()
+        self._lock = threading.Lock()
+        self._cache = {}
+        self._pending_username = None
+        self._generation = 0  # bumped by prefetch() and take(); older loads are dropped
+        self._import_thread = None
+
+    def warm_imports(self):
+        """Import the main UI module on a worker thread."""
+        if self._import_thread is not None:
+            return
+
+        def _load():
+            try:
+                importlib.import_module("expense_tracker")
+            except Exception:
+                pass
+
+        self._import_thread = threading.Thread(target=_load, name="ogca-warm-imports", daemon=True)
+        self._import_thread.start()
+
+    def prefetch(self, username):
+        """Start loading dashboard data for username (no-op if already queued)."""
+        username = (username or "").strip()
+        if not username:
+            return
+        with self._lock:
+            if username == self._pending_username:
+                return
+            self._pending_username = username
+            self._generation += 1
+            generation = self._generation
+        threading.Thread(
+            target=self._load_user, args=(username, generation), name="ogca-prefetch", daemon=True
+        ).start()
+
+    def _load_user(self, username, generation):
+        try:
+            conn = self.db.get_connection()
+            row = conn.execute('SELECT id FROM users WHERE username = ?', (username,)).fetchone()
+            conn.close()
+            if not row:
+                return
+            user_id = row["id"]
+            data = {
+                "summary": self.db.get_summary(user_id),
+                "category_summary": self.db.get_category_summary(user_id),
+                "managed_accounts": self.db.get_managed_accounts(user_id),
+                "expenses": self.db.get_expenses(user_id),
+                "income": self.db.get_income(user_id),
+            }
+        except Exception:
+            return
+        with self._lock:
+            # A later prefetch or a take() made this load stale: never hand it out
+            if generation == self._generation:
+                self._cache[user_id] = data
+
+    def take(self, user_id):
+        """Pop prefetched data for an authenticated user (None if not ready).
+
+        Whatever is still loading is discarded, so a later login in the same
+        session never gets data from an earlier one.
+        """
+        with self._lock:
+            self._pending_username = None
+            self._generation += 1
+            data = self._cache.pop(user_id, None)
+            self._cache.clear()
+        return data
+
+
+def _time_import(statement, repeat, cwd):
+    code = (
+        "import time\n"
+        "t0 = time.perf_counter()\n"
+        f"{statement}\n"
+        "print((time.perf_counter() - t0) * 1000)\n"
+    )
+    return _run_samples(code, repeat, cwd)
+
+
+def _time_login_window(repeat, cwd):
+    """Wall time from launching a fresh interpreter to the login window being on screen."""
+    code = (
+        "import sys, time\n"
+        "import main\n"
+        "app = main.ExpenseTrackerApp()\n"
+        "app.root.wait_visibility()\n"
+        "app.root.update()\n"
+        "print((time.time() - float(sys.argv[1])) * 1000)\n"
+        "app.root.destroy()\n"
+    )
+    return _run_samples(code, repeat, cwd, pass_launch_time=True)
+
+
+def _run_samples(code, repeat, cwd, pass_launch_time=False):
+    samples = []
+    for _ in range(repeat):
+        args = [sys.executable, "-c", code] + ([repr(time.time())] if pass_launch_time else [])
+        try:
+            out = subprocess.run(args, cwd=cwd, capture_output=True, text=True, timeout=120)
+        except subprocess.TimeoutExpired:
+            return None, "timed out"
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1] if out.stderr.strip() else "failed"
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples), None
+
+
+def measure_startup(repeat=5):
+    """Measure cold start (fresh interpreter each run) of the startup path.
+
+    The first case is the time until the login window is shown, including
+    interpreter start; the others are import costs alone, to show what the
+    deferred imports save. Returns a list of (label, median_ms or None,
+    error or None); the window case reports an error without a display.
+    """
+    cwd = os.path.dirname(os.path.abspath(__file__))
+    results = [("login window shown (launch to first paint)",) + _time_login_window(repeat, cwd)]
+    cases = [
+        ("login path (import main)", "import main"),
+        ("eager path (main + expense_tracker)", "import main, expense_tracker"),
+        ("expense_tracker (deferred until login)", "import expense_tracker"),
+        ("pdf_generator (deferred until first report)", "import pdf_generator"),
+    ]
+    for label, statement in cases:
+        median_ms, error = _time_import(statement, repeat, cwd)
+        results.append((label, median_ms, error))
+    return results
@@ -0,0 +1,306 @@
+"""Statement PDF parsing for OG CA (no tkinter dependency)."""
+import contextlib
+import io
+import logging
+import re
+from datetime import datetime
+
+
+STATEMENT_PRESETS = ("Auto", "PhonePe", "Paytm", "GPay", "Generic")
+
+KEYWORD_CATEGORY_MAP = {
+    "Food": ["food", "restaurant", "cafe", "zomato", "swiggy", "dinner", "lunch"],
+    "Transport": ["uber", "ola", "taxi", "metro", "bus", "fuel", "petrol", "diesel"],
+    "Utilities": ["electricity", "water", "internet", "wifi", "gas", "bill", "recharge"],
+    "Entertainment": ["movie", "netflix", "spotify", "game", "concert"],
+    "Healthcare": ["doctor", "medicine", "pharmacy", "hospital", "clinic"],
+    "Education": ["course", "tuition", "book", "exam", "school", "college"],
+}
+
+
+def _require_pdfplumber():
+    try:
+        import pdfplumber
+    except Exception:
+        raise RuntimeError("pdfplumber is required for PDF import. Install with: pip install pdfplumber")
+    logging.getLogger("pdfminer").setLevel(logging.ERROR)
+    logging.getLogger("pdfplumber").setLevel(logging.ERROR)
+    return pdfplumber
+
+
+def normalize_statement_date(raw_date):
+    """Convert statement date formats into YYYY-MM-DD."""
+    raw = (raw_date or "").strip()
+    formats = ["%b %d, %Y", "%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y"]
+    for fmt in formats:
+        try:
+            return datetime.strptime(raw, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return raw
+
+
+def phonepe_transaction_regex():
+    return re.compile(
+        r'^(?P<date>[A-Za-z]{3}\s+\d{1,2},\s+\d{4})\s+'
+        r'(?P<details>.+?)\s+'
+        r'(?P<type>DEBIT|CREDIT)\s+'
+        r'(?P<amount>[^\s]+)$'
+    )
+
+
+def _dedupe_transactions(transactions):
+    """De-duplicate by txn_id (or fallback tuple)."""
+    seen = set()
+    deduped = []
+    for t in transactions:
+        key = t["txn_id"] or f"{t['date']}|{t['type']}|{t['amount']}|{t['details']}"
+        if key in seen:
+            continue
+        seen.add(key)
+        deduped.append(t)
+    return deduped
+
+
+def parse_phonepe_statement_pdf(pdf_path):
+    """Parse multi-page PhonePe-style statement and return transactions list."""
+    pdfplumber = _require_pdfplumber()
+
+    pattern = phonepe_transaction_regex()
+    transactions = []
+    with contextlib.redirect_stderr(io.StringIO()):
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_no, page in enumerate(pdf.pages, start=1):
+                text = page.extract_text() or ""
+                lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+                current = None
+
+                for line in lines:
+                    if line.startswith("Page ") or "system generated statement" in line.lower():
+                        continue
+                    if line.startswith("Date Transaction Details") or line.startswith("Transaction Statement for"):
+                        continue
+                    if re.match(r'^\d{2}\D\d{2}\s*(am|pm)$', line.lower()):
+                        # orphan time line in odd extraction, ignore
+                        continue
+
+                    m = pattern.match(line)
+                    if m:
+                        if current:
+                            transactions.append(current)
+                        raw_date = m.group("date")
+                        details = m.group("details").strip()
+                        txn_type = m.group("type").upper()
+                        raw_amount = m.group("amount")
+                        cleaned_amount = re.sub(r'[^0-9.,]', '', raw_amount).replace(",", "")
+                        amount = float(cleaned_amount) if cleaned_amount else 0.0
+                        current = {
+                            "date": normalize_statement_date(raw_date),
+                            "raw_date": raw_date,
+                            "details": details,
+                            "type": txn_type,
+                            "amount": amount,
+                            "txn_id": "",
+                            "utr_no": "",
+                            "page": page_no,
+                        }
+                        continue
+
+                    if current:
+                        txn_id_match = re.search(r'Transaction ID\s+([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
+                        if txn_id_match:
+                            current["txn_id"] = txn_id_match.group(1)
+                        utr_match = re.search(r'UTR No\.\s*([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
+                        if utr_match:
+                            current["utr_no"] = utr_match.group(1)
+
+                if current:
+                    transactions.append(current)
+
+    return _dedupe_transactions(transactions)
+
+
+def parse_generic_upi_statement_pdf(pdf_path):
+    """Generic parser for UPI/payment statement formats."""
+    pdfplumber = _require_pdfplumber()
+
+    pattern = re.compile(
+        r'^(?P<date>[A-Za-z]{3}\s+\d{1,2},\s+\d{4}|\d{2}[/-]\d{2}[/-]\d{4}|\d{4}-\d{2}-\d{2})\s+'
+        r'(?P<details>.+?)\s+'
+        r'(?:(?P<type>DEBIT|CREDIT)\s+)?'
+        r'(?P<amount>[^\s]+)$',
+        flags=re.IGNORECASE
+    )
+
+    txns = []
+    with contextlib.redirect_stderr(io.StringIO()):
+        with pdfplumber.open(pdf_path) as pdf:
+            for page_no, page in enumerate(pdf.pages, start=1):
+                lines = [ln.strip() for ln in (page.extract_text() or "").splitlines() if ln.strip()]
+                current = None
+                for line in lines:
+                    low = line.lower()
+                    if line.startswith("Page ") or "system generated statement" in low or line.startswith("Date Transaction"):
+                        continue
+                    m = pattern.match(line)
+                    if m:
+                        if current:
+                            txns.append(current)
+                        raw_date = m.group("date")
+                        details = m.group("details").strip()
+                        raw_amount = m.group("amount")
+                        cleaned_amount = re.sub(r'[^0-9.,]', '', raw_amount).replace(",", "")
+                        amount = float(cleaned_amount) if cleaned_amount else 0.0
+                        txn_type = (m.group("type") or "").upper()
+                        if not txn_type:
+                            dl = details.lower()
+                            if "paid to" in dl or "sent to" in dl or "debit" in dl:
+                                txn_type = "DEBIT"
+                            elif "received" in dl or "credit" in dl:
+                                txn_type = "CREDIT"
+                            else:
+                                txn_type = "DEBIT"
+                        current = {
+                            "date": normalize_statement_date(raw_date),
+                            "raw_date": raw_date,
+                            "details": details,
+                            "type": txn_type,
+                            "amount": amount,
+                            "txn_id": "",
+                            "utr_no": "",
+                            "page": page_no,
+                        }
+                        continue
+                    if current:
+                        txn_id_match = re.search(r'(?:Transaction ID|Txn ID)\s*[:.]?\s*([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
+                        if txn_id_match:
+                            current["txn_id"] = txn_id_match.group(1)
+                        utr_match = re.search(r'UTR(?: No\.)?\s*[:.]?\s*([A-Za-z0-9]+)', line, flags=re.IGNORECASE)
+                        if utr_match:
+                            current["utr_no"] = utr_match.group(1)
+                if current:
+                    txns.append(current)
+
+    return _dedupe_transactions(txns)
+
+
+def detect_statement_provider(sample_text):
+    """Best-effort provider detection from PDF text."""
+    s = (sample_text or "").lower()
+    if "phonepe" in s:
+        return "PhonePe"
+    if "paytm" in s:
+        return "Paytm"
+    if "google pay" in s or "gpay" in s:
+        return "GPay"
+    return "Generic"
+
+
+def parse_statement_pdf(pdf_path, preset="Auto"):
+    """Parse PDF statement using selected preset. Returns (provider, transactions)."""
+    try:
+        import pdfplumber
+        with contextlib.redirect_stderr(io.StringIO()):
+            with pdfplumber.open(pdf_path) as pdf:
+                first_text = (pdf.pages[0].extract_text() or "") if pdf.pages else ""
+    except Exception:
+        first_text = ""
+
+    provider = detect_statement_provider(first_text) if preset == "Auto" else preset
+    provider = provider or "Generic"
+
+    if provider == "PhonePe":
+        txns = parse_phonepe_statement_pdf(pdf_path)
+    else:
+        txns = parse_generic_upi_statement_pdf(pdf_path)
+    return provider, txns
+
+
+def enhance_statement_description(details, txn_type, txn_id, provider="Statement"):
+    """Create cleaner description from raw statement details."""
+    d = (details or "").strip()
+    if d.lower().startswith("paid to "):
+        base = d[8:].strip()
+        desc = f"{provider} payment to {base}"
+    elif d.lower().startswith("received from "):
+        base = d[14:].strip()
+        desc = f"{provider} receipt from {base}"
+    else:
+        desc = f"{provider} {txn_type.lower()} - {d}"
+    if txn_id:
+        desc = f"{desc} ({txn_id})"
+    return desc[:160]
+
+
+def suggest_category(db, user_id, description):
+    """Suggest category using keyword rules + history."""
+    text = (description or "").strip().lower()
+    if not text:
+        return None
+    for category, words in KEYWORD_CATEGORY_MAP.items():
+        if any(word in text for word in words):
+            return category
+    return db.suggest_category(user_id, text)
+
+
+def build_import_rows(db, user_id, transactions, provider):
+    """Apply import rules and category suggestions to parsed transactions."""
+    rows = []
+    for txn in transactions:
+        rule = db.find_import_rule(user_id, txn["details"])
+        category = (
+            (rule["category"] if rule else None)
+            or suggest_category(db, user_id, txn["details"])
+            or ("Income" if txn["type"] == "CREDIT" else "Other")
+        )
+        desc = enhance_statement_description(txn["details"], txn["type"], txn["txn_id"], provider=provider)
+        rows.append({
+            **txn,
+            "category": category,
+            "description": desc,
+            "rule_account_name": (rule.get("account_name") if rule else ""),
+        })
+    return rows
+
+
+def save_import_rows(db, user_id, rows, provider, account_id=None, account_map=None):
+    """Persist previewed statement rows. Returns (imported, skipped)."""
+    account_map = account_map or {}
+    imported = 0
+    skipped = 0
+    for row in rows:
+        txn_id = row.get("txn_id", "")
+        if txn_id and db.statement_txn_exists(user_id, txn_id):
+            skipped += 1
+            continue
+
+        mapped_account = row.get("rule_account_name", "")
+        row_account_id = account_map.get(mapped_account, account_id) if mapped_account else account_id
+
+        notes = f"[STATEMENT:{txn_id}] [UTR:{row.get('utr_no','')}] [SOURCE:{provider} PDF]".strip()
+        if row["type"] == "DEBIT":
+            db.add_expense(
+                user_id,
+                row["category"],
+                float(row["amount"]),
+                row["date"],
+                row["description"],
+                "UPI",
+                notes=notes,
+                account_id=row_account_id,
+            )
+            imported += 1
+        elif row["type"] == "CREDIT":
+            db.add_income(
+                user_id,
+                row["description"],
+                float(row["amount"]),
+                row["date"],
+                f"Imported from statement {txn_id}",
+                notes=notes,
+                account_id=row_account_id,
+            )
+            imported += 1
+        else:
+            skipped += 1
+    return imported, skipped
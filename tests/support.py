@@ -0,0 +1,60 @@
+"""Shared test helpers: a throwaway database with a seeded random ledger."""
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from datetime import date, timedelta
+
+from database import Database
+
+
+class LedgerTestCase(unittest.TestCase):
+    """Each test gets its own database file (and archive folder) in a temp dir."""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="ogca-test-")
+        self.db_path = os.path.join(self.tmp, "ledger.db")
+        self.db = Database(self.db_path)
+        self.user_id = self.db.register_user("tester", "tester@example.com", "Passw0rd1")
+        self.account_ids = [
+            self.db.create_account(self.user_id, "Client A"),
+            self.db.create_account(self.user_id, "Client B"),
+        ]
+        self.rows = []  # (table, date, amount, account_id) for every seeded row
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def seed(self, count=1200, start=date(2019, 1, 1), days=1800, seed=7):
+        """Insert random expenses and income straight into SQLite, in one transaction."""
+        rng = random.Random(seed)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for _ in range(count):
+                day = (start + timedelta(days=rng.randrange(days))).isoformat()
+                table = rng.choice(("expenses", "income"))
+                label = "category" if table == "expenses" else "source"
+                amount = round(rng.uniform(1, 900), 2)
+                account_id = rng.choice([None] + self.account_ids)
+                conn.execute(
+                    f"INSERT INTO {table} (user_id, amount, {label}, date, account_id, description) "
+                    f"VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.user_id, amount, f"cat{rng.randrange(4)}", day, account_id, f"row {len(self.rows)}"),
+                )
+                self.rows.append((table, day, amount, account_id))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def brute_balance(self, day, account="ALL"):
+        """Income minus expenses dated on or before day, summed in Python."""
+        total = 0.0
+        for table, row_day, amount, account_id in self.rows:
+            if row_day > str(day):
+                continue
+            if account != "ALL" and (account_id or 0) != (account or 0):
+                continue
+            total += amount if table == "income" else -amount
+        return total
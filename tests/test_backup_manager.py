@@ -0,0 +1,73 @@
+import os
+import shutil
+import unittest
+
+import backup_manager
+import ledger_archive
+from tests.support import LedgerTestCase
+
+
+class ArchiveBackupTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seed(count=500)
+        ledger_archive.archive_transactions(self.db, "2022-01-01")
+        self.backups = os.path.join(self.tmp, "backups")
+
+    def snapshot(self):
+        uid = self.user_id
+        return {
+            "summary": self.db.get_summary(uid),
+            "ranged": sorted(e["id"] for e in self.db.get_expenses(uid, "2019-01-01", "2023-12-31")),
+            "trend": self.db.get_monthly_spending_trend(uid, 1000),
+        }
+
+    def test_restore_brings_back_archived_years(self):
+        before = self.snapshot()
+        path = backup_manager.create_backup(self.backups + os.sep, db_path=self.db_path, compression="gzip")
+        archive = backup_manager.backup_archive_dir(path)
+        self.assertEqual(len(os.listdir(archive)), 3)  # 2019, 2020 and 2021
+        self.assertEqual(backup_manager.verify_backup(path), (True, "ok (3 archive files)"))
+
+        # Lose the archive folder and move another year into a new file
+        shutil.rmtree(self.db.archive_dir())
+        ledger_archive.archive_transactions(self.db, "2023-01-01")
+        self.assertNotEqual(self.snapshot(), before)
+
+        backup_manager.restore_backup(path, db_path=self.db_path)
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(sorted(os.listdir(self.db.archive_dir())),
+                         [ledger_archive.archive_file_name(self.db, year) for year in (2019, 2020, 2021)])
+
+    def test_missing_archive_file_fails_the_backup(self):
+        os.remove(os.path.join(self.db.archive_dir(), ledger_archive.archive_file_name(self.db, 2020)))
+        with self.assertRaises(FileNotFoundError):
+            backup_manager.create_backup(self.backups + os.sep, db_path=self.db_path)
+        self.assertEqual(os.listdir(self.backups), [])
+
+    def test_verify_reports_a_missing_archive_folder(self):
+        path = backup_manager.create_backup(
+            os.path.join(self.backups, "snap.db"), db_path=self.db_path, compression=None
+        )
+        shutil.rmtree(backup_manager.backup_archive_dir(path))
+        ok, message = backup_manager.verify_backup(path)
+        self.assertFalse(ok)
+        self.assertIn("archive files missing", message)
+
+    def test_rotation_removes_archive_folders(self):
+        paths = [
+            backup_manager.create_backup(os.path.join(self.backups, f"{backup_manager.BACKUP_PREFIX}{i}.db"),
+                                         db_path=self.db_path)
+            for i in range(3)
+        ]
+        for age, path in enumerate(reversed(paths)):
+            os.utime(path, (1000000 - age, 1000000 - age))
+        self.assertEqual(backup_manager.list_backups(self.backups), paths[::-1])
+        self.assertEqual(backup_manager.rotate_backups(self.backups, keep=1), paths[1::-1])
+        self.assertEqual(sorted(os.listdir(self.backups)), [
+            os.path.basename(paths[2]), os.path.basename(backup_manager.backup_archive_dir(paths[2]))
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
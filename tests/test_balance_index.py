@@ -0,0 +1,108 @@
+import random
+import threading
+import unittest
+from datetime import date
+
+import ledger_archive
+from balance_index import BalanceIndex, Fenwick
+from tests.support import LedgerTestCase
+
+
+class FenwickTests(unittest.TestCase):
+    def test_prefix_sums_match_naive_sums(self):
+        rng = random.Random(3)
+        base = date(2024, 1, 1).toordinal()
+        daily = {base + rng.randrange(500): rng.uniform(-100, 100) for _ in range(200)}
+        tree = Fenwick(daily)
+        # Adds inside, before and far after the allocated range (forces rebuilds)
+        for ordinal in (base + 10, base - 40, base + 5000, base + 250):
+            daily[ordinal] = daily.get(ordinal, 0.0) + 12.5
+            tree.add(ordinal, 12.5)
+        for ordinal in range(base - 60, base + 5100, 7):
+            expected = sum(net for day, net in daily.items() if day <= ordinal)
+            self.assertAlmostEqual(tree.prefix(ordinal), expected, places=6)
+
+    def test_empty_tree_grows_on_first_add(self):
+        tree = Fenwick()
+        self.assertEqual(tree.prefix(date(2024, 1, 1).toordinal()), 0.0)
+        tree.add(date(2024, 5, 1).toordinal(), 7.0)
+        self.assertEqual(tree.prefix(date(2024, 4, 30).toordinal()), 0.0)
+        self.assertEqual(tree.prefix(date(2030, 1, 1).toordinal()), 7.0)
+
+
+class BalanceIndexTests(LedgerTestCase):
+    DAYS = ("2019-01-01", "2019-06-15", "2020-02-29", "2021-03-15", "2022-12-31", "2023-07-04", "2030-01-01")
+
+    def setUp(self):
+        super().setUp()
+        self.seed(count=1000, start=date(2019, 1, 1), days=5 * 365)
+        self.index = BalanceIndex(self.db)
+
+    def tearDown(self):
+        self.index.close()
+        super().tearDown()
+
+    def assertMatchesBruteForce(self, index=None):
+        index = index or self.index
+        for day in self.DAYS:
+            for account in ("ALL", None) + tuple(self.account_ids):
+                with self.subTest(day=day, account=account):
+                    self.assertAlmostEqual(
+                        index.balance_as_of(self.user_id, day, account), self.brute_balance(day, account), places=6
+                    )
+
+    def test_balances_match_brute_force(self):
+        self.assertMatchesBruteForce()
+        opening, closing = self.index.opening_and_closing(self.user_id, "2021-01-01", "2021-12-31")
+        self.assertAlmostEqual(opening, self.brute_balance("2020-12-31"), places=6)
+        self.assertAlmostEqual(closing, self.brute_balance("2021-12-31"), places=6)
+        self.assertAlmostEqual(self.index.net_between(self.user_id, "2021-01-01", "2021-12-31"), closing - opening, places=6)
+
+    def test_writes_update_built_trees(self):
+        self.index.balance_as_of(self.user_id)  # build before writing
+        expense_id = self.db.add_expense(self.user_id, "cat1", 250.0, "2020-05-05", account_id=self.account_ids[0])
+        self.rows.append(("expenses", "2020-05-05", 250.0, self.account_ids[0]))
+        self.db.update_expense(expense_id, amount=300.0, date="2021-05-05")
+        self.rows[-1] = ("expenses", "2021-05-05", 300.0, self.account_ids[0])
+        income_id = self.db.add_income(self.user_id, "Salary", 999.0, "2022-01-10")
+        self.db.delete_income(income_id)
+
+        worker = threading.Thread(target=self.db.add_income, args=(self.user_id, "Gift", 75.0, "2019-06-01"))
+        worker.start()
+        worker.join()
+        self.rows.append(("income", "2019-06-01", 75.0, None))
+        self.assertMatchesBruteForce()
+
+    def test_repeated_identical_writes_are_all_applied(self):
+        self.index.balance_as_of(self.user_id)
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            for i in range(3):
+                cursor.execute(
+                    "INSERT INTO income (user_id, source, amount, date) VALUES (?, 'Bonus', 10, '2022-02-02')",
+                    (self.user_id,),
+                )
+                conn.commit()
+                self.rows.append(("income", "2022-02-02", 10.0, None))
+        finally:
+            conn.close()
+        self.assertMatchesBruteForce()
+
+    def test_archived_days_keep_their_balances(self):
+        self.index.balance_as_of(self.user_id)
+        ledger_archive.archive_transactions(self.db, "2022-07-01")
+        self.assertMatchesBruteForce()
+        fresh = BalanceIndex(self.db)
+        try:
+            self.assertMatchesBruteForce(fresh)
+        finally:
+            fresh.close()
+
+        for year in (2019, 2020, 2021, 2022):
+            ledger_archive.restore_year(self.db, year)
+        self.assertMatchesBruteForce()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from datetime import date, timedelta
+
+import ledger_archive
+from cash_flow import CashFlow, flow_series
+from tests.support import LedgerTestCase
+
+
+def _bucket(day, granularity):
+    if granularity == "day":
+        return day
+    if granularity == "month":
+        return day[:7] + "-01"
+    parsed = date.fromisoformat(day)
+    return (parsed - timedelta(days=parsed.weekday())).isoformat()
+
+
+class CashFlowTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seed(count=900, start=date(2021, 1, 1), days=3 * 365)
+
+    def brute_series(self, granularity, start_date=None, end_date=None, account="ALL"):
+        """Per-period income, expenses and running balance, summed in Python."""
+        buckets = {}
+        for table, day, amount, account_id in self.rows:
+            if account != "ALL" and (account_id or 0) != (account or 0):
+                continue
+            if (start_date and day < start_date) or (end_date and day > end_date):
+                continue
+            income, expenses = buckets.get(_bucket(day, granularity), (0.0, 0.0))
+            if table == "income":
+                income += amount
+            else:
+                expenses += amount
+            buckets[_bucket(day, granularity)] = (income, expenses)
+        balance = 0.0
+        if start_date:
+            day_before = (date.fromisoformat(start_date) - timedelta(days=1)).isoformat()
+            balance = self.brute_balance(day_before, account)
+        series = []
+        for period in sorted(buckets):
+            income, expenses = buckets[period]
+            balance += income - expenses
+            series.append((period, round(income, 6), round(expenses, 6), round(balance, 6)))
+        return series
+
+    def actual(self, *args, **kwargs):
+        return [(row["period"], round(row["income"], 6), round(row["expenses"], 6), round(row["balance"], 6))
+                for row in flow_series(self.db, self.user_id, *args, **kwargs)]
+
+    def test_all_time_series_match_brute_force(self):
+        for granularity in ("day", "week", "month"):
+            with self.subTest(granularity=granularity):
+                self.assertEqual(self.actual(granularity), self.brute_series(granularity))
+
+    def test_ranged_and_account_series_carry_opening_balance(self):
+        cases = [
+            ("day", "2022-03-15", "2022-06-30", "ALL"),
+            ("week", "2022-02-02", "2023-02-01", None),
+            ("month", "2022-05-20", None, self.account_ids[0]),
+        ]
+        for granularity, start_date, end_date, account in cases:
+            with self.subTest(granularity=granularity, start=start_date, account=account):
+                self.assertEqual(
+                    self.actual(granularity, start_date, end_date, account),
+                    self.brute_series(granularity, start_date, end_date, account),
+                )
+
+    def test_series_unchanged_by_archiving(self):
+        ranged = self.brute_series("day", "2022-03-15", "2023-06-30")
+        monthly = self.brute_series("month", "2021-12-10")
+        ledger_archive.archive_transactions(self.db, "2023-01-01")
+        self.assertEqual(self.actual("day", "2022-03-15", "2023-06-30"), ranged)
+        self.assertEqual(self.actual("month", "2021-12-10"), monthly)
+
+    def test_cache_is_dropped_after_writes(self):
+        cash_flow = CashFlow(self.db)
+        try:
+            before = cash_flow.series(self.user_id, "month")
+            self.db.add_income(self.user_id, "Bonus", 1000, "2022-02-10")
+            after = cash_flow.series(self.user_id, "month")
+            self.assertAlmostEqual(after[-1]["balance"] - before[-1]["balance"], 1000)
+        finally:
+            cash_flow.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
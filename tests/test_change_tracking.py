@@ -0,0 +1,62 @@
+import unittest
+
+from tests.support import LedgerTestCase
+
+
+class ChangeTrackingTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.tables, self.row_events, self.flows = [], [], []
+        self.db.add_change_listener(self.tables.append)
+        self.db.add_row_listener(self.row_events.append)
+        self.db.add_flow_listener(self.flows.append)
+
+    def test_repeated_statements_are_reported_after_each_commit(self):
+        conn = self.db.get_connection()
+        try:
+            cursor = conn.cursor()
+            for _ in range(3):
+                cursor.execute("INSERT INTO quick_notes (user_id, title) VALUES (?, 'note')", (self.user_id,))
+                conn.commit()
+            for day in ("2024-01-01", "2024-01-02", "2024-01-03"):
+                cursor.execute(
+                    "INSERT INTO expenses (user_id, category, amount, date) VALUES (?, 'Food', 5, ?)",
+                    (self.user_id, day),
+                )
+                conn.commit()
+        finally:
+            conn.close()
+        self.assertEqual(sum("quick_notes" in tables for tables in self.tables), 3)
+        self.assertEqual(sum("expenses" in tables for tables in self.tables), 3)
+        self.assertEqual(len(self.row_events), 3)
+        self.assertEqual([list(flows.items()) for flows in self.flows], [
+            [((self.user_id, 0, day), -5.0)] for day in ("2024-01-01", "2024-01-02", "2024-01-03")
+        ])
+
+    def test_row_events_coalesce_per_commit(self):
+        expense_id = self.db.add_expense(self.user_id, "Food", 12.0, "2024-02-01")
+        self.db.update_expense(expense_id, amount=15.0)
+        self.db.delete_expense(expense_id)
+        self.assertEqual(self.row_events, [
+            {"expenses": {"insert": [expense_id]}},
+            {"expenses": {"update": [expense_id]}},
+            {"expenses": {"delete": [expense_id]}},
+        ])
+        self.assertEqual([sum(flows.values()) for flows in self.flows], [-12.0, -3.0, 15.0])
+
+    def test_rollback_reports_nothing(self):
+        conn = self.db.get_connection()
+        try:
+            conn.cursor().execute(
+                "INSERT INTO income (user_id, source, amount, date) VALUES (?, 'Salary', 100, '2024-03-01')",
+                (self.user_id,),
+            )
+            conn.rollback()
+            conn.commit()
+        finally:
+            conn.close()
+        self.assertEqual((self.tables, self.row_events, self.flows), ([], [], []))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import csv
+import os
+import unittest
+
+import csv_export
+import ledger_archive
+from tests.support import LedgerTestCase
+
+
+class CsvExportArchiveTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seed(count=600)
+        self.path = os.path.join(self.tmp, "export.csv")
+
+    def exported_dates(self, **kwargs):
+        csv_export.export_transactions_csv(self.db, self.user_id, self.path, include_total=False, **kwargs)
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return sorted(row[0] for row in list(csv.reader(f))[1:])
+
+    def category_totals(self, **kwargs):
+        csv_export.export_category_csv(self.db, self.user_id, self.path, **kwargs)
+        with open(self.path, newline="", encoding="utf-8") as f:
+            return [row[:3] for row in csv.reader(f)]
+
+    def test_exports_include_archived_years(self):
+        cases = [
+            {"start_date": "2020-01-01", "end_date": "2020-12-31"},
+            {"start_date": "2019-06-01", "end_date": "2022-06-30", "account_id": self.account_ids[0]},
+            {"end_date": "2021-03-31"},
+            {},
+        ]
+        before = [self.exported_dates(**kwargs) for kwargs in cases]
+        categories = self.category_totals(start_date="2019-01-01", end_date="2021-12-31")
+        self.assertTrue(all(before))
+
+        ledger_archive.archive_transactions(self.db, "2022-01-01")
+        for kwargs, expected in zip(cases, before):
+            with self.subTest(**kwargs):
+                self.assertEqual(self.exported_dates(**kwargs), expected)
+        self.assertEqual(self.exported_dates(table="income", start_date="2020-01-01", end_date="2020-12-31"),
+                         sorted(day for table, day, _, _ in self.rows if table == "income" and day[:4] == "2020"))
+        self.assertEqual(self.category_totals(start_date="2019-01-01", end_date="2021-12-31"), categories)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import sqlite3
+import unittest
+from datetime import date
+
+import ledger_archive
+from tests.support import LedgerTestCase
+
+
+class ArchiveRoundTripTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        # Twelve years, so ranged reads need more archive files than SQLite can ATTACH
+        self.seed(count=2500, start=date(2012, 1, 1), days=12 * 365)
+
+    def _live_counts(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return {t: conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0] for t in ("expenses", "income")}
+        finally:
+            conn.close()
+
+    def _snapshot(self):
+        uid = self.user_id
+        return {
+            "summary": self.db.get_summary(uid),
+            "ranged_summary": self.db.get_summary(uid, "2012-01-01", "2023-12-31"),
+            "ranged_rows": len(self.db.get_expenses(uid, "2012-01-01", "2023-12-31")),
+            "categories": self.db.get_category_summary(uid),
+            "trend": self.db.get_monthly_spending_trend(uid, 1000),
+            "top": self.db.get_top_categories(uid),
+            "account": self.db.get_account_summary(uid, self.account_ids[0]),
+        }
+
+    def assertSnapshotEqual(self, before, after):
+        for key in before:
+            with self.subTest(key=key):
+                self.assertEqual(_rounded(after[key]), _rounded(before[key]))
+
+    def test_archive_keeps_totals_and_ranged_reads(self):
+        before = self._snapshot()
+        live = self._live_counts()
+        result = ledger_archive.archive_transactions(self.db, "2023-01-01")
+        self.assertEqual(result["years"], list(range(2012, 2023)))
+        self.assertEqual(result["expenses"] + result["income"], sum(
+            1 for _, day, _, _ in self.rows if day < "2023-01-01"
+        ))
+        self.assertLess(sum(self._live_counts().values()), sum(live.values()))
+        self.assertSnapshotEqual(before, self._snapshot())
+
+    def test_restore_puts_every_row_back(self):
+        before = self._snapshot()
+        live = self._live_counts()
+        years = ledger_archive.archive_transactions(self.db, "2023-01-01")["years"]
+        for year in years:
+            ledger_archive.restore_year(self.db, year)
+        self.assertEqual(self._live_counts(), live)
+        self.assertEqual(ledger_archive.archive_status(self.db)["rollups"], 0)
+        self.assertEqual(self.db.get_archive_partitions(), [])
+        self.assertSnapshotEqual(before, self._snapshot())
+
+    def test_negative_balance_alert_counts_archived_income(self):
+        self.db.add_income(self.user_id, "Savings", 100000, "2015-03-01")
+        ledger_archive.archive_transactions(self.db, "2023-01-01")
+        live = self.db.get_summary(self.user_id, "2023-01-01", "9999-12-31")
+        # Makes the live rows negative; the archived income keeps the balance positive
+        self.db.add_expense(self.user_id, "cat0", max(live["total_income"] - live["total_expenses"], 0) + 1, "2024-06-01")
+        self.assertGreater(self.db.get_summary(self.user_id)["balance"], 0)
+        titles = [alert["title"] for alert in self.db.compute_system_alerts(self.user_id)]
+        self.assertNotIn("Negative Balance Warning", titles)
+
+
+def _rounded(value):
+    if isinstance(value, dict):
+        return {k: _rounded(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_rounded(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 6)
+    return value
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import time
+import unittest
+
+from tests.support import LedgerTestCase
+
+
+class RequeueStuckMailTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_id = self.db.register_user("other", "other@example.com", "Passw0rd1")
+
+    def enqueue(self, user_id):
+        return self.db.enqueue_mail(b"message", ["to@example.com"], "from@example.com", "Report", user_id)
+
+    def status(self, mail_id):
+        return self.db.get_mail(mail_id)["status"]
+
+    def test_only_expired_claims_are_requeued(self):
+        old, fresh = self.enqueue(self.user_id), self.enqueue(self.user_id)
+        now = time.time()
+        self.db.claim_due_mail(now - 3600, limit=1, user_id=self.user_id)  # claims `old` an hour ago
+        self.db.claim_due_mail(now, user_id=self.user_id)
+        self.assertEqual((self.status(old), self.status(fresh)), ("sending", "sending"))
+
+        self.assertEqual(self.db.requeue_stuck_mail(self.user_id, claimed_before=now - 900), 1)
+        self.assertEqual((self.status(old), self.status(fresh)), ("queued", "sending"))
+
+    def test_other_users_mail_is_left_alone(self):
+        mine, theirs = self.enqueue(self.user_id), self.enqueue(self.other_id)
+        self.db.claim_due_mail(time.time() - 3600)
+        self.assertEqual(self.db.requeue_stuck_mail(self.user_id, claimed_before=time.time()), 1)
+        self.assertEqual((self.status(mine), self.status(theirs)), ("queued", "sending"))
+        self.assertEqual(self.db.requeue_stuck_mail(), 1)
+        self.assertEqual(self.status(theirs), "queued")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import migrations
+from database import Database
+from migrations import SCHEMA_VERSION, migrate, schema_version
+
+
+def _schema(path):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'").fetchall())
+    finally:
+        conn.close()
+
+
+def _version(path):
+    conn = sqlite3.connect(path)
+    try:
+        return schema_version(conn)
+    finally:
+        conn.close()
+
+
+class MigrationTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp(prefix="ogca-test-")
+        self.path = os.path.join(self.tmp, "migrate.db")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_fresh_database_applies_every_step(self):
+        self.assertEqual(migrate(self.path), [step[0] for step in migrations.MIGRATIONS])
+        self.assertEqual(_version(self.path), SCHEMA_VERSION)
+
+    def test_rerun_is_a_noop(self):
+        migrate(self.path)
+        schema = _schema(self.path)
+        self.assertEqual(migrate(self.path), [])
+        Database(self.path)
+        self.assertEqual(_schema(self.path), schema)
+
+    def test_resume_from_partial_upgrade_matches_fresh_schema(self):
+        self.assertEqual(migrate(self.path, target=7), list(range(1, 8)))
+        self.assertEqual(_version(self.path), 7)
+        self.assertEqual(migrate(self.path), list(range(8, SCHEMA_VERSION + 1)))
+
+        fresh = os.path.join(self.tmp, "fresh.db")
+        migrate(fresh)
+        self.assertEqual(_schema(self.path), _schema(fresh))
+
+    def test_unversioned_database_upgrades_in_place(self):
+        migrate(self.path)
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+        conn.close()
+        schema = _schema(self.path)
+        migrate(self.path)
+        self.assertEqual(_version(self.path), SCHEMA_VERSION)
+        self.assertEqual(_schema(self.path), schema)
+
+    def test_interrupted_backfill_resumes(self):
+        migrate(self.path, target=7)
+        conn = sqlite3.connect(self.path)
+        conn.execute("INSERT INTO users (username, email, password_hash, salt) VALUES ('u', 'u@x', 'h', 's')")
+        for i in range(5):
+            conn.execute(
+                "INSERT INTO trash_bin (user_id, item_type, item_data) VALUES (1, 'expense', ?)",
+                (json.dumps({"amount": i + 1, "date": "2024-01-0%d" % (i + 1), "category": "Food"}),),
+            )
+        conn.commit()
+        conn.close()
+
+        real = Database._trash_columns
+        calls = []
+
+        def flaky(item_type, data):
+            calls.append(1)
+            if len(calls) == 3:
+                raise RuntimeError("interrupted")
+            return real(item_type, data)
+
+        with mock.patch.object(migrations._backfill_trash_columns, "__defaults__", (2,)), \
+                mock.patch.object(Database, "_trash_columns", staticmethod(flaky)):
+            with self.assertRaises(RuntimeError):
+                migrate(self.path)
+        self.assertEqual(_version(self.path), 7)
+        conn = sqlite3.connect(self.path)
+        done = conn.execute("SELECT COUNT(*) FROM trash_bin WHERE category IS NOT NULL").fetchone()[0]
+        conn.close()
+        self.assertEqual(done, 2)  # the first batch committed before the failure
+
+        migrate(self.path)
+        conn = sqlite3.connect(self.path)
+        rows = conn.execute("SELECT amount, category FROM trash_bin ORDER BY id").fetchall()
+        conn.close()
+        self.assertEqual(rows, [(float(i + 1), "Food") for i in range(5)])
+        self.assertEqual(_version(self.path), SCHEMA_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import gzip
+import json
+import os
+import sqlite3
+import unittest
+
+import ledger_archive
+import ndjson_backup
+from tests.support import LedgerTestCase
+
+
+class NdjsonBackupTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seed(count=400)
+        self.db.add_notifications(self.user_id, [
+            {"title": "Budget Warning", "message": "cat0 at 85%", "severity": "warning", "fingerprint": "budget_warning:cat0:2024-01"},
+            {"title": "Hello", "message": "no fingerprint"},
+        ])
+        self.db.add_report_schedule(self.user_id, "boss@example.com", "2025-01-31", account_id=self.account_ids[1])
+        self.other_id = self.db.register_user("restored", "restored@example.com", "Passw0rd1")
+
+    def _rows(self, table, user_id, columns):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return sorted(conn.execute(f"SELECT {columns} FROM {table} WHERE user_id = ?", (user_id,)).fetchall())
+        finally:
+            conn.close()
+
+    def _account_names(self, table, user_id):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return sorted(conn.execute(
+                f"SELECT t.amount, a.account_name FROM {table} t "
+                f"LEFT JOIN managed_accounts a ON a.id = t.account_id WHERE t.user_id = ?",
+                (user_id,),
+            ).fetchall(), key=lambda row: (row[0], row[1] or ""))
+        finally:
+            conn.close()
+
+    def test_round_trip_into_another_user(self):
+        path = os.path.join(self.tmp, "backup.ndjson.gz")
+        exported = ndjson_backup.export_backup(self.db, self.user_id, path)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[0]["type"], "header")
+        self.assertEqual(records[-1], {"type": "footer", "counts": exported})
+
+        imported = ndjson_backup.import_backup(self.db, self.other_id, path, batch_size=50)
+        for table in ("managed_accounts", "expenses", "income", "notifications", "report_schedules"):
+            with self.subTest(table=table):
+                self.assertEqual(imported.get(table), exported[table])
+        for table, columns in (("expenses", "date, amount, category, description"),
+                               ("income", "date, amount, source, description")):
+            self.assertEqual(self._rows(table, self.other_id, columns), self._rows(table, self.user_id, columns))
+            # account_id is remapped to the importing user's new accounts
+            self.assertEqual(self._account_names(table, self.other_id), self._account_names(table, self.user_id))
+        schedule = self.db.get_report_schedules(self.other_id)[0]
+        self.assertEqual((schedule["account_name"], schedule["next_run_date"]), ("Client B", "2025-01-31"))
+        self.assertEqual(self.db.get_unread_notification_count(self.other_id), 2)
+
+    def test_archived_years_are_exported_and_restored(self):
+        columns = "date, amount, description"
+        before = {t: self._rows(t, self.user_id, columns) for t in ("expenses", "income")}
+        ledger_archive.archive_transactions(self.db, "2022-01-01")
+        self.assertLess(len(self._rows("expenses", self.user_id, "id")), len(before["expenses"]))
+
+        path = os.path.join(self.tmp, "backup.ndjson")
+        exported = ndjson_backup.export_backup(self.db, self.user_id, path)
+        imported = ndjson_backup.import_backup(self.db, self.other_id, path)
+        for table in ("expenses", "income"):
+            with self.subTest(table=table):
+                self.assertEqual(exported[table], len(before[table]))
+                self.assertEqual(imported[table], exported[table])
+                self.assertEqual(self._rows(table, self.other_id, columns), before[table])
+        self.assertAlmostEqual(self.db.get_summary(self.other_id)["balance"],
+                               self.db.get_summary(self.user_id)["balance"], places=6)
+
+    def test_import_over_existing_alerts_skips_duplicates(self):
+        path = os.path.join(self.tmp, "backup.ndjson")
+        ndjson_backup.export_backup(self.db, self.user_id, path)
+        imported = ndjson_backup.import_backup(self.db, self.user_id, path)
+        self.assertEqual(imported["notifications"], 1)  # the fingerprinted alert already exists
+        self.assertEqual(imported.get("managed_accounts", 0), 0)
+        self.assertEqual(len(self._rows("expenses", self.user_id, "id")),
+                         2 * sum(1 for row in self.rows if row[0] == "expenses"))
+
+    def test_truncated_backup_writes_nothing(self):
+        path = os.path.join(self.tmp, "backup.ndjson")
+        ndjson_backup.export_backup(self.db, self.user_id, path)
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(lines[:-1])
+        with self.assertRaises(ValueError):
+            ndjson_backup.import_backup(self.db, self.other_id, path)
+        self.assertEqual(self._rows("expenses", self.other_id, "id"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import sqlite3
+import unittest
+
+from tests.support import LedgerTestCase
+
+
+def _alert(fingerprint, title="Alert"):
+    return {"title": title, "message": f"{title} message", "severity": "warning", "fingerprint": fingerprint}
+
+
+class NotificationCounterTests(LedgerTestCase):
+    def counted(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            return conn.execute(
+                "SELECT COALESCE(SUM(is_read = 0), 0), COUNT(*) FROM notifications WHERE user_id = ?", (self.user_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def stored(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT unread, total FROM notification_counters WHERE user_id = ?", (self.user_id,)
+            ).fetchone()
+            return tuple(row) if row else (0, 0)
+        finally:
+            conn.close()
+
+    def test_add_notifications_returns_rows_inserted(self):
+        self.assertEqual(self.db.add_notifications(self.user_id, [_alert("a"), _alert("b")]), 2)
+        self.assertEqual(self.db.add_notifications(self.user_id, [_alert("a"), _alert("b"), _alert("c")]), 1)
+        self.assertEqual(self.db.add_notifications(self.user_id, [{"title": "t", "message": "m"}] * 2), 2)
+        self.assertEqual(self.db.get_unread_notification_count(self.user_id), 5)
+
+    def test_counters_follow_every_change(self):
+        first = self.db.add_notification(self.user_id, "One", "m")
+        second = self.db.add_notification(self.user_id, "Two", "m")
+        self.db.add_notifications(self.user_id, [_alert("x"), _alert("y")])
+        self.assertEqual(self.stored(), self.counted())
+
+        self.db.mark_notification_read(first, self.user_id)
+        self.db.mark_notification_read(first, self.user_id)  # no double count
+        self.assertEqual(self.stored(), (3, 4))
+        self.db.mark_notification_read(first, self.user_id, is_read=False)
+        self.db.delete_notification(second, self.user_id)
+        self.assertEqual(self.stored(), self.counted())
+        self.assertEqual(self.db.get_unread_notification_count(self.user_id), 3)
+
+        self.db.clear_notifications(self.user_id)
+        self.assertEqual(self.stored(), (0, 0))
+
+    def test_pruning_and_rebuild_keep_counters_exact(self):
+        ids = [self.db.add_notification(self.user_id, f"n{i}", "m") for i in range(12)]
+        for notification_id in ids[:5]:
+            self.db.mark_notification_read(notification_id, self.user_id)
+        result = self.db.prune_notifications(self.user_id, max_per_user=8, batch_size=3)
+        self.assertEqual(result["capped"], 4)
+        self.assertEqual(self.stored(), self.counted())
+        self.assertEqual(self.stored(), (7, 8))
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE notification_counters SET unread = 99, total = 99")
+        conn.commit()
+        conn.close()
+        self.db.rebuild_notification_counters()
+        self.assertEqual(self.stored(), self.counted())
+
+
+if __name__ == "__main__":
+    unittest.main()
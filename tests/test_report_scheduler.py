@@ -0,0 +1,58 @@
+import unittest
+from datetime import date
+
+from report_scheduler import advance_run_date, run_due_schedules
+from tests.support import LedgerTestCase
+
+
+class AdvanceRunDateTests(unittest.TestCase):
+    def test_month_end_schedules_return_to_their_anchor_day(self):
+        run_date, dates = "2025-01-31", []
+        for month in range(2, 6):
+            run_date = advance_run_date(run_date, "monthly", date(2025, month, 1), anchor_day=31)
+            dates.append(run_date)
+        self.assertEqual(dates, ["2025-02-28", "2025-03-31", "2025-04-30", "2025-05-31"])
+        self.assertEqual(advance_run_date("2024-02-29", "yearly", date(2024, 3, 1), anchor_day=29), "2025-02-28")
+        self.assertEqual(advance_run_date("2025-02-28", "quarterly", date(2025, 3, 1), anchor_day=30), "2025-05-30")
+
+    def test_missed_runs_are_skipped(self):
+        self.assertEqual(advance_run_date("2025-01-15", "monthly", date(2025, 4, 20), anchor_day=15), "2025-05-15")
+        self.assertEqual(advance_run_date("2025-01-01", "weekly", date(2025, 1, 20)), "2025-01-22")
+
+
+class RunDueSchedulesTests(LedgerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.seed(count=50, start=date(2025, 1, 1), days=60)
+        self.schedule_id = self.db.add_report_schedule(self.user_id, "boss@example.com", "2025-01-31")
+
+    def schedule(self):
+        return self.db.get_report_schedules(self.user_id)[0]
+
+    def test_a_run_is_queued_once_and_advanced_to_the_anchor_day(self):
+        first = run_due_schedules(self.db, "2025-02-01", default_sender="me@example.com")
+        second = run_due_schedules(self.db, "2025-02-01", default_sender="me@example.com")
+        self.assertEqual((first["queued"], second["due"], second["queued"]), (1, 0, 0))
+        self.assertEqual(self.schedule()["next_run_date"], "2025-02-28")
+
+        run_due_schedules(self.db, "2025-02-28", default_sender="me@example.com")
+        self.assertEqual(self.schedule()["next_run_date"], "2025-03-31")
+        self.assertEqual(self.db.get_outbox_counts(self.user_id), {"queued": 2})
+
+    def test_stale_claims_are_refused(self):
+        self.assertEqual(self.db.claim_report_schedules([(self.schedule_id, "2025-01-31", "2025-02-28")]),
+                         [self.schedule_id])
+        # A second process that read the schedule before the first claim loses
+        self.assertEqual(self.db.claim_report_schedules([(self.schedule_id, "2025-01-31", "2025-02-28")]), [])
+
+    def test_render_errors_leave_the_run_due(self):
+        self.db.update_report_schedule(self.schedule_id, self.user_id, report_kind="unknown")
+        result = run_due_schedules(self.db, "2025-02-01", default_sender="me@example.com")
+        self.assertEqual((result["errors"], result["queued"]), (1, 0))
+        schedule = self.schedule()
+        self.assertEqual(schedule["next_run_date"], "2025-01-31")
+        self.assertTrue(schedule["last_status"].startswith("error:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,10 @@
 """Standalone user database management application."""
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 
 from config import COLORS, FONTS
 from database import Database
-from utils import validate_email, validate_password
+from utils import validate_email, validate_password, run_in_background
 
 
 class UserManagerApp:
@@ -55,6 +55,7 @@ class UserManagerApp:
 
         ttk.Button(toolbar, text="Refresh", command=self.refresh_users).pack(side=tk.LEFT, padx=4)
         ttk.Button(toolbar, text="New User", command=self.start_new_user).pack(side=tk.LEFT, padx=4)
+        ttk.Button(toolbar, text="Month-end Statements", command=self.generate_month_end_statements).pack(side=tk.LEFT, padx=4)
 
         body = tk.Frame(self.root, bg=COLORS["background"])
         body.pack(fill=tk.BOTH, expand=True, padx=16, pady=(0, 10))
@@ -243,22 +244,34 @@ class UserManagerApp:
             return
 
         if creating:
-            user_id = self.db.register_user(data["username"], data["email"], data["password"], data["full_name"])
-            if not user_id:
-                messagebox.showerror("Error", "Could not create user. Username/email may already exist.")
-                return
-
-            self.db.update_user_admin(
-                user_id,
-                phone=data["phone"],
-                address=data["address"],
-                city=data["city"],
-                state=data["state"],
-                zip_code=data["zip_code"],
+            def on_created(user_id):
+                if not user_id:
+                    messagebox.showerror("Error", "Could not create user. Username/email may already exist.")
+                    self.set_status("Ready")
+                    return
+
+                self.db.update_user_admin(
+                    user_id,
+                    phone=data["phone"],
+                    address=data["address"],
+                    city=data["city"],
+                    state=data["state"],
+                    zip_code=data["zip_code"],
+                )
+                self.set_status(f"Created user #{user_id}")
+                messagebox.showinfo("Success", "User created successfully")
+                self.selected_user_id = user_id
+                self.refresh_users()
+
+            # Password hashing is slow by design; run it off the Tk thread
+            self.set_status("Creating user...")
+            run_in_background(
+                self.root,
+                lambda: self.db.register_user(data["username"], data["email"], data["password"], data["full_name"]),
+                on_created,
+                lambda e: messagebox.showerror("Error", f"Could not create user: {e}"),
             )
-            self.set_status(f"Created user #{user_id}")
-            messagebox.showinfo("Success", "User created successfully")
-            self.selected_user_id = user_id
+            return
         else:
             ok = self.db.update_user_admin(
                 self.selected_user_id,
@@ -275,10 +288,23 @@ class UserManagerApp:
                 messagebox.showerror("Error", "Update failed. Username/email may already exist.")
                 return
 
+            user_id = self.selected_user_id
             if data["password"]:
-                self.db.update_user_password(self.selected_user_id, data["password"])
+                def on_updated(_):
+                    self.set_status(f"Updated user #{user_id}")
+                    messagebox.showinfo("Success", "User updated successfully")
+                    self.refresh_users()
+
+                self.set_status("Updating user...")
+                run_in_background(
+                    self.root,
+                    lambda: self.db.update_user_password(user_id, data["password"]),
+                    on_updated,
+                    lambda e: messagebox.showerror("Error", f"Password update failed: {e}"),
+                )
+                return
 
-            self.set_status(f"Updated user #{self.selected_user_id}")
+            self.set_status(f"Updated user #{user_id}")
             messagebox.showinfo("Success", "User updated successfully")
 
         self.refresh_users()
@@ -302,12 +328,57 @@ class UserManagerApp:
             messagebox.showerror("Error", message)
             return
 
-        if self.db.update_user_password(self.selected_user_id, password):
+        user_id = self.selected_user_id
+
+        def on_done(ok):
+            if not ok:
+                self.set_status("Ready")
+                return
             self.form_vars["password"].set("")
             self.form_vars["confirm"].set("")
-            self.set_status(f"Password reset for user #{self.selected_user_id}")
+            self.set_status(f"Password reset for user #{user_id}")
             messagebox.showinfo("Success", "Password updated")
 
+        self.set_status("Resetting password...")
+        run_in_background(
+            self.root,
+            lambda: self.db.update_user_password(user_id, password),
+            on_done,
+            lambda e: messagebox.showerror("Error", f"Password update failed: {e}"),
+        )
+
+    def generate_month_end_statements(self):
+        """Render last month's statement for every managed account of every user."""
+        from batch_reports import closed_period_range, run_batch_reports
+
+        out_dir = filedialog.askdirectory(title="Select folder for account statements")
+        if not out_dir:
+            return
+
+        start_date, end_date = closed_period_range("Month")
+
+        def on_done(manifest):
+            self.set_status(
+                f"Statements: {manifest['written']} written, {manifest['skipped']} skipped, "
+                f"{manifest['failed']} failed ({manifest['seconds']:.1f}s)"
+            )
+            messagebox.showinfo("Statements Ready", f"Saved to {out_dir}\nSee manifest.json for details.")
+
+        self.set_status("Generating account statements...")
+        run_in_background(
+            self.root,
+            lambda progress: run_batch_reports(
+                out_dir,
+                db_path=self.db.db_path,
+                start_date=start_date,
+                end_date=end_date,
+                progress=progress,
+            ),
+            on_done,
+            lambda e: messagebox.showerror("Error", f"Failed to generate statements: {e}"),
+            on_progress=lambda done, total: self.set_status(f"Generating account statements... {done}/{total}"),
+        )
+
     def delete_selected_user(self):
         if self.selected_user_id is None:
             messagebox.showerror("Error", "Select a user first")
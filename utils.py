@@ -1,9 +1,11 @@
 """Comprehensive Utility functions for Expense Tracker Pro"""
 import tkinter as tk
 from tkinter import ttk, messagebox
-from config import COLORS, FONTS
+from config import COLORS, FONTS, SEARCH_DEBOUNCE_MS
 from datetime import datetime, timedelta
+import queue
 import re
+import threading
 
 
 # ============== CUSTOM UI COMPONENTS ==============
@@ -532,6 +534,247 @@ def get_export_filename(report_type, format_type='pdf'):
     return f"{report_type}_{timestamp}.{format_type}"
 
 
+# ============== BACKGROUND TASK UTILITIES ==============
+
+def run_in_background(widget, func, on_done=None, on_error=None, on_progress=None, poll_ms=40):
+    """Run func on a worker thread and deliver results on the Tk thread.
+
+    Tk widgets must only be touched from the main loop, so the worker posts
+    its outcome to a queue that is polled with widget.after(). When
+    on_progress is given, func is called as func(progress=callback) and may
+    report progress values from the worker.
+    """
+    results = queue.Queue()
+
+    def worker():
+        try:
+            if on_progress is not None:
+                value = func(progress=lambda *info: results.put(("progress", info)))
+            else:
+                value = func()
+            results.put(("done", value))
+        except Exception as e:
+            results.put(("error", e))
+
+    def poll():
+        try:
+            if not widget.winfo_exists():
+                return
+        except tk.TclError:
+            return
+        while True:
+            try:
+                kind, payload = results.get_nowait()
+            except queue.Empty:
+                widget.after(poll_ms, poll)
+                return
+            if kind == "progress":
+                on_progress(*payload)
+            elif kind == "done":
+                if on_done:
+                    on_done(payload)
+                return
+            else:
+                if on_error:
+                    on_error(payload)
+                return
+
+    thread = threading.Thread(target=worker, daemon=True)
+    thread.start()
+    widget.after(poll_ms, poll)
+    return thread
+
+
+def sort_key(value):
+    """Typed sort key for a table cell: numbers (commas allowed) before text."""
+    text = str(value if value is not None else "").replace(",", "").strip()
+    try:
+        return (0, float(text), "")
+    except ValueError:
+        return (1, 0.0, text.lower())
+
+
+class TableSearch:
+    """Debounced, incremental search over the rows of a Treeview.
+
+    load() inserts every row once (iid = row index) and builds its lowercase
+    haystack. Keystrokes are debounced; a query that extends the previous one
+    only rescans the previous matches, and the tree is updated by detaching
+    or re-attaching just the rows whose visibility changed. With a key
+    function, patch() applies row-level changes (see ledger_store.py)
+    without reloading.
+    """
+
+    def __init__(self, tree, entry, values, haystack=None, on_change=None, delay_ms=SEARCH_DEBOUNCE_MS,
+                 sort_keys=None, key=None):
+        self.tree = tree
+        self.entry = entry
+        self.values = values  # row -> tuple shown in the tree columns
+        self.haystack = haystack or (lambda row: " ".join(str(v or "") for v in values(row)))
+        self.on_change = on_change  # called with the visible rows after each change
+        self.delay_ms = delay_ms
+        self.sort_keys = sort_keys or {}  # column index -> row -> typed key (default: sort_key of the cell)
+        self.key = key  # row -> identity used by patch()
+        self.rows = []
+        self._index = {}  # key -> row index
+        self._iids = []
+        self._hay = []
+        self._order = []  # every row index in display order
+        self._base = []  # _order after row_filter
+        self._matches = []  # _base rows matching _query, in display order
+        self._visible = set()
+        self._sorted = {}  # column index -> row indexes in ascending order, per load
+        self._row_filter = None
+        self._query = None
+        self._after_id = None
+        widget = getattr(entry, "entry", entry)
+        widget.bind("<KeyRelease>", lambda e: self.schedule(), add="+")
+        widget.bind("<Return>", lambda e: self.apply(), add="+")
+
+    def load(self, rows):
+        """Replace the table contents (call again after data changes)."""
+        self.rows = list(rows)
+        self._hay = [self.haystack(row).lower() for row in self.rows]
+        self._order = list(range(len(self.rows)))
+        self._iids = [str(index) for index in self._order]
+        self._index = {self.key(row): index for index, row in enumerate(self.rows)} if self.key else {}
+        self._sorted = {}
+        self.tree.delete(*self.tree.get_children(""))
+        for index, row in enumerate(self.rows):
+            self.tree.insert("", "end", iid=self._iids[index], values=self.values(row))
+        self._visible = set(self._order)
+        self._matches = list(self._order)
+        self._query = self.entry.get().strip().lower()
+        self._rebase()
+
+    def patch(self, upserted=(), removed=()):
+        """Insert/update rows and remove rows by key, touching only those tree items.
+
+        New rows go to the top; an edited row keeps its place until the next
+        sort. Only a change in an edited row's visibility rescans the table.
+        """
+        if not self.tree.winfo_exists():
+            return
+        query = self._query or ""
+        visible_changed = False
+        for row_key in removed:
+            index = self._index.pop(row_key, None)
+            if index is None:
+                continue
+            self.tree.delete(self._iids[index])
+            self.rows[index] = None
+            self._hay[index] = ""
+            self._order.remove(index)
+            if self._base is not self._order and index in self._base:
+                self._base.remove(index)
+            if index in self._visible:
+                self._matches.remove(index)
+                self._visible.discard(index)
+        for row in upserted:
+            index = self._index.get(self.key(row))
+            passes = self._row_filter is None or self._row_filter(row)
+            if index is None:
+                index = len(self.rows)
+                self.rows.append(row)
+                self._hay.append(self.haystack(row).lower())
+                self._iids.append(str(index))
+                self._index[self.key(row)] = index
+                self.tree.insert("", 0, iid=self._iids[index], values=self.values(row))
+                self._order.insert(0, index)
+                if passes and self._base is not self._order:
+                    self._base.insert(0, index)
+                if passes and query in self._hay[index]:
+                    self._matches.insert(0, index)
+                    self._visible.add(index)
+                else:
+                    self.tree.detach(self._iids[index])
+                continue
+            was_base = self._row_filter is None or self._row_filter(self.rows[index])
+            self.rows[index] = row
+            self._hay[index] = self.haystack(row).lower()
+            self.tree.item(self._iids[index], values=self.values(row))
+            if was_base != passes or (index in self._visible) != (passes and query in self._hay[index]):
+                visible_changed = True
+        self._sorted = {}
+        if visible_changed:
+            self._rebase()
+        elif self.on_change:
+            self.on_change(self.visible_rows())
+
+    def set_filter(self, predicate):
+        """Extra row predicate (e.g. a type combobox); None shows every row."""
+        self._row_filter = predicate
+        self._rebase()
+
+    def row(self, iid):
+        return self.rows[int(iid)]
+
+    def visible_rows(self):
+        return [self.rows[i] for i in self._matches]
+
+    def sort_column(self, column, descending=False):
+        """Order every row (shown or not) by a tree column and redisplay in one call.
+
+        Keys are computed once per column per load; later clicks on the same
+        column only reverse the cached order.
+        """
+        order = self._sorted.get(column)
+        if order is None:
+            key = self.sort_keys.get(column) or (lambda row: sort_key(self.values(row)[column]))
+            keys = [key(row) if row is not None else None for row in self.rows]  # None: removed by patch()
+            order = sorted((i for i, row in enumerate(self.rows) if row is not None), key=keys.__getitem__)
+            self._sorted[column] = order
+        self._order = order[::-1] if descending else list(order)
+        self._rebase()
+
+    def schedule(self):
+        if self._after_id is not None:
+            self.tree.after_cancel(self._after_id)
+        self._after_id = self.tree.after(self.delay_ms, self.apply)
+
+    def apply(self):
+        """Filter for the current entry text now."""
+        if self._after_id is not None:
+            self.tree.after_cancel(self._after_id)
+            self._after_id = None
+        query = self.entry.get().strip().lower()
+        if query == self._query:
+            return
+        candidates = self._matches if self._query is not None and query.startswith(self._query) else self._base
+        self._show([i for i in candidates if query in self._hay[i]] if query else list(self._base), query)
+
+    def _rebase(self):
+        if self._row_filter is None:
+            self._base = self._order
+        else:
+            self._base = [i for i in self._order if self._row_filter(self.rows[i])]
+        query = self._query or ""
+        matches = [i for i in self._base if query in self._hay[i]] if query else list(self._base)
+        self._show(matches, query, reorder=True)
+
+    def _show(self, matches, query, reorder=False):
+        if not self.tree.winfo_exists():
+            return
+        visible = set(matches)
+        added = visible - self._visible
+        removed = self._visible - visible
+        iids = self._iids
+        if reorder or len(added) > len(matches) // 2:
+            self.tree.set_children("", *[iids[i] for i in matches])
+        else:
+            if removed:
+                self.tree.detach(*[iids[i] for i in removed])
+            if added:
+                for position, index in enumerate(matches):
+                    if index in added:
+                        self.tree.move(iids[index], "", position)
+        self._matches = matches
+        self._visible = visible
+        self._query = query
+        if self.on_change:
+            self.on_change(self.visible_rows())
+
+
 # ============== THEME MANAGEMENT ==============
 
 def apply_theme(theme="light"):
@@ -64,6 +64,7 @@ optional_deps = [
     ('reportlab', 'PDF Generation'),
     ('PIL', 'Image Processing'),
     ('dateutil', 'Date Utilities'),
+    ('numpy', 'Forecasting'),
     ('cv2', 'Image Recognition (Optional)')
 ]
 